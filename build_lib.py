@@ -144,6 +144,8 @@ try:
         "native/warp.cpp",
         "native/crt.cpp",
         "native/cuda_util.cpp",
+        "native/thread_pool.cpp",
+        "native/cpu_graph.cpp",
         "native/mesh.cpp",
         "native/hashgrid.cpp",
         "native/reduce.cpp",
@@ -151,7 +153,9 @@ try:
         "native/sort.cpp",
         "native/sparse.cpp",
         "native/volume.cpp",
+        "native/volume_builder.cpp",
         "native/marching.cpp",
+        "native/gemm.cpp",
         "native/cutlass_gemm.cpp",
     ]
     warp_cpp_paths = [os.path.join(build_path, cpp) for cpp in cpp_sources]
@@ -0,0 +1,157 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+###########################################################################
+# Benchmark for the BVH builders and layouts of wp.Mesh
+#
+# Builds the BVH of a procedural mesh with each constructor, with and
+# without the wide BVH used by CPU queries, and measures the build time
+# and the throughput of ray and closest point queries against the result.
+###########################################################################
+
+import statistics
+import time
+
+import numpy as np
+
+import warp as wp
+
+wp.config.quiet = True
+wp.init()
+
+num_samples = 5
+num_rays = 1 << 18
+
+
+@wp.kernel
+def cast_rays(mesh: wp.uint64, origin: wp.vec3, dirs: wp.array(dtype=wp.vec3), hits: wp.array(dtype=float)):
+    tid = wp.tid()
+
+    t = float(0.0)
+    u = float(0.0)
+    v = float(0.0)
+    sign = float(0.0)
+    n = wp.vec3()
+    f = int(0)
+
+    if wp.mesh_query_ray(mesh, origin, dirs[tid], 1.0e6, t, u, v, sign, n, f):
+        hits[tid] = t
+    else:
+        hits[tid] = -1.0
+
+
+@wp.kernel
+def closest_points(mesh: wp.uint64, points: wp.array(dtype=wp.vec3), dists: wp.array(dtype=float)):
+    tid = wp.tid()
+
+    face = int(0)
+    u = float(0.0)
+    v = float(0.0)
+
+    p = points[tid]
+    if wp.mesh_query_point_no_sign(mesh, p, 1.0e6, face, u, v):
+        dists[tid] = wp.length(wp.mesh_eval_position(mesh, face, u, v) - p)
+    else:
+        dists[tid] = -1.0
+
+
+def create_terrain(resolution):
+    # height field with bumps of varying size so that the triangle bounds overlap unevenly
+    x, y = np.meshgrid(np.linspace(-1.0, 1.0, resolution), np.linspace(-1.0, 1.0, resolution))
+    z = 0.2 * np.sin(7.0 * x) * np.cos(5.0 * y) + 0.05 * np.sin(40.0 * x * y)
+
+    points = np.stack((x.ravel(), y.ravel(), z.ravel()), axis=1)
+
+    cells = np.arange(resolution * resolution).reshape(resolution, resolution)[:-1, :-1].ravel()
+    indices = np.stack(
+        (
+            cells,
+            cells + 1,
+            cells + resolution,
+            cells + 1,
+            cells + resolution + 1,
+            cells + resolution,
+        ),
+        axis=1,
+    )
+
+    return points, indices.ravel()
+
+
+def measure(func):
+    times = []
+    for _ in range(num_samples):
+        wp.synchronize()
+        start = time.perf_counter()
+        func()
+        wp.synchronize()
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+rng = np.random.default_rng(123)
+
+dirs_np = rng.normal(size=(num_rays, 3))
+dirs_np[:, 2] = -np.abs(dirs_np[:, 2]) - 1.0
+dirs_np /= np.linalg.norm(dirs_np, axis=1)[:, None]
+
+origin = wp.vec3(0.0, 0.0, 2.0)
+
+query_points_np = rng.uniform(-1.0, 1.0, size=(num_rays, 3))
+
+print("-------------------------------------------------------------------------------------------")
+print("| device | constructor | layout |  triangles |      build |  rays Mq/s | points kq/s |")
+print("-------------------------------------------------------------------------------------------")
+
+for device in wp.get_devices():
+    dirs = wp.array(dirs_np, dtype=wp.vec3, device=device)
+    query_points = wp.array(query_points_np, dtype=wp.vec3, device=device)
+    hits = wp.empty(num_rays, dtype=float, device=device)
+
+    # the wide BVH is only used by CPU queries
+    layouts = ("binary", "wide") if device.is_cpu else ("binary",)
+
+    for resolution in (256, 1024):
+        points_np, indices_np = create_terrain(resolution)
+
+        points = wp.array(points_np, dtype=wp.vec3, device=device)
+        indices = wp.array(indices_np, dtype=int, device=device)
+
+        for constructor in ("sah", "median", "lbvh"):
+            for layout in layouts:
+                meshes = [None]
+
+                def build():
+                    meshes[0] = wp.Mesh(
+                        points=points, indices=indices, constructor=constructor, wide_bvh=(layout == "wide")
+                    )
+
+                build_time = measure(build)
+
+                mesh = meshes[0]
+
+                ray_query = lambda: wp.launch(
+                    cast_rays, dim=num_rays, inputs=[mesh.id, origin, dirs, hits], device=device
+                )
+                ray_query()
+                ray_time = measure(ray_query)
+
+                point_query = lambda: wp.launch(
+                    closest_points, dim=num_rays, inputs=[mesh.id, query_points, hits], device=device
+                )
+                point_query()
+                point_time = measure(point_query)
+
+                print(
+                    f"| {str(device):6} | {constructor:11} | {layout:6} | {len(indices_np) // 3:10} |"
+                    f"{build_time * 1000.0:8.2f} ms |{num_rays / ray_time * 1.0e-6:11.2f} |"
+                    f"{num_rays / point_time * 1.0e-3:12.1f} |"
+                )
+
+print("-------------------------------------------------------------------------------------------")
+print(f"(median of {num_samples} runs, {num_rays} queries)")
@@ -0,0 +1,102 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+###########################################################################
+# Benchmark for the CPU hash grid build and neighbor queries
+#
+# Compares grids storing dense cell ranges against sparse grids that only
+# store the occupied cells in an open-addressing table.
+###########################################################################
+
+import statistics
+import time
+
+import numpy as np
+
+import warp as wp
+
+wp.config.quiet = True
+wp.init()
+
+num_samples = 5
+radius = 0.02
+
+
+@wp.kernel
+def count_neighbors(grid: wp.uint64, radius: float, points: wp.array(dtype=wp.vec3), counts: wp.array(dtype=int)):
+    tid = wp.tid()
+
+    i = wp.hash_grid_point_id(grid, tid)
+    p = points[i]
+    count = int(0)
+
+    for index in wp.hash_grid_query(grid, p, radius):
+        if wp.length(p - points[index]) <= radius:
+            count += 1
+
+    counts[i] = count
+
+
+def measure(func):
+    func()
+
+    times = []
+    for _ in range(num_samples):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+rng = np.random.default_rng(123)
+
+print("-------------------------------------------------------------------------------")
+print("| points     |  dim |  storage |    create |     build |     query | cell MB   |")
+print("-------------------------------------------------------------------------------")
+
+for num_points in (1 << 16, 1 << 20):
+    # points on a thin shell leave most cells of the grid empty
+    directions = rng.normal(size=(num_points, 3))
+    points_np = directions / np.linalg.norm(directions, axis=1)[:, None] * 10.0
+
+    points = wp.array(points_np, dtype=wp.vec3, device="cpu")
+    counts = wp.zeros(num_points, dtype=int, device="cpu")
+
+    for dim in (128, 512):
+        for sparse in (False, True):
+            start = time.perf_counter()
+            grid = wp.HashGrid(dim, dim, dim, device="cpu", sparse=sparse)
+            create_time = time.perf_counter() - start
+
+            build_time = measure(lambda: grid.build(points, radius))
+            query_time = measure(
+                lambda: wp.launch(
+                    count_neighbors, dim=num_points, inputs=[grid.id, radius, points, counts], device="cpu"
+                )
+            )
+
+            if sparse:
+                # physical cells wrap around the grid dimensions
+                cells = np.mod(np.trunc(points_np / radius).astype(np.int64) + (1 << 20), dim)
+                num_occupied = len(np.unique(cells, axis=0))
+                num_slots = 16
+                while num_slots < 4 * num_occupied:
+                    num_slots *= 2
+                cell_bytes = 3 * 4 * num_slots
+            else:
+                cell_bytes = 2 * 4 * dim**3
+
+            print(
+                f"| {num_points:10} | {dim:4} | {'sparse' if sparse else 'dense':>8} |{create_time * 1000.0:7.2f} ms |"
+                f"{build_time * 1000.0:7.2f} ms |{query_time * 1000.0:7.2f} ms | {cell_bytes / (1 << 20):9.2f} |"
+            )
+
+            del grid
+
+print("-------------------------------------------------------------------------------")
+print(f"(median of {num_samples} runs)")
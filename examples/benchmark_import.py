@@ -0,0 +1,104 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+###########################################################################
+# Benchmark for the import time of warp.sim and the latency of the first
+# simulation step in a new process, with a warm kernel cache.
+#
+# Every sample runs in a fresh interpreter. Samples are taken with and
+# without the persisted source information of the kernel cache, in which
+# case the sources of the kernels are read and parsed before the modules
+# can be loaded.
+###########################################################################
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sample_script = """
+import sys, time
+
+start = time.perf_counter()
+
+import warp as wp
+wp.config.quiet = True
+wp.config.kernel_cache_dir = sys.argv[1]
+wp.init()
+
+import warp.sim
+
+import_time = time.perf_counter() - start
+
+builder = wp.sim.ModelBuilder()
+builder.add_particle_grid(
+    dim_x=8, dim_y=8, dim_z=8, cell_x=0.1, cell_y=0.1, cell_z=0.1,
+    pos=wp.vec3(0.0, 1.0, 0.0), rot=wp.quat_identity(), vel=wp.vec3(0.0, 0.0, 0.0), mass=1.0, jitter=0.0,
+)
+model = builder.finalize(device="cpu")
+
+state_0 = model.state()
+state_1 = model.state()
+integrator = wp.sim.SemiImplicitIntegrator()
+
+start = time.perf_counter()
+integrator.simulate(model, state_0, state_1, 1.0 / 60.0)
+wp.synchronize()
+step_time = time.perf_counter() - start
+
+print(import_time, step_time)
+"""
+
+
+def sample(cache_dir):
+    result = subprocess.run(
+        [sys.executable, "-c", sample_script, cache_dir], check=True, capture_output=True, text=True
+    )
+    import_time, step_time = result.stdout.split()[-2:]
+    return float(import_time), float(step_time)
+
+
+num_samples = 5
+
+with tempfile.TemporaryDirectory() as cache_dir:
+    # compile the kernels and persist the source information
+    sample(cache_dir)
+
+    source_cache_path = os.path.join(cache_dir, "sources.json")
+    with open(source_cache_path, "rb") as f:
+        source_cache = f.read()
+
+    results = {}
+
+    for name, persisted in (("parsed sources", False), ("persisted sources", True)):
+        import_times = []
+        step_times = []
+
+        for _ in range(num_samples):
+            if persisted:
+                with open(source_cache_path, "wb") as f:
+                    f.write(source_cache)
+            elif os.path.exists(source_cache_path):
+                os.remove(source_cache_path)
+
+            import_time, step_time = sample(cache_dir)
+            import_times.append(import_time)
+            step_times.append(step_time)
+
+        results[name] = (statistics.median(import_times), statistics.median(step_times))
+
+    print("----------------------------------------------------------------")
+    print("|                   |  import warp.sim |  first step |   total |")
+    print("----------------------------------------------------------------")
+    for name, (import_time, step_time) in results.items():
+        print(
+            f"| {name:17} |{import_time * 1000.0:14.1f} ms |{step_time * 1000.0:9.1f} ms |"
+            f"{(import_time + step_time) * 1000.0:5.0f} ms |"
+        )
+    print("----------------------------------------------------------------")
+    print(f"(median of {num_samples} processes)")
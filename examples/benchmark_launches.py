@@ -6,7 +6,8 @@
 # license agreement from NVIDIA CORPORATION is strictly prohibited.
 
 ###########################################################################
-# Bechmarks for kernel launches with different types of args
+# Bechmarks for kernel launches with different types of args, and for
+# bound launches recorded with wp.launch(..., record_cmd=True)
 ###########################################################################
 
 import warp as wp
@@ -202,6 +203,16 @@ for device in devices:
         tsa = wp.ScopedTimer("sa")
         tsz = wp.ScopedTimer("sz")
 
+        tb0 = wp.ScopedTimer("b0")
+        tbf = wp.ScopedTimer("bf")
+        tbv = wp.ScopedTimer("bv")
+        tbm = wp.ScopedTimer("bm")
+        tba = wp.ScopedTimer("ba")
+        tbz = wp.ScopedTimer("bz")
+
+        tua = wp.ScopedTimer("ua")
+        tuz = wp.ScopedTimer("uz")
+
         wp.synchronize_device()
 
         with tk0:
@@ -276,20 +287,90 @@ for device in devices:
             for _ in range(num_launches):
                 wp.launch(ksz, dim=1, inputs=[sz])
 
+        # bound launches, the hooks are resolved and the arguments are packed once
+
+        b0 = wp.launch(k0, dim=1, inputs=[], record_cmd=True)
+        bf = wp.launch(kf, dim=1, inputs=[x, y, z], record_cmd=True)
+        bv = wp.launch(kv, dim=1, inputs=[u, v, w], record_cmd=True)
+        bm = wp.launch(km, dim=1, inputs=[M, N, O], record_cmd=True)
+        ba = wp.launch(ka, dim=1, inputs=[a, b, c], record_cmd=True)
+        bz = wp.launch(kz, dim=1, inputs=[a, b, c, x, y, z, u, v, w], record_cmd=True)
+
+        wp.synchronize_device()
+
+        with tb0:
+            for _ in range(num_launches):
+                b0.launch()
+
+        wp.synchronize_device()
+
+        with tbf:
+            for _ in range(num_launches):
+                bf.launch()
+
+        wp.synchronize_device()
+
+        with tbv:
+            for _ in range(num_launches):
+                bv.launch()
+
+        wp.synchronize_device()
+
+        with tbm:
+            for _ in range(num_launches):
+                bm.launch()
+
+        wp.synchronize_device()
+
+        with tba:
+            for _ in range(num_launches):
+                ba.launch()
+
+        wp.synchronize_device()
+
+        with tbz:
+            for _ in range(num_launches):
+                bz.launch()
+
+        # bound launches that update one array and one scalar argument before each launch
+
+        index_a = bz.get_param_index("a")
+        index_x = bz.get_param_index("x")
+
+        wp.synchronize_device()
+
+        with tua:
+            for i in range(num_launches):
+                ba.set_param_at_index(0, b if i & 1 else a)
+                ba.launch()
+
+        wp.synchronize_device()
+
+        with tuz:
+            for i in range(num_launches):
+                bz.set_param_at_index(index_a, b if i & 1 else a)
+                bz.set_param_at_index(index_x, float(i))
+                bz.launch()
+
         wp.synchronize_device()
 
         timers = [
-            [tk0, ts0],
-            [tkf, tsf],
-            [tkv, tsv],
-            [tkm, tsm],
-            [tka, tsa],
-            [tkz, tsz],
+            [tk0, ts0, tb0, None],
+            [tkf, tsf, tbf, None],
+            [tkv, tsv, tbv, None],
+            [tkm, tsm, tbm, None],
+            [tka, tsa, tba, tua],
+            [tkz, tsz, tbz, tuz],
         ]
 
-        print("--------------------------------")
-        print(f"| args |    direct |    struct |")
-        print("--------------------------------")
-        for tk, ts in timers:
-            print(f"|  {tk.name}  |{tk.elapsed:10.0f} |{ts.elapsed:10.0f} |")
-        print("--------------------------------")
+        # per-launch cost in microseconds
+        def us(timer):
+            return f"{timer.elapsed * 1000.0 / num_launches:10.2f}" if timer else " " * 10
+
+        print("--------------------------------------------------------")
+        print(f"| args |    direct |    struct |     bound |   updated |")
+        print("--------------------------------------------------------")
+        for tk, ts, tb, tu in timers:
+            print(f"|  {tk.name}  |{us(tk)} |{us(ts)} |{us(tb)} |{us(tu)} |")
+        print("--------------------------------------------------------")
+        print("(microseconds per launch)")
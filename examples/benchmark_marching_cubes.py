@@ -0,0 +1,69 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+###########################################################################
+# Benchmark for CPU marching cubes
+#
+# Extracts the surface of a sphere from the whole field at once and slab by
+# slab, the slabs only keep a fraction of the field in memory.
+###########################################################################
+
+import statistics
+import time
+
+import numpy as np
+
+import warp as wp
+
+wp.config.quiet = True
+wp.init()
+
+num_samples = 5
+
+
+def measure(func):
+    func()
+
+    times = []
+    for _ in range(num_samples):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+print("---------------------------------------------------------------")
+print("| dim  |     slab |    verts |     tris |      time |   Mcell/s |")
+print("---------------------------------------------------------------")
+
+for dim in (64, 128, 256):
+    coords = np.arange(dim, dtype=np.float32) - dim / 2
+    x, y, z = np.meshgrid(coords, coords, coords, indexing="ij")
+    field_np = np.sqrt(x * x + y * y + z * z) - dim / 4
+
+    field = wp.array(field_np, dtype=float, device="cpu")
+
+    iso = wp.MarchingCubes(nx=dim, ny=dim, nz=dim, max_verts=10**7, max_tris=10**7, device="cpu")
+
+    for slab_size in (None, 16):
+        if slab_size is None:
+            elapsed = measure(lambda: iso.surface(field=field, threshold=0.0))
+        else:
+            slabs = [field_np[i : i + slab_size] for i in range(0, dim, slab_size)]
+            slabs = [wp.array(slab, dtype=float, device="cpu") for slab in slabs]
+            elapsed = measure(lambda: iso.surface_slabs(slabs, threshold=0.0))
+
+        slab_name = "full" if slab_size is None else slab_size
+
+        print(
+            f"| {dim:4} | {slab_name:>8} | {len(iso.verts):8} | {len(iso.indices) // 3:8} |"
+            f"{elapsed * 1000.0:7.2f} ms | {dim**3 / elapsed / 1.0e6:9.1f} |"
+        )
+
+print("---------------------------------------------------------------")
+print(f"(median of {num_samples} runs)")
@@ -0,0 +1,83 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+###########################################################################
+# Benchmark for wp.matmul() and wp.batched_matmul() on the CPU
+#
+# The CPU GEMM, which uses the native host implementation for small matrices
+# and NumPy's BLAS for large ones, is compared against the NumPy expression
+# used by the previous CPU fallback, which copies the inputs to NumPy and
+# assigns the result back to the output array.
+###########################################################################
+
+import statistics
+import time
+
+import numpy as np
+
+import warp as wp
+
+wp.config.quiet = True
+wp.init()
+
+num_samples = 20
+
+
+def measure(func):
+    func()
+
+    times = []
+    for _ in range(num_samples):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+rng = np.random.default_rng(123)
+
+print("-----------------------------------------------------------------------------------")
+print("|    dtype |     batch |    m |    n |    k |     numpy |      warp |    speedup |")
+print("-----------------------------------------------------------------------------------")
+
+# small layers of MLP controllers, then larger matrices
+shapes = [(1, 64, 64, 64), (256, 16, 32, 32), (1, 256, 256, 256), (16, 64, 128, 64), (1, 1024, 1024, 1024)]
+
+for dtype in (wp.float32, wp.float64):
+    np_type = wp.types.warp_type_to_np_dtype[dtype]
+
+    for batch_count, m, n, k in shapes:
+        a = wp.array(rng.standard_normal((batch_count, m, k)).astype(np_type), dtype=dtype, device="cpu")
+        b = wp.array(rng.standard_normal((batch_count, k, n)).astype(np_type), dtype=dtype, device="cpu")
+        c = wp.array(rng.standard_normal((batch_count, m, n)).astype(np_type), dtype=dtype, device="cpu")
+        d = wp.empty_like(c)
+
+        if batch_count == 1:
+            a, b, c, d = a[0], b[0], c[0], d[0]
+
+            def warp_func():
+                wp.matmul(a, b, c, d, 1.0, 1.0, device="cpu")
+
+        else:
+
+            def warp_func():
+                wp.batched_matmul(a, b, c, d, 1.0, 1.0, device="cpu")
+
+        def numpy_func():
+            d.assign(1.0 * np.matmul(a.numpy(), b.numpy()) + 1.0 * c.numpy())
+
+        numpy_time = measure(numpy_func)
+        warp_time = measure(warp_func)
+
+        print(
+            f"| {dtype.__name__:>8} | {batch_count:9} | {m:4} | {n:4} | {k:4} |{numpy_time * 1000.0:7.3f} ms |"
+            f"{warp_time * 1000.0:7.3f} ms |{numpy_time / warp_time:10.2f}x |"
+        )
+
+print("-----------------------------------------------------------------------------------")
+print(f"(median of {num_samples} runs)")
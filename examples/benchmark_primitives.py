@@ -0,0 +1,176 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+###########################################################################
+# Benchmark for the CPU scan, reduction and run-length encoding primitives
+# of warp.utils.
+#
+# The multithreaded primitives are compared against single-threaded
+# Warp kernels that run the same loops as the previous serial
+# implementations of array_scan, array_sum, array_inner and
+# runlength_encode.
+###########################################################################
+
+import statistics
+import time
+from typing import Any
+
+import numpy as np
+
+import warp as wp
+
+wp.config.quiet = True
+wp.init()
+
+num_samples = 10
+
+
+def measure(func):
+    func()
+
+    times = []
+    for _ in range(num_samples):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+@wp.kernel
+def serial_scan(values: wp.array(dtype=Any), result: wp.array(dtype=Any), count: int):
+    total = values[0]
+    result[0] = total
+
+    for i in range(1, count):
+        total = total + values[i]
+        result[i] = total
+
+
+@wp.kernel
+def serial_sum(values: wp.array(dtype=Any), result: wp.array(dtype=Any), count: int):
+    total = values[0]
+
+    for i in range(1, count):
+        total = total + values[i]
+
+    result[0] = total
+
+
+@wp.kernel
+def serial_inner_scalar(a: wp.array(dtype=Any), b: wp.array(dtype=Any), result: wp.array(dtype=Any), count: int):
+    total = a[0] * b[0]
+
+    for i in range(1, count):
+        total = total + a[i] * b[i]
+
+    result[0] = total
+
+
+@wp.kernel
+def serial_inner_vector(a: wp.array(dtype=Any), b: wp.array(dtype=Any), result: wp.array(dtype=Any), count: int):
+    total = wp.dot(a[0], b[0])
+
+    for i in range(1, count):
+        total = total + wp.dot(a[i], b[i])
+
+    result[0] = total
+
+
+@wp.kernel
+def serial_runlength_encode(
+    values: wp.array(dtype=Any),
+    run_values: wp.array(dtype=Any),
+    run_lengths: wp.array(dtype=int),
+    run_count: wp.array(dtype=int),
+    count: int,
+):
+    num_runs = int(0)
+    run_values[0] = values[0]
+    run_lengths[0] = 1
+
+    for i in range(1, count):
+        if values[i] == run_values[num_runs]:
+            run_lengths[num_runs] = run_lengths[num_runs] + 1
+        else:
+            num_runs = num_runs + 1
+            run_values[num_runs] = values[i]
+            run_lengths[num_runs] = 1
+
+    run_count[0] = num_runs + 1
+
+
+def serial_launch(kernel, *args):
+    # a single thread runs the whole loop
+    return lambda: wp.launch(kernel, dim=1, inputs=[*args, len(args[0])], device="cpu")
+
+
+rng = np.random.default_rng(123)
+
+print("------------------------------------------------------------------------------")
+print("| primitive        |    dtype |        count |    serial |     warp |  speedup |")
+print("------------------------------------------------------------------------------")
+
+for count in (1 << 16, 1 << 20, 1 << 24):
+    for dtype in (wp.int32, wp.int64, wp.float32, wp.float64, wp.vec3):
+        np_type = wp.types.warp_type_to_np_dtype[wp.types.type_scalar_type(dtype)]
+        shape = (count, wp.types.type_length(dtype)) if wp.types.type_length(dtype) > 1 else (count,)
+
+        values_np = rng.integers(0, high=4, size=shape).astype(np_type)
+
+        values = wp.array(values_np, dtype=dtype, device="cpu")
+        result = wp.zeros_like(values)
+
+        benchmarks = [
+            ("array_scan", serial_launch(serial_scan, values, result), lambda: wp.utils.array_scan(values, result)),
+        ]
+
+        if wp.types.type_length(dtype) == 1:
+            sorted_np = np.sort(rng.integers(0, high=count // 16, size=count)).astype(np_type)
+
+            sorted_values = wp.array(sorted_np, dtype=dtype, device="cpu")
+            run_values = wp.empty_like(sorted_values)
+            run_lengths = wp.empty(count, dtype=int, device="cpu")
+            run_count = wp.empty(1, dtype=int, device="cpu")
+
+            benchmarks.append(
+                (
+                    "runlength_encode",
+                    serial_launch(serial_runlength_encode, sorted_values, run_values, run_lengths, run_count),
+                    lambda: wp.utils.runlength_encode(sorted_values, run_values, run_lengths, run_count=run_count),
+                )
+            )
+
+        if wp.types.type_scalar_type(dtype) in (wp.float32, wp.float64):
+            scalar_type = wp.types.type_scalar_type(dtype)
+            serial_inner = serial_inner_vector if wp.types.type_length(dtype) > 1 else serial_inner_scalar
+            inner = wp.empty(1, dtype=scalar_type, device="cpu")
+
+            benchmarks += [
+                (
+                    "array_sum",
+                    serial_launch(serial_sum, values, result),
+                    lambda: wp.utils.array_sum(values, out=result[:1]),
+                ),
+                (
+                    "array_inner",
+                    serial_launch(serial_inner, values, values, inner),
+                    lambda: wp.utils.array_inner(values, values, out=inner),
+                ),
+            ]
+
+        for name, serial_func, warp_func in benchmarks:
+            serial_time = measure(serial_func)
+            warp_time = measure(warp_func)
+
+            print(
+                f"| {name:16} | {dtype.__name__:>8} | {count:12} |{serial_time * 1000.0:7.2f} ms |"
+                f"{warp_time * 1000.0:7.2f} ms |{serial_time / warp_time:8.2f}x |"
+            )
+
+print("------------------------------------------------------------------------------")
+print(f"(median of {num_samples} runs)")
@@ -0,0 +1,157 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+###########################################################################
+# Benchmark for the CPU BSR matrix functions of warp.sparse.
+#
+# The matrices have the pattern of a finite element stiffness matrix: 3x3
+# blocks coupling each node of a regular 3D grid with its 27 neighbors,
+# assembled from the 8x8 blocks of each hexahedral element so that every
+# block location is accumulated from several triplets.
+#
+# Triplet assembly, transposition and matrix-vector products are compared
+# against serial NumPy equivalents, matrix-matrix products are timed only.
+###########################################################################
+
+import statistics
+import time
+
+import numpy as np
+
+import warp as wp
+import warp.sparse as sparse
+
+wp.config.quiet = True
+wp.init()
+
+num_samples = 5
+
+
+def measure(func):
+    func()
+
+    times = []
+    for _ in range(num_samples):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+def grid_element_triplets(res):
+    nodes = np.arange((res + 1) ** 3).reshape(res + 1, res + 1, res + 1)
+
+    # node indices of the 8 corners of each element
+    corners = np.stack(
+        [nodes[i : i + res, j : j + res, k : k + res].flatten() for i in (0, 1) for j in (0, 1) for k in (0, 1)],
+        axis=1,
+    )
+
+    rows = np.repeat(corners, 8, axis=1).flatten()
+    cols = np.tile(corners, (1, 8)).flatten()
+
+    return nodes.size, rows.astype(np.int32), cols.astype(np.int32)
+
+
+def numpy_from_triplets(rows, cols, values, nrow, ncol):
+    keys = rows.astype(np.int64) * ncol + cols
+    order = np.argsort(keys, kind="stable")
+    unique_keys, heads = np.unique(keys[order], return_index=True)
+    block_values = np.add.reduceat(values[order], heads, axis=0)
+    offsets = np.searchsorted(unique_keys // ncol, np.arange(nrow + 1))
+    return offsets, (unique_keys % ncol).astype(np.int32), block_values
+
+
+def numpy_transpose(offsets, columns, values, nrow, ncol):
+    rows = np.repeat(np.arange(nrow, dtype=np.int32), np.diff(offsets))
+    order = np.argsort(columns, kind="stable")
+    t_offsets = np.searchsorted(columns[order], np.arange(ncol + 1))
+    return t_offsets, rows[order], np.transpose(values[order], (0, 2, 1))
+
+
+def numpy_mv(offsets, columns, values, x):
+    products = np.einsum("nij,nj->ni", values, x[columns])
+    return np.add.reduceat(products, offsets[:-1], axis=0)
+
+
+rng = np.random.default_rng(123)
+
+print("---------------------------------------------------------------------------------------")
+print("| operation        |      nodes |  triplets |    blocks |     numpy |     warp | speedup |")
+print("---------------------------------------------------------------------------------------")
+
+for res in (16, 32, 48):
+    node_count, rows_np, cols_np = grid_element_triplets(res)
+    values_np = rng.random(size=(len(rows_np), 3, 3)).astype(np.float32)
+
+    rows = wp.array(rows_np, dtype=int, device="cpu")
+    cols = wp.array(cols_np, dtype=int, device="cpu")
+    values = wp.array(values_np, dtype=wp.mat33, device="cpu")
+
+    A = sparse.bsr_zeros(node_count, node_count, block_type=wp.mat33, device="cpu")
+    sparse.bsr_set_from_triplets(A, rows, cols, values)
+
+    A_t = sparse.bsr_zeros(node_count, node_count, block_type=wp.mat33, device="cpu")
+    A_mm = sparse.bsr_zeros(node_count, node_count, block_type=wp.mat33, device="cpu")
+    mm_work_arrays = sparse.bsr_mm_work_arrays()
+
+    x_np = rng.random(size=(node_count, 3)).astype(np.float32)
+    x = wp.array(x_np, dtype=wp.vec3, device="cpu")
+    y = wp.zeros_like(x)
+
+    offsets_np = A.offsets.numpy()
+    columns_np = A.columns.numpy()[: A.nnz]
+    block_values_np = A.values.numpy()[: A.nnz]
+
+    benchmarks = [
+        (
+            "from_triplets",
+            lambda: numpy_from_triplets(rows_np, cols_np, values_np, node_count, node_count),
+            lambda: sparse.bsr_set_from_triplets(A, rows, cols, values),
+        ),
+        (
+            "transpose",
+            lambda: numpy_transpose(offsets_np, columns_np, block_values_np, node_count, node_count),
+            lambda: sparse.bsr_set_transpose(dest=A_t, src=A),
+        ),
+        (
+            "mv",
+            lambda: numpy_mv(offsets_np, columns_np, block_values_np, x_np),
+            lambda: sparse.bsr_mv(A, x, y),
+        ),
+        (
+            "mm",
+            None,
+            lambda: sparse.bsr_mm(A, A, A_mm, work_arrays=mm_work_arrays),
+        ),
+        (
+            "mm (reuse)",
+            None,
+            lambda: sparse.bsr_mm(A, A, A_mm, work_arrays=mm_work_arrays, reuse_topology=True),
+        ),
+    ]
+
+    for name, numpy_func, warp_func in benchmarks:
+        warp_time = measure(warp_func)
+        wp.synchronize()
+
+        if numpy_func is None:
+            numpy_column = "        - |"
+            speedup_column = "      - |"
+        else:
+            numpy_time = measure(numpy_func)
+            numpy_column = f"{numpy_time * 1000.0:7.2f} ms |"
+            speedup_column = f"{numpy_time / warp_time:7.2f}x |"
+
+        print(
+            f"| {name:16} | {node_count:10} | {len(rows_np):9} | {A.nnz:9} |{numpy_column}"
+            f"{warp_time * 1000.0:7.2f} ms |{speedup_column}"
+        )
+
+print("---------------------------------------------------------------------------------------")
+print(f"(median of {num_samples} runs)")
@@ -0,0 +1,56 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+###########################################################################
+# Benchmark for the CPU sparse volume allocation
+#
+# Measures wp.Volume.allocate_by_tiles() from particles in world space, as
+# done when a sparse volume is rebuilt around a particle system every frame.
+###########################################################################
+
+import statistics
+import time
+
+import numpy as np
+
+import warp as wp
+
+wp.config.quiet = True
+wp.init()
+
+num_samples = 5
+voxel_size = 0.01
+
+rng = np.random.default_rng(123)
+
+print("------------------------------------------------------------------")
+print("|       points |     tiles |   voxels (M) |     build |  Mpoints/s |")
+print("------------------------------------------------------------------")
+
+for num_points in (1 << 14, 1 << 17, 1 << 20, 1 << 22):
+    # particles on a noisy sphere shell, similar to a fluid surface
+    directions = rng.normal(size=(num_points, 3))
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    radii = 1.0 + 0.05 * rng.random(size=(num_points, 1))
+    points = wp.array(directions * radii, dtype=wp.vec3, device="cpu")
+
+    times = []
+    for _ in range(num_samples):
+        start = time.perf_counter()
+        volume = wp.Volume.allocate_by_tiles(points, voxel_size, bg_value=1.0e6, device="cpu")
+        times.append(time.perf_counter() - start)
+
+    build_time = statistics.median(times)
+    num_tiles = volume.get_tiles().shape[0]
+
+    print(
+        f"| {num_points:12} | {num_tiles:9} | {num_tiles * 512 / 1.0e6:12.2f} |{build_time * 1000.0:7.2f} ms |"
+        f"{num_points / build_time / 1.0e6:11.2f} |"
+    )
+
+print("------------------------------------------------------------------")
+print(f"(median of {num_samples} runs)")
@@ -0,0 +1,119 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+###########################################################################
+# Benchmark for the constraint coloring of the XPBD integrator.
+#
+# A sheet of cloth with distance springs and bending edges is stretched by
+# 10% and relaxed by a single XPBD step. For an increasing number of solver
+# iterations, the remaining spring stretch and the wall time of the step are
+# compared between the Jacobi solver, which averages the constraint deltas
+# with atomics, and the Gauss-Seidel solver, which projects the constraints
+# of each color in place.
+###########################################################################
+
+import statistics
+import time
+
+import numpy as np
+
+import warp as wp
+import warp.sim
+
+wp.config.quiet = True
+wp.init()
+
+num_samples = 5
+
+
+def build_cloth(res, particle_constraint_coloring):
+    builder = wp.sim.ModelBuilder()
+    builder.particle_constraint_coloring = particle_constraint_coloring
+    builder.add_cloth_grid(
+        pos=(0.0, 2.0, 0.0),
+        rot=wp.quat_identity(),
+        vel=(0.0, 0.0, 0.0),
+        dim_x=res,
+        dim_y=res,
+        cell_x=2.0 / res,
+        cell_y=2.0 / res,
+        mass=0.1,
+        fix_left=True,
+        add_springs=True,
+        spring_ke=1.0e6,
+        spring_kd=0.0,
+    )
+
+    model = builder.finalize()
+    model.ground = False
+
+    # stretch the cloth away from its rest shape
+    q = model.particle_q.numpy()
+    center = q.mean(axis=0)
+    model.particle_q.assign((q - center) * 1.1 + center)
+
+    return model
+
+
+def spring_stretch(model, state):
+    q = state.particle_q.numpy()
+    springs = model.spring_indices.numpy().reshape(-1, 2)
+
+    # the Jacobi solver diverges for stiff springs
+    with np.errstate(over="ignore", invalid="ignore"):
+        lengths = np.linalg.norm(q[springs[:, 0]] - q[springs[:, 1]], axis=1)
+        stretch = lengths / model.spring_rest_length.numpy() - 1.0
+        return np.sqrt(np.mean(stretch**2))
+
+
+def measure(model, iterations):
+    integrator = wp.sim.XPBDIntegrator(iterations=iterations)
+    state_in = model.state()
+    state_out = model.state()
+
+    def step():
+        integrator.simulate(model, state_in, state_out, 1.0 / 60.0)
+        wp.synchronize()
+
+    step()
+
+    times = []
+    for _ in range(num_samples):
+        start = time.perf_counter()
+        step()
+        times.append(time.perf_counter() - start)
+
+    return spring_stretch(model, state_out), statistics.median(times)
+
+
+print("-----------------------------------------------------------------------------------------------------")
+print("| particles | springs | colors | iterations |  jacobi stretch |     time |  colored stretch |     time |")
+print("-----------------------------------------------------------------------------------------------------")
+
+for res in (32, 64):
+    model = build_cloth(res, False)
+    colored_model = build_cloth(res, True)
+    colors = len(colored_model.spring_color_offsets) - 1
+
+    stretch = spring_stretch(model, model.state())
+    print(
+        f"| {model.particle_count:9} | {model.spring_count:7} | {colors:6} | {'initial':>10} |"
+        f" {stretch:15.3e} |        - | {stretch:16.3e} |        - |"
+    )
+
+    for iterations in (1, 2, 4, 8, 16, 32):
+        stretch, seconds = measure(model, iterations)
+        colored_stretch, colored_seconds = measure(colored_model, iterations)
+
+        print(
+            f"| {model.particle_count:9} | {model.spring_count:7} | {colors:6} | {iterations:10} |"
+            f" {stretch:15.3e} | {seconds * 1000.0:5.2f} ms |"
+            f" {colored_stretch:16.3e} | {colored_seconds * 1000.0:5.2f} ms |"
+        )
+
+print("-----------------------------------------------------------------------------------------------------")
+print(f"(RMS relative spring stretch after one step, median time of {num_samples} steps)")
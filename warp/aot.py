@@ -0,0 +1,227 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+"""Ahead-of-time compilation of Warp modules into kernel bundles.
+
+A kernel bundle is a zip archive holding the CPU object code of a set of modules along with a
+manifest that maps the kernel cache key of each module (see :func:`warp.build.kernel_cache_key`)
+to its object file. Bundles are written with::
+
+    python -m warp.aot -o kernels.wpbundle my_package.simulation my_package.rendering
+
+and used at runtime by setting ``warp.config.kernel_bundles`` before the modules are loaded,
+:meth:`warp.context.Module.load` then looks up the bundle before generating and compiling code.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import zipfile
+
+import warp
+
+# version of the bundle layout, readers reject bundles with a newer format
+BUNDLE_FORMAT = 1
+
+MANIFEST_NAME = "manifest.json"
+
+
+class KernelBundle:
+    """Read access to the modules of a kernel bundle."""
+
+    def __init__(self, path):
+        self.path = path
+        self.archive = zipfile.ZipFile(path, "r")
+
+        try:
+            manifest = json.loads(self.archive.read(MANIFEST_NAME))
+        except (KeyError, ValueError) as e:
+            self.archive.close()
+            raise RuntimeError(f"'{path}' is not a Warp kernel bundle") from e
+
+        if manifest.get("format", 0) > BUNDLE_FORMAT:
+            self.archive.close()
+            raise RuntimeError(f"Kernel bundle '{path}' has format {manifest['format']}, expected {BUNDLE_FORMAT}")
+
+        self.warp_version = manifest["warp_version"]
+        self.target = manifest["target"]
+        self.modules = manifest["modules"]
+
+    def is_compatible(self):
+        # cache keys include the Warp version and target, mismatching bundles cannot contain any module
+        return self.warp_version == warp.config.version and self.target == warp.build.cpu_target
+
+    def find(self, cache_key):
+        entry = self.modules.get(cache_key)
+        return entry["file"] if entry is not None else None
+
+    def extract(self, cache_key, output_path):
+        with open(output_path, "wb") as f:
+            f.write(self.archive.read(self.modules[cache_key]["file"]))
+
+
+# bundles opened by get_kernel_bundles(), by path
+opened_bundles = {}
+
+
+def get_kernel_bundles():
+    """Returns the bundles listed in ``warp.config.kernel_bundles`` that match this Warp version and CPU target."""
+
+    paths = warp.config.kernel_bundles
+    if not paths:
+        return []
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+
+    bundles = []
+
+    for path in paths:
+        path = os.path.realpath(path)
+
+        bundle = opened_bundles.get(path)
+        if bundle is None:
+            try:
+                bundle = KernelBundle(path)
+            except (OSError, RuntimeError, zipfile.BadZipFile) as e:
+                warp.utils.warn(f"Failed to open kernel bundle '{path}': {e}")
+                bundle = False
+
+            if bundle and not bundle.is_compatible():
+                warp.utils.warn(
+                    f"Ignoring kernel bundle '{path}' built by Warp {bundle.warp_version} for '{bundle.target}'"
+                )
+                bundle = False
+
+            opened_bundles[path] = bundle
+
+        if bundle:
+            bundles.append(bundle)
+
+    return bundles
+
+
+def find_kernel_bundle(cache_key):
+    """Returns the first bundle that contains the module with the given cache key, or None."""
+
+    for bundle in get_kernel_bundles():
+        if bundle.find(cache_key) is not None:
+            return bundle
+
+    return None
+
+
+def enumerate_kernels(modules):
+    """Returns the names of the kernels of the modules and the number of their overloads."""
+
+    kernels = []
+
+    for module in modules:
+        for kernel in module.kernels.values():
+            num_overloads = len(kernel.overloads) if kernel.is_generic else 1
+            kernels.append((f"{module.name}.{kernel.key}", num_overloads))
+
+    return kernels
+
+
+def build_bundle(output_path, modules, verbose=False):
+    """Builds the CPU code of the given Warp modules and writes it to a kernel bundle.
+
+    Args:
+        output_path: Path of the bundle file.
+        modules: The :class:`warp.context.Module` objects to bundle, modules without kernels are skipped.
+        verbose: Whether to print the bundled kernels.
+    """
+
+    modules = [m for m in modules if m.kernels]
+
+    # builds run concurrently and populate the kernel cache
+    warp.context.force_load(device="cpu", modules=modules)
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "warp_version": warp.config.version,
+        "target": warp.build.cpu_target,
+        "modules": {},
+    }
+
+    tmp_path = f"{output_path}.tmp-{os.getpid()}"
+
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for module in modules:
+            for name, unit_hash, kernel in module.get_cpu_units():
+                cache_key = warp.build.kernel_cache_key(unit_hash, warp.build.cpu_target)
+
+                _, obj_path, _ = module.get_cpu_build_paths(unit_hash, name)
+
+                with warp.build.cache_entry_lock(obj_path):
+                    cache_path = warp.build.find_cache_entry(obj_path)
+                    if cache_path is None:
+                        raise RuntimeError(f"Object code of module {module.name} is not in the kernel cache")
+
+                    file_name = "bin/" + os.path.basename(obj_path)
+                    archive.write(cache_path, file_name)
+
+                if kernel is not None:
+                    kernel_names = [kernel.get_mangled_name()]
+                else:
+                    kernel_names = sorted(k.key for k in module.kernels.values())
+
+                manifest["modules"][cache_key] = {"name": module.name, "file": file_name, "kernels": kernel_names}
+
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+
+    os.replace(tmp_path, output_path)
+
+    if verbose:
+        for name, num_overloads in enumerate_kernels(modules):
+            print(f"  {name} ({num_overloads} overload{'s' if num_overloads != 1 else ''})")
+
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m warp.aot", description="Precompile the CPU kernels of Python modules into a Warp kernel bundle."
+    )
+    parser.add_argument("modules", nargs="+", help="Python modules to import, e.g. my_package.kernels")
+    parser.add_argument("-o", "--output", required=True, help="path of the kernel bundle to write")
+    parser.add_argument(
+        "--all", action="store_true", help="also bundle the modules registered before the imports, e.g. warp.utils"
+    )
+    parser.add_argument("--mode", choices=["release", "debug"], help="compilation mode, defaults to warp.config.mode")
+    parser.add_argument("--cache-dir", help="kernel cache directory used for the builds")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the bundled kernels")
+    args = parser.parse_args(argv)
+
+    if args.mode is not None:
+        warp.config.mode = args.mode
+    if args.cache_dir is not None:
+        warp.config.kernel_cache_dir = args.cache_dir
+
+    warp.config.quiet = not args.verbose
+    warp.init()
+
+    # the modules imported for the first time by the given imports, including their dependencies
+    registered = set(warp.context.user_modules)
+
+    sys.path.insert(0, os.getcwd())
+    for name in args.modules:
+        importlib.import_module(name)
+
+    modules = [m for name, m in warp.context.user_modules.items() if args.all or name not in registered]
+
+    manifest = build_bundle(args.output, modules, verbose=args.verbose)
+
+    print(f"Wrote {len(manifest['modules'])} modules to kernel bundle '{args.output}'")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
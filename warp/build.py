@@ -5,7 +5,17 @@
 # distribution of this software and related documentation without an express
 # license agreement from NVIDIA CORPORATION is strictly prohibited.
 
+import atexit
+import concurrent.futures
+import hashlib
+import json
 import os
+import platform
+import re
+import subprocess
+import sys
+import threading
+import time
 
 import warp.config
 from warp.thirdparty import appdirs
@@ -50,6 +60,48 @@ def build_cpu(obj_path, cpp_path, mode="release", verify_fp=False, fast_math=Fal
             raise Exception(f"CPU kernel build failed with error code {err}")
 
 
+# compiles a CPU module in a separate process, it only loads the warp-clang library so that builds of several
+# modules can run concurrently without sharing the LLVM state of the calling process
+cpu_build_script = """
+import ctypes, sys
+lib_path, cpp_path, inc_path, obj_path, debug = sys.argv[1:]
+llvm = ctypes.CDLL(lib_path, winmode=0) if sys.version_info >= (3, 8) else ctypes.CDLL(lib_path)
+with open(cpp_path, "rb") as cpp:
+    src = cpp.read()
+err = llvm.compile_cpp(src, cpp_path.encode("utf-8"), inc_path.encode("utf-8"), obj_path.encode("utf-8"), debug == "1")
+sys.exit(1 if err != 0 else 0)
+"""
+
+
+# builds a CPU module like build_cpu() in a new process and returns the compile time in seconds
+def build_cpu_process(obj_path, cpp_path, mode="release", verify_fp=False, fast_math=False):
+    inc_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "native")
+    debug = "1" if mode == "debug" else "0"
+
+    start = time.perf_counter()
+
+    args = [sys.executable, "-I", "-c", cpu_build_script, warp.context.runtime.llvm_lib, cpp_path, inc_path, obj_path]
+    result = subprocess.run(args + [debug])
+    if result.returncode != 0:
+        raise Exception(f"CPU kernel build failed with exit code {result.returncode}")
+
+    return time.perf_counter() - start
+
+
+build_pool = None
+
+
+# thread pool that waits on the build processes started by Module.load_async()
+def get_build_pool():
+    global build_pool
+
+    if build_pool is None:
+        max_workers = warp.config.max_build_jobs or os.cpu_count() or 1
+        build_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warp-build")
+
+    return build_pool
+
+
 kernel_bin_dir = None
 kernel_gen_dir = None
 
@@ -85,6 +137,11 @@ def init_kernel_cache(path=None):
         # print("Creating binary directory '%s'" % cache_bin_dir)
         os.makedirs(cache_bin_dir, exist_ok=True)
 
+    # persisted source information belongs to the previous cache directory
+    global source_cache
+    save_source_cache()
+    source_cache = None
+
     warp.config.kernel_cache_dir = cache_root_dir
 
     global kernel_bin_dir, kernel_gen_dir
@@ -110,3 +167,371 @@ def clear_kernel_cache():
     for p in paths:
         if os.path.isfile(p):
             os.remove(p)
+
+
+# advisory lock on a file that coordinates the processes sharing a kernel cache directory
+class FileLock:
+    def __init__(self, path, blocking=True):
+        self.path = path
+        self.blocking = blocking
+        self.file = None
+
+    def acquire(self):
+        self.file = open(self.path, "a+b")
+
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK if self.blocking else msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX if self.blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        except OSError:
+            self.file.close()
+            self.file = None
+
+            if self.blocking:
+                raise
+
+            return False
+
+        return True
+
+    def release(self):
+        if self.file is None:
+            return
+
+        if os.name == "nt":
+            import msvcrt
+
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+# target string of the CPU object code, object files can be shared between hosts of the same platform
+cpu_target = f"cpu-{sys.platform}-{platform.machine().lower()}"
+
+# cache file names are "<module_name>_<key>" followed by extensions, temporary files carry a ".tmp-" tag
+cache_entry_pattern = re.compile(r"^(wp_.*_[0-9a-f]{32})(\..*)?$")
+
+
+def kernel_cache_key(module_hash, target):
+    """Returns the content address of a module build in the kernel cache.
+
+    The key combines the module hash, which covers the kernel sources and compile options, with the
+    build target and the Warp version, so that builds for different targets can share a cache.
+    """
+
+    h = hashlib.sha256()
+    h.update(module_hash)
+    h.update(bytes(f"{target};{warp.config.version}", "utf-8"))
+
+    return h.hexdigest()[:32]
+
+
+# lock that guards the files of a cache entry, it is held while the entry is built or loaded
+def cache_entry_lock(path, blocking=True):
+    stem = cache_entry_pattern.match(os.path.basename(path)).group(1)
+    return FileLock(os.path.join(kernel_bin_dir, stem + ".lock"), blocking=blocking)
+
+
+# returns the path of a cached build, looking up the local cache first and then the shared cache
+def find_cache_entry(path):
+    if os.path.isfile(path):
+        # the modification time orders local entries for eviction
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return path
+
+    if warp.config.cache_shared_dir is not None:
+        shared_path = os.path.join(warp.config.cache_shared_dir, "bin", os.path.basename(path))
+        if os.path.isfile(shared_path):
+            return shared_path
+
+    return None
+
+
+# writes generated sources so that concurrent writers never expose a partial file
+def write_cache_source(path, source):
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+    with open(tmp_path, "w") as f:
+        f.write(source)
+
+    os.replace(tmp_path, path)
+
+
+def build_cache_entry(output_path, build):
+    """Builds a kernel cache entry, unless another process has already built it.
+
+    The ``build`` callable receives a temporary path that is moved to ``output_path`` once the build
+    has succeeded, the entry lock serializes builds of the same entry across processes.
+    Returns the result of ``build``, or None when the entry already exists.
+    """
+
+    with cache_entry_lock(output_path):
+        if warp.config.cache_kernels and os.path.isfile(output_path):
+            return None
+
+        # keep the extension, the CUDA compiler selects the output format from it
+        root, ext = os.path.splitext(output_path)
+        tmp_path = f"{root}.tmp-{os.getpid()}-{threading.get_ident()}{ext}"
+
+        try:
+            result = build(tmp_path)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+
+    return result
+
+
+def evict_kernel_cache(max_size=None):
+    """Removes the least recently used modules from the kernel cache until its size is within ``max_size`` bytes.
+
+    If ``max_size`` is not specified, ``warp.config.cache_max_size`` is used, a size of 0 disables eviction.
+    Only the local cache is affected, modules that are being built or loaded by other processes are skipped.
+    """
+
+    if max_size is None:
+        max_size = warp.config.cache_max_size
+
+    if not max_size or kernel_bin_dir is None:
+        return
+
+    # files of each cache entry, grouped by the module name and key
+    entries = {}
+
+    for cache_dir in (kernel_bin_dir, kernel_gen_dir):
+        if cache_dir is None or not os.path.isdir(cache_dir):
+            continue
+
+        for name in os.listdir(cache_dir):
+            match = cache_entry_pattern.match(name)
+            if match is None or ".tmp-" in name:
+                continue
+
+            entries.setdefault(match.group(1), []).append(os.path.join(cache_dir, name))
+
+    with FileLock(os.path.join(kernel_bin_dir, "evict.lock")):
+        usage = []
+        total_size = 0
+
+        for stem, paths in entries.items():
+            size = 0
+            last_use = None
+
+            for path in paths:
+                if path.endswith(".lock"):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                size += stat.st_size
+                last_use = max(last_use or 0.0, stat.st_mtime)
+
+            # entries that were evicted before only have their lock file left
+            if last_use is None:
+                continue
+
+            usage.append((last_use, size, stem))
+            total_size += size
+
+        usage.sort()
+
+        for _, size, stem in usage:
+            if total_size <= max_size:
+                break
+
+            # skip entries that are in use, their lock is held by a build or a load
+            lock = cache_entry_lock(stem, blocking=False)
+            if not lock.acquire():
+                continue
+
+            # the lock file is kept, a process waiting on it would otherwise lock an unlinked file
+            # while another process creates and locks a new one at the same path
+            try:
+                for path in entries[stem]:
+                    if not path.endswith(".lock") and os.path.isfile(path):
+                        os.remove(path)
+            finally:
+                lock.release()
+
+            total_size -= size
+
+
+# Hashes and module references of function sources, persisted in the kernel cache directory so that
+# later processes do not need to read and parse the sources of modules that are already compiled.
+# Entries are grouped by source file and are only valid for the content of the file, the hash of the content is
+# memoized per process and computed again when the modification time or the size of the file changes.
+source_cache = None
+source_cache_dirty = set()
+source_file_stamps = {}
+
+
+def get_source_cache_path():
+    return os.path.join(warp.config.kernel_cache_dir, "sources.json")
+
+
+def get_source_file_stamp(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        source_file_stamps.pop(filename, None)
+        return None
+
+    memo = source_file_stamps.get(filename)
+    if memo is not None and memo[0] == st.st_mtime_ns and memo[1] == st.st_size:
+        return memo[2]
+
+    try:
+        with open(filename, "rb") as f:
+            stamp = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        source_file_stamps.pop(filename, None)
+        return None
+
+    source_file_stamps[filename] = (st.st_mtime_ns, st.st_size, stamp)
+
+    return stamp
+
+
+def invalidate_source_file(filename):
+    """Drops the memoized hash and the source information of a file, e.g.: when its module is reloaded."""
+
+    source_file_stamps.pop(filename, None)
+
+    if source_cache is not None:
+        source_cache.pop(filename, None)
+        source_cache_dirty.discard(filename)
+
+
+def get_source_key(func):
+    # the references and the generated code of functions created by a closure, e.g.: a kernel factory,
+    # depend on the captured variables, all instances share the same source and cannot be told apart
+    if func.__closure__:
+        return None
+
+    code = func.__code__
+
+    return f"{func.__qualname__}:{code.co_firstlineno}"
+
+
+def load_source_cache():
+    global source_cache
+
+    source_cache = {}
+
+    if warp.config.kernel_cache_dir is not None:
+        try:
+            with open(get_source_cache_path(), "r") as f:
+                source_cache = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+
+def save_source_cache():
+    if not source_cache_dirty or warp.config.kernel_cache_dir is None:
+        return
+
+    path = get_source_cache_path()
+
+    try:
+        with FileLock(path + ".lock"):
+            # merge with the entries written by other processes
+            try:
+                with open(path, "r") as f:
+                    merged = json.load(f)
+            except (OSError, ValueError):
+                merged = {}
+
+            for filename in source_cache_dirty:
+                entry = source_cache[filename]
+                existing = merged.get(filename)
+                if existing is not None and existing["stamp"] == entry["stamp"]:
+                    existing["funcs"].update(entry["funcs"])
+                else:
+                    merged[filename] = entry
+
+            write_cache_source(path, json.dumps(merged))
+
+    except OSError:
+        pass
+
+    source_cache_dirty.clear()
+
+
+def get_source_info(func):
+    """Returns the persisted information about the source of a Python function, or None."""
+
+    if not warp.config.cache_kernels:
+        return None
+
+    key = get_source_key(func)
+    if key is None:
+        return None
+
+    if source_cache is None:
+        load_source_cache()
+
+    code = func.__code__
+
+    entry = source_cache.get(code.co_filename)
+    if entry is None or entry["stamp"] != get_source_file_stamp(code.co_filename):
+        return None
+
+    return entry["funcs"].get(key)
+
+
+def set_source_info(func, **info):
+    """Updates the persisted information about the source of a Python function, it is saved at exit."""
+
+    if not warp.config.cache_kernels:
+        return
+
+    key = get_source_key(func)
+    if key is None:
+        return
+
+    if source_cache is None:
+        load_source_cache()
+
+    code = func.__code__
+
+    # sources that are not in a file cannot be identified by a later process
+    stamp = get_source_file_stamp(code.co_filename)
+    if stamp is None:
+        return
+
+    entry = source_cache.get(code.co_filename)
+    if entry is None or entry["stamp"] != stamp:
+        entry = source_cache[code.co_filename] = {"stamp": stamp, "funcs": {}}
+
+    entry["funcs"].setdefault(key, {}).update(info)
+
+    if not source_cache_dirty:
+        atexit.register(save_source_cache)
+
+    source_cache_dirty.add(code.co_filename)
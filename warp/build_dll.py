@@ -335,6 +335,9 @@ def build_dll_for_arch(dll_path, cpp_paths, cu_path, libs, mode, arch, verify_fp
             opt_no_undefined = "-Wl,--no-undefined"
             opt_exclude_libs = "-Wl,--exclude-libs,ALL"
 
+            # the CPU worker pool uses std::thread, which needs libpthread on older glibc versions
+            ld_inputs.append("-lpthread")
+
         with ScopedTimer("link", active=warp.config.verbose):
             origin = "@loader_path" if (sys.platform == "darwin") else "$ORIGIN"
             link_cmd = f"g++ {target} -shared -Wl,-rpath,'{origin}' {opt_no_undefined} {opt_exclude_libs} -o '{dll_path}' {' '.join(ld_inputs + libs)}"
@@ -10,6 +10,7 @@ from __future__ import annotations
 import ast
 import builtins
 import ctypes
+import hashlib
 import inspect
 import re
 import sys
@@ -17,6 +18,7 @@ import textwrap
 import types
 from typing import Any, Callable, Mapping
 
+import warp.build
 import warp.config
 from warp.types import *
 
@@ -83,6 +85,23 @@ comparison_chain_strings = [
 ]
 
 
+# builtins whose results depend on the order in which threads execute, kernels
+# calling them are not compiled to lane-batched CPU loops
+simd_incompatible_builtins = {"atomic_add", "atomic_sub", "atomic_min", "atomic_max"}
+
+# builtins whose output refers to the same memory as their first argument
+aliasing_builtins = {"address", "view", "copy"}
+
+# builtins that only read the memory of their arguments
+read_only_builtins = {"load", "len", "extract", "lower_bound"}
+
+# lane counts supported by the "cpu_simd_width" module option
+cpu_simd_widths = (0, 4, 8, 16)
+
+# target features used for lane-batched CPU entry points, keyed by the number of 32-bit lanes
+cpu_simd_target_features = {8: "avx2,fma", 16: "avx512f"}
+
+
 def op_str_is_chainable(op: str) -> builtins.bool:
     return op in comparison_chain_strings
 
@@ -518,29 +537,13 @@ class Adjoint:
         # whether the generation of the adjoint code is skipped for this function
         adj.skip_reverse_codegen = skip_reverse_codegen
 
-        # build AST from function object
-        adj.source = inspect.getsource(func)
-
-        # get source code lines and line number where function starts
-        adj.raw_source, adj.fun_lineno = inspect.getsourcelines(func)
+        # the source and the AST are only needed to hash and build the function, they are
+        # read and parsed on first access, see parse_source()
+        adj.transformers = transformers
 
         # keep track of line number in function code
         adj.lineno = None
 
-        # ensures that indented class methods can be parsed as kernels
-        adj.source = textwrap.dedent(adj.source)
-
-        # extract name of source file
-        adj.filename = inspect.getsourcefile(func) or "unknown source file"
-
-        # build AST and apply node transformers
-        adj.tree = ast.parse(adj.source)
-        adj.transformers = transformers
-        for transformer in transformers:
-            adj.tree = transformer.visit(adj.tree)
-
-        adj.fun_name = adj.tree.body[0].name
-
         # whether the forward code shall be used for the reverse pass and a custom
         # function signature is applied to the reverse version of the function
         adj.custom_reverse_mode = custom_reverse_mode
@@ -555,13 +558,13 @@ class Adjoint:
         if overload_annotations is None:
             # use source-level argument annotations
             if len(argspec.annotations) < len(argspec.args):
-                raise WarpCodegenError(f"Incomplete argument annotations on function {adj.fun_name}")
+                raise WarpCodegenError(f"Incomplete argument annotations on function {func.__name__}")
             adj.arg_types = argspec.annotations
         else:
             # use overload argument annotations
             for arg_name in argspec.args:
                 if arg_name not in overload_annotations:
-                    raise WarpCodegenError(f"Incomplete overload annotations for function {adj.fun_name}")
+                    raise WarpCodegenError(f"Incomplete overload annotations for function {func.__name__}")
             adj.arg_types = overload_annotations.copy()
 
         adj.args = []
@@ -588,6 +591,106 @@ class Adjoint:
         # for unit testing errors being spit out from kernels.
         adj.skip_build = False
 
+    # attributes that are computed by parse_source()
+    source_attributes = ("source", "raw_source", "fun_lineno", "filename", "tree", "fun_name")
+
+    def __getattr__(adj, name):
+        # only called for attributes that are not set yet
+        if name in Adjoint.source_attributes:
+            adj.parse_source()
+            return adj.__dict__[name]
+
+        raise AttributeError(f"'Adjoint' object has no attribute '{name}'")
+
+    # reads the source of the function and builds its AST
+    def parse_source(adj):
+        # get source code lines and line number where function starts
+        adj.raw_source, adj.fun_lineno = inspect.getsourcelines(adj.func)
+
+        # ensures that indented class methods can be parsed as kernels
+        adj.source = textwrap.dedent("".join(adj.raw_source))
+
+        # extract name of source file
+        adj.filename = inspect.getsourcefile(adj.func) or "unknown source file"
+
+        # build AST and apply node transformers
+        adj.tree = ast.parse(adj.source)
+        for transformer in adj.transformers:
+            adj.tree = transformer.visit(adj.tree)
+
+        adj.fun_name = adj.tree.body[0].name
+
+    # returns the hash of the function source, which is looked up in the persisted source cache
+    # so that the source of a function does not need to be read when its module is loaded from the kernel cache
+    def get_source_hash(adj):
+        info = warp.build.get_source_info(adj.func)
+        if info is not None and "hash" in info:
+            return bytes.fromhex(info["hash"])
+
+        source_hash = hashlib.sha256(bytes(adj.source, "utf-8")).digest()
+        warp.build.set_source_info(adj.func, hash=source_hash.hex())
+
+        return source_hash
+
+    # returns the hash of the constant values the function refers to by name, directly or as attributes of modules
+    # and classes, e.g.: wp.sim.PARTICLE_FLAG_ACTIVE, they are folded into the generated code but are not part of
+    # the source, the names are taken from the code object so that the source does not need to be parsed
+    def get_constant_hash(adj):
+        func = adj.func
+
+        names = set()
+        codes = [func.__code__]
+        while codes:
+            code = codes.pop()
+            names.update(code.co_names)
+            names.update(code.co_freevars)
+            codes.extend(c for c in code.co_consts if isinstance(c, types.CodeType))
+
+        # symbols are looked up in the globals first, then in the captured variables, see emit_Name()
+        captured = dict(zip(func.__code__.co_freevars, [c.cell_contents for c in (func.__closure__ or [])]))
+
+        values = {}
+        scopes = []
+        for name in names:
+            obj = func.__globals__.get(name)
+            if obj is None:
+                obj = captured.get(name)
+
+            if warp.types.is_value(obj):
+                values[name] = obj
+            elif isinstance(obj, (types.ModuleType, type)):
+                scopes.append((name, obj))
+
+        visited = set()
+        while scopes:
+            path, scope = scopes.pop()
+            if id(scope) in visited:
+                continue
+            visited.add(id(scope))
+
+            for name in names:
+                try:
+                    obj = getattr(scope, name, None)
+                except Exception:
+                    continue
+
+                if warp.types.is_value(obj):
+                    values[f"{path}.{name}"] = obj
+                elif isinstance(obj, (types.ModuleType, type)):
+                    scopes.append((f"{path}.{name}", obj))
+
+        h = hashlib.sha256()
+        for name in sorted(values):
+            try:
+                value = warp.types.get_constant_bytes(values[name])
+            except Exception:
+                value = bytes(repr(values[name]), "utf-8")
+
+            h.update(bytes(f"{name}:{type(values[name]).__name__}=", "utf-8"))
+            h.update(value)
+
+        return h.digest()
+
     # generate function ssa form and adjoint
     def build(adj, builder):
         if adj.skip_build:
@@ -601,6 +704,15 @@ class Adjoint:
         adj.return_var = None  # return type for function or kernel
         adj.loop_symbols = []  # symbols at the start of each loop
 
+        # whether the body is straight-line code without atomics, i.e.: consecutive
+        # threads can be executed in lock-step by a lane-batched CPU loop (see codegen_module())
+        adj.simd_compatible = True
+
+        # labels of the arguments whose memory may be modified by the function, used to find dependencies between
+        # commands of CPU graphs, array addresses and views are traced back to the argument they refer to
+        adj.written_args = set()
+        adj.arg_aliases = {a.label: a.label for a in adj.args}
+
         # blocks
         adj.blocks = [Block()]
         adj.loop_blocks = []
@@ -907,13 +1019,21 @@ class Adjoint:
         if not func.is_builtin():
             adj.builder.build_function(func)
 
+            # user functions are inlined into the caller, native snippets are opaque
+            if func.native_snippet is not None or not func.adj.simd_compatible:
+                adj.simd_compatible = False
+
+        elif func.key in simd_incompatible_builtins:
+            adj.simd_compatible = False
+
         # evaluate the function type based on inputs
         arg_types = [strip_reference(a.type) for a in args if not isinstance(a, warp.context.Function)]
         return_type = func.value_func(arg_types, kwds, templates)
 
-        func_name = compute_type_str(func.native_func, templates)
         param_types = list(func.input_types.values())
 
+        func_name = compute_type_str(func.native_func, templates)
+
         use_initializer_list = func.initializer_list_func(args, templates)
 
         args_var = [
@@ -960,6 +1080,8 @@ class Adjoint:
             )
             replay_call = forward_call
 
+        adj.record_arg_access(func, args, param_types, output)
+
         if func.skip_replay:
             adj.add_forward(forward_call, replay="// " + replay_call)
         else:
@@ -980,6 +1102,30 @@ class Adjoint:
 
         return output
 
+    # track which arguments of the function may be written through the arguments of a call
+    def record_arg_access(adj, func, args, param_types, output):
+        for i, a in enumerate(args):
+            if not isinstance(a, Var):
+                continue
+
+            source = adj.arg_aliases.get(a.label)
+            if source is None:
+                continue
+
+            if func.is_builtin() and func.key in aliasing_builtins:
+                if i == 0 and isinstance(output, Var):
+                    adj.arg_aliases[output.label] = source
+                continue
+
+            if func.is_builtin() and func.key in read_only_builtins:
+                continue
+
+            # values are copied when passed, only references, arrays and structs (which may hold arrays) can be written
+            arg_type = strip_reference(a.type)
+            by_reference = param_types[i] == Reference if i < len(param_types) else func.variadic
+            if (by_reference and is_reference(a.type)) or is_array(arg_type) or isinstance(arg_type, Struct):
+                adj.written_args.add(source)
+
     def add_builtin_call(adj, func_name, args, min_outputs=None, templates=[], kwds=None):
         func = warp.context.builtin_functions[func_name]
         return adj.add_call(func, args, min_outputs, templates, kwds)
@@ -1002,6 +1148,8 @@ class Adjoint:
 
     # define an if statement
     def begin_if(adj, cond):
+        adj.simd_compatible = False
+
         cond = adj.load(cond)
         adj.add_forward(f"if ({cond.emit()}) {{")
         adj.add_reverse("}")
@@ -1016,6 +1164,8 @@ class Adjoint:
         adj.add_reverse(f"if ({cond.emit()}) {{")
 
     def begin_else(adj, cond):
+        adj.simd_compatible = False
+
         cond = adj.load(cond)
         adj.add_forward(f"if (!{cond.emit()}) {{")
         adj.add_reverse("}")
@@ -1031,6 +1181,8 @@ class Adjoint:
 
     # define a for-loop
     def begin_for(adj, iter):
+        adj.simd_compatible = False
+
         cond_block = adj.begin_block()
         adj.loop_blocks.append(cond_block)
         adj.add_forward(f"for_start_{cond_block.label}:;")
@@ -1095,6 +1247,8 @@ class Adjoint:
 
     # define a while loop
     def begin_while(adj, cond):
+        adj.simd_compatible = False
+
         # evaluate condition in its own block
         # so we can control replay
         cond_block = adj.begin_block()
@@ -1325,6 +1479,10 @@ class Adjoint:
                 attr_type = Reference(aggregate_type.vars[node.attr].type)
                 attr = adj.add_var(attr_type)
 
+                source = adj.arg_aliases.get(aggregate.label)
+                if source is not None:
+                    adj.arg_aliases[attr.label] = source
+
                 if is_reference(aggregate.type):
                     adj.add_forward(f"{attr.emit()} = &({aggregate.emit()}->{node.attr});")
                     adj.add_reverse(f"{aggregate.emit_adj()}.{node.attr} = {attr.emit_adj()};")
@@ -2095,10 +2253,15 @@ cpu_module_header = """
 #define int(x) cast_int(x)
 #define adj_int(x, adj_x, adj_ret) adj_cast_int(x, adj_x, adj_ret)
 
-#define builtin_tid1d() wp::tid(wp::s_threadIdx)
-#define builtin_tid2d(x, y) wp::tid(x, y, wp::s_threadIdx, dim)
-#define builtin_tid3d(x, y, z) wp::tid(x, y, z, wp::s_threadIdx, dim)
-#define builtin_tid4d(x, y, z, w) wp::tid(x, y, z, w, wp::s_threadIdx, dim)
+// thread indices beyond the int range are reported once per launch by cpu_launch_kernel()
+#define builtin_tid1d() static_cast<int>(_idx)
+#define builtin_tid2d(x, y) wp::tid(x, y, _idx, dim)
+#define builtin_tid3d(x, y, z) wp::tid(x, y, z, _idx, dim)
+#define builtin_tid4d(x, y, z, w) wp::tid(x, y, z, w, _idx, dim)
+
+// lane-batched loops (see the "cpu_simd_width" module option) keep the scalar code
+// for kernel bodies that the compiler is unable to vectorize
+#pragma clang diagnostic ignored "-Wpass-failed"
 
 """
 
@@ -2186,16 +2349,18 @@ cuda_kernel_template = """
 extern "C" __global__ void {name}_cuda_kernel_forward(
     {forward_args})
 {{
+    const size_t _dim_size = wp::launch_size(dim);
     for (size_t _idx = static_cast<size_t>(blockDim.x) * static_cast<size_t>(blockIdx.x) + static_cast<size_t>(threadIdx.x);
-         _idx < dim.size;
+         _idx < _dim_size;
          _idx += static_cast<size_t>(blockDim.x) * static_cast<size_t>(gridDim.x)) {{
 {forward_body}}}}}
 
 extern "C" __global__ void {name}_cuda_kernel_backward(
     {reverse_args})
 {{
+    const size_t _dim_size = wp::launch_size(dim);
     for (size_t _idx = static_cast<size_t>(blockDim.x) * static_cast<size_t>(blockIdx.x) + static_cast<size_t>(threadIdx.x);
-         _idx < dim.size;
+         _idx < _dim_size;
          _idx += static_cast<size_t>(blockDim.x) * static_cast<size_t>(gridDim.x)) {{
 {reverse_body}}}}}
 
@@ -2203,7 +2368,7 @@ extern "C" __global__ void {name}_cuda_kernel_backward(
 
 cpu_kernel_template = """
 
-void {name}_cpu_kernel_forward(
+{forward_qualifiers}void {name}_cpu_kernel_forward(
     {forward_args})
 {{
 {forward_body}}}
@@ -2219,26 +2384,27 @@ cpu_module_template = """
 
 extern "C" {{
 
-// Python CPU entry points
-WP_API void {name}_cpu_forward(
-    {forward_args})
+// Python CPU entry points, called by the CPU worker pool (see cpu_launch_kernel())
+// each call processes the threads in [task_begin, task_end) using the packed kernel parameters
+{forward_attributes}WP_API void {name}_cpu_forward(
+    void** args,
+    size_t task_begin,
+    size_t task_end)
 {{
-    for (size_t i=0; i < dim.size; ++i)
-    {{
-        wp::s_threadIdx = i;
+    {forward_args}
 
-        {name}_cpu_kernel_forward(
-            {forward_params});
-    }}
+{forward_loop}
 }}
 
 WP_API void {name}_cpu_backward(
-    {reverse_args})
+    void** args,
+    size_t task_begin,
+    size_t task_end)
 {{
-    for (size_t i=0; i < dim.size; ++i)
-    {{
-        wp::s_threadIdx = i;
+    {reverse_args}
 
+    for (size_t _idx = task_begin; _idx < task_end; ++_idx)
+    {{
         {name}_cpu_kernel_backward(
             {reverse_params});
     }}
@@ -2248,6 +2414,45 @@ WP_API void {name}_cpu_backward(
 
 """
 
+cpu_forward_loop_template = """    for (size_t _idx = task_begin; _idx < task_end; ++_idx)
+    {{
+        {name}_cpu_kernel_forward(
+            {forward_params});
+    }}"""
+
+# lane-batched loop for the "cpu_simd_width" module option, consecutive threads are executed
+# in lock-step, one per vector lane, threads of a launch are independent so the compiler
+# is told to ignore possible aliasing between iterations
+cpu_simd_forward_loop_template = """    #pragma clang loop vectorize(assume_safety) vectorize_width({simd_width}) interleave(disable)
+    for (size_t _idx = task_begin; _idx < task_end; ++_idx)
+    {{
+        {name}_cpu_kernel_forward(
+            {forward_params});
+    }}"""
+
+# when the innermost dimension of every array is contiguous, the strides are re-assigned as
+# constants so that per-lane accesses are compiled to vector loads/stores instead of gathers/scatters
+cpu_simd_contiguous_forward_loop_template = """    if ({contiguous_cond})
+    {{
+        {contiguous_strides}
+
+        #pragma clang loop vectorize(assume_safety) vectorize_width({simd_width}) interleave(disable)
+        for (size_t _idx = task_begin; _idx < task_end; ++_idx)
+        {{
+            {name}_cpu_kernel_forward(
+                {contiguous_params});
+        }}
+    }}
+    else
+    {{
+        #pragma clang loop vectorize(assume_safety) vectorize_width({simd_width}) interleave(disable)
+        for (size_t _idx = task_begin; _idx < task_end; ++_idx)
+        {{
+            {name}_cpu_kernel_forward(
+                {contiguous_params});
+        }}
+    }}"""
+
 cuda_module_header_template = """
 
 extern "C" {{
@@ -2270,10 +2475,14 @@ extern "C" {{
 
 // Python CPU entry points
 WP_API void {name}_cpu_forward(
-    {forward_args});
+    void** args,
+    size_t task_begin,
+    size_t task_end);
 
 WP_API void {name}_cpu_backward(
-    {reverse_args});
+    void** args,
+    size_t task_begin,
+    size_t task_end);
 
 }} // extern C
 """
@@ -2626,6 +2835,32 @@ def codegen_snippet(adj, name, snippet, adj_snippet):
     return s
 
 
+def get_cpu_simd_width(kernel, options):
+    """Returns the number of lanes used by the CPU forward entry point of a kernel, or 0 for a scalar loop"""
+
+    width = options.get("cpu_simd_width", 0)
+
+    if width not in cpu_simd_widths:
+        raise ValueError(f"Invalid value for the cpu_simd_width option: {width}, valid values are {cpu_simd_widths}")
+
+    # kernels with data-dependent control flow or atomics fall back to the scalar loop
+    if not kernel.adj.simd_compatible:
+        return 0
+
+    return width
+
+
+def get_cpu_simd_target_features(width):
+    """Returns the vector ISA features available on the host for a lane-batched loop of the given width"""
+
+    from warp.context import runtime
+
+    # use the widest registers that fit the requested lanes, the compiler splits wider vectors
+    width = min(width, runtime.cpu_simd_lanes)
+
+    return cpu_simd_target_features.get(width)
+
+
 def codegen_kernel(kernel, device, options):
     # Update the module's options with the ones defined on the kernel, if any.
     options = dict(options)
@@ -2636,6 +2871,11 @@ def codegen_kernel(kernel, device, options):
     forward_args = ["wp::launch_bounds_t dim"]
     reverse_args = ["wp::launch_bounds_t dim"]
 
+    if device == "cpu":
+        # CPU kernels receive their thread index from the entry point loop
+        forward_args.append("size_t _idx")
+        reverse_args.append("size_t _idx")
+
     # forward args
     for arg in adj.args:
         forward_args.append(arg.ctype() + " var_" + arg.label)
@@ -2658,8 +2898,15 @@ def codegen_kernel(kernel, device, options):
     else:
         reverse_body = ""
 
+    forward_qualifiers = ""
+
     if device == "cpu":
         template = cpu_kernel_template
+
+        # the forward body must be inlined into the lane-batched loop to be vectorized
+        if get_cpu_simd_width(kernel, options):
+            forward_qualifiers = "static inline __attribute__((always_inline))\n"
+
     elif device == "cuda":
         template = cuda_kernel_template
     else:
@@ -2667,6 +2914,7 @@ def codegen_kernel(kernel, device, options):
 
     s = template.format(
         name=kernel.get_mangled_name(),
+        forward_qualifiers=forward_qualifiers,
         forward_args=indent(forward_args),
         reverse_args=indent(reverse_args),
         forward_body=forward_body,
@@ -2676,47 +2924,85 @@ def codegen_kernel(kernel, device, options):
     return s
 
 
-def codegen_module(kernel, device="cpu"):
+def codegen_module(kernel, device="cpu", options={}):
     if device != "cpu":
         return ""
 
+    # Update the module's options with the ones defined on the kernel, if any.
+    options = dict(options)
+    options.update(kernel.options)
+
     adj = kernel.adj
 
-    # build forward signature
-    forward_args = ["wp::launch_bounds_t dim"]
-    forward_params = ["dim"]
+    # kernel parameters are passed as an array of pointers, in the same
+    # layout as for CUDA launches, and unpacked into local variables
+    forward_args = ["wp::launch_bounds_t dim = *static_cast<wp::launch_bounds_t*>(args[0]);"]
+    forward_params = ["dim", "_idx"]
 
-    for arg in adj.args:
-        if hasattr(arg.type, "_wp_generic_type_str_"):
-            # vectors and matrices are passed from Python by pointer
-            forward_args.append(f"const {arg.ctype()}* var_" + arg.label)
-            forward_params.append(f"*var_{arg.label}")
-        else:
-            forward_args.append(f"{arg.ctype()} var_{arg.label}")
-            forward_params.append("var_" + arg.label)
+    for i, arg in enumerate(adj.args):
+        forward_args.append(f"{arg.ctype()} var_{arg.label} = *static_cast<{arg.ctype()}*>(args[{i + 1}]);")
+        forward_params.append("var_" + arg.label)
 
     # build reverse signature
     reverse_args = [*forward_args]
     reverse_params = [*forward_params]
 
-    for arg in adj.args:
+    for i, arg in enumerate(adj.args):
         if isinstance(arg.type, indexedarray):
             # indexed array gradients are regular arrays
             _arg = Var(arg.label, array(dtype=arg.type.dtype, ndim=arg.type.ndim))
-            reverse_args.append(f"const {_arg.ctype()} adj_{arg.label}")
-            reverse_params.append(f"adj_{_arg.label}")
-        elif hasattr(arg.type, "_wp_generic_type_str_"):
-            # vectors and matrices are passed from Python by pointer
-            reverse_args.append(f"const {arg.ctype()}* adj_{arg.label}")
-            reverse_params.append(f"*adj_{arg.label}")
+            ctype = _arg.ctype()
+        else:
+            ctype = arg.ctype()
+
+        reverse_args.append(f"{ctype} adj_{arg.label} = *static_cast<{ctype}*>(args[{len(adj.args) + i + 1}]);")
+        reverse_params.append(f"adj_{arg.label}")
+
+    forward_attributes = ""
+
+    simd_width = get_cpu_simd_width(kernel, options)
+
+    if simd_width:
+        target_features = get_cpu_simd_target_features(simd_width)
+        if target_features:
+            forward_attributes = f'__attribute__((target("{target_features}")))\n'
+
+        arrays = [arg for arg in adj.args if isinstance(arg.type, array)]
+
+        if arrays:
+            contiguous_cond = []
+            contiguous_strides = []
+
+            for arg in arrays:
+                stride = f"var_{arg.label}.strides[{arg.type.ndim - 1}]"
+                contiguous_cond.append(f"{stride} == sizeof(*var_{arg.label}.data)")
+                contiguous_strides.append(f"{stride} = sizeof(*var_{arg.label}.data);")
+
+            forward_loop = cpu_simd_contiguous_forward_loop_template.format(
+                name=kernel.get_mangled_name(),
+                simd_width=simd_width,
+                contiguous_cond=" &&\n        ".join(contiguous_cond),
+                contiguous_strides="\n        ".join(contiguous_strides),
+                contiguous_params=indent(forward_params, 4),
+            )
         else:
-            reverse_args.append(f"{arg.ctype()} adj_{arg.label}")
-            reverse_params.append(f"adj_{arg.label}")
+            forward_loop = cpu_simd_forward_loop_template.format(
+                name=kernel.get_mangled_name(),
+                simd_width=simd_width,
+                forward_params=indent(forward_params, 3),
+            )
+    else:
+        forward_loop = cpu_forward_loop_template.format(
+            name=kernel.get_mangled_name(),
+            forward_params=indent(forward_params, 3),
+        )
 
     s = cpu_module_template.format(
         name=kernel.get_mangled_name(),
-        forward_args=indent(forward_args),
-        reverse_args=indent(reverse_args),
+        forward_attributes=forward_attributes,
+        forward_loop=forward_loop,
+        forward_args="\n    ".join(forward_args),
+        reverse_args="\n    ".join(reverse_args),
         forward_params=indent(forward_params, 3),
         reverse_params=indent(reverse_params, 3),
     )
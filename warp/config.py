@@ -23,6 +23,13 @@ host_compiler = None  # user can specify host compiler here, otherwise will atte
 
 cache_kernels = True
 kernel_cache_dir = None  # path to kernel cache directory, if None a default path will be used
+cache_max_size = (
+    0  # maximum size in bytes of the kernel cache, least recently used modules are evicted first, 0 is unlimited
+)
+cache_shared_dir = None  # path to a read-only kernel cache that is searched when a module is not in the user cache
+kernel_bundles = (
+    None  # path or list of paths to kernel bundles written by `python -m warp.aot`, searched before building
+)
 
 cuda_output = (
     None  # preferred CUDA output format for kernels ("ptx" or "cubin"), determined automatically if unspecified
@@ -32,4 +39,14 @@ ptx_target_arch = 70  # target architecture for PTX generation, defaults to the
 
 enable_backward = True  # whether to compiler the backward passes of the kernels
 
+cpu_max_threads = (
+    0  # maximum number of threads used by CPU kernel launches, 0 uses all hardware threads, 1 runs launches serially
+)
+cpu_tile_size = 0  # number of kernel threads handed to a CPU worker at a time, 0 chooses a size automatically
+
+max_build_jobs = 0  # maximum number of modules compiled concurrently by force_load() and load_module(), 0 uses one per hardware thread
+
+alloc_pool = False  # cache freed array memory by size class and reuse it for later allocations, see `wp.empty_cache()`
+alloc_pool_limit = 0  # maximum size in bytes of the cached memory per device when alloc_pool is enabled, 0 is unlimited
+
 llvm_cuda = False  # use Clang/LLVM instead of NVRTC to compile CUDA
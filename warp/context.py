@@ -6,6 +6,7 @@
 # license agreement from NVIDIA CORPORATION is strictly prohibited.
 
 import ast
+import concurrent.futures
 import ctypes
 import gc
 import hashlib
@@ -14,6 +15,8 @@ import io
 import os
 import platform
 import sys
+import threading
+import time
 import types
 from copy import copy as shallowcopy
 from types import ModuleType
@@ -1034,6 +1037,10 @@ def get_module(name):
         if user_modules[name].loader is not parent_loader:
             old_module = user_modules[name]
 
+            # dependents are registered when the references of the other modules are resolved
+            for module in list(user_modules.values()):
+                module.resolve_references()
+
             # Unload the old module and recursively unload all of its dependents.
             # This ensures that dependent modules will be re-hashed and reloaded on next launch.
             # The visited set tracks modules already visited to avoid circular references.
@@ -1053,6 +1060,11 @@ def get_module(name):
             old_module.structs = {}
             old_module.loader = parent_loader
 
+            # the source file has likely changed, its hashes must not be taken from the source cache
+            filename = getattr(parent, "__file__", None)
+            if filename is not None:
+                warp.build.invalidate_source_file(filename)
+
         return user_modules[name]
 
     else:
@@ -1137,7 +1149,8 @@ class ModuleBuilder:
             # use dict to preserve import order
             self.functions[func] = None
 
-    def codegen(self, device):
+    # generates the source of the module, or of the structs, functions and the given concrete kernels only
+    def codegen(self, device, kernels=None):
         source = ""
 
         # code-gen structs
@@ -1155,15 +1168,18 @@ class ModuleBuilder:
                     func.adj, name=func.key, snippet=func.native_snippet, adj_snippet=func.adj_native_snippet
                 )
 
-        for kernel in self.module.kernels.values():
+        if kernels is None:
+            kernels = []
+            for kernel in self.module.kernels.values():
+                if not kernel.is_generic:
+                    kernels.append(kernel)
+                else:
+                    kernels.extend(kernel.overloads.values())
+
+        for kernel in kernels:
             # each kernel gets an entry point in the module
-            if not kernel.is_generic:
-                source += warp.codegen.codegen_kernel(kernel, device=device, options=self.options)
-                source += warp.codegen.codegen_module(kernel, device=device)
-            else:
-                for k in kernel.overloads.values():
-                    source += warp.codegen.codegen_kernel(k, device=device, options=self.options)
-                    source += warp.codegen.codegen_module(k, device=device)
+            source += warp.codegen.codegen_kernel(kernel, device=device, options=self.options)
+            source += warp.codegen.codegen_module(kernel, device=device, options=self.options)
 
         # add headers
         if device == "cpu":
@@ -1191,16 +1207,22 @@ class Module:
         self.structs = {}
 
         self.cpu_module = None
+        self.cpu_units = {}  # names of the loaded CPU object code by kernel, the key is None for whole-module builds
         self.cuda_modules = {}  # module lookup by CUDA context
 
         self.cpu_build_failed = False
         self.cuda_build_failed = False
 
+        # pending CPU build as a (futures, units, start time) tuple, see load_async()
+        self.cpu_build = None
+
         self.options = {
             "max_unroll": 16,
             "enable_backward": warp.config.enable_backward,
             "fast_math": False,
             "cuda_output": None,  # supported values: "ptx", "cubin", or None (automatic)
+            "cpu_simd_width": 0,  # supported values: 0 (scalar), 4, 8, 16
+            "cpu_kernel_units": False,  # build and cache the CPU code of each kernel separately
             "mode": warp.config.mode,
         }
 
@@ -1225,6 +1247,10 @@ class Module:
         self.references = set()  # modules whose content we depend on
         self.dependents = set()  # modules that depend on our content
 
+        # functions and kernels whose references have not been determined yet, their sources are only
+        # parsed when the module is hashed -> See ``Module.resolve_references()``
+        self.pending_references = []
+
         # Since module hashing is recursive, we improve performance by caching the hash of the
         # module contents (kernel source, function source, and struct source).
         # After all kernels, functions, and structs are added to the module (usually at import time),
@@ -1233,6 +1259,11 @@ class Module:
 
         self.content_hash = None
 
+        # hashes of the content shared by all kernels (structs and functions) and of each concrete kernel,
+        # computed along with the content hash
+        self.shared_hash = None
+        self.kernel_hashes = {}
+
         # number of times module auto-generates kernel key for user
         # used to ensure unique kernel keys
         self.count = 0
@@ -1246,7 +1277,7 @@ class Module:
     def register_kernel(self, kernel):
         self.kernels[kernel.key] = kernel
 
-        self.find_references(kernel.adj)
+        self.pending_references.append(kernel.adj)
 
         # for a reload of module on next launch
         self.unload()
@@ -1274,7 +1305,7 @@ class Module:
             elif not skip_adding_overload:
                 func_existing.add_overload(func)
 
-        self.find_references(func.adj)
+        self.pending_references.append(func.adj)
 
         # for a reload of module on next launch
         self.unload()
@@ -1284,6 +1315,11 @@ class Module:
         self.count += 1
         return unique_key
 
+    # find the references of the functions and kernels registered since the last call
+    def resolve_references(self):
+        while self.pending_references:
+            self.find_references(self.pending_references.pop())
+
     # collect all referenced functions / structs
     # given the AST of a function or kernel
     def find_references(self, adj):
@@ -1292,6 +1328,21 @@ class Module:
                 self.references.add(ref)
                 ref.dependents.add(self)
 
+        # scan for structs
+        for arg in adj.args:
+            if isinstance(arg.type, warp.codegen.Struct) and arg.type.module is not None:
+                add_ref(arg.type.module)
+
+        # the modules referenced by function calls are persisted with the source information,
+        # the AST is only scanned when the source changed or some of these modules are not registered yet
+        info = warp.build.get_source_info(adj.func) if not adj.transformers else None
+        if info is not None and "refs" in info and all(name in user_modules for name in info["refs"]):
+            for name in info["refs"]:
+                add_ref(user_modules[name])
+            return
+
+        refs = set()
+
         # scan for function calls
         for node in ast.walk(adj.tree):
             if isinstance(node, ast.Call):
@@ -1302,6 +1353,8 @@ class Module:
                     # if this is a user-defined function, add a module reference
                     if isinstance(func, warp.context.Function) and func.module is not None:
                         add_ref(func.module)
+                        if func.module is not self:
+                            refs.add(func.module.name)
 
                 except Exception:
                     # Lookups may fail for builtins, but that's ok.
@@ -1309,12 +1362,13 @@ class Module:
                     # and that's ok too (not an external reference).
                     pass
 
-        # scan for structs
-        for arg in adj.args:
-            if isinstance(arg.type, warp.codegen.Struct) and arg.type.module is not None:
-                add_ref(arg.type.module)
+        if not adj.transformers:
+            warp.build.set_source_info(adj.func, refs=sorted(refs))
+
+    def hash_module(self, kernels=False):
+        """Returns the hash of the module, or the hash of the module and a dictionary of the
+        hashes of its concrete kernels if ``kernels`` is True."""
 
-    def hash_module(self):
         def get_annotations(obj: Any) -> Mapping[str, Any]:
             """Alternative to `inspect.get_annotations()` for Python 3.9 and older."""
             # See https://docs.python.org/3/howto/annotations.html#accessing-the-annotations-dict-of-an-object-in-python-3-9-and-older
@@ -1328,14 +1382,14 @@ class Module:
                 return get_type_name(type_hint.cls)
             return type_hint
 
-        def hash_recursive(module, visited):
-            # Hash this module, including all referenced modules recursively.
-            # The visited set tracks modules already visited to avoid circular references.
+        def hash_content(module):
+            # Hash the module contents, the struct and function sources that are shared by all kernels
+            # are hashed separately from each concrete kernel so that kernels can be built individually.
 
             # check if we need to update the content hash
             if not module.content_hash:
                 # recompute content hash
-                ch = hashlib.sha256()
+                sh = hashlib.sha256()
 
                 # struct source
                 for struct in module.structs.values():
@@ -1343,43 +1397,69 @@ class Module:
                         "{}: {}".format(name, get_type_name(type_hint))
                         for name, type_hint in get_annotations(struct.cls).items()
                     )
-                    ch.update(bytes(s, "utf-8"))
+                    sh.update(bytes(s, "utf-8"))
 
                 # functions source
                 for func in module.functions.values():
-                    s = func.adj.source
-                    ch.update(bytes(s, "utf-8"))
+                    sh.update(func.adj.get_source_hash())
+                    sh.update(func.adj.get_constant_hash())
 
                     if func.custom_grad_func:
-                        s = func.custom_grad_func.adj.source
-                        ch.update(bytes(s, "utf-8"))
+                        sh.update(func.custom_grad_func.adj.get_source_hash())
+                        sh.update(func.custom_grad_func.adj.get_constant_hash())
                     if func.custom_replay_func:
-                        s = func.custom_replay_func.adj.source
-                        
+                        sh.update(func.custom_replay_func.adj.get_source_hash())
+                        sh.update(func.custom_replay_func.adj.get_constant_hash())
+
                     # cache func arg types
                     for arg, arg_type in func.adj.arg_types.items():
                         s = f"{arg}: {get_type_name(arg_type)}"
-                        ch.update(bytes(s, "utf-8"))
+                        sh.update(bytes(s, "utf-8"))
+
+                module.shared_hash = sh.digest()
+                module.kernel_hashes = {}
+
+                ch = hashlib.sha256()
+                ch.update(module.shared_hash)
 
                 # kernel source
                 for kernel in module.kernels.values():
-                    ch.update(bytes(kernel.adj.source, "utf-8"))
+                    kh = hashlib.sha256()
+                    kh.update(kernel.adj.get_source_hash())
+                    # compile-time constants referenced by the kernel
+                    kh.update(kernel.adj.get_constant_hash())
                     # cache kernel arg types
                     for arg, arg_type in kernel.adj.arg_types.items():
                         s = f"{arg}: {get_type_name(arg_type)}"
-                        ch.update(bytes(s, "utf-8"))
-                    # for generic kernels the Python source is always the same,
-                    # but we hash the type signatures of all the overloads
-                    if kernel.is_generic:
+                        kh.update(bytes(s, "utf-8"))
+
+                    if not kernel.is_generic:
+                        module.kernel_hashes[kernel] = kh.digest()
+                    else:
+                        # for generic kernels the Python source is always the same,
+                        # but we hash the type signatures of all the overloads
                         for sig in sorted(kernel.overloads.keys()):
-                            ch.update(bytes(sig, "utf-8"))
+                            oh = kh.copy()
+                            oh.update(bytes(sig, "utf-8"))
+                            module.kernel_hashes[kernel.overloads[sig]] = oh.digest()
+
+                for kernel_hash in module.kernel_hashes.values():
+                    ch.update(kernel_hash)
 
                 module.content_hash = ch.digest()
 
+        def hash_recursive(module, visited, include_content=True):
+            # Hash this module, including all referenced modules recursively.
+            # The visited set tracks modules already visited to avoid circular references.
+
+            module.resolve_references()
+            hash_content(module)
+
             h = hashlib.sha256()
 
             # content hash
-            h.update(module.content_hash)
+            if include_content:
+                h.update(module.content_hash)
 
             # configuration parameters
             for k in sorted(module.options.keys()):
@@ -1390,11 +1470,11 @@ class Module:
             if warp.config.verify_fp:
                 h.update(bytes("verify_fp", "utf-8"))
 
-            h.update(bytes(warp.config.mode, "utf-8"))
+            # lane-batched CPU kernels are compiled for the vector ISA of the host
+            if module.options["cpu_simd_width"]:
+                h.update(bytes(f"cpu_simd_lanes={runtime.cpu_simd_lanes}", "utf-8"))
 
-            # compile-time constants (global)
-            if warp.types._constant_hash:
-                h.update(warp.types._constant_hash.digest())
+            h.update(bytes(warp.config.mode, "utf-8"))
 
             # recurse on references
             visited.add(module)
@@ -1407,11 +1487,26 @@ class Module:
 
             return h.digest()
 
-        return hash_recursive(self, visited=set())
+        module_hash = hash_recursive(self, visited=set())
 
-    def load(self, device):
-        from warp.utils import ScopedTimer
+        if not kernels:
+            return module_hash
 
+        # a kernel depends on the shared module content, its own content and the module settings,
+        # but not on the other kernels of the module
+        settings_hash = hash_recursive(self, visited=set(), include_content=False)
+
+        kernel_hashes = {}
+        for kernel, content_hash in self.kernel_hashes.items():
+            h = hashlib.sha256()
+            h.update(self.shared_hash)
+            h.update(content_hash)
+            h.update(settings_hash)
+            kernel_hashes[kernel] = h.digest()
+
+        return module_hash, kernel_hashes
+
+    def load(self, device):
         device = get_device(device)
 
         if device.is_cpu:
@@ -1423,6 +1518,9 @@ class Module:
                 return False
             if not warp.is_cpu_available():
                 raise RuntimeError("Failed to build CPU module because no CPU buildchain was found")
+            # wait for a build started by load_async()
+            if self.cpu_build is not None:
+                return self.end_cpu_build()
         else:
             # check if already loaded
             if device.context in self.cuda_modules:
@@ -1433,68 +1531,25 @@ class Module:
             if not warp.is_cuda_available():
                 raise RuntimeError("Failed to build CUDA module because CUDA is not available")
 
-        with ScopedTimer(f"Module {self.name} load on device '{device}'", active=not warp.config.quiet):
-            build_path = warp.build.kernel_bin_dir
-            gen_path = warp.build.kernel_gen_dir
+        from warp.utils import ScopedTimer
 
-            if not os.path.exists(build_path):
-                os.makedirs(build_path)
-            if not os.path.exists(gen_path):
-                os.makedirs(gen_path)
+        with ScopedTimer(f"Module {self.name} load on device '{device}'", active=not warp.config.quiet):
+            build_path, gen_path = self.get_build_paths()
 
             module_name = "wp_" + self.name
             module_path = os.path.join(build_path, module_name)
             module_hash = self.hash_module()
 
-            builder = ModuleBuilder(self, self.options)
-
             if device.is_cpu:
-                obj_path = os.path.join(build_path, module_name)
-                obj_path = obj_path + ".o"
-                cpu_hash_path = module_path + ".cpu.hash"
-
                 # check cache
-                if warp.config.cache_kernels and os.path.isfile(cpu_hash_path) and os.path.isfile(obj_path):
-                    with open(cpu_hash_path, "rb") as f:
-                        cache_hash = f.read()
-
-                    if cache_hash == module_hash:
-                        runtime.llvm.load_obj(obj_path.encode("utf-8"), module_name.encode("utf-8"))
-                        self.cpu_module = module_name
-                        return True
-
-                # build
-                try:
-                    cpp_path = os.path.join(gen_path, module_name + ".cpp")
-
-                    # write cpp sources
-                    cpp_source = builder.codegen("cpu")
-
-                    cpp_file = open(cpp_path, "w")
-                    cpp_file.write(cpp_source)
-                    cpp_file.close()
-
-                    # build object code
-                    with ScopedTimer("Compile x86", active=warp.config.verbose):
-                        warp.build.build_cpu(
-                            obj_path,
-                            cpp_path,
-                            mode=self.options["mode"],
-                            fast_math=self.options["fast_math"],
-                            verify_fp=warp.config.verify_fp,
-                        )
-
-                    # update cpu hash
-                    with open(cpu_hash_path, "wb") as f:
-                        f.write(module_hash)
-
-                    # load the object code
-                    runtime.llvm.load_obj(obj_path.encode("utf-8"), module_name.encode("utf-8"))
+                units = self.load_cpu_cache(self.get_cpu_units())
+                if not units:
                     self.cpu_module = module_name
+                    return True
 
-                except Exception as e:
-                    self.cpu_build_failed = True
-                    raise (e)
+                # build the units that are not cached
+                self.begin_cpu_build(units, ModuleBuilder(self, self.options), asynchronous=False)
+                self.end_cpu_build()
 
             elif device.is_cuda:
                 # determine whether to use PTX or CUBIN
@@ -1513,67 +1568,262 @@ class Module:
 
                 if use_ptx:
                     output_arch = min(device.arch, warp.config.ptx_target_arch)
-                    output_path = module_path + f".sm{output_arch}.ptx"
+                    output_ext = f".sm{output_arch}.ptx"
                 else:
                     output_arch = device.arch
-                    output_path = module_path + f".sm{output_arch}.cubin"
+                    output_ext = f".sm{output_arch}.cubin"
 
-                cuda_hash_path = module_path + f".sm{output_arch}.hash"
+                # cache entries are addressed by the module hash and the output format
+                cache_key = warp.build.kernel_cache_key(module_hash, "cuda" + output_ext)
+                output_path = f"{module_path}_{cache_key}{output_ext}"
 
                 # check cache
-                if warp.config.cache_kernels and os.path.isfile(cuda_hash_path) and os.path.isfile(output_path):
-                    with open(cuda_hash_path, "rb") as f:
-                        cache_hash = f.read()
-
-                    if cache_hash == module_hash:
-                        cuda_module = warp.build.load_cuda(output_path, device)
-                        if cuda_module is not None:
-                            self.cuda_modules[device.context] = cuda_module
-                            return True
+                if warp.config.cache_kernels:
+                    with warp.build.cache_entry_lock(output_path):
+                        cache_path = warp.build.find_cache_entry(output_path)
+                        if cache_path is not None:
+                            cuda_module = warp.build.load_cuda(cache_path, device)
+                            if cuda_module is not None:
+                                self.cuda_modules[device.context] = cuda_module
+                                return True
 
                 # build
                 try:
-                    cu_path = os.path.join(gen_path, module_name + ".cu")
+                    cu_path = os.path.join(gen_path, f"{module_name}_{cache_key}.cu")
 
                     # write cuda sources
+                    builder = ModuleBuilder(self, self.options)
                     cu_source = builder.codegen("cuda")
-
-                    cu_file = open(cu_path, "w")
-                    cu_file.write(cu_source)
-                    cu_file.close()
+                    warp.build.write_cache_source(cu_path, cu_source)
 
                     # generate PTX or CUBIN
                     with ScopedTimer("Compile CUDA", active=warp.config.verbose):
-                        warp.build.build_cuda(
-                            cu_path,
-                            output_arch,
+                        warp.build.build_cache_entry(
                             output_path,
-                            config=self.options["mode"],
-                            fast_math=self.options["fast_math"],
-                            verify_fp=warp.config.verify_fp,
+                            lambda path: warp.build.build_cuda(
+                                cu_path,
+                                output_arch,
+                                path,
+                                config=self.options["mode"],
+                                fast_math=self.options["fast_math"],
+                                verify_fp=warp.config.verify_fp,
+                            ),
                         )
 
-                    # update cuda hash
-                    with open(cuda_hash_path, "wb") as f:
-                        f.write(module_hash)
-
                     # load the module
-                    cuda_module = warp.build.load_cuda(output_path, device)
+                    with warp.build.cache_entry_lock(output_path):
+                        cuda_module = warp.build.load_cuda(output_path, device)
                     if cuda_module is not None:
                         self.cuda_modules[device.context] = cuda_module
                     else:
                         raise Exception("Failed to load CUDA module")
 
+                    warp.build.evict_kernel_cache()
+
                 except Exception as e:
                     self.cuda_build_failed = True
                     raise (e)
 
             return True
 
+    def load_async(self, device):
+        """Starts building the CPU code of the module in a separate process, the next
+        :meth:`load()` waits for the build to complete. Other devices are loaded synchronously."""
+
+        device = get_device(device)
+
+        if not device.is_cpu:
+            return self.load(device)
+
+        if self.cpu_module or self.cpu_build is not None:
+            return True
+        if self.cpu_build_failed:
+            return False
+        if not warp.is_cpu_available():
+            raise RuntimeError("Failed to build CPU module because no CPU buildchain was found")
+
+        self.get_build_paths()
+
+        units = self.load_cpu_cache(self.get_cpu_units())
+        if not units:
+            self.cpu_module = "wp_" + self.name
+            return True
+
+        self.begin_cpu_build(units, ModuleBuilder(self, self.options), asynchronous=True)
+
+        return True
+
+    def get_build_paths(self):
+        build_path = warp.build.kernel_bin_dir
+        gen_path = warp.build.kernel_gen_dir
+
+        if not os.path.exists(build_path):
+            os.makedirs(build_path)
+        if not os.path.exists(gen_path):
+            os.makedirs(gen_path)
+
+        return build_path, gen_path
+
+    # the CPU compilation units of the module as (name, hash, kernel) tuples, the whole module is a single
+    # unit unless the "cpu_kernel_units" option is set, in which case every concrete kernel is built separately
+    def get_cpu_units(self):
+        module_name = "wp_" + self.name
+
+        if not self.options["cpu_kernel_units"]:
+            return [(module_name, self.hash_module(), None)]
+
+        _, kernel_hashes = self.hash_module(kernels=True)
+
+        return [(f"{module_name}.{k.get_mangled_name()}", h, k) for k, h in kernel_hashes.items()]
+
+    # cache entries are addressed by the hash of the unit and the CPU target
+    def get_cpu_build_paths(self, module_hash, name=None):
+        if name is None:
+            name = "wp_" + self.name
+
+        cache_key = warp.build.kernel_cache_key(module_hash, warp.build.cpu_target)
+        obj_path = os.path.join(warp.build.kernel_bin_dir, f"{name}_{cache_key}.o")
+        cpp_path = os.path.join(warp.build.kernel_gen_dir, f"{name}_{cache_key}.cpp")
+
+        return name, obj_path, cpp_path
+
+    # loads the units found in the local or the shared kernel cache, returns the units that need to be built
+    def load_cpu_cache(self, units):
+        if not warp.config.cache_kernels:
+            return units
+
+        missing = []
+
+        for unit in units:
+            name, unit_hash, kernel = unit
+            _, obj_path, _ = self.get_cpu_build_paths(unit_hash, name)
+
+            # the entry lock keeps the file from being evicted while it is loaded
+            with warp.build.cache_entry_lock(obj_path):
+                cache_path = warp.build.find_cache_entry(obj_path)
+                if cache_path is None:
+                    cache_path = self.load_cpu_bundle(unit_hash, obj_path)
+                if cache_path is None:
+                    missing.append(unit)
+                    continue
+
+                self.load_cpu_unit(name, cache_path, kernel)
+
+        return missing
+
+    # loads the object code of a unit, the entry points of its kernels are looked up by name
+    def load_cpu_unit(self, name, obj_path, kernel):
+        runtime.llvm.load_obj(obj_path.encode("utf-8"), name.encode("utf-8"))
+
+        key = kernel.get_mangled_name() if kernel is not None else None
+        self.cpu_units[key] = name
+
+    # extracts the object code from a precompiled kernel bundle into the kernel cache
+    def load_cpu_bundle(self, module_hash, obj_path):
+        if not warp.config.kernel_bundles:
+            return None
+
+        from warp.aot import find_kernel_bundle
+
+        cache_key = warp.build.kernel_cache_key(module_hash, warp.build.cpu_target)
+
+        bundle = find_kernel_bundle(cache_key)
+        if bundle is None:
+            return None
+
+        tmp_path = f"{obj_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            bundle.extract(cache_key, tmp_path)
+            os.replace(tmp_path, obj_path)
+        finally:
+            if os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+
+        return obj_path
+
+    # generates the CPU code of the units and compiles it, either in this process or in background build processes
+    def begin_cpu_build(self, units, builder, asynchronous):
+        from warp.utils import ScopedTimer
+
+        futures = []
+
+        try:
+            for name, unit_hash, kernel in units:
+                _, obj_path, cpp_path = self.get_cpu_build_paths(unit_hash, name)
+
+                # write cpp sources
+                cpp_source = builder.codegen("cpu", kernels=[kernel] if kernel is not None else None)
+                warp.build.write_cache_source(cpp_path, cpp_source)
+
+                build_args = (cpp_path, self.options["mode"], warp.config.verify_fp, self.options["fast_math"])
+
+                if asynchronous:
+                    futures.append(
+                        warp.build.get_build_pool().submit(
+                            warp.build.build_cache_entry,
+                            obj_path,
+                            lambda path, build_args=build_args: warp.build.build_cpu_process(path, *build_args),
+                        )
+                    )
+                else:
+                    # build object code
+                    with ScopedTimer("Compile x86", active=warp.config.verbose):
+                        warp.build.build_cache_entry(obj_path, lambda path: warp.build.build_cpu(path, *build_args))
+
+        except Exception as e:
+            self.cpu_build_failed = True
+            raise (e)
+
+        self.cpu_build = (futures, units, time.perf_counter())
+
+    # waits for the builds started by begin_cpu_build() and loads the object code
+    def end_cpu_build(self):
+        futures, units, start_time = self.cpu_build
+        self.cpu_build = None
+
+        try:
+            if futures:
+                # no compile time is returned when another process has built the unit
+                compile_times = [t for t in (f.result() for f in futures) if t is not None]
+
+                if not warp.config.quiet:
+                    load_time = time.perf_counter() - start_time
+                    message = f"Module {self.name} load on device 'cpu' took {load_time * 1000.0:.2f} ms"
+                    if compile_times:
+                        message += f" (compiled in {max(compile_times) * 1000.0:.2f} ms)"
+                    print(message)
+
+            # load the object code
+            for name, unit_hash, kernel in units:
+                _, obj_path, _ = self.get_cpu_build_paths(unit_hash, name)
+
+                with warp.build.cache_entry_lock(obj_path):
+                    self.load_cpu_unit(name, obj_path, kernel)
+
+            self.cpu_module = "wp_" + self.name
+
+        except Exception as e:
+            self.cpu_build_failed = True
+            raise (e)
+
+        warp.build.evict_kernel_cache()
+
+        return True
+
     def unload(self):
-        if self.cpu_module:
-            runtime.llvm.unload_obj(self.cpu_module.encode("utf-8"))
-            self.cpu_module = None
+        # discard the result of a pending build, the object code may be outdated
+        if self.cpu_build is not None:
+            futures = self.cpu_build[0]
+            self.cpu_build = None
+
+            if futures:
+                concurrent.futures.wait(futures)
+
+        for name in self.cpu_units.values():
+            runtime.llvm.unload_obj(name.encode("utf-8"))
+
+        self.cpu_units = {}
+        self.cpu_module = None
 
         # need to unload the CUDA module from all CUDA contexts where it is loaded
         # note: we ensure that this doesn't change the current CUDA context
@@ -1605,13 +1855,12 @@ class Module:
         name = kernel.get_mangled_name()
 
         if device.is_cpu:
-            func = ctypes.CFUNCTYPE(None)
-            forward = func(
-                runtime.llvm.lookup(self.cpu_module.encode("utf-8"), (name + "_cpu_forward").encode("utf-8"))
-            )
-            backward = func(
-                runtime.llvm.lookup(self.cpu_module.encode("utf-8"), (name + "_cpu_backward").encode("utf-8"))
-            )
+            # kernels built as separate units have their own object code
+            cpu_module = self.cpu_units.get(name, self.cpu_module)
+
+            # entry points are passed to cpu_launch_kernel() by address, a failed lookup returns 0
+            forward = runtime.llvm.lookup(cpu_module.encode("utf-8"), (name + "_cpu_forward").encode("utf-8")) or None
+            backward = runtime.llvm.lookup(cpu_module.encode("utf-8"), (name + "_cpu_backward").encode("utf-8")) or None
         else:
             cu_module = self.cuda_modules[device.context]
             forward = runtime.core.cuda_get_kernel(
@@ -1630,33 +1879,183 @@ class Module:
 # execution context
 
 
-# a simple allocator
-# TODO: use a pooled allocator to avoid hitting the system allocator
+# rounds an allocation size up to its size class, sizes up to 4 KB are rounded to multiples of 256 bytes,
+# larger sizes to one of four classes per power of two so that at most 25% of a block is unused
+def get_alloc_size_class(size_in_bytes):
+    if size_in_bytes <= 4096:
+        return (size_in_bytes + 255) & ~255
+
+    step = 1 << (size_in_bytes.bit_length() - 3)
+    return (size_in_bytes + step - 1) & ~(step - 1)
+
+
+# a caching allocator, freed blocks are kept in pools by size class and reused by later allocations
+# of the same class instead of going through the system allocator
 class Allocator:
     def __init__(self, device):
         self.device = device
 
+        # cached blocks by size class, each block is a (ptr, stream) pair, the stream is the CUDA stream
+        # that was current when the block was freed and is None for CPU blocks
+        self.pools = {}
+
+        # size classes of the blocks handed out by the pools
+        self.block_sizes = {}
+
+        self.lock = threading.Lock()
+
+        self.bytes_in_use = 0
+        self.bytes_cached = 0
+        self.peak_bytes_in_use = 0
+        self.alloc_count = 0
+        self.free_count = 0
+        self.cache_hit_count = 0
+        self.system_alloc_count = 0
+        self.system_free_count = 0
+
     def alloc(self, size_in_bytes, pinned=False):
         if self.device.is_cuda:
             if self.device.is_capturing:
-                raise RuntimeError(f"Cannot allocate memory on device {self} while graph capture is active")
-            return runtime.core.alloc_device(self.device.context, size_in_bytes)
-        elif self.device.is_cpu:
-            if pinned:
-                return runtime.core.alloc_pinned(size_in_bytes)
+                raise RuntimeError(f"Cannot allocate memory on device {self.device} while graph capture is active")
+        elif pinned:
+            # pinned blocks are not cached since they may be in use by asynchronous copies when freed
+            return runtime.core.alloc_pinned(size_in_bytes)
+
+        if warp.config.alloc_pool:
+            size_class = get_alloc_size_class(size_in_bytes)
+        else:
+            size_class = size_in_bytes
+
+        with self.lock:
+            self.alloc_count += 1
+
+            pool = self.pools.get(size_class)
+            if pool:
+                ptr, stream = self.take_block(pool)
+                self.cache_hit_count += 1
+                self.bytes_cached -= size_class
             else:
-                return runtime.core.alloc_host(size_in_bytes)
+                ptr = stream = None
+
+        if ptr is None:
+            ptr = self.system_alloc(size_class)
+            if ptr is None:
+                # release the cached blocks and try again
+                self.empty_cache()
+                ptr = self.system_alloc(size_class)
+                if ptr is None:
+                    return None
+
+        elif stream is not None and stream.cuda_stream != self.device.stream.cuda_stream:
+            # the block may still be used by work on the stream that freed it
+            self.device.stream.wait_stream(stream)
+
+        with self.lock:
+            self.block_sizes[ptr] = size_class
+            self.bytes_in_use += size_class
+            self.peak_bytes_in_use = max(self.peak_bytes_in_use, self.bytes_in_use)
+
+        return ptr
 
     def free(self, ptr, size_in_bytes, pinned=False):
+        # arrays without elements have no memory
+        if ptr is None:
+            return
+
         if self.device.is_cuda:
             if self.device.is_capturing:
-                raise RuntimeError(f"Cannot free memory on device {self} while graph capture is active")
-            return runtime.core.free_device(self.device.context, ptr)
-        elif self.device.is_cpu:
-            if pinned:
-                return runtime.core.free_pinned(ptr)
+                raise RuntimeError(f"Cannot free memory on device {self.device} while graph capture is active")
+        elif pinned:
+            return runtime.core.free_pinned(ptr)
+
+        with self.lock:
+            size_class = self.block_sizes.pop(ptr, None)
+            if size_class is None:
+                # allocated before the runtime was reinitialized
+                cache = False
             else:
-                return runtime.core.free_host(ptr)
+                self.free_count += 1
+                self.bytes_in_use -= size_class
+
+                # blocks allocated while the pool was disabled are only cached if their size is a size class,
+                # the cached memory does not grow beyond the limit
+                limit = warp.config.alloc_pool_limit
+                cache = (
+                    warp.config.alloc_pool
+                    and size_class == get_alloc_size_class(size_class)
+                    and (limit == 0 or self.bytes_cached + size_class <= limit)
+                )
+
+            if cache:
+                stream = self.device.stream if self.device.is_cuda else None
+                self.pools.setdefault(size_class, []).append((ptr, stream))
+                self.bytes_cached += size_class
+                return
+
+        self.system_free(ptr)
+
+    # takes a block from a pool, preferring blocks freed on the current stream which can be reused without synchronization
+    def take_block(self, pool):
+        if self.device.is_cuda:
+            stream = self.device.stream
+            for i in range(len(pool) - 1, -1, -1):
+                if pool[i][1].cuda_stream == stream.cuda_stream:
+                    return pool.pop(i)
+
+        return pool.pop()
+
+    def system_alloc(self, size_in_bytes):
+        with self.lock:
+            self.system_alloc_count += 1
+
+        if self.device.is_cuda:
+            return runtime.core.alloc_device(self.device.context, size_in_bytes)
+        else:
+            return runtime.core.alloc_host(size_in_bytes)
+
+    def system_free(self, ptr):
+        with self.lock:
+            self.system_free_count += 1
+
+        if self.device.is_cuda:
+            runtime.core.free_device(self.device.context, ptr)
+        else:
+            runtime.core.free_host(ptr)
+
+    def empty_cache(self):
+        """Returns the cached blocks to the system allocator."""
+
+        with self.lock:
+            blocks = [ptr for pool in self.pools.values() for ptr, _ in pool]
+            self.pools.clear()
+            self.bytes_cached = 0
+
+        for ptr in blocks:
+            self.system_free(ptr)
+
+    def get_stats(self):
+        """Returns a dictionary of allocation statistics, see :func:`warp.get_allocator_stats()`."""
+
+        with self.lock:
+            return {
+                "bytes_in_use": self.bytes_in_use,
+                "bytes_cached": self.bytes_cached,
+                "peak_bytes_in_use": self.peak_bytes_in_use,
+                "alloc_count": self.alloc_count,
+                "free_count": self.free_count,
+                "cache_hit_count": self.cache_hit_count,
+                "system_alloc_count": self.system_alloc_count,
+                "system_free_count": self.system_free_count,
+            }
+
+    def reset_stats(self):
+        with self.lock:
+            self.peak_bytes_in_use = self.bytes_in_use
+            self.alloc_count = 0
+            self.free_count = 0
+            self.cache_hit_count = 0
+            self.system_alloc_count = 0
+            self.system_free_count = 0
 
 
 class ContextGuard:
@@ -1780,9 +2179,12 @@ class Device:
         self._stream = None
         self.null_stream = None
 
-        # indicates whether CUDA graph capture is active for this device
+        # indicates whether graph capture is active for this device
         self.is_capturing = False
 
+        # records commands while graph capture is active on the CPU device
+        self.cpu_capture = None
+
         self.allocator = Allocator(self)
         self.context_guard = ContextGuard(self)
 
@@ -1790,18 +2192,28 @@ class Device:
             # CPU device
             self.name = platform.processor() or "CPU"
             self.arch = 0
+            self.sm_count = 0
             self.is_uva = False
             self.is_cubin_supported = False
             self.is_mempool_supported = False
 
             # TODO: add more device-specific dispatch functions
-            self.memset = runtime.core.memset_host
-            self.memtile = runtime.core.memtile_host
+            self.memset = lambda ptr, value, size: (
+                self.cpu_capture.record_memset(ptr, value, size)
+                if self.is_capturing
+                else runtime.core.memset_host(ptr, value, size)
+            )
+            self.memtile = lambda ptr, src, srcsize, reps: (
+                self.cpu_capture.record_memtile(ptr, src, srcsize, reps)
+                if self.is_capturing
+                else runtime.core.memtile_host(ptr, src, srcsize, reps)
+            )
 
         elif ordinal >= 0 and ordinal < runtime.core.cuda_device_get_count():
             # CUDA device
             self.name = runtime.core.cuda_device_get_name(ordinal).decode()
             self.arch = runtime.core.cuda_device_get_arch(ordinal)
+            self.sm_count = runtime.core.cuda_device_get_sm_count(ordinal)
             self.is_uva = runtime.core.cuda_device_is_uva(ordinal)
             # check whether our NVRTC can generate CUBINs for this architecture
             self.is_cubin_supported = self.arch in runtime.nvrtc_supported_archs
@@ -1921,14 +2333,177 @@ Devicelike = Union[Device, str, None]
 
 
 class Graph:
-    def __init__(self, device: Device, exec: ctypes.c_void_p):
+    def __init__(self, device: Device, exec: ctypes.c_void_p, retain: List = None):
         self.device = device
         self.exec = exec
 
+        # objects referenced by the recorded commands of CPU graphs, they must outlive the graph
+        self.retain = retain
+
     def __del__(self):
-        # use CUDA context guard to avoid side effects during garbage collection
-        with self.device.context_guard:
-            runtime.core.cuda_graph_destroy(self.device.context, self.exec)
+        if self.device.is_cpu:
+            runtime.core.cpu_graph_destroy(self.exec)
+        else:
+            # use CUDA context guard to avoid side effects during garbage collection
+            with self.device.context_guard:
+                runtime.core.cuda_graph_destroy(self.device.context, self.exec)
+
+
+class CpuGraphCapture:
+    """Records CPU kernel launches and memory operations into a native graph, see :func:`capture_begin()`.
+
+    Each recorded command depends on the earlier commands that access overlapping memory where at least one of
+    the two writes. Commands whose memory accesses cannot be determined (e.g.: kernels taking ``uint64`` handles
+    to meshes or volumes) are ordered against all other commands.
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self.graph = runtime.core.cpu_graph_create()
+
+        # Python objects and ctypes values referenced by the recorded commands
+        self.retain = []
+
+        # (node, ranges) pairs for the commands recorded since the last barrier, where ranges
+        # is a list of (begin, end, write) tuples of the accessed memory in bytes
+        self.nodes = []
+        self.barrier = None
+
+    def add_node(self, add_func, ranges, *args):
+        if ranges is None:
+            deps = [node for node, _ in self.nodes]
+        else:
+            deps = [node for node, node_ranges in self.nodes if self.ranges_conflict(ranges, node_ranges)]
+
+        if self.barrier is not None:
+            deps.append(self.barrier)
+
+        node = add_func(self.graph, *args, (ctypes.c_int * len(deps))(*deps), len(deps))
+
+        if ranges is None:
+            self.nodes = []
+            self.barrier = node
+        else:
+            self.nodes.append((node, ranges))
+
+    @staticmethod
+    def ranges_conflict(ranges_a, ranges_b):
+        for begin_a, end_a, write_a in ranges_a:
+            for begin_b, end_b, write_b in ranges_b:
+                if (write_a or write_b) and begin_a < end_b and begin_b < end_a:
+                    return True
+        return False
+
+    @staticmethod
+    def add_array_ranges(arr, elem_size, write, ranges):
+        if not arr.data:
+            return
+
+        extent = elem_size
+        for i in range(arr.ndim):
+            if arr.shape[i] == 0:
+                return
+            extent += (arr.shape[i] - 1) * arr.strides[i]
+
+        ranges.append((arr.data, arr.data + extent, write))
+
+        if arr.grad:
+            ranges.append((arr.grad, arr.grad + extent, write))
+
+    # collects the memory ranges referenced by a packed kernel argument, returns False if they can't be determined
+    def add_arg_ranges(self, arg_type, value, write, ranges):
+        if isinstance(arg_type, warp.types.array):
+            self.add_array_ranges(value, warp.types.type_size_in_bytes(arg_type.dtype), write, ranges)
+        elif isinstance(arg_type, warp.types.indexedarray):
+            self.add_array_ranges(value.data, warp.types.type_size_in_bytes(arg_type.dtype), write, ranges)
+            for i in range(arg_type.ndim):
+                if value.indices[i]:
+                    ranges.append((value.indices[i], value.indices[i] + 4 * value.shape[i], False))
+        elif isinstance(arg_type, warp.codegen.Struct):
+            for name, var in arg_type.vars.items():
+                if not self.add_arg_ranges(var.type, getattr(value, name), write, ranges):
+                    return False
+        elif warp.types.is_array(arg_type) or arg_type == warp.types.uint64:
+            # fabric arrays and handles to native objects reference memory that is not known here
+            return False
+
+        return True
+
+    def record_launch(self, kernel, func, bounds, max_cpu_threads, params, kernel_params, adjoint, args):
+        ranges = []
+
+        # the arguments written by a kernel are found when it is built, which is skipped for cached modules
+        if not hasattr(kernel.adj, "written_args"):
+            ModuleBuilder(kernel.module, kernel.module.options)
+
+        # params hold the launch bounds followed by the forward and (for adjoint launches) the adjoint arguments
+        for i, value in enumerate(params[1:]):
+            arg = kernel.adj.args[i % len(kernel.adj.args)]
+            write = adjoint or arg.label in kernel.adj.written_args
+
+            if not self.add_arg_ranges(arg.type, value, write, ranges):
+                ranges = None
+                break
+
+        # indirect launches read their counter when they start
+        if ranges is not None and bounds.size_from:
+            ranges.append((bounds.size_from, bounds.size_from + ctypes.sizeof(ctypes.c_int32), False))
+
+        self.retain.append((params, kernel_params, args))
+
+        self.add_node(
+            runtime.core.cpu_graph_add_launch,
+            ranges,
+            func,
+            bounds.size,
+            max_cpu_threads,
+            warp.config.cpu_tile_size,
+            kernel_params,
+        )
+
+    def record_memcpy(self, dst_ptr, src_ptr, size, dest, src):
+        self.retain.append((dest, src))
+
+        ranges = [(src_ptr, src_ptr + size, False), (dst_ptr, dst_ptr + size, True)]
+        self.add_node(runtime.core.cpu_graph_add_memcpy, ranges, dst_ptr, src_ptr, size)
+
+    def record_memset(self, ptr, value, size):
+        self.add_node(runtime.core.cpu_graph_add_memset, [(ptr, ptr + size, True)], ptr, value, size)
+
+    def record_memtile(self, ptr, src, srcsize, reps):
+        ranges = [(ptr, ptr + srcsize * reps, True)]
+        self.add_node(runtime.core.cpu_graph_add_memtile, ranges, ptr, src, srcsize, reps)
+
+    def record_array_copy(self, dst_desc, src_desc, dst_type, src_type, elem_size, dest, src):
+        self.retain.append((dst_desc, src_desc, dest, src))
+
+        # arrays provide the same type information as kernel argument types
+        ranges = []
+        if not self.add_arg_ranges(src, src_desc, False, ranges) or not self.add_arg_ranges(
+            dest, dst_desc, True, ranges
+        ):
+            ranges = None
+
+        self.add_node(
+            runtime.core.cpu_graph_add_array_copy,
+            ranges,
+            ctypes.pointer(dst_desc),
+            ctypes.pointer(src_desc),
+            dst_type,
+            src_type,
+            elem_size,
+        )
+
+    def record_array_fill(self, arr_desc, arr_type, value, value_size, arr):
+        self.retain.append((arr_desc, arr))
+
+        ranges = []
+        if not self.add_arg_ranges(arr, arr_desc, True, ranges):
+            ranges = None
+
+        self.add_node(
+            runtime.core.cpu_graph_add_array_fill, ranges, ctypes.pointer(arr_desc), arr_type, value, value_size
+        )
 
 
 class Runtime:
@@ -1957,6 +2532,9 @@ class Runtime:
 
         self.core = self.load_dll(warp_lib)
 
+        # kept for the build processes started by force_load(), see warp.build.build_cpu_process()
+        self.llvm_lib = llvm_lib
+
         if os.path.exists(llvm_lib):
             self.llvm = self.load_dll(llvm_lib)
             # setup c-types for warp-clang.dll
@@ -2000,145 +2578,215 @@ class Runtime:
         ]
         self.core.memtile_device.restype = None
 
-        self.core.memcpy_h2h.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
-        self.core.memcpy_h2h.restype = None
-        self.core.memcpy_h2d.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
-        self.core.memcpy_h2d.restype = None
-        self.core.memcpy_d2h.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
-        self.core.memcpy_d2h.restype = None
-        self.core.memcpy_d2d.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
-        self.core.memcpy_d2d.restype = None
-        self.core.memcpy_peer.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
-        self.core.memcpy_peer.restype = None
-
-        self.core.array_copy_host.argtypes = [
+        self.core.cpu_launch_kernel.argtypes = [
             ctypes.c_void_p,
-            ctypes.c_void_p,
-            ctypes.c_int,
-            ctypes.c_int,
+            ctypes.c_size_t,
             ctypes.c_int,
+            ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_void_p),
         ]
-        self.core.array_copy_host.restype = ctypes.c_size_t
-        self.core.array_copy_device.argtypes = [
+        self.core.cpu_launch_kernel.restype = None
+        self.core.cpu_get_default_thread_count.argtypes = None
+        self.core.cpu_get_default_thread_count.restype = ctypes.c_int
+        self.core.cpu_get_simd_width.argtypes = None
+        self.core.cpu_get_simd_width.restype = ctypes.c_int
+
+        self.core.cpu_graph_create.argtypes = None
+        self.core.cpu_graph_create.restype = ctypes.c_void_p
+        self.core.cpu_graph_destroy.argtypes = [ctypes.c_void_p]
+        self.core.cpu_graph_destroy.restype = None
+        self.core.cpu_graph_add_launch.argtypes = [
             ctypes.c_void_p,
             ctypes.c_void_p,
-            ctypes.c_void_p,
-            ctypes.c_int,
+            ctypes.c_size_t,
             ctypes.c_int,
+            ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_void_p),
+            ctypes.POINTER(ctypes.c_int),
             ctypes.c_int,
         ]
-        self.core.array_copy_device.restype = ctypes.c_size_t
-
-        self.core.array_fill_host.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
-        self.core.array_fill_host.restype = None
-        self.core.array_fill_device.argtypes = [
+        self.core.cpu_graph_add_launch.restype = ctypes.c_int
+        self.core.cpu_graph_add_memcpy.argtypes = [
             ctypes.c_void_p,
             ctypes.c_void_p,
-            ctypes.c_int,
             ctypes.c_void_p,
+            ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_int),
             ctypes.c_int,
         ]
-        self.core.array_fill_device.restype = None
-
-        self.core.array_sum_double_host.argtypes = [
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_int,
-            ctypes.c_int,
-            ctypes.c_int,
-        ]
-        self.core.array_sum_float_host.argtypes = [
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_int,
-            ctypes.c_int,
-            ctypes.c_int,
-        ]
-        self.core.array_sum_double_device.argtypes = [
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_int,
+        self.core.cpu_graph_add_memcpy.restype = ctypes.c_int
+        self.core.cpu_graph_add_memset.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
             ctypes.c_int,
+            ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_int),
             ctypes.c_int,
         ]
-        self.core.array_sum_float_device.argtypes = [
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_int,
-            ctypes.c_int,
+        self.core.cpu_graph_add_memset.restype = ctypes.c_int
+        self.core.cpu_graph_add_memtile.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_size_t,
+            ctypes.c_size_t,
+            ctypes.POINTER(ctypes.c_int),
             ctypes.c_int,
         ]
-
-        self.core.array_inner_double_host.argtypes = [
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_uint64,
+        self.core.cpu_graph_add_memtile.restype = ctypes.c_int
+        self.core.cpu_graph_add_array_copy.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
             ctypes.c_int,
             ctypes.c_int,
             ctypes.c_int,
+            ctypes.POINTER(ctypes.c_int),
             ctypes.c_int,
         ]
-        self.core.array_inner_float_host.argtypes = [
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_int,
+        self.core.cpu_graph_add_array_copy.restype = ctypes.c_int
+        self.core.cpu_graph_add_array_fill.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
             ctypes.c_int,
+            ctypes.c_void_p,
             ctypes.c_int,
+            ctypes.POINTER(ctypes.c_int),
             ctypes.c_int,
         ]
-        self.core.array_inner_double_device.argtypes = [
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_int,
+        self.core.cpu_graph_add_array_fill.restype = ctypes.c_int
+        self.core.cpu_graph_get_stage_count.argtypes = [ctypes.c_void_p]
+        self.core.cpu_graph_get_stage_count.restype = ctypes.c_int
+        self.core.cpu_graph_launch.argtypes = [ctypes.c_void_p]
+        self.core.cpu_graph_launch.restype = None
+
+        self.core.memcpy_h2h.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+        self.core.memcpy_h2h.restype = None
+        self.core.memcpy_h2d.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+        self.core.memcpy_h2d.restype = None
+        self.core.memcpy_d2h.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+        self.core.memcpy_d2h.restype = None
+        self.core.memcpy_d2d.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+        self.core.memcpy_d2d.restype = None
+        self.core.memcpy_peer.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+        self.core.memcpy_peer.restype = None
+
+        self.core.array_copy_host.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
             ctypes.c_int,
             ctypes.c_int,
             ctypes.c_int,
         ]
-        self.core.array_inner_float_device.argtypes = [
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_int,
+        self.core.array_copy_host.restype = ctypes.c_size_t
+        self.core.array_copy_device.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
             ctypes.c_int,
             ctypes.c_int,
             ctypes.c_int,
         ]
+        self.core.array_copy_device.restype = ctypes.c_size_t
 
-        self.core.array_scan_int_host.argtypes = [ctypes.c_uint64, ctypes.c_uint64, ctypes.c_int, ctypes.c_bool]
-        self.core.array_scan_float_host.argtypes = [ctypes.c_uint64, ctypes.c_uint64, ctypes.c_int, ctypes.c_bool]
-        self.core.array_scan_int_device.argtypes = [ctypes.c_uint64, ctypes.c_uint64, ctypes.c_int, ctypes.c_bool]
-        self.core.array_scan_float_device.argtypes = [ctypes.c_uint64, ctypes.c_uint64, ctypes.c_int, ctypes.c_bool]
-
-        self.core.radix_sort_pairs_int_host.argtypes = [ctypes.c_uint64, ctypes.c_uint64, ctypes.c_int]
-        self.core.radix_sort_pairs_int_device.argtypes = [ctypes.c_uint64, ctypes.c_uint64, ctypes.c_int]
-
-        self.core.runlength_encode_int_host.argtypes = [
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_uint64,
+        self.core.array_fill_host.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        self.core.array_fill_host.restype = None
+        self.core.array_fill_device.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
             ctypes.c_int,
-        ]
-        self.core.runlength_encode_int_device.argtypes = [
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_uint64,
-            ctypes.c_uint64,
+            ctypes.c_void_p,
             ctypes.c_int,
         ]
+        self.core.array_fill_device.restype = None
+
+        for reduce_type in ("int", "uint", "int64", "uint64", "float", "double"):
+            for target in ("host", "device"):
+                array_sum = getattr(self.core, f"array_sum_{reduce_type}_{target}")
+                array_sum.argtypes = [ctypes.c_uint64, ctypes.c_uint64, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+                array_sum.restype = None
+
+                array_inner = getattr(self.core, f"array_inner_{reduce_type}_{target}")
+                array_inner.argtypes = [
+                    ctypes.c_uint64,
+                    ctypes.c_uint64,
+                    ctypes.c_uint64,
+                    ctypes.c_int,
+                    ctypes.c_int,
+                    ctypes.c_int,
+                    ctypes.c_int,
+                ]
+                array_inner.restype = None
+
+        for scan_type in ("int", "uint", "int64", "uint64", "float", "double"):
+            array_scan_host = getattr(self.core, f"array_scan_{scan_type}_host")
+            array_scan_host.argtypes = [ctypes.c_uint64, ctypes.c_uint64, ctypes.c_int, ctypes.c_bool, ctypes.c_int]
+            array_scan_host.restype = None
+
+            array_scan_device = getattr(self.core, f"array_scan_{scan_type}_device")
+            array_scan_device.argtypes = [ctypes.c_uint64, ctypes.c_uint64, ctypes.c_int, ctypes.c_bool]
+            array_scan_device.restype = None
+
+            runlength_encode_host = getattr(self.core, f"runlength_encode_{scan_type}_host")
+            runlength_encode_host.argtypes = [
+                ctypes.c_uint64,
+                ctypes.c_uint64,
+                ctypes.c_uint64,
+                ctypes.c_uint64,
+                ctypes.c_int,
+                ctypes.c_int,
+            ]
+            runlength_encode_host.restype = None
+
+            runlength_encode_device = getattr(self.core, f"runlength_encode_{scan_type}_device")
+            runlength_encode_device.argtypes = [
+                ctypes.c_uint64,
+                ctypes.c_uint64,
+                ctypes.c_uint64,
+                ctypes.c_uint64,
+                ctypes.c_int,
+            ]
+            runlength_encode_device.restype = None
+
+        for key_type in ("int", "uint", "int64", "uint64", "float"):
+            for target in ("host", "device"):
+                radix_sort_pairs = getattr(self.core, f"radix_sort_pairs_{key_type}_{target}")
+                radix_sort_pairs.argtypes = [ctypes.c_uint64, ctypes.c_uint64, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+                radix_sort_pairs.restype = None
+
+                segmented_sort_pairs = getattr(self.core, f"segmented_sort_pairs_{key_type}_{target}")
+                segmented_sort_pairs.argtypes = [
+                    ctypes.c_uint64,
+                    ctypes.c_uint64,
+                    ctypes.c_int,
+                    ctypes.c_uint64,
+                    ctypes.c_uint64,
+                    ctypes.c_int,
+                    ctypes.c_int,
+                    ctypes.c_int,
+                ]
+                segmented_sort_pairs.restype = None
 
         self.core.bvh_create_host.restype = ctypes.c_uint64
-        self.core.bvh_create_host.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int]
+        self.core.bvh_create_host.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+
+        self.core.bvh_create_wide_host.restype = ctypes.c_int
+        self.core.bvh_create_wide_host.argtypes = [ctypes.c_uint64]
 
         self.core.bvh_create_device.restype = ctypes.c_uint64
-        self.core.bvh_create_device.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int]
+        self.core.bvh_create_device.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_int,
+            ctypes.c_int,
+        ]
 
         self.core.bvh_destroy_host.argtypes = [ctypes.c_uint64]
         self.core.bvh_destroy_device.argtypes = [ctypes.c_uint64]
 
         self.core.bvh_refit_host.argtypes = [ctypes.c_uint64]
+        self.core.bvh_refit_host.restype = ctypes.c_int
         self.core.bvh_refit_device.argtypes = [ctypes.c_uint64]
 
         self.core.mesh_create_host.restype = ctypes.c_uint64
@@ -2149,8 +2797,12 @@ class Runtime:
             ctypes.c_int,
             ctypes.c_int,
             ctypes.c_int,
+            ctypes.c_int,
         ]
 
+        self.core.mesh_create_wide_bvh_host.restype = ctypes.c_int
+        self.core.mesh_create_wide_bvh_host.argtypes = [ctypes.c_uint64]
+
         self.core.mesh_create_device.restype = ctypes.c_uint64
         self.core.mesh_create_device.argtypes = [
             ctypes.c_void_p,
@@ -2160,26 +2812,81 @@ class Runtime:
             ctypes.c_int,
             ctypes.c_int,
             ctypes.c_int,
+            ctypes.c_int,
         ]
 
         self.core.mesh_destroy_host.argtypes = [ctypes.c_uint64]
         self.core.mesh_destroy_device.argtypes = [ctypes.c_uint64]
 
         self.core.mesh_refit_host.argtypes = [ctypes.c_uint64]
+        self.core.mesh_refit_host.restype = ctypes.c_int
         self.core.mesh_refit_device.argtypes = [ctypes.c_uint64]
 
-        self.core.hash_grid_create_host.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        self.core.hash_grid_create_host.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
         self.core.hash_grid_create_host.restype = ctypes.c_uint64
         self.core.hash_grid_destroy_host.argtypes = [ctypes.c_uint64]
         self.core.hash_grid_update_host.argtypes = [ctypes.c_uint64, ctypes.c_float, ctypes.c_void_p, ctypes.c_int]
         self.core.hash_grid_reserve_host.argtypes = [ctypes.c_uint64, ctypes.c_int]
 
-        self.core.hash_grid_create_device.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        self.core.hash_grid_create_device.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
         self.core.hash_grid_create_device.restype = ctypes.c_uint64
         self.core.hash_grid_destroy_device.argtypes = [ctypes.c_uint64]
         self.core.hash_grid_update_device.argtypes = [ctypes.c_uint64, ctypes.c_float, ctypes.c_void_p, ctypes.c_int]
         self.core.hash_grid_reserve_device.argtypes = [ctypes.c_uint64, ctypes.c_int]
 
+        self.core.marching_cubes_create_host.argtypes = []
+        self.core.marching_cubes_create_host.restype = ctypes.c_uint64
+        self.core.marching_cubes_destroy_host.argtypes = [ctypes.c_uint64]
+        self.core.marching_cubes_surface_host.argtypes = [
+            ctypes.c_uint64,
+            ctypes.c_void_p,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+        ]
+        self.core.marching_cubes_surface_host.restype = ctypes.c_int
+        self.core.marching_cubes_surface_slab_host.argtypes = [
+            ctypes.c_uint64,
+            ctypes.c_void_p,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+        ]
+        self.core.marching_cubes_surface_slab_host.restype = ctypes.c_int
+
+        self.core.gemm_host.argtypes = [
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_double,
+            ctypes.c_double,
+            ctypes.c_bool,
+            ctypes.c_bool,
+            ctypes.c_int,
+        ]
+        self.core.gemm_host.restype = ctypes.c_bool
+
         self.core.cutlass_gemm.argtypes = [
             ctypes.c_int,
             ctypes.c_int,
@@ -2212,6 +2919,41 @@ class Runtime:
             ctypes.POINTER(ctypes.c_uint64),
         ]
         self.core.volume_destroy_host.argtypes = [ctypes.c_uint64]
+        self.core.volume_f_from_tiles_host.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_bool,
+        ]
+        self.core.volume_f_from_tiles_host.restype = ctypes.c_uint64
+        self.core.volume_v_from_tiles_host.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_bool,
+        ]
+        self.core.volume_v_from_tiles_host.restype = ctypes.c_uint64
+        self.core.volume_i_from_tiles_host.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_bool,
+        ]
+        self.core.volume_i_from_tiles_host.restype = ctypes.c_uint64
 
         self.core.volume_create_device.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint64]
         self.core.volume_create_device.restype = ctypes.c_uint64
@@ -2312,6 +3054,81 @@ class Runtime:
         self.core.bsr_transpose_float_device.argtypes = bsr_transpose_argtypes
         self.core.bsr_transpose_double_device.argtypes = bsr_transpose_argtypes
 
+        bsr_mm_argtypes = [
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+        ]
+        self.core.bsr_mm_count_host.argtypes = bsr_mm_argtypes
+        self.core.bsr_mm_count_host.restype = ctypes.c_int
+        self.core.bsr_mm_list_host.argtypes = bsr_mm_argtypes + [ctypes.c_uint64]
+
+        self.core.bsr_mm_values_float_host.argtypes = [
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+        ]
+        self.core.bsr_mm_values_double_host.argtypes = [
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_double,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+        ]
+
+        self.core.bsr_mv_float_host.argtypes = [
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.c_float,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+        ]
+        self.core.bsr_mv_double_host.argtypes = [
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_double,
+            ctypes.c_double,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+            ctypes.c_uint64,
+        ]
+
         self.core.is_cuda_enabled.argtypes = None
         self.core.is_cuda_enabled.restype = ctypes.c_int
         self.core.is_cuda_compatibility_enabled.argtypes = None
@@ -2339,6 +3156,8 @@ class Runtime:
         self.core.cuda_device_get_name.restype = ctypes.c_char_p
         self.core.cuda_device_get_arch.argtypes = [ctypes.c_int]
         self.core.cuda_device_get_arch.restype = ctypes.c_int
+        self.core.cuda_device_get_sm_count.argtypes = [ctypes.c_int]
+        self.core.cuda_device_get_sm_count.restype = ctypes.c_int
         self.core.cuda_device_is_uva.argtypes = [ctypes.c_int]
         self.core.cuda_device_is_uva.restype = ctypes.c_int
 
@@ -2466,6 +3285,9 @@ class Runtime:
         self.device_map["cpu"] = self.cpu_device
         self.context_map[None] = self.cpu_device
 
+        # number of 32-bit lanes in the host's vector registers, used by lane-batched CPU kernels
+        self.cpu_simd_lanes = self.core.cpu_get_simd_width()
+
         cuda_device_count = self.core.cuda_device_get_count()
 
         if cuda_device_count > 0:
@@ -3187,7 +4009,7 @@ def pack_arg(kernel, arg_type, arg_name, value, device, adjoint=False):
                 )
 
             # check subtype
-            if not warp.types.types_equal(value.dtype, arg_type.dtype):
+            if value.dtype is not arg_type.dtype and not warp.types.types_equal(value.dtype, arg_type.dtype):
                 adj = "adjoint " if adjoint else ""
                 raise RuntimeError(
                     f"Error launching kernel '{kernel.key}', {adj}argument '{arg_name}' expects an array with dtype={arg_type.dtype} but passed array has dtype={value.dtype}."
@@ -3258,7 +4080,19 @@ def pack_arg(kernel, arg_type, arg_name, value, device, adjoint=False):
 # represents all data required for a kernel launch
 # so that launches can be replayed quickly, use `wp.launch(..., record_cmd=True)`
 class Launch:
-    def __init__(self, kernel, device, hooks=None, params=None, params_addr=None, bounds=None, max_blocks=0):
+    def __init__(
+        self,
+        kernel,
+        device,
+        hooks=None,
+        params=None,
+        params_addr=None,
+        bounds=None,
+        max_blocks=0,
+        max_cpu_threads=0,
+        dim_from=None,
+        args=None,
+    ):
         # if not specified look up hooks
         if not hooks:
             module = kernel.module
@@ -3296,29 +4130,64 @@ class Launch:
         self.device = device
         self.bounds = bounds
         self.max_blocks = max_blocks
+        self.max_cpu_threads = max_cpu_threads
+
+        # counter of indirect launches, referenced by the launch bounds
+        self.dim_from = dim_from
+
+        # Python values of the params, CPU graphs that capture this command keep them alive
+        self.args = list(args) if args is not None else [None] * len(kernel.adj.args)
+
+        # argument lookup by name for the set_param_by_name*() methods
+        self.arg_indices = {arg.label: i for i, arg in enumerate(kernel.adj.args)}
+
+        # Python types that can be written in place into the packed value of scalar params, see set_param_at_index()
+        self.inplace_types = []
+        for arg in kernel.adj.args:
+            if arg.type in warp.types.float_types and arg.type is not warp.types.float16:
+                self.inplace_types.append((float, int))
+            elif arg.type in warp.types.int_types:
+                self.inplace_types.append((int,))
+            else:
+                self.inplace_types.append(())
 
     def set_dim(self, dim):
-        self.bounds = warp.types.launch_bounds_t(dim)
+        size_from = self.bounds.size_from
+        bounds = warp.types.launch_bounds_t(dim)
+
+        if size_from and bounds.ndim != 1:
+            raise RuntimeError(f"Error launching kernel '{self.kernel.key}', dim_from requires a 1-D launch dimension")
+
+        self.bounds = bounds
+        self.bounds.size_from = size_from
 
         # launch bounds always at index 0
         self.params[0] = self.bounds
 
-        # for CUDA kernels we need to update the address to each arg
+        # kernels are launched with the address of each arg
         if self.params_addr:
-            self.params_addr[0] = ctypes.c_void_p(ctypes.addressof(self.bounds))
+            self.params_addr[0] = ctypes.addressof(self.bounds)
 
     # set kernel param at an index, will convert to ctype as necessary
     def set_param_at_index(self, index, value):
+        # fast path for Python numbers passed to scalar params, the packed value is
+        # overwritten so that the param address does not need to be updated
+        if type(value) in self.inplace_types[index]:
+            self.params[index + 1].value = value
+            self.args[index] = value
+            return
+
         arg_type = self.kernel.adj.args[index].type
         arg_name = self.kernel.adj.args[index].label
 
         carg = pack_arg(self.kernel, arg_type, arg_name, value, self.device, False)
 
         self.params[index + 1] = carg
+        self.args[index] = value
 
-        # for CUDA kernels we need to update the address to each arg
+        # kernels are launched with the address of each arg
         if self.params_addr:
-            self.params_addr[index + 1] = ctypes.c_void_p(ctypes.addressof(carg))
+            self.params_addr[index + 1] = ctypes.addressof(carg)
 
     # set kernel param at an index without any type conversion
     # args must be passed as ctypes or basic int / float types
@@ -3327,25 +4196,31 @@ class Launch:
             # not sure how to directly assign struct->struct without reallocating using ctypes
             self.params[index + 1] = value
 
-            # for CUDA kernels we need to update the address to each arg
+            # kernels are launched with the address of each arg
             if self.params_addr:
-                self.params_addr[index + 1] = ctypes.c_void_p(ctypes.addressof(value))
+                self.params_addr[index + 1] = ctypes.addressof(value)
 
         else:
             self.params[index + 1].__init__(value)
 
+        self.args[index] = value
+
     # set kernel param by argument name
     def set_param_by_name(self, name, value):
-        for i, arg in enumerate(self.kernel.adj.args):
-            if arg.label == name:
-                self.set_param_at_index(i, value)
+        self.set_param_at_index(self.get_param_index(name), value)
 
     # set kernel param by argument name with no type conversions
     def set_param_by_name_from_ctype(self, name, value):
-        # lookup argument index
-        for i, arg in enumerate(self.kernel.adj.args):
-            if arg.label == name:
-                self.set_param_at_index_from_ctype(i, value)
+        self.set_param_at_index_from_ctype(self.get_param_index(name), value)
+
+    # look up the index of a kernel param, the index can be cached by callers
+    # that update the same param on every launch
+    def get_param_index(self, name):
+        index = self.arg_indices.get(name)
+        if index is None:
+            raise RuntimeError(f"Kernel '{self.kernel.key}' has no argument named '{name}'")
+
+        return index
 
     # set all params
     def set_params(self, values):
@@ -3359,7 +4234,28 @@ class Launch:
 
     def launch(self) -> Any:
         if self.device.is_cpu:
-            self.hooks.forward(*self.params)
+            if self.device.is_capturing:
+                # record copies of the current param values, in-place updates of this command must not modify the graph
+                params = [type(p).from_buffer_copy(p) for p in self.params]
+                params_addr = (ctypes.c_void_p * len(params))(*[ctypes.addressof(p) for p in params])
+                self.device.cpu_capture.record_launch(
+                    self.kernel,
+                    self.hooks.forward,
+                    self.bounds,
+                    self.max_cpu_threads or warp.config.cpu_max_threads,
+                    params,
+                    params_addr,
+                    False,
+                    self.args + [self.dim_from],
+                )
+            else:
+                runtime.core.cpu_launch_kernel(
+                    self.hooks.forward,
+                    self.bounds.size,
+                    self.max_cpu_threads or warp.config.cpu_max_threads,
+                    warp.config.cpu_tile_size,
+                    self.params_addr,
+                )
         else:
             runtime.core.cuda_launch_kernel(
                 self.device.context, self.hooks.forward, self.bounds.size, self.max_blocks, self.params_addr
@@ -3379,6 +4275,8 @@ def launch(
     record_tape=True,
     record_cmd=False,
     max_blocks=0,
+    max_cpu_threads=0,
+    dim_from: warp.array = None,
 ):
     """Launch a Warp kernel on the target device
 
@@ -3398,6 +4296,13 @@ def launch(
         record_cmd: When True the launch will be returned as a ``Launch`` command object, the launch will not occur until the user calls ``cmd.launch()``
         max_blocks: The maximum number of CUDA thread blocks to use. Only has an effect for CUDA kernel launches.
             If negative or zero, the maximum hardware value will be used.
+        max_cpu_threads: The maximum number of CPU threads to use. Only has an effect for CPU kernel launches.
+            If negative or zero, ``warp.config.cpu_max_threads`` will be used.
+        dim_from: An optional array of type ``int32`` on the launch device whose first element limits the number
+            of threads of a 1-D launch, which then runs ``min(dim, dim_from[0])`` threads. The counter is read on
+            the device when the kernel starts, so it can be written by previous launches without synchronizing
+            with the host, and the launch must not modify it. CUDA launches use a grid sized for the device
+            instead of for ``dim`` unless ``max_blocks`` is given.
     """
 
     assert_initialized()
@@ -3419,6 +4324,23 @@ def launch(
     # construct launch bounds
     bounds = warp.types.launch_bounds_t(dim)
 
+    if dim_from is not None:
+        if bounds.ndim != 1:
+            raise RuntimeError(f"Error launching kernel '{kernel.key}', dim_from requires a 1-D launch dimension")
+        if not isinstance(dim_from, warp.array) or dim_from.dtype != warp.int32 or dim_from.size < 1:
+            raise RuntimeError(f"Error launching kernel '{kernel.key}', dim_from must be a non-empty int32 array")
+        if dim_from.device != device:
+            raise RuntimeError(
+                f"Error launching kernel '{kernel.key}', dim_from is on device {dim_from.device} "
+                f"but the kernel is launched on device {device}"
+            )
+
+        bounds.size_from = dim_from.ptr
+
+        # threads past the counter exit immediately, a grid that fills the device loops over the counted range
+        if device.is_cuda and max_blocks <= 0 and device.sm_count > 0:
+            max_blocks = device.sm_count * 8
+
     if bounds.size > 0:
         # first param is the number of threads
         params = []
@@ -3456,15 +4378,36 @@ def launch(
         pack_args(fwd_args, params)
         pack_args(adj_args, params, adjoint=True)
 
+        # kernels receive the address of each packed parameter
+        kernel_args = [ctypes.c_void_p(ctypes.addressof(x)) for x in params]
+        kernel_params = (ctypes.c_void_p * len(kernel_args))(*kernel_args)
+
         # run kernel
         if device.is_cpu:
+            if max_cpu_threads <= 0:
+                max_cpu_threads = warp.config.cpu_max_threads
+
             if adjoint:
                 if hooks.backward is None:
                     raise RuntimeError(
                         f"Failed to find backward kernel '{kernel.key}' from module '{kernel.module.name}' for device '{device}'"
                     )
 
-                hooks.backward(*params)
+                if device.is_capturing:
+                    device.cpu_capture.record_launch(
+                        kernel,
+                        hooks.backward,
+                        bounds,
+                        max_cpu_threads,
+                        params,
+                        kernel_params,
+                        True,
+                        fwd_args + adj_args + [dim_from],
+                    )
+                else:
+                    runtime.core.cpu_launch_kernel(
+                        hooks.backward, bounds.size, max_cpu_threads, warp.config.cpu_tile_size, kernel_params
+                    )
 
             else:
                 if hooks.forward is None:
@@ -3474,16 +4417,34 @@ def launch(
 
                 if record_cmd:
                     launch = Launch(
-                        kernel=kernel, hooks=hooks, params=params, params_addr=None, bounds=bounds, device=device
+                        kernel=kernel,
+                        hooks=hooks,
+                        params=params,
+                        params_addr=kernel_params,
+                        bounds=bounds,
+                        device=device,
+                        max_cpu_threads=max_cpu_threads,
+                        dim_from=dim_from,
+                        args=fwd_args,
                     )
                     return launch
+                elif device.is_capturing:
+                    device.cpu_capture.record_launch(
+                        kernel,
+                        hooks.forward,
+                        bounds,
+                        max_cpu_threads,
+                        params,
+                        kernel_params,
+                        False,
+                        fwd_args + [dim_from],
+                    )
                 else:
-                    hooks.forward(*params)
+                    runtime.core.cpu_launch_kernel(
+                        hooks.forward, bounds.size, max_cpu_threads, warp.config.cpu_tile_size, kernel_params
+                    )
 
         else:
-            kernel_args = [ctypes.c_void_p(ctypes.addressof(x)) for x in params]
-            kernel_params = (ctypes.c_void_p * len(kernel_args))(*kernel_args)
-
             with warp.ScopedStream(stream):
                 if adjoint:
                     if hooks.backward is None:
@@ -3509,6 +4470,9 @@ def launch(
                             params_addr=kernel_params,
                             bounds=bounds,
                             device=device,
+                            max_blocks=max_blocks,
+                            dim_from=dim_from,
+                            args=fwd_args,
                         )
                         return launch
 
@@ -3526,7 +4490,7 @@ def launch(
 
     # record on tape if one is active
     if runtime.tape and record_tape:
-        runtime.tape.record_launch(kernel, dim, max_blocks, inputs, outputs, device)
+        runtime.tape.record_launch(kernel, dim, max_blocks, inputs, outputs, device, max_cpu_threads, dim_from)
 
 
 def synchronize():
@@ -3586,12 +4550,70 @@ def synchronize_stream(stream_or_device=None):
     runtime.core.cuda_stream_synchronize(stream.device.context, stream.cuda_stream)
 
 
-def force_load(device: Union[Device, str, List[Device], List[str]] = None, modules: List[Module] = None):
+def empty_cache(device: Devicelike = None):
+    """Release the memory blocks cached by the allocator of a device back to the system
+
+    Freed array memory is kept in pools and reused by later allocations of the same size class
+    when ``warp.config.alloc_pool`` is enabled. Memory that is still in use is not affected.
+
+    Args:
+        device: Device whose cache is released. If None, the caches of all devices are released.
+    """
+
+    if device is None:
+        devices = [runtime.cpu_device, *runtime.cuda_devices]
+    else:
+        devices = [runtime.get_device(device)]
+
+    for d in devices:
+        with d.context_guard:
+            d.allocator.empty_cache()
+
+
+def get_allocator_stats(device: Devicelike = None) -> Dict[str, int]:
+    """Returns the allocation statistics of a device
+
+    The returned dictionary holds the following entries:
+
+    - ``bytes_in_use``: size of the memory blocks currently allocated
+    - ``bytes_cached``: size of the freed memory blocks kept for reuse
+    - ``peak_bytes_in_use``: maximum of ``bytes_in_use`` since the statistics were last reset
+    - ``alloc_count``, ``free_count``: number of allocations and frees
+    - ``cache_hit_count``: number of allocations served from the cached blocks
+    - ``system_alloc_count``, ``system_free_count``: number of calls to the system allocator
+
+    Sizes are rounded up to the allocator's size classes. Pinned host memory is not included.
+
+    Args:
+        device: Device to query. If None, the current default device is used.
+    """
+
+    return runtime.get_device(device).allocator.get_stats()
+
+
+def reset_allocator_stats(device: Devicelike = None):
+    """Resets the allocation counters of a device and sets the peak memory use to the current memory use
+
+    Args:
+        device: Device whose statistics are reset. If None, the current default device is used.
+    """
+
+    runtime.get_device(device).allocator.reset_stats()
+
+
+def force_load(
+    device: Union[Device, str, List[Device], List[str]] = None, modules: List[Module] = None, block: bool = True
+):
     """Force user-defined kernels to be compiled and loaded
 
+    CPU modules that are not in the kernel cache are compiled concurrently in separate processes,
+    see ``warp.config.max_build_jobs``.
+
     Args:
         device: The device or list of devices to load the modules on.  If None, load on all devices.
         modules: List of modules to load.  If None, load all imported modules.
+        block: Whether to wait until all modules are loaded. If False, the function returns once the CPU builds
+            are queued and a kernel launch only waits for the build of the module containing the kernel.
     """
 
     if is_cuda_driver_initialized():
@@ -3606,11 +4628,19 @@ def force_load(device: Union[Device, str, List[Device], List[str]] = None, modul
         devices = [get_device(device)]
 
     if modules is None:
-        modules = user_modules.values()
+        modules = list(user_modules.values())
+
+    # queue the CPU builds first so that they run while CUDA modules are compiled
+    devices = sorted(devices, key=lambda d: not d.is_cpu)
 
     for d in devices:
         for m in modules:
-            m.load(d)
+            m.load_async(d)
+
+    if block:
+        for d in devices:
+            for m in modules:
+                m.load(d)
 
     if is_cuda_available():
         # restore original context to avoid side effects
@@ -3618,7 +4648,10 @@ def force_load(device: Union[Device, str, List[Device], List[str]] = None, modul
 
 
 def load_module(
-    module: Union[Module, ModuleType, str] = None, device: Union[Device, str] = None, recursive: bool = False
+    module: Union[Module, ModuleType, str] = None,
+    device: Union[Device, str] = None,
+    recursive: bool = False,
+    block: bool = True,
 ):
     """Force user-defined module to be compiled and loaded
 
@@ -3626,6 +4659,7 @@ def load_module(
         module: The module to load.  If None, load the current module.
         device: The device to load the modules on.  If None, load on all devices.
         recursive: Whether to load submodules.  E.g., if the given module is `warp.sim`, this will also load `warp.sim.model`, `warp.sim.articulation`, etc.
+        block: Whether to wait until the modules are loaded, see :func:`force_load()`.
 
     Note: A module must be imported before it can be loaded by this function.
     """
@@ -3657,7 +4691,7 @@ def load_module(
             if name.startswith(prefix):
                 modules.append(mod)
 
-    force_load(device=device, modules=modules)
+    force_load(device=device, modules=modules, block=block)
 
 
 def set_module_options(options: Dict[str, Any], module: Optional[Any] = None):
@@ -3668,6 +4702,8 @@ def set_module_options(options: Dict[str, Any], module: Optional[Any] = None):
 
     * **mode**: The compilation mode to use, can be "debug", or "release", defaults to the value of ``warp.config.mode``.
     * **max_unroll**: The maximum fixed-size loop to unroll (default 16)
+    * **cpu_simd_width**: The number of threads processed per iteration by the CPU code of kernels without
+      data-dependent control flow or atomics, can be 0 (scalar), 4, 8, or 16 (default 0)
 
     Args:
 
@@ -3694,11 +4730,14 @@ def get_module_options(module: Optional[Any] = None) -> Dict[str, Any]:
 
 
 def capture_begin(device: Devicelike = None, stream=None, force_module_load=True):
-    """Begin capture of a CUDA graph
+    """Begin capture of a CUDA or CPU graph
 
-    Captures all subsequent kernel launches and memory operations on CUDA devices.
+    Captures all subsequent kernel launches and memory operations on the device.
     This can be used to record large numbers of kernels and replay them with low-overhead.
 
+    On the CPU, kernel launches, :func:`~warp.copy()` calls between CPU arrays and array fills are recorded.
+    Commands that do not access overlapping memory may run concurrently when the graph is launched.
+
     Args:
 
         device: The device to capture on, if None the current CUDA device will be used
@@ -3707,15 +4746,24 @@ def capture_begin(device: Devicelike = None, stream=None, force_module_load=True
 
     """
 
-    if warp.config.verify_cuda is True:
-        raise RuntimeError("Cannot use CUDA error verification during graph capture")
-
     if stream is not None:
         device = stream.device
     else:
         device = runtime.get_device(device)
-        if not device.is_cuda:
-            raise RuntimeError("Must be a CUDA device")
+
+    if device.is_cpu:
+        if device.is_capturing:
+            raise RuntimeError(f"Graph capture is already active on device {device}")
+
+        if force_module_load:
+            force_load(device)
+
+        device.cpu_capture = CpuGraphCapture(device)
+        device.is_capturing = True
+        return
+
+    if warp.config.verify_cuda is True:
+        raise RuntimeError("Cannot use CUDA error verification during graph capture")
 
     if force_module_load:
         force_load(device)
@@ -3730,18 +4778,26 @@ def capture_begin(device: Devicelike = None, stream=None, force_module_load=True
 
 
 def capture_end(device: Devicelike = None, stream=None) -> Graph:
-    """Ends the capture of a CUDA graph
+    """Ends the capture of a CUDA or CPU graph
 
     Returns:
-        A handle to a CUDA graph object that can be launched with :func:`~warp.capture_launch()`
+        A handle to a graph object that can be launched with :func:`~warp.capture_launch()`
     """
 
     if stream is not None:
         device = stream.device
     else:
         device = runtime.get_device(device)
-        if not device.is_cuda:
-            raise RuntimeError("Must be a CUDA device")
+
+    if device.is_cpu:
+        capture = device.cpu_capture
+        if capture is None:
+            raise RuntimeError(f"Graph capture is not active on device {device}")
+
+        device.cpu_capture = None
+        device.is_capturing = False
+
+        return Graph(device, capture.graph, capture.retain)
 
     with warp.ScopedStream(stream):
         graph = runtime.core.cuda_graph_end_capture(device.context)
@@ -3760,13 +4816,20 @@ def capture_end(device: Devicelike = None, stream=None) -> Graph:
 
 
 def capture_launch(graph: Graph, stream: Stream = None):
-    """Launch a previously captured CUDA graph
+    """Launch a previously captured CUDA or CPU graph
 
     Args:
         graph: A Graph as returned by :func:`~warp.capture_end()`
-        stream: A Stream to launch the graph on (optional)
+        stream: A Stream to launch the graph on (optional, CUDA graphs only)
     """
 
+    if graph.device.is_cpu:
+        if stream is not None:
+            raise RuntimeError(f"Cannot launch graph from device {graph.device} on a stream")
+
+        runtime.core.cpu_graph_launch(graph.exec)
+        return
+
     if stream is not None:
         if stream.device != graph.device:
             raise RuntimeError(f"Cannot launch graph from device {graph.device} on stream from device {stream.device}")
@@ -3835,7 +4898,10 @@ def copy(
             )
 
         if src.device.is_cpu and dest.device.is_cpu:
-            runtime.core.memcpy_h2h(dst_ptr, src_ptr, bytes_to_copy)
+            if dest.device.is_capturing:
+                dest.device.cpu_capture.record_memcpy(dst_ptr, src_ptr, bytes_to_copy, dest, src)
+            else:
+                runtime.core.memcpy_h2h(dst_ptr, src_ptr, bytes_to_copy)
         else:
             # figure out the CUDA context/stream for the copy
             if stream is not None:
@@ -3890,6 +4956,8 @@ def copy(
         if src.device.is_cuda:
             with warp.ScopedStream(stream):
                 runtime.core.array_copy_device(src.device.context, dst_ptr, src_ptr, dst_type, src_type, src_elem_size)
+        elif dest.device.is_capturing:
+            dest.device.cpu_capture.record_array_copy(dst_desc, src_desc, dst_type, src_type, src_elem_size, dest, src)
         else:
             runtime.core.array_copy_host(dst_ptr, src_ptr, dst_type, src_type, src_elem_size)
 
@@ -1090,22 +1090,30 @@ struct launch_bounds_t
     int shape[LAUNCH_MAX_DIMS]; // size of each dimension
     int ndim;                   // number of valid dimension
     size_t size;                // total number of threads
+    const int* size_from;       // optional counter in device memory limiting the number of threads of a 1-D launch
 };
 
-#ifndef __CUDACC__
-static size_t s_threadIdx;
-#endif
+// number of threads that execute a launch, for indirect launches the counter is read when the launch starts
+inline CUDA_CALLABLE size_t launch_size(const launch_bounds_t& bounds)
+{
+    if (!bounds.size_from)
+        return bounds.size;
+
+    const int count = *bounds.size_from;
+    if (count <= 0)
+        return 0;
+
+    return size_t(count) < bounds.size ? size_t(count) : bounds.size;
+}
 
+#ifdef __CUDACC__
 inline CUDA_CALLABLE size_t grid_index()
 {
-#ifdef __CUDACC__
     // Need to cast at least one of the variables being multiplied so that type promotion happens before the multiplication
     size_t grid_index = static_cast<size_t>(blockDim.x) * static_cast<size_t>(blockIdx.x) + static_cast<size_t>(threadIdx.x);
     return grid_index;
-#else
-    return s_threadIdx;
-#endif
 }
+#endif
 
 inline CUDA_CALLABLE int tid(size_t index)
 {
@@ -1152,13 +1160,89 @@ inline CUDA_CALLABLE_DEVICE void tid(int& i, int& j, int& k, int& l, size_t inde
     l = index%p;
 }
 
+#if !defined(__CUDA_ARCH__)
+
+// CPU kernels are executed concurrently by the CPU worker pool, so atomics
+// need to be implemented with the compiler's atomic builtins on the host
+#if defined(__clang__) || defined(__GNUC__)
+
 template<typename T>
-inline CUDA_CALLABLE T atomic_add(T* buf, T value)
+inline T cpu_atomic_add(T* buf, T value)
+{
+    T old;
+    T desired;
+    __atomic_load(buf, &old, __ATOMIC_RELAXED);
+    do
+    {
+        desired = static_cast<T>(old + value);
+    }
+    while (!__atomic_compare_exchange(buf, &old, &desired, true, __ATOMIC_RELAXED, __ATOMIC_RELAXED));
+    return old;
+}
+
+inline int32 cpu_atomic_add(int32* buf, int32 value) { return __atomic_fetch_add(buf, value, __ATOMIC_RELAXED); }
+inline uint32 cpu_atomic_add(uint32* buf, uint32 value) { return __atomic_fetch_add(buf, value, __ATOMIC_RELAXED); }
+inline int64 cpu_atomic_add(int64* buf, int64 value) { return __atomic_fetch_add(buf, value, __ATOMIC_RELAXED); }
+inline uint64 cpu_atomic_add(uint64* buf, uint64 value) { return __atomic_fetch_add(buf, value, __ATOMIC_RELAXED); }
+
+template<typename T>
+inline T cpu_atomic_min(T* buf, T value)
+{
+    T old;
+    __atomic_load(buf, &old, __ATOMIC_RELAXED);
+    while (value < old && !__atomic_compare_exchange(buf, &old, &value, true, __ATOMIC_RELAXED, __ATOMIC_RELAXED))
+    {
+    }
+    return old;
+}
+
+template<typename T>
+inline T cpu_atomic_max(T* buf, T value)
+{
+    T old;
+    __atomic_load(buf, &old, __ATOMIC_RELAXED);
+    while (value > old && !__atomic_compare_exchange(buf, &old, &value, true, __ATOMIC_RELAXED, __ATOMIC_RELAXED))
+    {
+    }
+    return old;
+}
+
+#else
+
+// compilers without atomic builtins (MSVC) only use these for host code outside of kernels
+template<typename T>
+inline T cpu_atomic_add(T* buf, T value)
 {
-#if !defined(__CUDA_ARCH__)
     T old = buf[0];
     buf[0] += value;
     return old;
+}
+
+template<typename T>
+inline T cpu_atomic_min(T* buf, T value)
+{
+    T old = buf[0];
+    buf[0] = min(old, value);
+    return old;
+}
+
+template<typename T>
+inline T cpu_atomic_max(T* buf, T value)
+{
+    T old = buf[0];
+    buf[0] = max(old, value);
+    return old;
+}
+
+#endif // defined(__clang__) || defined(__GNUC__)
+
+#endif // !defined(__CUDA_ARCH__)
+
+template<typename T>
+inline CUDA_CALLABLE T atomic_add(T* buf, T value)
+{
+#if !defined(__CUDA_ARCH__)
+    return cpu_atomic_add(buf, value);
 #else
     return atomicAdd(buf, value);
 #endif
@@ -1168,9 +1252,7 @@ template<>
 inline CUDA_CALLABLE float16 atomic_add(float16* buf, float16 value)
 {
 #if !defined(__CUDA_ARCH__)
-    float16 old = buf[0];
-    buf[0] += value;
-    return old;
+    return cpu_atomic_add(buf, value);
 #elif defined(__clang__)  // CUDA compiled by Clang
 	__half r = atomicAdd(reinterpret_cast<__half*>(buf), *reinterpret_cast<__half*>(&value));
     return *reinterpret_cast<float16*>(&r);
@@ -1219,9 +1301,7 @@ inline CUDA_CALLABLE float atomic_max(float* address, float val)
     return __int_as_float(old);
 
 #else
-    float old = *address;
-    *address = max(old, val);
-    return old;
+    return cpu_atomic_max(address, val);
 #endif
 }
 
@@ -1242,9 +1322,7 @@ inline CUDA_CALLABLE float atomic_min(float* address, float val)
     return __int_as_float(old);
 
 #else
-    float old = *address;
-    *address = min(old, val);
-    return old;
+    return cpu_atomic_min(address, val);
 #endif
 }
 
@@ -1254,9 +1332,7 @@ inline CUDA_CALLABLE int atomic_max(int* address, int val)
     return atomicMax(address, val);
 
 #else
-    int old = *address;
-    *address = max(old, val);
-    return old;
+    return cpu_atomic_max(address, val);
 #endif
 }
 
@@ -1267,9 +1343,7 @@ inline CUDA_CALLABLE int atomic_min(int* address, int val)
     return atomicMin(address, val);
 
 #else
-    int old = *address;
-    *address = min(old, val);
-    return old;
+    return cpu_atomic_min(address, val);
 #endif
 }
 
@@ -8,10 +8,13 @@
 
 #include <vector>
 #include <algorithm>
+#include <cmath>
 
 #include "bvh.h"
 #include "warp.h"
 #include "cuda_util.h"
+#include "sort.h"
+#include "thread_pool.h"
 
 #include <map>
 
@@ -23,26 +26,65 @@ namespace wp
 
 /////////////////////////////////////////////////////////////////////////////////////////////
 
-class MedianBVHBuilder
+class TopDownBVHBuilder
 {	
 public:
 
-    void build(BVH& bvh, const vec3* lowers, const vec3* uppers, int n);
+    void build(BVH& bvh, const vec3* lowers, const vec3* uppers, int n, int constructor_type);
 
 private:
 
-    bounds3 calc_bounds(const vec3* lowers, const vec3* uppers, const int* indices, int start, int end);
+    // subtree built by a worker thread once the top of the tree has been split
+    struct BuildTask
+    {
+        int start;
+        int end;
+        int node_index;
+        int depth;
+        int parent;
+    };
+
+    bounds3 calc_bounds(const int* indices, int start, int end);
+
+    int partition_median(int* indices, int start, int end, bounds3 range_bounds);
+    int partition_midpoint(int* indices, int start, int end, bounds3 range_bounds);
+    int partition_sah(int* indices, int start, int end, bounds3 range_bounds);
+    int partition_morton(int start, int end);
+
+    int build_recursive(BVH& bvh, int* indices, int start, int end, int node_index, int depth, int parent, std::vector<BuildTask>* tasks);
 
-    int partition_median(const vec3* lowers, const vec3* uppers, int* indices, int start, int end, bounds3 range_bounds);
-    int partition_midpoint(const vec3* lowers, const vec3* uppers, int* indices, int start, int end, bounds3 range_bounds);
-    int partition_sah(const vec3* lowers, const vec3* uppers, int* indices, int start, int end, bounds3 range_bounds);
+    const vec3* lowers;
+    const vec3* uppers;
 
-    int build_recursive(BVH& bvh, const vec3* lowers, const vec3* uppers, int* indices, int start, int end, int depth, int parent);
+    int constructor_type;
+    int task_size;
+
+    // Morton codes of the sorted items for LBVH builds
+    std::vector<int> keys;
 };
 
+// number of bins per axis of the SAH builder
+const int SAH_NUM_BINS = 16;
+
+// ranges with more items than this are binned and bounded in parallel
+const int BVH_PARALLEL_RANGE_SIZE = 65536;
+
+// minimum number of items of the subtrees built by a worker thread
+const int BVH_MIN_TASK_SIZE = 4096;
+
+// deepest level of the trees built on the host, queries use a traversal stack of 32 nodes
+const int BVH_MAX_BUILD_DEPTH = 30;
+
+// true if count items can be split into single item leaves below a node at depth
+inline bool fits_depth(int count, int depth)
+{
+    const int levels = BVH_MAX_BUILD_DEPTH - depth;
+    return levels >= 31 || (levels >= 0 && count <= (1 << levels));
+}
+
 //////////////////////////////////////////////////////////////////////
 
-void MedianBVHBuilder::build(BVH& bvh, const vec3* lowers, const vec3* uppers, int n)
+void TopDownBVHBuilder::build(BVH& bvh, const vec3* lowers, const vec3* uppers, int n, int constructor_type)
 {
     bvh.max_depth = 0;
     bvh.max_nodes = 2*n-1;
@@ -58,19 +100,90 @@ void MedianBVHBuilder::build(BVH& bvh, const vec3* lowers, const vec3* uppers, i
 
     if (n == 0)
         return;
+
+    this->lowers = lowers;
+    this->uppers = uppers;
+    this->constructor_type = constructor_type;
     
-    std::vector<int> indices(n);
+    // the sort uses the second half of the arrays as temporary memory
+    std::vector<int> indices(2*n);
     for (int i=0; i < n; ++i)
         indices[i] = i;
 
-    build_recursive(bvh, lowers, uppers, &indices[0], 0, n, 0, -1);
+    if (constructor_type == BVH_CONSTRUCTOR_LBVH)
+    {
+        bounds3 total_bounds = calc_bounds(&indices[0], 0, n);
+
+        vec3 edges = total_bounds.edges();
+        edges += vec3(0.0001f);
+
+        const vec3 inv_edges = vec3(1.0f/edges[0], 1.0f/edges[1], 1.0f/edges[2]);
+
+        keys.resize(2*n);
+
+        wp::parallel_for(n, [&](size_t begin, size_t end)
+        {
+            for (size_t i=begin; i < end; ++i)
+            {
+                const vec3 center = 0.5f*(lowers[i] + uppers[i]);
+                const vec3 local = cw_mul(center - total_bounds.lower, inv_edges);
+
+                // 10-bit Morton codes stored in lower 30bits (1024^3 effective resolution)
+                keys[i] = morton3<1024>(local[0], local[1], local[2]);
+            }
+        });
+
+        radix_sort_pairs_host(&keys[0], &indices[0], n, 0, 30);
+    }
+
+    // the top of the tree is split serially, the subtrees below are built in parallel
+    task_size = std::max(BVH_MIN_TASK_SIZE, n / (4*wp::cpu_default_thread_count()));
+
+    std::vector<BuildTask> tasks;
+    bvh.max_depth = build_recursive(bvh, &indices[0], 0, n, 0, 0, -1, &tasks);
+
+    std::vector<int> task_depths(tasks.size());
+
+    wp::parallel_for(tasks.size(), [&](size_t begin, size_t end)
+    {
+        for (size_t i=begin; i < end; ++i)
+        {
+            const BuildTask& task = tasks[i];
+            task_depths[i] = build_recursive(bvh, &indices[0], task.start, task.end, task.node_index, task.depth, task.parent, NULL);
+        }
+    }, 0, 1);
+
+    for (int depth : task_depths)
+        bvh.max_depth = std::max(bvh.max_depth, depth);
+
+    bvh.num_nodes = 2*n-1;
 }
 
 
-bounds3 MedianBVHBuilder::calc_bounds(const vec3* lowers, const vec3* uppers, const int* indices, int start, int end)
+bounds3 TopDownBVHBuilder::calc_bounds(const int* indices, int start, int end)
 {
     bounds3 u;
 
+    if (end - start > BVH_PARALLEL_RANGE_SIZE)
+    {
+        const int num_chunks = (end - start + BVH_PARALLEL_RANGE_SIZE - 1) / BVH_PARALLEL_RANGE_SIZE;
+        std::vector<bounds3> chunk_bounds(num_chunks);
+
+        wp::parallel_for(num_chunks, [&](size_t begin, size_t end_chunk)
+        {
+            for (size_t chunk=begin; chunk < end_chunk; ++chunk)
+            {
+                const int chunk_start = start + int(chunk)*BVH_PARALLEL_RANGE_SIZE;
+                chunk_bounds[chunk] = calc_bounds(indices, chunk_start, std::min(end, chunk_start + BVH_PARALLEL_RANGE_SIZE));
+            }
+        }, 0, 1);
+
+        for (const bounds3& b : chunk_bounds)
+            u = bounds_union(u, b);
+
+        return u;
+    }
+
     for (int i=start; i < end; ++i)
     {
         u.add_point(lowers[indices[i]]);
@@ -98,7 +211,7 @@ struct PartitionPredicateMedian
 };
 
 
-int MedianBVHBuilder::partition_median(const vec3* lowers, const vec3* uppers, int* indices, int start, int end, bounds3 range_bounds)
+int TopDownBVHBuilder::partition_median(int* indices, int start, int end, bounds3 range_bounds)
 {
     assert(end-start >= 2);
 
@@ -132,7 +245,7 @@ struct PartitionPredictateMidPoint
 };
 
 
-int MedianBVHBuilder::partition_midpoint(const vec3* lowers, const vec3* uppers, int* indices, int start, int end, bounds3 range_bounds)
+int TopDownBVHBuilder::partition_midpoint(int* indices, int start, int end, bounds3 range_bounds)
 {
     assert(end-start >= 2);
 
@@ -153,75 +266,203 @@ int MedianBVHBuilder::partition_midpoint(const vec3* lowers, const vec3* uppers,
     return k;
 }
 
-// disable std::sort workaround for macOS error
-#if 0
-int MedianBVHBuilder::partition_sah(const bounds3* bounds, int* indices, int start, int end, bounds3 range_bounds)
+// item counts and bounds of the SAH bins of each axis
+struct SAHBins
 {
-    assert(end-start >= 2);
+    int counts[3][SAH_NUM_BINS];
+    bounds3 bounds[3][SAH_NUM_BINS];
 
-    int n = end-start;
-    vec3 edges = range_bounds.edges();
+    SAHBins()
+    {
+        for (int axis=0; axis < 3; ++axis)
+        {
+            for (int bin=0; bin < SAH_NUM_BINS; ++bin)
+            {
+                counts[axis][bin] = 0;
+                bounds[axis][bin] = bounds3();
+            }
+        }
+    }
 
-    int longestAxis = longest_axis(edges);
+    void merge(const SAHBins& other)
+    {
+        for (int axis=0; axis < 3; ++axis)
+        {
+            for (int bin=0; bin < SAH_NUM_BINS; ++bin)
+            {
+                counts[axis][bin] += other.counts[axis][bin];
+                bounds[axis][bin] = bounds_union(bounds[axis][bin], other.bounds[axis][bin]);
+            }
+        }
+    }
+};
 
-    // sort along longest axis
-    std::sort(&indices[0]+start, &indices[0]+end, PartitionPredicateMedian(&bounds[0], longestAxis));
+struct SAHBinning
+{
+    SAHBinning(const vec3* lowers, const vec3* uppers, const bounds3& centroid_bounds) : lowers(lowers), uppers(uppers), lower(centroid_bounds.lower)
+    {
+        const vec3 edges = centroid_bounds.edges();
 
-    // total area for range from [0, split]
-    std::vector<float> left_areas(n);
-    // total area for range from (split, end]
-    std::vector<float> right_areas(n);
+        for (int axis=0; axis < 3; ++axis)
+            scale[axis] = edges[axis] > 0.0f ? SAH_NUM_BINS / edges[axis] : 0.0f;
+    }
 
-    bounds3 left;
-    bounds3 right;
+    int bin(int item, int axis) const
+    {
+        const float center = 0.5f*(lowers[item][axis] + uppers[item][axis]);
+        return std::min(int((center - lower[axis])*scale[axis]), SAH_NUM_BINS-1);
+    }
 
-    // build cumulative bounds and area from left and right
-    for (int i=0; i < n; ++i)
+    void add(const int* indices, int start, int end, SAHBins& bins) const
     {
-        left = bounds_union(left, bounds[indices[start+i]]);
-        right = bounds_union(right, bounds[indices[end-i-1]]);
+        for (int i=start; i < end; ++i)
+        {
+            const int item = indices[i];
+            const bounds3 item_bounds(lowers[item], uppers[item]);
+
+            for (int axis=0; axis < 3; ++axis)
+            {
+                const int b = bin(item, axis);
 
-        left_areas[i] = left.area();
-        right_areas[n-i-1] = right.area();
+                bins.counts[axis][b]++;
+                bins.bounds[axis][b] = bounds_union(bins.bounds[axis][b], item_bounds);
+            }
+        }
     }
 
-    float invTotalArea = 1.0f/range_bounds.area();
+    const vec3* lowers;
+    const vec3* uppers;
 
-    // find split point i that minimizes area(left[i]) + area(right[i])
-    int minSplit = 0;
-    float minCost = FLT_MAX;
+    vec3 lower;
+    vec3 scale;
+};
 
-    for (int i=0; i < n; ++i)
+// binned surface area heuristic, the items are binned by centroid along each axis and split
+// between the two bins minimizing the sum of child areas weighted by their item counts
+int TopDownBVHBuilder::partition_sah(int* indices, int start, int end, bounds3 range_bounds)
+{
+    assert(end-start >= 2);
+
+    bounds3 centroid_bounds;
+    for (int i=start; i < end; ++i)
+        centroid_bounds.add_point(0.5f*(lowers[indices[i]] + uppers[indices[i]]));
+
+    const SAHBinning binning(lowers, uppers, centroid_bounds);
+
+    SAHBins bins;
+
+    if (end - start > BVH_PARALLEL_RANGE_SIZE)
     {
-        float pBelow = left_areas[i]*invTotalArea;
-        float pAbove = right_areas[i]*invTotalArea;
+        const int num_chunks = (end - start + BVH_PARALLEL_RANGE_SIZE - 1) / BVH_PARALLEL_RANGE_SIZE;
+        std::vector<SAHBins> chunk_bins(num_chunks);
 
-        float cost = pBelow*i + pAbove*(n-i);
+        wp::parallel_for(num_chunks, [&](size_t begin, size_t end_chunk)
+        {
+            for (size_t chunk=begin; chunk < end_chunk; ++chunk)
+            {
+                const int chunk_start = start + int(chunk)*BVH_PARALLEL_RANGE_SIZE;
+                binning.add(indices, chunk_start, std::min(end, chunk_start + BVH_PARALLEL_RANGE_SIZE), chunk_bins[chunk]);
+            }
+        }, 0, 1);
+
+        for (const SAHBins& b : chunk_bins)
+            bins.merge(b);
+    }
+    else
+    {
+        binning.add(indices, start, end, bins);
+    }
+
+    int best_axis = -1;
+    int best_bin = -1;
+    float best_cost = FLT_MAX;
+
+    for (int axis=0; axis < 3; ++axis)
+    {
+        if (binning.scale[axis] == 0.0f)
+            continue;
 
-        if (cost < minCost)
+        // area and count of the items in the bins above each split
+        float right_areas[SAH_NUM_BINS];
+        int right_counts[SAH_NUM_BINS];
+
+        bounds3 right;
+        int right_count = 0;
+
+        for (int bin=SAH_NUM_BINS-1; bin > 0; --bin)
         {
-            minCost = cost;
-            minSplit = i;
+            right = bounds_union(right, bins.bounds[axis][bin]);
+            right_count += bins.counts[axis][bin];
+
+            right_areas[bin] = right_count ? right.area() : 0.0f;
+            right_counts[bin] = right_count;
+        }
+
+        bounds3 left;
+        int left_count = 0;
+
+        for (int bin=0; bin < SAH_NUM_BINS-1; ++bin)
+        {
+            left = bounds_union(left, bins.bounds[axis][bin]);
+            left_count += bins.counts[axis][bin];
+
+            if (left_count == 0 || right_counts[bin+1] == 0)
+                continue;
+
+            const float cost = left.area()*left_count + right_areas[bin+1]*right_counts[bin+1];
+
+            if (cost < best_cost)
+            {
+                best_cost = cost;
+                best_axis = axis;
+                best_bin = bin;
+            }
         }
     }
 
-    return start + minSplit + 1;
+    // all centroids coincide
+    if (best_axis == -1)
+        return partition_median(indices, start, end, range_bounds);
+
+    int* upper = std::partition(indices+start, indices+end, [&](int item) { return binning.bin(item, best_axis) <= best_bin; });
+
+    return int(upper-indices);
+}
+
+// splits the Morton ordered items at the highest bit that differs in their keys
+int TopDownBVHBuilder::partition_morton(int start, int end)
+{
+    assert(end-start >= 2);
+
+    const int first_key = keys[start];
+    const int last_key = keys[end-1];
+
+    // identical keys, split in the middle
+    if (first_key == last_key)
+        return (start+end)/2;
+
+    const int split_bit = 31 - clz(first_key ^ last_key);
+
+    // keys share their bits above split_bit, the first key with split_bit set starts the right child
+    const int* split = std::partition_point(&keys[start], &keys[end], [&](int key) { return (key & (1 << split_bit)) == 0; });
+
+    return int(split - &keys[0]);
 }
-#endif
 
-int MedianBVHBuilder::build_recursive(BVH& bvh, const vec3* lowers, const vec3* uppers, int* indices, int start, int end, int depth, int parent)
+int TopDownBVHBuilder::build_recursive(BVH& bvh, int* indices, int start, int end, int node_index, int depth, int parent, std::vector<BuildTask>* tasks)
 {
     assert(start < end);
 
     const int n = end-start;
-    const int node_index = bvh.num_nodes++;
 
-    assert(node_index < bvh.max_nodes);
-
-    if (depth > bvh.max_depth)
-        bvh.max_depth = depth;
+    // hand the subtree over to a worker thread
+    if (tasks && n <= task_size)
+    {
+        tasks->push_back({start, end, node_index, depth, parent});
+        return depth;
+    }
 
-    bounds3 b = calc_bounds(lowers, uppers, indices, start, end);
+    bounds3 b = calc_bounds(indices, start, end);
     
     const int kMaxItemsPerLeaf = 1;
 
@@ -230,28 +471,49 @@ int MedianBVHBuilder::build_recursive(BVH& bvh, const vec3* lowers, const vec3*
         bvh.node_lowers[node_index] = make_node(b.lower, indices[start], true);
         bvh.node_uppers[node_index] = make_node(b.upper, indices[start], false);
         bvh.node_parents[node_index] = parent;
+
+        return depth;
     }
     else    
     {
-        //int split = partition_midpoint(bounds, indices, start, end, b);
-        int split = partition_median(lowers, uppers, indices, start, end, b);
-        //int split = partition_sah(bounds, indices, start, end, b);
+        int split;
+
+        if (constructor_type == BVH_CONSTRUCTOR_SAH)
+            split = partition_sah(indices, start, end, b);
+        else if (constructor_type == BVH_CONSTRUCTOR_LBVH)
+            split = partition_morton(start, end);
+        else
+            split = partition_median(indices, start, end, b);
 
         if (split == start || split == end)
         {
             // partitioning failed, split down the middle
             split = (start+end)/2;
         }
-    
-        int left_child = build_recursive(bvh, lowers, uppers, indices, start, split, depth+1, node_index);
-        int right_child = build_recursive(bvh, lowers, uppers, indices, split, end, depth+1, node_index);
+
+        // unbalanced splits are replaced by median splits when the tree would get
+        // too deep for the traversal stack of the queries
+        if (!fits_depth(std::max(split-start, end-split), depth+1))
+        {
+            if (constructor_type == BVH_CONSTRUCTOR_LBVH)
+                split = (start+end)/2;
+            else
+                split = partition_median(indices, start, end, b);
+        }
+
+        // each subtree of m items has 2*m-1 nodes, the right subtree follows the left one
+        const int left_child = node_index + 1;
+        const int right_child = node_index + 2*(split-start);
+
+        const int left_depth = build_recursive(bvh, indices, start, split, left_child, depth+1, node_index, tasks);
+        const int right_depth = build_recursive(bvh, indices, split, end, right_child, depth+1, node_index, tasks);
         
         bvh.node_lowers[node_index] = make_node(b.lower, left_child, false);
         bvh.node_uppers[node_index] = make_node(b.upper, right_child, false);
         bvh.node_parents[node_index] = parent;
-    }
 
-    return node_index;
+        return std::max(left_depth, right_depth);
+    }
 }
 
 
@@ -296,6 +558,244 @@ void bvh_refit_recursive(BVH& bvh, int index)
 void bvh_refit_host(BVH& bvh)
 {
     bvh_refit_recursive(bvh, 0);
+
+    if (bvh.wide_nodes)
+        bvh_refit_wide_host(bvh);
+}
+
+namespace
+{
+
+bounds3 bvh_node_bounds(const BVH& bvh, int index)
+{
+    const BVHPackedNodeHalf& lower = bvh.node_lowers[index];
+    const BVHPackedNodeHalf& upper = bvh.node_uppers[index];
+
+    return bounds3(vec3(lower.x, lower.y, lower.z), vec3(upper.x, upper.y, upper.z));
+}
+
+// finds the binary nodes that become the children of a wide node by repeatedly
+// opening the inner child with the largest surface area
+int bvh_collapse_children(const BVH& bvh, int index, int* children)
+{
+    int num_children = 0;
+
+    if (bvh.node_lowers[index].b)
+    {
+        // a single item, only happens at the root
+        children[num_children++] = index;
+        return num_children;
+    }
+
+    children[num_children++] = bvh.node_lowers[index].i;
+    children[num_children++] = bvh.node_uppers[index].i;
+
+    while (num_children < BVH_WIDE_WIDTH)
+    {
+        int best = -1;
+        float best_area = -1.0f;
+
+        for (int c=0; c < num_children; ++c)
+        {
+            if (bvh.node_lowers[children[c]].b)
+                continue;
+
+            const float area = bvh_node_bounds(bvh, children[c]).area();
+            if (area > best_area)
+            {
+                best = c;
+                best_area = area;
+            }
+        }
+
+        if (best < 0)
+            break;
+
+        const int opened = children[best];
+        children[best] = bvh.node_lowers[opened].i;
+        children[num_children++] = bvh.node_uppers[opened].i;
+    }
+
+    return num_children;
+}
+
+// quantizes the child bounds along one axis, returns false if they don't fit in 8 bits with this exponent
+bool bvh_quantize_axis(BVHWideNode& node, const bounds3* child_bounds, int num_children, int axis, int exponent)
+{
+    const float origin = node.origin[axis];
+    const float scale = bvh_wide_scale(exponent);
+
+    uint8_t* lowers = axis == 0 ? node.lower_x : (axis == 1 ? node.lower_y : node.lower_z);
+    uint8_t* uppers = axis == 0 ? node.upper_x : (axis == 1 ? node.upper_y : node.upper_z);
+
+    for (int c=0; c < num_children; ++c)
+    {
+        const float child_lower = child_bounds[c].lower[axis];
+        const float child_upper = child_bounds[c].upper[axis];
+
+        // round outwards, then fix up the rounding of the dequantization
+        int lower = std::max(int(floorf((child_lower - origin)/scale)), 0);
+        while (lower > 0 && bvh_wide_dequantize(origin, lower, scale) > child_lower)
+            --lower;
+
+        int upper = std::max(int(ceilf((child_upper - origin)/scale)), lower);
+        while (upper <= 255 && bvh_wide_dequantize(origin, upper, scale) < child_upper)
+            ++upper;
+
+        if (lower > 255 || upper > 255)
+            return false;
+
+        lowers[c] = uint8_t(lower);
+        uppers[c] = uint8_t(upper);
+    }
+
+    return true;
+}
+
+void bvh_quantize_children(BVHWideNode& node, const bounds3& bounds, const bounds3* child_bounds, int num_children)
+{
+    node.origin = bounds.lower;
+
+    for (int axis=0; axis < 3; ++axis)
+    {
+        // smallest power of two spacing that covers the node extent with 255 steps
+        int exponent = 0;
+        frexpf((bounds.upper[axis] - bounds.lower[axis])/255.0f, &exponent);
+        exponent = std::max(exponent, -126);
+
+        while (exponent < 127 && !bvh_quantize_axis(node, child_bounds, num_children, axis, exponent))
+            ++exponent;
+
+        node.exponent[axis] = int8_t(exponent);
+    }
+}
+
+// returns the number of levels of the wide subtree
+int bvh_collapse_recursive(const BVH& bvh, int index, std::vector<BVHWideNode>& nodes)
+{
+    const int node_index = int(nodes.size());
+    nodes.push_back(BVHWideNode());
+
+    int children[BVH_WIDE_WIDTH];
+    const int num_children = bvh_collapse_children(bvh, index, children);
+
+    bounds3 child_bounds[BVH_WIDE_WIDTH];
+    for (int c=0; c < num_children; ++c)
+        child_bounds[c] = bvh_node_bounds(bvh, children[c]);
+
+    BVHWideNode node;
+    memset(&node, 0, sizeof(BVHWideNode));
+
+    node.num_children = uint8_t(num_children);
+    bvh_quantize_children(node, bvh_node_bounds(bvh, index), child_bounds, num_children);
+
+    int depth = 0;
+    for (int c=0; c < num_children; ++c)
+    {
+        if (bvh.node_lowers[children[c]].b)
+        {
+            node.children[c] = -int(bvh.node_lowers[children[c]].i) - 1;
+        }
+        else
+        {
+            node.children[c] = int(nodes.size());
+            depth = std::max(depth, bvh_collapse_recursive(bvh, children[c], nodes));
+        }
+    }
+
+    nodes[node_index] = node;
+
+    return depth + 1;
+}
+
+bool bvh_bounds_finite(const bounds3& b)
+{
+    for (int axis=0; axis < 3; ++axis)
+    {
+        if (!std::isfinite(b.lower[axis]) || !std::isfinite(b.upper[axis]))
+            return false;
+    }
+
+    return true;
+}
+
+// requantizes the children of a wide node against the refit item bounds, the topology of
+// the wide tree is kept, returns false if any bounds of the subtree are not finite
+bool bvh_refit_wide_recursive(BVH& bvh, int index, bounds3& bounds)
+{
+    BVHWideNode& node = bvh.wide_nodes[index];
+
+    bounds3 child_bounds[BVH_WIDE_WIDTH];
+    bounds = bounds3();
+
+    for (int c=0; c < node.num_children; ++c)
+    {
+        const int child = node.children[c];
+
+        if (child < 0)
+        {
+            const int item = -child - 1;
+            child_bounds[c] = bounds3(bvh.item_lowers[item], bvh.item_uppers[item]);
+
+            if (!bvh_bounds_finite(child_bounds[c]))
+                return false;
+        }
+        else if (!bvh_refit_wide_recursive(bvh, child, child_bounds[c]))
+        {
+            return false;
+        }
+
+        bounds = bounds_union(bounds, child_bounds[c]);
+    }
+
+    bvh_quantize_children(node, bounds, child_bounds, node.num_children);
+
+    return true;
+}
+
+} // anonymous namespace
+
+bool bvh_create_wide_host(BVH& bvh)
+{
+    delete[] bvh.wide_nodes;
+    bvh.wide_nodes = NULL;
+    bvh.num_wide_nodes = 0;
+
+    if (bvh.num_items == 0)
+        return false;
+
+    // the bounds can't be quantized
+    if (!bvh_bounds_finite(bvh_node_bounds(bvh, *bvh.root)))
+        return false;
+
+    std::vector<BVHWideNode> nodes;
+    nodes.reserve(bvh.num_items/2 + 1);
+
+    const int depth = bvh_collapse_recursive(bvh, *bvh.root, nodes);
+
+    // each level pushes at most BVH_WIDE_WIDTH children after popping its node
+    if ((BVH_WIDE_WIDTH-1)*depth + 1 > BVH_QUERY_STACK_SIZE)
+        return false;
+
+    bvh.num_wide_nodes = int(nodes.size());
+    bvh.wide_nodes = new BVHWideNode[bvh.num_wide_nodes];
+    memcpy(bvh.wide_nodes, nodes.data(), sizeof(BVHWideNode)*bvh.num_wide_nodes);
+
+    return true;
+}
+
+bool bvh_refit_wide_host(BVH& bvh)
+{
+    bounds3 root_bounds;
+    if (bvh_refit_wide_recursive(bvh, 0, root_bounds))
+        return true;
+
+    // the queries fall back to the binary nodes
+    delete[] bvh.wide_nodes;
+    bvh.wide_nodes = NULL;
+    bvh.num_wide_nodes = 0;
+
+    return false;
 }
 
 
@@ -339,17 +839,34 @@ void bvh_rem_descriptor(uint64_t id)
 }
 
 
+void bvh_create_host(vec3* lowers, vec3* uppers, int num_items, int constructor_type, BVH& bvh)
+{
+    memset(&bvh, 0, sizeof(BVH));
+
+    bvh.context = NULL;
+
+    bvh.item_lowers = lowers;
+    bvh.item_uppers = uppers;
+    bvh.num_items = num_items;
+
+    TopDownBVHBuilder builder;
+    builder.build(bvh, lowers, uppers, num_items, constructor_type);
+}
+
 void bvh_destroy_host(BVH& bvh)
 {
     delete[] bvh.node_lowers;
     delete[] bvh.node_uppers;
     delete[] bvh.node_parents;
     delete[] bvh.root;
+    delete[] bvh.wide_nodes;
 
     bvh.node_lowers = NULL;
     bvh.node_uppers = NULL;
     bvh.node_parents = NULL;
     bvh.root = NULL;
+    bvh.wide_nodes = NULL;
+    bvh.num_wide_nodes = 0;
 
     bvh.max_nodes = 0;
     bvh.num_items = 0;
@@ -357,27 +874,28 @@ void bvh_destroy_host(BVH& bvh)
 
 } // namespace wp
 
-uint64_t bvh_create_host(vec3* lowers, vec3* uppers, int num_items)
+uint64_t bvh_create_host(vec3* lowers, vec3* uppers, int num_items, int constructor_type)
 {
     BVH* bvh = new BVH();
-    memset(bvh, 0, sizeof(BVH));
+    bvh_create_host(lowers, uppers, num_items, constructor_type, *bvh);
 
-    bvh->context = NULL;
+    return (uint64_t)bvh;
+}
 
-    bvh->item_lowers = lowers;
-    bvh->item_uppers = uppers;
-    bvh->num_items = num_items;
+int bvh_refit_host(uint64_t id)
+{
+    BVH* bvh = (BVH*)(id);
 
-    MedianBVHBuilder builder;
-    builder.build(*bvh, lowers, uppers, num_items);
+    const bool wide = bvh->wide_nodes != NULL;
+    bvh_refit_host(*bvh);
 
-    return (uint64_t)bvh;
+    return !wide || bvh->wide_nodes != NULL;
 }
 
-void bvh_refit_host(uint64_t id)
+int bvh_create_wide_host(uint64_t id)
 {
     BVH* bvh = (BVH*)(id);
-    bvh_refit_host(*bvh);
+    return bvh_create_wide_host(*bvh);
 }
 
 void bvh_destroy_host(uint64_t id)
@@ -391,7 +909,7 @@ void bvh_destroy_host(uint64_t id)
 // stubs for non-CUDA platforms
 #if !WP_ENABLE_CUDA
 
-uint64_t bvh_create_device(void* context, wp::vec3* lowers, wp::vec3* uppers, int num_items) { return 0; }
+uint64_t bvh_create_device(void* context, wp::vec3* lowers, wp::vec3* uppers, int num_items, int constructor_type) { return 0; }
 void bvh_refit_device(uint64_t id) {}
 void bvh_destroy_device(uint64_t id) {}
 
@@ -480,7 +480,36 @@ void bvh_refit_device(uint64_t id)
     }
 }
 
-uint64_t bvh_create_device(void* context, wp::vec3* lowers, wp::vec3* uppers, int num_items)
+// builds the tree with one of the top-down builders on the host and copies its nodes to the device
+void bvh_build_on_host(wp::BVH& bvh_device, const wp::vec3* lowers, const wp::vec3* uppers, int num_items, int constructor_type)
+{
+    std::vector<wp::vec3> host_lowers(num_items);
+    std::vector<wp::vec3> host_uppers(num_items);
+
+    memcpy_d2h(WP_CURRENT_CONTEXT, host_lowers.data(), (void*)lowers, sizeof(wp::vec3)*num_items);
+    memcpy_d2h(WP_CURRENT_CONTEXT, host_uppers.data(), (void*)uppers, sizeof(wp::vec3)*num_items);
+    cuda_stream_synchronize(WP_CURRENT_CONTEXT, cuda_stream_get_current());
+
+    wp::BVH bvh_host;
+    wp::bvh_create_host(host_lowers.data(), host_uppers.data(), num_items, constructor_type, bvh_host);
+
+    const int num_nodes = bvh_host.num_nodes;
+
+    memcpy_h2d(WP_CURRENT_CONTEXT, bvh_device.node_lowers, bvh_host.node_lowers, sizeof(wp::BVHPackedNodeHalf)*num_nodes);
+    memcpy_h2d(WP_CURRENT_CONTEXT, bvh_device.node_uppers, bvh_host.node_uppers, sizeof(wp::BVHPackedNodeHalf)*num_nodes);
+    memcpy_h2d(WP_CURRENT_CONTEXT, bvh_device.node_parents, bvh_host.node_parents, sizeof(int)*num_nodes);
+    memcpy_h2d(WP_CURRENT_CONTEXT, bvh_device.root, bvh_host.root, sizeof(int));
+
+    // the host nodes must stay alive until the copies are done
+    cuda_stream_synchronize(WP_CURRENT_CONTEXT, cuda_stream_get_current());
+
+    bvh_device.max_depth = bvh_host.max_depth;
+    bvh_device.num_nodes = num_nodes;
+
+    wp::bvh_destroy_host(bvh_host);
+}
+
+uint64_t bvh_create_device(void* context, wp::vec3* lowers, wp::vec3* uppers, int num_items, int constructor_type)
 {
     ContextGuard guard(context);
 
@@ -494,11 +523,20 @@ uint64_t bvh_create_device(void* context, wp::vec3* lowers, wp::vec3* uppers, in
     bvh_host.root = (int*)alloc_device(WP_CURRENT_CONTEXT, sizeof(int));
     bvh_host.item_lowers = lowers;
     bvh_host.item_uppers = uppers;
+    bvh_host.wide_nodes = NULL;
+    bvh_host.num_wide_nodes = 0;
 
     bvh_host.context = context ? context : cuda_context_get_current();
 
-    wp::LinearBVHBuilderGPU builder;
-    builder.build(bvh_host, lowers, uppers, num_items, NULL);
+    if (constructor_type == wp::BVH_CONSTRUCTOR_LBVH)
+    {
+        wp::LinearBVHBuilderGPU builder;
+        builder.build(bvh_host, lowers, uppers, num_items, NULL);
+    }
+    else
+    {
+        bvh_build_on_host(bvh_host, lowers, uppers, num_items, constructor_type);
+    }
 
     // create device-side BVH descriptor
     wp::BVH* bvh_device = (wp::BVH*)alloc_device(WP_CURRENT_CONTEXT, sizeof(wp::BVH));
@@ -103,6 +103,14 @@ CUDA_CALLABLE inline bounds3 bounds_intersection(const bounds3& a, const bounds3
 	return bounds3(max(a.lower, b.lower), min(a.upper, b.upper));
 }
 
+// algorithms used to build a BVH, see the constructor argument of wp.Bvh and wp.Mesh
+enum BVHConstructorType
+{
+	BVH_CONSTRUCTOR_SAH = 0,
+	BVH_CONSTRUCTOR_MEDIAN = 1,
+	BVH_CONSTRUCTOR_LBVH = 2
+};
+
 struct BVHPackedNodeHalf
 {
 	float x;
@@ -112,6 +120,40 @@ struct BVHPackedNodeHalf
 	unsigned int b : 1;
 };
 
+// number of children of the nodes of a wide BVH, matches the SSE and NEON vector width
+#define BVH_WIDE_WIDTH 4
+
+// size of the query traversal stacks, a wide BVH can push BVH_WIDE_WIDTH-1 more entries per level
+// than it pops and is only traversed by CPU queries
+#if defined(__CUDA_ARCH__)
+#define BVH_QUERY_STACK_SIZE 32
+#else
+#define BVH_QUERY_STACK_SIZE 96
+#endif
+
+// node of a wide BVH, the child bounds are quantized to 8 bits per axis on a grid with a
+// power of two spacing anchored at the lower bound of the node, rounding outwards so that
+// the quantized bounds always contain the children
+struct BVHWideNode
+{
+	vec3 origin;
+
+	// the grid spacing along each axis is 2^exponent
+	int8_t exponent[3];
+	uint8_t num_children;
+
+	// quantized bounds stored per axis so that all children are tested together
+	uint8_t lower_x[BVH_WIDE_WIDTH];
+	uint8_t lower_y[BVH_WIDE_WIDTH];
+	uint8_t lower_z[BVH_WIDE_WIDTH];
+	uint8_t upper_x[BVH_WIDE_WIDTH];
+	uint8_t upper_y[BVH_WIDE_WIDTH];
+	uint8_t upper_z[BVH_WIDE_WIDTH];
+
+	// index of a wide node, or -(item+1) for a leaf
+	int children[BVH_WIDE_WIDTH];
+};
+
 struct BVH
 {		
     BVHPackedNodeHalf* node_lowers;
@@ -135,6 +177,10 @@ struct BVH
 	vec3* item_uppers;
 	int num_items;
 
+	// optional wide BVH collapsed from the binary nodes for CPU queries, the root is the first node
+	BVHWideNode* wide_nodes;
+	int num_wide_nodes;
+
 	// cuda context
 	void* context;
 };
@@ -218,7 +264,7 @@ struct bvh_query_t
     BVH bvh;
 
 	// BVH traversal stack:
-	int stack[32];
+	int stack[BVH_QUERY_STACK_SIZE];
 	int count;
 
     // inputs
@@ -230,6 +276,202 @@ struct bvh_query_t
 };
 
 
+#if !defined(__CUDA_ARCH__)
+
+// 2^exponent for exponents in [-126, 127], built from its bits since kernels don't link ldexpf()
+inline float bvh_wide_scale(int exponent)
+{
+	union
+	{
+		uint32_t i;
+		float f;
+	} scale;
+
+	scale.i = uint32_t(exponent + 127) << 23;
+	return scale.f;
+}
+
+// the product is exact so the result is the same with or without fused multiply-adds
+inline float bvh_wide_dequantize(float origin, int q, float scale)
+{
+	return origin + float(q)*scale;
+}
+
+// conservative bounds of the children of a wide node
+inline void bvh_wide_child_bounds(const BVHWideNode& node, vec3* lowers, vec3* uppers)
+{
+	const float scale_x = bvh_wide_scale(node.exponent[0]);
+	const float scale_y = bvh_wide_scale(node.exponent[1]);
+	const float scale_z = bvh_wide_scale(node.exponent[2]);
+
+	for (int c=0; c < BVH_WIDE_WIDTH; ++c)
+	{
+		lowers[c] = vec3(bvh_wide_dequantize(node.origin[0], node.lower_x[c], scale_x),
+						 bvh_wide_dequantize(node.origin[1], node.lower_y[c], scale_y),
+						 bvh_wide_dequantize(node.origin[2], node.lower_z[c], scale_z));
+
+		uppers[c] = vec3(bvh_wide_dequantize(node.origin[0], node.upper_x[c], scale_x),
+						 bvh_wide_dequantize(node.origin[1], node.upper_y[c], scale_y),
+						 bvh_wide_dequantize(node.origin[2], node.upper_z[c], scale_z));
+	}
+}
+
+// bounds of the whole tree, the wide root is not quantized against a parent
+inline bounds3 bvh_root_bounds(const BVH& bvh)
+{
+	const BVHPackedNodeHalf& lower = bvh.node_lowers[*bvh.root];
+	const BVHPackedNodeHalf& upper = bvh.node_uppers[*bvh.root];
+
+	return bounds3(vec3(lower.x, lower.y, lower.z), vec3(upper.x, upper.y, upper.z));
+}
+
+// depth-first traversal of the wide BVH that visits the children of each node in increasing order of
+// node_key(lower, upper), only nodes with a key strictly less than max_key are visited and visit_leaf(item)
+// may decrease max_key to cull the rest of the traversal
+template <typename KeyFunc, typename LeafFunc>
+inline void bvh_wide_traverse_ordered(const BVH& bvh, const float& max_key, KeyFunc node_key, LeafFunc visit_leaf)
+{
+	struct Entry
+	{
+		int child;
+		float key;
+	};
+
+	Entry stack[BVH_QUERY_STACK_SIZE];
+	int count = 0;
+
+	const bounds3 root_bounds = bvh_root_bounds(bvh);
+	stack[count++] = {0, node_key(root_bounds.lower, root_bounds.upper)};
+
+	while (count)
+	{
+		const Entry entry = stack[--count];
+
+		// max_key may have decreased since the entry was pushed
+		if (!(entry.key < max_key))
+			continue;
+
+		if (entry.child < 0)
+		{
+			visit_leaf(-entry.child - 1);
+			continue;
+		}
+
+		const BVHWideNode& node = bvh.wide_nodes[entry.child];
+
+		vec3 lowers[BVH_WIDE_WIDTH];
+		vec3 uppers[BVH_WIDE_WIDTH];
+		bvh_wide_child_bounds(node, lowers, uppers);
+
+		// insertion sort of the children in decreasing key order so that the nearest is popped first
+		Entry children[BVH_WIDE_WIDTH];
+		int num_children = 0;
+
+		for (int c=0; c < node.num_children; ++c)
+		{
+			const float key = node_key(lowers[c], uppers[c]);
+			if (!(key < max_key))
+				continue;
+
+			int i = num_children++;
+			while (i > 0 && children[i-1].key < key)
+			{
+				children[i] = children[i-1];
+				--i;
+			}
+			children[i] = {node.children[c], key};
+		}
+
+		for (int i=0; i < num_children; ++i)
+			stack[count++] = children[i];
+	}
+}
+
+// pushes the children of a wide node that overlap the query box, or intersect the query ray, onto the stack
+inline void bvh_wide_push_children(const BVHWideNode& node, bool is_ray, const vec3& input_lower, const vec3& input_upper, int* stack, int& count)
+{
+	vec3 lowers[BVH_WIDE_WIDTH];
+	vec3 uppers[BVH_WIDE_WIDTH];
+	bvh_wide_child_bounds(node, lowers, uppers);
+
+	const bounds3 input_bounds(input_lower, input_upper);
+
+	for (int c=0; c < node.num_children; ++c)
+	{
+		bool hit;
+		if (is_ray)
+		{
+			float t = 0.0f;
+			hit = intersect_ray_aabb(input_lower, input_upper, lowers[c], uppers[c], t);
+		}
+		else
+		{
+			hit = input_bounds.overlaps(bounds3(lowers[c], uppers[c]));
+		}
+
+		if (hit)
+			stack[count++] = node.children[c];
+	}
+}
+
+// pushes the wide root onto the stack if the query box overlaps the tree, or the query ray intersects it
+inline void bvh_wide_push_root(const BVH& bvh, bool is_ray, const vec3& input_lower, const vec3& input_upper, int* stack, int& count)
+{
+	const bounds3 root_bounds = bvh_root_bounds(bvh);
+
+	bool hit;
+	if (is_ray)
+	{
+		float t = 0.0f;
+		hit = intersect_ray_aabb(input_lower, input_upper, root_bounds.lower, root_bounds.upper, t);
+	}
+	else
+	{
+		hit = bounds3(input_lower, input_upper).overlaps(root_bounds);
+	}
+
+	if (hit)
+		stack[count++] = 0;
+}
+
+// returns the next item of a query on a wide BVH, leaves are pushed as -(item+1)
+inline bool bvh_wide_query_next(const BVH& bvh, bool is_ray, const vec3& input_lower, const vec3& input_upper, int* stack, int& count, int& index)
+{
+	while (count)
+	{
+		const int child = stack[--count];
+
+		if (child < 0)
+		{
+			const int item = -child - 1;
+
+			// the quantized bounds are conservative, test the exact item bounds like the binary leaves
+			bool hit;
+			if (is_ray)
+			{
+				float t = 0.0f;
+				hit = intersect_ray_aabb(input_lower, input_upper, bvh.item_lowers[item], bvh.item_uppers[item], t);
+			}
+			else
+			{
+				hit = bounds3(input_lower, input_upper).overlaps(bounds3(bvh.item_lowers[item], bvh.item_uppers[item]));
+			}
+
+			if (!hit)
+				continue;
+
+			index = item;
+			return true;
+		}
+
+		bvh_wide_push_children(bvh.wide_nodes[child], is_ray, input_lower, input_upper, stack, count);
+	}
+
+	return false;
+}
+
+#endif // !__CUDA_ARCH__
+
 CUDA_CALLABLE inline bvh_query_t bvh_query(
     uint64_t id, bool is_ray, const vec3& lower, const vec3& upper)
 {
@@ -252,6 +494,16 @@ CUDA_CALLABLE inline bvh_query_t bvh_query(
     query.input_lower = lower;
     query.input_upper = upper;
 
+#if !defined(__CUDA_ARCH__)
+	if (bvh.wide_nodes)
+	{
+		// the leaves are found by bvh_query_next()
+		query.count = 0;
+		bvh_wide_push_root(bvh, is_ray, lower, upper, query.stack, query.count);
+		return query;
+	}
+#endif
+
     wp::bounds3 input_bounds(query.input_lower, query.input_upper);
 
     // Navigate through the bvh, find the first overlapping leaf node.
@@ -330,6 +582,17 @@ CUDA_CALLABLE inline void adj_bvh_query_ray(uint64_t id, const vec3& start, cons
 CUDA_CALLABLE inline bool bvh_query_next(bvh_query_t& query, int& index)
 {
     BVH bvh = query.bvh;
+
+#if !defined(__CUDA_ARCH__)
+	if (bvh.wide_nodes)
+	{
+		if (!bvh_wide_query_next(bvh, query.is_ray, query.input_lower, query.input_upper, query.stack, query.count, query.bounds_nr))
+			return false;
+
+		index = query.bounds_nr;
+		return true;
+	}
+#endif
 	
 	wp::bounds3 input_bounds(query.input_lower, query.input_upper);
 
@@ -408,9 +671,20 @@ CUDA_CALLABLE void bvh_rem_descriptor(uint64_t id);
 
 #if !__CUDA_ARCH__
 
+// builds the BVH of items that live in host memory, the nodes are allocated on the host
+void bvh_create_host(vec3* lowers, vec3* uppers, int num_items, int constructor_type, wp::BVH& bvh);
 void bvh_destroy_host(wp::BVH& bvh);
 void bvh_refit_host(wp::BVH& bvh);
 
+// collapses the binary nodes of a host BVH into a wide BVH used by the CPU queries, returns false
+// if the tree is too deep for the query stacks or its bounds are not finite, the wide nodes are
+// stored next to the binary nodes which still provide the root bounds and the device copies
+bool bvh_create_wide_host(wp::BVH& bvh);
+
+// requantizes the wide nodes in place after the item bounds changed, the wide nodes are released
+// and false is returned if the bounds are no longer finite
+bool bvh_refit_wide_host(wp::BVH& bvh);
+
 void bvh_destroy_device(wp::BVH& bvh);
 void bvh_refit_device(uint64_t id);
 
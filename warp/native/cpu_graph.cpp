@@ -0,0 +1,333 @@
+/** Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+ * NVIDIA CORPORATION and its licensors retain all intellectual property
+ * and proprietary rights in and to this software, related documentation
+ * and any modifications thereto.  Any use, reproduction, disclosure or
+ * distribution of this software and related documentation without an express
+ * license agreement from NVIDIA CORPORATION is strictly prohibited.
+ */
+
+#include "warp.h"
+#include "builtin.h"
+#include "thread_pool.h"
+
+#include <climits>
+#include <cstdio>
+#include <vector>
+
+namespace
+{
+
+enum CpuGraphNodeType
+{
+    CPU_GRAPH_LAUNCH,
+    CPU_GRAPH_MEMCPY,
+    CPU_GRAPH_MEMSET,
+    CPU_GRAPH_MEMTILE,
+    CPU_GRAPH_ARRAY_COPY,
+    CPU_GRAPH_ARRAY_FILL,
+};
+
+struct CpuGraphNode
+{
+    CpuGraphNodeType type;
+
+    // kernel launches
+    void (*kernel)(void** args, size_t task_begin, size_t task_end);
+    void** args;
+    size_t dim;
+    int max_threads;
+    size_t tile_size;
+
+    // memory operations, dst and src are raw pointers or array descriptors for the array_* commands
+    void* dst;
+    void* src;
+    size_t n;
+    int value;
+    int dst_type;
+    int src_type;
+    int elem_size;
+
+    // fill values are copied at record time, the caller's buffer is usually a temporary
+    std::vector<char> fill_value;
+
+    // stage in which the node runs, one more than the latest stage of its dependencies
+    int stage;
+};
+
+// a unit of work when several nodes of a stage are executed concurrently
+struct CpuGraphTask
+{
+    const CpuGraphNode* node;
+    size_t begin;
+    size_t end;
+};
+
+struct CpuGraph
+{
+    std::vector<CpuGraphNode> nodes;
+
+    // node indices for each stage, nodes within a stage have no dependencies on each other
+    std::vector<std::vector<int>> stages;
+
+    // flattened work of the stages that contain several nodes, built lazily on the first launch
+    std::vector<std::vector<CpuGraphTask>> stage_tasks;
+    std::vector<int> stage_threads;
+    bool tasks_valid = false;
+};
+
+// number of threads of a launch node, read from the counter of indirect launches at each replay
+size_t launch_size(const CpuGraphNode& node)
+{
+    const wp::launch_bounds_t* bounds = static_cast<const wp::launch_bounds_t*>(node.args[0]);
+    if (!bounds->size_from)
+        return node.dim;
+
+    return wp::launch_size(*bounds);
+}
+
+void kernel_task(void* context, size_t begin, size_t end)
+{
+    const CpuGraphNode* node = static_cast<const CpuGraphNode*>(context);
+    node->kernel(node->args, begin, end);
+}
+
+// runs the range [begin, end) of a node on the calling thread
+void execute_node_range(const CpuGraphNode& node, size_t begin, size_t end)
+{
+    switch (node.type)
+    {
+    case CPU_GRAPH_LAUNCH:
+    {
+        // tasks are split from the maximum launch size, indirect launches skip the threads past their counter
+        const size_t size = launch_size(node);
+        if (end > size)
+            end = size;
+        if (begin < end)
+            node.kernel(node.args, begin, end);
+        break;
+    }
+    case CPU_GRAPH_MEMCPY:
+        memcpy_h2h(node.dst, node.src, node.n);
+        break;
+    case CPU_GRAPH_MEMSET:
+        memset_host(node.dst, node.value, node.n);
+        break;
+    case CPU_GRAPH_MEMTILE:
+        memtile_host(node.dst, node.fill_value.data(), node.fill_value.size(), node.n);
+        break;
+    case CPU_GRAPH_ARRAY_COPY:
+        array_copy_host(node.dst, node.src, node.dst_type, node.src_type, node.elem_size);
+        break;
+    case CPU_GRAPH_ARRAY_FILL:
+        array_fill_host(node.dst, node.dst_type, node.fill_value.data(), int(node.fill_value.size()));
+        break;
+    }
+}
+
+// runs a node that is alone in its stage, kernels use the whole thread pool
+void execute_node(const CpuGraphNode& node)
+{
+    if (node.type == CPU_GRAPH_LAUNCH)
+        wp::cpu_parallel_for(launch_size(node), kernel_task, const_cast<CpuGraphNode*>(&node), node.max_threads, node.tile_size);
+    else
+        execute_node_range(node, 0, 0);
+}
+
+void stage_task(void* context, size_t begin, size_t end)
+{
+    const CpuGraphTask* tasks = static_cast<const CpuGraphTask*>(context);
+
+    for (size_t i = begin; i < end; ++i)
+        execute_node_range(*tasks[i].node, tasks[i].begin, tasks[i].end);
+}
+
+// splits the nodes of each stage into tasks that are claimed by the pool threads one at a time,
+// so that independent kernels run concurrently while each of them is still tiled across threads
+void build_stage_tasks(CpuGraph& graph)
+{
+    const size_t num_stages = graph.stages.size();
+
+    graph.stage_tasks.assign(num_stages, std::vector<CpuGraphTask>());
+    graph.stage_threads.assign(num_stages, 0);
+
+    for (size_t s = 0; s < num_stages; ++s)
+    {
+        const std::vector<int>& stage = graph.stages[s];
+        if (stage.size() < 2)
+            continue;
+
+        std::vector<CpuGraphTask>& tasks = graph.stage_tasks[s];
+        int stage_threads = 1;
+
+        for (int index : stage)
+        {
+            const CpuGraphNode& node = graph.nodes[index];
+
+            if (node.type != CPU_GRAPH_LAUNCH)
+            {
+                tasks.push_back({&node, 0, 0});
+                continue;
+            }
+
+            const int threads = node.max_threads > 0 ? node.max_threads : wp::cpu_default_thread_count();
+            if (threads > stage_threads)
+                stage_threads = threads;
+
+            // a launch limited to one thread stays in one piece
+            size_t tile_size = node.tile_size;
+            if (threads == 1)
+                tile_size = node.dim;
+            else if (tile_size == 0)
+                tile_size = wp::cpu_auto_tile_size(node.dim, threads);
+
+            for (size_t begin = 0; begin < node.dim; begin += tile_size)
+            {
+                const size_t end = (begin + tile_size < node.dim) ? begin + tile_size : node.dim;
+                tasks.push_back({&node, begin, end});
+            }
+        }
+
+        graph.stage_threads[s] = stage_threads;
+    }
+
+    graph.tasks_valid = true;
+}
+
+int add_node(void* graph_ptr, CpuGraphNode& node, const int* deps, int num_deps)
+{
+    CpuGraph* graph = static_cast<CpuGraph*>(graph_ptr);
+
+    node.stage = 0;
+    for (int i = 0; i < num_deps; ++i)
+    {
+        const int dep_stage = graph->nodes[deps[i]].stage;
+        if (dep_stage + 1 > node.stage)
+            node.stage = dep_stage + 1;
+    }
+
+    const int index = int(graph->nodes.size());
+
+    if (node.stage >= int(graph->stages.size()))
+        graph->stages.resize(node.stage + 1);
+
+    graph->stages[node.stage].push_back(index);
+    graph->nodes.push_back(node);
+    graph->tasks_valid = false;
+
+    return index;
+}
+
+CpuGraphNode make_node(CpuGraphNodeType type)
+{
+    CpuGraphNode node = {};
+    node.type = type;
+    return node;
+}
+
+} // anonymous namespace
+
+
+void* cpu_graph_create()
+{
+    return new CpuGraph();
+}
+
+void cpu_graph_destroy(void* graph)
+{
+    delete static_cast<CpuGraph*>(graph);
+}
+
+int cpu_graph_add_launch(void* graph, void* kernel, size_t dim, int max_threads, size_t tile_size, void** args, const int* deps, int num_deps)
+{
+    if (dim > size_t(INT_MAX) + 1)
+        printf("Warp warning: launch of %zu threads, 1-D tid() is returning overflowed ints\n", dim);
+
+    CpuGraphNode node = make_node(CPU_GRAPH_LAUNCH);
+    node.kernel = reinterpret_cast<void (*)(void**, size_t, size_t)>(kernel);
+    node.args = args;
+    node.dim = dim;
+    node.max_threads = max_threads;
+    node.tile_size = tile_size;
+
+    return add_node(graph, node, deps, num_deps);
+}
+
+int cpu_graph_add_memcpy(void* graph, void* dest, void* src, size_t n, const int* deps, int num_deps)
+{
+    CpuGraphNode node = make_node(CPU_GRAPH_MEMCPY);
+    node.dst = dest;
+    node.src = src;
+    node.n = n;
+
+    return add_node(graph, node, deps, num_deps);
+}
+
+int cpu_graph_add_memset(void* graph, void* dest, int value, size_t n, const int* deps, int num_deps)
+{
+    CpuGraphNode node = make_node(CPU_GRAPH_MEMSET);
+    node.dst = dest;
+    node.value = value;
+    node.n = n;
+
+    return add_node(graph, node, deps, num_deps);
+}
+
+int cpu_graph_add_memtile(void* graph, void* dest, const void* src, size_t srcsize, size_t n, const int* deps, int num_deps)
+{
+    CpuGraphNode node = make_node(CPU_GRAPH_MEMTILE);
+    node.dst = dest;
+    node.n = n;
+    node.fill_value.assign(static_cast<const char*>(src), static_cast<const char*>(src) + srcsize);
+
+    return add_node(graph, node, deps, num_deps);
+}
+
+int cpu_graph_add_array_copy(void* graph, void* dst, void* src, int dst_type, int src_type, int elem_size, const int* deps, int num_deps)
+{
+    CpuGraphNode node = make_node(CPU_GRAPH_ARRAY_COPY);
+    node.dst = dst;
+    node.src = src;
+    node.dst_type = dst_type;
+    node.src_type = src_type;
+    node.elem_size = elem_size;
+
+    return add_node(graph, node, deps, num_deps);
+}
+
+int cpu_graph_add_array_fill(void* graph, void* arr, int arr_type, const void* value, int value_size, const int* deps, int num_deps)
+{
+    CpuGraphNode node = make_node(CPU_GRAPH_ARRAY_FILL);
+    node.dst = arr;
+    node.dst_type = arr_type;
+    node.fill_value.assign(static_cast<const char*>(value), static_cast<const char*>(value) + value_size);
+
+    return add_node(graph, node, deps, num_deps);
+}
+
+int cpu_graph_get_stage_count(void* graph)
+{
+    return int(static_cast<CpuGraph*>(graph)->stages.size());
+}
+
+void cpu_graph_launch(void* graph_ptr)
+{
+    CpuGraph& graph = *static_cast<CpuGraph*>(graph_ptr);
+
+    if (!graph.tasks_valid)
+        build_stage_tasks(graph);
+
+    for (size_t s = 0; s < graph.stages.size(); ++s)
+    {
+        const std::vector<int>& stage = graph.stages[s];
+
+        if (stage.size() == 1)
+        {
+            execute_node(graph.nodes[stage[0]]);
+        }
+        else
+        {
+            std::vector<CpuGraphTask>& tasks = graph.stage_tasks[s];
+            wp::cpu_parallel_for(tasks.size(), stage_task, tasks.data(), graph.stage_threads[s], 1);
+        }
+    }
+}
@@ -0,0 +1,278 @@
+/** Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+ * NVIDIA CORPORATION and its licensors retain all intellectual property
+ * and proprietary rights in and to this software, related documentation
+ * and any modifications thereto.  Any use, reproduction, disclosure or
+ * distribution of this software and related documentation without an express
+ * license agreement from NVIDIA CORPORATION is strictly prohibited.
+ */
+
+#include "warp.h"
+#include "builtin.h"
+#include "thread_pool.h"
+
+#include <algorithm>
+#include <cstring>
+#include <vector>
+
+// blocked host GEMM computing D = alpha * (A @ B) + beta * C for each matrix of a batch, with the same
+// memory layouts as cutlass_gemm(): A is m-by-k, B is k-by-n, C and D are row-major m-by-n
+//  - D is divided into tiles that are computed in parallel, the tiles do not depend on the number of
+//    threads so that results are reproducible
+//  - for each tile, panels of A and B are packed into contiguous buffers in the compute type (float for
+//    float16 and float32, double for float64), which also handles column-major inputs and half conversions
+//  - each tile of D is written once from its accumulated product and the same tile of C, so D may alias C
+
+namespace
+{
+
+// tile of D computed by a task
+const int GEMM_TILE_M = 64;
+const int GEMM_TILE_N = 64;
+
+// depth of the packed A and B panels
+const int GEMM_TILE_K = 256;
+
+// block of the tile accumulated in registers by the inner kernel
+const int GEMM_ROWS = 4;
+const int GEMM_COLS = 8;
+
+// below this number of multiply-adds the product is computed by the calling thread only
+const double GEMM_SERIAL_FLOPS = 32768.0;
+
+template <typename T> struct gemm_compute_type { typedef float type; };
+template <> struct gemm_compute_type<double> { typedef double type; };
+
+template <typename T>
+struct GemmArgs
+{
+    typedef typename gemm_compute_type<T>::type S;
+
+    int m, n, k;
+    const T* a;
+    const T* b;
+    const T* c;
+    T* d;
+    S alpha;
+    S beta;
+    bool row_major_a;
+    bool row_major_b;
+};
+
+// accumulates the product of GEMM_ROWS rows of the A panel and GEMM_COLS columns of the B panel into dst
+template <typename S>
+void gemm_block(const S* __restrict a_block, const S* __restrict b_block, S* __restrict dst, int depth, int stride)
+{
+    S sum[GEMM_ROWS][GEMM_COLS] = {};
+
+    for (int p=0; p < depth; ++p)
+    {
+        for (int r=0; r < GEMM_ROWS; ++r)
+        {
+            const S x = a_block[p * GEMM_ROWS + r];
+            for (int c=0; c < GEMM_COLS; ++c)
+                sum[r][c] += x * b_block[p * GEMM_COLS + c];
+        }
+    }
+
+    for (int r=0; r < GEMM_ROWS; ++r)
+    {
+        for (int c=0; c < GEMM_COLS; ++c)
+            dst[r * stride + c] += sum[r][c];
+    }
+}
+
+template <typename T>
+void gemm_tile(const GemmArgs<T>& args, int batch, int row_begin, int col_begin, std::vector<typename gemm_compute_type<T>::type>& buffer)
+{
+    typedef typename gemm_compute_type<T>::type S;
+
+    const int m = args.m;
+    const int n = args.n;
+    const int k = args.k;
+
+    const int rows = std::min(GEMM_TILE_M, m - row_begin);
+    const int cols = std::min(GEMM_TILE_N, n - col_begin);
+
+    // the tile is padded to a multiple of the inner kernel block
+    const int padded_rows = (rows + GEMM_ROWS - 1) / GEMM_ROWS * GEMM_ROWS;
+    const int padded_cols = (cols + GEMM_COLS - 1) / GEMM_COLS * GEMM_COLS;
+
+    buffer.resize(size_t(GEMM_TILE_M) * GEMM_TILE_K + size_t(GEMM_TILE_K) * GEMM_TILE_N + size_t(GEMM_TILE_M) * GEMM_TILE_N);
+
+    S* a_panel = buffer.data();
+    S* b_panel = a_panel + GEMM_TILE_M * GEMM_TILE_K;
+    S* acc = b_panel + GEMM_TILE_K * GEMM_TILE_N;
+
+    std::fill(acc, acc + padded_rows * padded_cols, S(0));
+
+    const T* a = args.a + size_t(batch) * m * k;
+    const T* b = args.b + size_t(batch) * k * n;
+
+    if (args.alpha != S(0))
+    {
+        for (int depth_begin=0; depth_begin < k; depth_begin += GEMM_TILE_K)
+        {
+            const int depth = std::min(GEMM_TILE_K, k - depth_begin);
+
+            // A panel, groups of GEMM_ROWS rows interleaved along the depth, padding rows are zero
+            for (int i=0; i < padded_rows; ++i)
+            {
+                S* dst = a_panel + (i / GEMM_ROWS) * GEMM_ROWS * depth + i % GEMM_ROWS;
+
+                if (i >= rows)
+                {
+                    for (int p=0; p < depth; ++p)
+                        dst[p * GEMM_ROWS] = S(0);
+                }
+                else if (args.row_major_a)
+                {
+                    const T* src = a + size_t(row_begin + i) * k + depth_begin;
+                    for (int p=0; p < depth; ++p)
+                        dst[p * GEMM_ROWS] = S(src[p]);
+                }
+                else
+                {
+                    const T* src = a + size_t(depth_begin) * m + row_begin + i;
+                    for (int p=0; p < depth; ++p)
+                        dst[p * GEMM_ROWS] = S(src[size_t(p) * m]);
+                }
+            }
+
+            // B panel, groups of GEMM_COLS columns interleaved along the depth, padding columns are zero
+            for (int j=0; j < padded_cols; ++j)
+            {
+                S* dst = b_panel + (j / GEMM_COLS) * GEMM_COLS * depth + j % GEMM_COLS;
+
+                if (j >= cols)
+                {
+                    for (int p=0; p < depth; ++p)
+                        dst[p * GEMM_COLS] = S(0);
+                }
+                else if (args.row_major_b)
+                {
+                    const T* src = b + size_t(depth_begin) * n + col_begin + j;
+                    for (int p=0; p < depth; ++p)
+                        dst[p * GEMM_COLS] = S(src[size_t(p) * n]);
+                }
+                else
+                {
+                    const T* src = b + size_t(col_begin + j) * k + depth_begin;
+                    for (int p=0; p < depth; ++p)
+                        dst[p * GEMM_COLS] = S(src[p]);
+                }
+            }
+
+            // GEMM_ROWS x GEMM_COLS blocks of the tile are accumulated in registers
+            for (int i=0; i < padded_rows; i += GEMM_ROWS)
+            {
+                const S* a_block = a_panel + i * depth;
+
+                for (int j=0; j < padded_cols; j += GEMM_COLS)
+                {
+                    const S* b_block = b_panel + j * depth;
+
+                    gemm_block(a_block, b_block, acc + i * padded_cols + j, depth, padded_cols);
+                }
+            }
+        }
+    }
+
+    // D = alpha * acc + beta * C, C is not read when beta is zero as it may be uninitialized
+    const S alpha = args.alpha;
+    const S beta = args.beta;
+
+    for (int i=0; i < rows; ++i)
+    {
+        const size_t offset = size_t(batch) * m * n + size_t(row_begin + i) * n + col_begin;
+        const S* src = acc + i * padded_cols;
+        T* dst = args.d + offset;
+
+        if (beta != S(0))
+        {
+            const T* c = args.c + offset;
+            for (int j=0; j < cols; ++j)
+                dst[j] = T(alpha * src[j] + beta * S(c[j]));
+        }
+        else
+        {
+            for (int j=0; j < cols; ++j)
+                dst[j] = T(alpha * src[j]);
+        }
+    }
+}
+
+template <typename T>
+void gemm_batched(const GemmArgs<T>& args, int batch_count)
+{
+    typedef typename gemm_compute_type<T>::type S;
+
+    const int tiles_m = (args.m + GEMM_TILE_M - 1) / GEMM_TILE_M;
+    const int tiles_n = (args.n + GEMM_TILE_N - 1) / GEMM_TILE_N;
+    const size_t num_tiles = size_t(batch_count) * tiles_m * tiles_n;
+
+    const double flops = double(batch_count) * args.m * args.n * args.k;
+    const int max_threads = flops < GEMM_SERIAL_FLOPS ? 1 : 0;
+
+    wp::parallel_for(num_tiles, [&](size_t begin, size_t end)
+    {
+        std::vector<S> buffer;
+
+        for (size_t tile=begin; tile < end; ++tile)
+        {
+            const int batch = int(tile / (size_t(tiles_m) * tiles_n));
+            const int tile_m = int(tile / tiles_n % tiles_m);
+            const int tile_n = int(tile % tiles_n);
+
+            gemm_tile(args, batch, tile_m * GEMM_TILE_M, tile_n * GEMM_TILE_N, buffer);
+        }
+    }, max_threads, 1);
+}
+
+template <typename T>
+bool gemm_host_typed(int m, int n, int k, const void* a, const void* b, const void* c, void* d, double alpha, double beta, bool row_major_a, bool row_major_b, int batch_count)
+{
+    typedef typename gemm_compute_type<T>::type S;
+
+    GemmArgs<T> args;
+    args.m = m;
+    args.n = n;
+    args.k = k;
+    args.a = static_cast<const T*>(a);
+    args.b = static_cast<const T*>(b);
+    args.c = static_cast<const T*>(c);
+    args.d = static_cast<T*>(d);
+    // the scale factors are only rounded to float for the float32 and float16 compute type
+    args.alpha = S(alpha);
+    args.beta = S(beta);
+    args.row_major_a = row_major_a;
+    args.row_major_b = row_major_b;
+
+    gemm_batched(args, batch_count);
+
+    return true;
+}
+
+} // anonymous namespace
+
+
+bool gemm_host(int m, int n, int k, const char* datatype_str,
+               const void* a, const void* b, const void* c, void* d,
+               double alpha, double beta,
+               bool row_major_a, bool row_major_b,
+               int batch_count)
+{
+    if (m < 0 || n < 0 || k < 0 || batch_count < 0)
+        return false;
+
+    if (m == 0 || n == 0 || batch_count == 0)
+        return true;
+
+    if (strcmp(datatype_str, "<f8") == 0)
+        return gemm_host_typed<double>(m, n, k, a, b, c, d, alpha, beta, row_major_a, row_major_b, batch_count);
+    else if (strcmp(datatype_str, "<f4") == 0)
+        return gemm_host_typed<float>(m, n, k, a, b, c, d, alpha, beta, row_major_a, row_major_b, batch_count);
+    else if (strcmp(datatype_str, "<f2") == 0)
+        return gemm_host_typed<wp::half>(m, n, k, a, b, c, d, alpha, beta, row_major_a, row_major_b, batch_count);
+
+    return false;
+}
@@ -11,10 +11,17 @@
 #include "hashgrid.h"
 #include "sort.h"
 #include "string.h"
+#include "thread_pool.h"
 
 using namespace wp;
 
+#include <algorithm>
 #include <map>
+#include <vector>
+
+#if defined(_MSC_VER)
+#include <intrin.h>
+#endif
 
 namespace 
 {
@@ -55,7 +62,77 @@ void hash_grid_rebuild_device(const HashGrid& grid, const wp::vec3* points, int
 
 
 // host methods
-uint64_t hash_grid_create_host(int dim_x, int dim_y, int dim_z)
+namespace
+{
+    // smallest sparse cell table, allocated on creation so that queries on an empty grid find no cells
+    const int HASH_GRID_MIN_CELL_SLOTS = 16;
+
+    // number of elements processed serially by a task
+    const int HASH_GRID_BLOCK_SIZE = 16384;
+
+    // atomically claims an empty (-1) slot of the sparse cell table
+    inline bool hash_grid_claim_slot(int* key, int cell)
+    {
+#if defined(_MSC_VER)
+        return _InterlockedCompareExchange((volatile long*)key, long(cell), -1L) == -1L;
+#else
+        return __sync_bool_compare_and_swap(key, -1, cell);
+#endif
+    }
+
+    inline bool hash_grid_is_cell_start(const int* point_cells, int i)
+    {
+        return i == 0 || point_cells[i] != point_cells[i-1];
+    }
+
+    template <typename Func>
+    void hash_grid_parallel_blocks(int n, const Func& func)
+    {
+        const int num_blocks = (n + HASH_GRID_BLOCK_SIZE - 1) / HASH_GRID_BLOCK_SIZE;
+
+        wp::parallel_for(num_blocks, [&](size_t begin, size_t end)
+        {
+            for (size_t block=begin; block < end; ++block)
+                func(int(block) * HASH_GRID_BLOCK_SIZE, std::min(n, int(block + 1) * HASH_GRID_BLOCK_SIZE));
+        }, 0, 1);
+    }
+
+    void hash_grid_fill_host(int* values, int n, int value)
+    {
+        hash_grid_parallel_blocks(n, [&](int begin, int end)
+        {
+            std::fill(values + begin, values + end, value);
+        });
+    }
+
+    // marks all slots of the sparse cell table empty, growing it to at least four times the number of occupied cells,
+    // most cells visited by queries are empty and the low load factor keeps their probe sequences short
+    void hash_grid_reserve_cells_host(HashGrid& grid, int num_occupied)
+    {
+        int num_slots = HASH_GRID_MIN_CELL_SLOTS;
+        while (num_slots < 4*num_occupied)
+            num_slots *= 2;
+
+        if (num_slots > grid.num_cell_slots)
+        {
+            free_host(grid.cell_table);
+
+            grid.cell_table = (HashGridCell*)alloc_host(num_slots*sizeof(HashGridCell));
+            grid.num_cell_slots = num_slots;
+        }
+
+        HashGridCell* cell_table = grid.cell_table;
+
+        hash_grid_parallel_blocks(grid.num_cell_slots, [&](int begin, int end)
+        {
+            for (int slot=begin; slot < end; ++slot)
+                cell_table[slot].key = -1;
+        });
+    }
+
+} // anonymous namespace
+
+uint64_t hash_grid_create_host(int dim_x, int dim_y, int dim_z, int sparse)
 {
     HashGrid* grid = new HashGrid();
     memset(grid, 0, sizeof(HashGrid));
@@ -64,9 +141,17 @@ uint64_t hash_grid_create_host(int dim_x, int dim_y, int dim_z)
     grid->dim_y = dim_y;
     grid->dim_z = dim_z;
 
-    const int num_cells = dim_x*dim_y*dim_z;   
-    grid->cell_starts = (int*)alloc_host(num_cells*sizeof(int));
-    grid->cell_ends = (int*)alloc_host(num_cells*sizeof(int));
+    if (sparse)
+    {
+        // cell storage scales with the number of occupied cells
+        hash_grid_reserve_cells_host(*grid, 0);
+    }
+    else
+    {
+        const int num_cells = dim_x*dim_y*dim_z;   
+        grid->cell_starts = (int*)alloc_host(num_cells*sizeof(int));
+        grid->cell_ends = (int*)alloc_host(num_cells*sizeof(int));
+    }
 
     return (uint64_t)(grid);
 }
@@ -79,6 +164,7 @@ void hash_grid_destroy_host(uint64_t id)
     free_host(grid->point_cells);
     free_host(grid->cell_starts);
     free_host(grid->cell_ends);
+    free_host(grid->cell_table);
 
     delete grid;
 }
@@ -111,48 +197,94 @@ void hash_grid_update_host(uint64_t id, float cell_width, const wp::vec3* points
     grid->cell_width = cell_width;
     grid->cell_width_inv = 1.0f / cell_width;
 
+    int* point_cells = grid->point_cells;
+    int* point_ids = grid->point_ids;
+
     // calculate cell for each position
-    for (int i=0; i < num_points; ++i)
+    hash_grid_parallel_blocks(num_points, [&](int begin, int end)
     {
-        grid->point_cells[i] = hash_grid_index(*grid, points[i]);
-        grid->point_ids[i] = i;
-    }
+        for (int i=begin; i < end; ++i)
+        {
+            point_cells[i] = hash_grid_index(*grid, points[i]);
+            point_ids[i] = i;
+        }
+    });
     
-    // sort indices
-    radix_sort_pairs_host(grid->point_cells, grid->point_ids, num_points);
-
     const int num_cells = grid->dim_x * grid->dim_y * grid->dim_z;
-    memset(grid->cell_starts, 0, sizeof(int) * num_cells);
-    memset(grid->cell_ends, 0, sizeof(int) * num_cells);
 
-    // compute cell start / end
-    for (int i=0; i < num_points; ++i)
+    // sort indices, only the bits of valid cell indices need to be sorted
+    radix_sort_pairs_host(point_cells, point_ids, num_points, 0, radix_sort_bit_count(num_cells));
+
+    if (grid->cell_table)
     {
-		// scan the particle-cell array to find the start and end
-		const int c = grid->point_cells[i];
-		
-		if (i == 0)
-			grid->cell_starts[c] = 0;
-		else
-		{
-			const int p = grid->point_cells[i-1];
-
-			if (c != p)
-			{
-				grid->cell_starts[c] = i;
-                grid->cell_ends[p] = i;
-			}
-		}
-
-        if (i == num_points - 1)
+        // count occupied cells to size the table
+        const int num_blocks = (num_points + HASH_GRID_BLOCK_SIZE - 1) / HASH_GRID_BLOCK_SIZE;
+        std::vector<int> block_counts(num_blocks, 0);
+
+        hash_grid_parallel_blocks(num_points, [&](int begin, int end)
         {
-            grid->cell_ends[c] = i + 1;
-        }
-	}
+            int count = 0;
+            for (int i=begin; i < end; ++i)
+                count += hash_grid_is_cell_start(point_cells, i);
+
+            block_counts[begin / HASH_GRID_BLOCK_SIZE] = count;
+        });
+
+        int num_occupied = 0;
+        for (int count : block_counts)
+            num_occupied += count;
+
+        hash_grid_reserve_cells_host(*grid, num_occupied);
+
+        const int slot_mask = grid->num_cell_slots - 1;
+
+        // insert one entry per run of sorted cells, the run may extend past the end of the block
+        hash_grid_parallel_blocks(num_points, [&](int begin, int end)
+        {
+            for (int i=begin; i < end; ++i)
+            {
+                if (!hash_grid_is_cell_start(point_cells, i))
+                    continue;
+
+                const int c = point_cells[i];
+
+                int run_end = i + 1;
+                while (run_end < num_points && point_cells[run_end] == c)
+                    ++run_end;
+
+                int slot = hash_grid_cell_slot(c, grid->num_cell_slots);
+                while (!hash_grid_claim_slot(&grid->cell_table[slot].key, c))
+                    slot = (slot+1) & slot_mask;
+
+                grid->cell_table[slot].start = i;
+                grid->cell_table[slot].end = run_end;
+            }
+        });
+    }
+    else
+    {
+        hash_grid_fill_host(grid->cell_starts, num_cells, 0);
+        hash_grid_fill_host(grid->cell_ends, num_cells, 0);
+
+        // each cell start / end is written by the point on its run boundary
+        hash_grid_parallel_blocks(num_points, [&](int begin, int end)
+        {
+            for (int i=begin; i < end; ++i)
+            {
+                const int c = point_cells[i];
+
+                if (hash_grid_is_cell_start(point_cells, i))
+                    grid->cell_starts[c] = i;
+
+                if (i == num_points - 1 || point_cells[i+1] != c)
+                    grid->cell_ends[c] = i + 1;
+            }
+        });
+    }
 }
 
 // device methods
-uint64_t hash_grid_create_device(void* context, int dim_x, int dim_y, int dim_z)
+uint64_t hash_grid_create_device(void* context, int dim_x, int dim_y, int dim_z, int sparse)
 {
     ContextGuard guard(context);
 
@@ -165,6 +297,7 @@ uint64_t hash_grid_create_device(void* context, int dim_x, int dim_y, int dim_z)
     grid.dim_y = dim_y;
     grid.dim_z = dim_z;
 
+    // the sparse cell table is only supported on the host, device grids always use dense cell storage
     const int num_cells = dim_x*dim_y*dim_z;   
     grid.cell_starts = (int*)alloc_device(WP_CURRENT_CONTEXT, num_cells*sizeof(int));
     grid.cell_ends = (int*)alloc_device(WP_CURRENT_CONTEXT, num_cells*sizeof(int));
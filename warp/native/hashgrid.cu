@@ -61,9 +61,9 @@ void hash_grid_rebuild_device(const wp::HashGrid& grid, const wp::vec3* points,
 
     wp_launch_device(WP_CURRENT_CONTEXT, wp::compute_cell_indices, num_points, (grid, points, num_points));
     
-    radix_sort_pairs_device(WP_CURRENT_CONTEXT, grid.point_cells, grid.point_ids, num_points);
-
     const int num_cells = grid.dim_x * grid.dim_y * grid.dim_z;
+
+    radix_sort_pairs_device(WP_CURRENT_CONTEXT, grid.point_cells, grid.point_ids, num_points, 0, radix_sort_bit_count(num_cells));
     
     memset_device(WP_CURRENT_CONTEXT, grid.cell_starts, 0, sizeof(int) * num_cells);    
     memset_device(WP_CURRENT_CONTEXT, grid.cell_ends, 0, sizeof(int) * num_cells);
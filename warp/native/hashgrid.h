@@ -11,6 +11,14 @@
 namespace wp
 {
 
+// entry of the sparse cell table, the key is the physical cell index or -1 for empty slots
+struct HashGridCell
+{
+    int key;
+    int start;
+    int end;
+};
+
 struct HashGrid
 {
     float cell_width;
@@ -22,6 +30,9 @@ struct HashGrid
     int* cell_starts{nullptr};   // start index of a range of indices belonging to a cell, dim_x*dim_y*dim_z in length
     int* cell_ends{nullptr};     // end index of a range of indices belonging to a cell, dim_x*dim_y*dim_z in length
 
+    HashGridCell* cell_table{nullptr};  // open-addressing table of occupied cells, replaces cell_starts / cell_ends for sparse grids
+    int num_cell_slots;                 // power of two length of cell_table
+
     int dim_x;
     int dim_y;
     int dim_z;
@@ -72,6 +83,58 @@ CUDA_CALLABLE inline int hash_grid_index(const HashGrid& grid, const vec3& p)
                            int(p[2]*grid.cell_width_inv));
 }
 
+// slot in the sparse cell table where the probe sequence for a cell starts
+CUDA_CALLABLE inline int hash_grid_cell_slot(int cell, int num_cell_slots)
+{
+    // mix the bits so that cells differing only in their y or z coordinate do not collide,
+    // runs of 4 cells along x keep neighboring slots so that queries touch fewer cache lines
+    unsigned int h = (unsigned int)cell >> 2;
+    h ^= h >> 16;
+    h *= 0x85ebca6bu;
+    h ^= h >> 13;
+    h *= 0xc2b2ae35u;
+    h ^= h >> 16;
+
+    return int(((h << 2) | ((unsigned int)cell & 3u)) & (unsigned int)(num_cell_slots-1));
+}
+
+// returns the range of sorted point indices belonging to a physical cell
+CUDA_CALLABLE inline void hash_grid_cell_range(const HashGrid& grid, int cell, int& start, int& end)
+{
+    if (grid.cell_table)
+    {
+        // linear probing, the table is at most a quarter full so an empty slot always ends the search
+        int slot = hash_grid_cell_slot(cell, grid.num_cell_slots);
+
+        while (1)
+        {
+            const HashGridCell& entry = grid.cell_table[slot];
+
+            if (entry.key == cell)
+            {
+                start = entry.start;
+                end = entry.end;
+                return;
+            }
+            
+            if (entry.key < 0)
+            {
+                // unoccupied cell
+                start = 0;
+                end = 0;
+                return;
+            }
+
+            slot = (slot+1) & (grid.num_cell_slots-1);
+        }
+    }
+    else
+    {
+        start = grid.cell_starts[cell];
+        end = grid.cell_ends[cell];
+    }
+}
+
 // stores state required to traverse neighboring cells of a point
 struct hash_grid_query_t
 {
@@ -121,8 +184,7 @@ CUDA_CALLABLE inline hash_grid_query_t hash_grid_query(uint64_t id, wp::vec3 pos
     query.z = query.z_start;
 
     const int cell = hash_grid_index(query.grid, query.x, query.y, query.z);
-    query.cell_index = query.grid.cell_starts[cell];
-    query.cell_end = query.grid.cell_ends[cell];
+    hash_grid_cell_range(query.grid, cell, query.cell_index, query.cell_end);
 
     return query;
 }
@@ -165,9 +227,7 @@ CUDA_CALLABLE inline bool hash_grid_query_next(hash_grid_query_t& query, int& in
 
             // update cell pointers
             const int cell = hash_grid_index(grid, query.x, query.y, query.z);
-
-            query.cell_index = grid.cell_starts[cell];
-            query.cell_end = grid.cell_ends[cell];        
+            hash_grid_cell_range(grid, cell, query.cell_index, query.cell_end);
         }
     }
 }
@@ -1,3 +1,423 @@
+#include "warp.h"
+#include "marching.h"
+#include "scan.h"
+#include "thread_pool.h"
 
+#include <algorithm>
+#include <vector>
 
-// not implemented yet
\ No newline at end of file
+// the host surfacer processes the field in slabs of consecutive x planes (the slowest varying
+// dimension of the field), a full surface extraction is a single slab covering all planes
+//  - the vertices of the cell at plane x need the field at planes x and x+1
+//  - the triangles of the cell at plane x need the field and the vertices at planes x and x+1
+// so the last two field planes and the last plane of vertex indices are carried over to the next slab,
+// the vertex and triangle order is the same as for the device implementation regardless of the slabs used
+
+namespace
+{
+
+struct MarchingCubesHost
+{
+    // grid
+    int nx;
+    int ny;
+    int nz;
+
+    // first plane of the next slab
+    int next_plane;
+
+    // field at planes next_plane-2 and next_plane-1
+    std::vector<float> carry_field[2];
+
+    // vertex indices of the cells at plane next_plane-2, 3 per cell
+    std::vector<int> carry_verts;
+
+    // vertex indices of the cells at the planes processed by the current slab
+    std::vector<int> cell_verts;
+
+    // per-row counts and offsets
+    std::vector<int> row_counts;
+    std::vector<int> row_offsets;
+
+    int num_verts;
+    int num_tris;
+
+    // set once the output buffers are too small, the following slabs only count
+    bool overflow;
+};
+
+inline bool marching_cubes_crossing(float d0, float d, float threshold)
+{
+    return (d0 <= threshold && d >= threshold) || (d <= threshold && d0 >= threshold);
+}
+
+// number of vertices created by the cell (x, y, z), given the field at planes x and x+1
+inline int marching_cubes_count_cell_verts(const MarchingCubesHost& mc, const float* plane0, const float* plane1, int y, int z, float threshold)
+{
+    const int i = y*mc.nz + z;
+    const float d0 = plane0[i];
+
+    return int(marching_cubes_crossing(d0, plane1[i], threshold))
+         + int(marching_cubes_crossing(d0, plane0[i + mc.nz], threshold))
+         + int(marching_cubes_crossing(d0, plane0[i + 1], threshold));
+}
+
+inline int marching_cubes_cell_code(const MarchingCubesHost& mc, const float* planes[2], int y, int z, float threshold)
+{
+    int code = 0;
+    for (int i=0; i < 8; ++i)
+    {
+        const float* plane = planes[wp::marchingCubeCorners[i][0]];
+        const int cy = y + wp::marchingCubeCorners[i][1];
+        const int cz = z + wp::marchingCubeCorners[i][2];
+
+        if (plane[cy*mc.nz + cz] >= threshold)
+            code |= (1 << i);
+    }
+
+    return code;
+}
+
+// exclusive scan of the row counts, returns the total
+int marching_cubes_scan_rows(MarchingCubesHost& mc, int num_rows)
+{
+    if (num_rows == 0)
+        return 0;
+
+    mc.row_offsets.resize(num_rows);
+    scan_host(mc.row_counts.data(), mc.row_offsets.data(), num_rows, false);
+
+    return mc.row_offsets[num_rows-1] + mc.row_counts[num_rows-1];
+}
+
+int marching_cubes_surface_slab(
+    MarchingCubesHost& mc,
+    const float* field,
+    int x_begin,
+    int x_end,
+    float threshold,
+    wp::vec3* verts,
+    int* triangles,
+    int max_verts,
+    int max_tris)
+{
+    const int nx = mc.nx;
+    const int ny = mc.ny;
+    const int nz = mc.nz;
+    const size_t plane_size = size_t(ny)*nz;
+
+    auto field_plane = [&](int x) -> const float*
+    {
+        if (x >= x_begin)
+            return field + (x - x_begin)*plane_size;
+        else
+            return mc.carry_field[x - x_begin + 2].data();
+    };
+
+    // planes whose vertices and triangles are created by this slab
+    const int vert_begin = std::max(0, x_begin - 1);
+    const int vert_end = std::max(vert_begin, std::min(x_end - 1, nx - 1));
+    const int tri_begin = std::max(0, x_begin - 2);
+    const int tri_end = std::max(tri_begin, std::min(x_end - 2, nx - 2));
+
+    // vertex indices are stored for the planes [tri_begin, vert_end)
+    mc.cell_verts.resize(size_t(vert_end - tri_begin)*plane_size*3);
+
+    if (tri_begin < vert_begin && !mc.overflow)
+        std::copy(mc.carry_verts.begin(), mc.carry_verts.end(), mc.cell_verts.begin());
+
+    // vertices, one row of cells along z at a time
+    {
+        const int num_rows = (vert_end - vert_begin)*ny;
+        mc.row_counts.resize(num_rows);
+
+        wp::parallel_for(num_rows, [&](size_t begin, size_t end)
+        {
+            for (size_t row=begin; row < end; ++row)
+            {
+                const int x = vert_begin + int(row)/ny;
+                const int y = int(row)%ny;
+
+                int count = 0;
+
+                if (y < ny - 1)
+                {
+                    const float* plane0 = field_plane(x);
+                    const float* plane1 = field_plane(x + 1);
+
+                    for (int z=0; z < nz - 1; ++z)
+                        count += marching_cubes_count_cell_verts(mc, plane0, plane1, y, z, threshold);
+                }
+
+                mc.row_counts[row] = count;
+            }
+        });
+
+        const int slab_verts = marching_cubes_scan_rows(mc, num_rows);
+
+        if (mc.num_verts + slab_verts > max_verts)
+            mc.overflow = true;
+
+        if (!mc.overflow)
+        {
+            const int first_vert = mc.num_verts;
+
+            wp::parallel_for(num_rows, [&](size_t begin, size_t end)
+            {
+                for (size_t row=begin; row < end; ++row)
+                {
+                    const int x = vert_begin + int(row)/ny;
+                    const int y = int(row)%ny;
+
+                    int* row_verts = &mc.cell_verts[((x - tri_begin)*plane_size + size_t(y)*nz)*3];
+                    std::fill(row_verts, row_verts + 3*nz, 0);
+
+                    if (y >= ny - 1)
+                        continue;
+
+                    const float* plane0 = field_plane(x);
+                    const float* plane1 = field_plane(x + 1);
+
+                    int id = first_vert + mc.row_offsets[row];
+
+                    for (int z=0; z < nz - 1; ++z)
+                    {
+                        const int i = y*nz + z;
+                        const float d0 = plane0[i];
+
+                        const float ds[3] = { plane1[i], plane0[i + nz], plane0[i + 1] };
+
+                        for (int dim=0; dim < 3; ++dim)
+                        {
+                            const float d = ds[dim];
+
+                            if (marching_cubes_crossing(d0, d, threshold))
+                            {
+                                const float t = (d != d0) ? wp::clamp((threshold - d0) / (d - d0), 0.0f, 1.0f) : 0.5f;
+
+                                wp::vec3 p = wp::vec3(x + 0.5f, y + 0.5f, z + 0.5f);
+                                p[dim] += t;
+
+                                verts[id] = p;
+                                row_verts[3*z + dim] = id++;
+                            }
+                        }
+                    }
+                }
+            });
+        }
+
+        mc.num_verts += slab_verts;
+    }
+
+    // triangles
+    {
+        const int num_rows = (tri_end - tri_begin)*ny;
+        mc.row_counts.resize(num_rows);
+
+        wp::parallel_for(num_rows, [&](size_t begin, size_t end)
+        {
+            for (size_t row=begin; row < end; ++row)
+            {
+                const int x = tri_begin + int(row)/ny;
+                const int y = int(row)%ny;
+
+                int count = 0;
+
+                if (y < ny - 2)
+                {
+                    const float* planes[2] = { field_plane(x), field_plane(x + 1) };
+
+                    for (int z=0; z < nz - 2; ++z)
+                    {
+                        const int code = marching_cubes_cell_code(mc, planes, y, z, threshold);
+                        count += wp::firstMarchingCubesId[code + 1] - wp::firstMarchingCubesId[code];
+                    }
+                }
+
+                mc.row_counts[row] = count;
+            }
+        });
+
+        const int slab_indices = marching_cubes_scan_rows(mc, num_rows);
+
+        if (mc.num_tris + slab_indices/3 > max_tris)
+            mc.overflow = true;
+
+        if (!mc.overflow)
+        {
+            int* first_index = triangles + size_t(mc.num_tris)*3;
+
+            wp::parallel_for(num_rows, [&](size_t begin, size_t end)
+            {
+                for (size_t row=begin; row < end; ++row)
+                {
+                    const int x = tri_begin + int(row)/ny;
+                    const int y = int(row)%ny;
+
+                    if (y >= ny - 2)
+                        continue;
+
+                    const float* planes[2] = { field_plane(x), field_plane(x + 1) };
+
+                    int* out = first_index + mc.row_offsets[row];
+
+                    for (int z=0; z < nz - 2; ++z)
+                    {
+                        const int code = marching_cubes_cell_code(mc, planes, y, z, threshold);
+
+                        const int first_in = wp::firstMarchingCubesId[code];
+                        const int num = wp::firstMarchingCubesId[code + 1] - first_in;
+
+                        for (int i=0; i < num; ++i)
+                        {
+                            const int* edge = wp::marchingCubesEdgeLocations[wp::marchingCubesIds[first_in + i]];
+
+                            const size_t cell = (x + edge[0] - tri_begin)*plane_size + size_t(y + edge[1])*nz + (z + edge[2]);
+                            *out++ = mc.cell_verts[3*cell + edge[3]];
+                        }
+                    }
+                }
+            });
+        }
+
+        mc.num_tris += slab_indices/3;
+    }
+
+    // carry the last vertex plane and field planes over to the next slab
+    if (vert_end > tri_begin && !mc.overflow)
+    {
+        const size_t offset = (vert_end - 1 - tri_begin)*plane_size*3;
+        mc.carry_verts.assign(mc.cell_verts.begin() + offset, mc.cell_verts.begin() + offset + plane_size*3);
+    }
+
+    std::vector<float> carry_field[2];
+    for (int i=0; i < 2; ++i)
+    {
+        const int x = x_end - 2 + i;
+        if (x >= 0)
+        {
+            const float* plane = field_plane(x);
+            carry_field[i].assign(plane, plane + plane_size);
+        }
+    }
+
+    mc.carry_field[0].swap(carry_field[0]);
+    mc.carry_field[1].swap(carry_field[1]);
+
+    mc.next_plane = x_end;
+
+    return mc.overflow ? -1 : 0;
+}
+
+} // anonymous namespace
+
+
+uint64_t marching_cubes_create_host()
+{
+    MarchingCubesHost* mc = new MarchingCubesHost();
+    mc->next_plane = 0;
+
+    return (uint64_t)(mc);
+}
+
+void marching_cubes_destroy_host(uint64_t id)
+{
+    if (!id)
+        return;
+
+    delete (MarchingCubesHost*)(id);
+}
+
+int marching_cubes_surface_slab_host(
+    uint64_t id,
+    const float* field,
+    int x_begin,
+    int x_end,
+    int nx,
+    int ny,
+    int nz,
+    float threshold,
+    wp::vec3* verts,
+    int* triangles,
+    int max_verts,
+    int max_tris,
+    int* out_num_verts,
+    int* out_num_tris)
+{
+    if (!id || !field)
+        return -1;
+
+    MarchingCubesHost& mc = *(MarchingCubesHost*)(id);
+
+    // the first slab starts a new surface
+    if (x_begin == 0)
+    {
+        mc.nx = nx;
+        mc.ny = ny;
+        mc.nz = nz;
+        mc.next_plane = 0;
+        mc.num_verts = 0;
+        mc.num_tris = 0;
+        mc.overflow = false;
+    }
+
+    // slabs must be consecutive and cover the grid
+    if (x_begin != mc.next_plane || x_end <= x_begin || x_end > nx || nx != mc.nx || ny != mc.ny || nz != mc.nz)
+        return -1;
+
+    const int error = marching_cubes_surface_slab(mc, field, x_begin, x_end, threshold, verts, triangles, max_verts, max_tris);
+
+    *out_num_verts = mc.num_verts;
+    *out_num_tris = mc.num_tris;
+
+    return error;
+}
+
+int marching_cubes_surface_host(
+    uint64_t id,
+    const float* field,
+    int nx,
+    int ny,
+    int nz,
+    float threshold,
+    wp::vec3* verts,
+    int* triangles,
+    int max_verts,
+    int max_tris,
+    int* out_num_verts,
+    int* out_num_tris)
+{
+    return marching_cubes_surface_slab_host(id, field, 0, nx, nx, ny, nz, threshold, verts, triangles, max_verts, max_tris, out_num_verts, out_num_tris);
+}
+
+
+#if !WP_ENABLE_CUDA
+
+uint64_t marching_cubes_create_device(void* context)
+{
+    return 0;
+}
+
+void marching_cubes_destroy_device(uint64_t id)
+{
+}
+
+int marching_cubes_surface_device(
+    uint64_t id,
+    const float* field,
+    int nx,
+    int ny,
+    int nz,
+    float threshold,
+    wp::vec3* verts,
+    int* triangles,
+    int max_verts,
+    int max_tris,
+    int* out_num_verts,
+    int* out_num_tris)
+{
+    return -1;
+}
+
+#endif // !WP_ENABLE_CUDA
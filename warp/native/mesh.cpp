@@ -97,9 +97,12 @@ void bvh_refit_with_solid_angle_recursive_host(BVH& bvh, int index, Mesh& mesh)
 void bvh_refit_with_solid_angle_host(BVH& bvh, Mesh& mesh)
 {
     bvh_refit_with_solid_angle_recursive_host(bvh, 0, mesh);
+
+    if (bvh.wide_nodes)
+        bvh_refit_wide_host(bvh);
 }
 
-uint64_t mesh_create_host(array_t<wp::vec3> points, array_t<wp::vec3> velocities, array_t<int> indices, int num_points, int num_tris, int support_winding_number)
+uint64_t mesh_create_host(array_t<wp::vec3> points, array_t<wp::vec3> velocities, array_t<int> indices, int num_points, int num_tris, int support_winding_number, int constructor_type)
 {
     Mesh* m = new Mesh(points, velocities, indices, num_points, num_tris);
 
@@ -127,7 +130,7 @@ uint64_t mesh_create_host(array_t<wp::vec3> points, array_t<wp::vec3> velocities
     }
     m->average_edge_length = sum / (num_tris*3);
 
-    m->bvh = *(wp::BVH*)bvh_create_host(m->lowers, m->uppers, num_tris);
+    bvh_create_host(m->lowers, m->uppers, num_tris, constructor_type, m->bvh);
     
     if (support_winding_number) 
     {
@@ -156,9 +159,10 @@ void mesh_destroy_host(uint64_t id)
     delete m;
 }
 
-void mesh_refit_host(uint64_t id)
+int mesh_refit_host(uint64_t id)
 {
     Mesh* m = (Mesh*)(id);
+    const bool wide = m->bvh.wide_nodes != NULL;
 
     float sum = 0.0;
     for (int i=0; i < m->num_tris; ++i)
@@ -189,6 +193,15 @@ void mesh_refit_host(uint64_t id)
     {
         bvh_refit_host(m->bvh);
     }
+
+    return !wide || m->bvh.wide_nodes != NULL;
+}
+
+
+int mesh_create_wide_bvh_host(uint64_t id)
+{
+    Mesh* m = (Mesh*)(id);
+    return bvh_create_wide_host(m->bvh);
 }
 
 
@@ -196,7 +209,7 @@ void mesh_refit_host(uint64_t id)
 #if !WP_ENABLE_CUDA
 
 
-WP_API uint64_t mesh_create_device(void* context, wp::array_t<wp::vec3> points, wp::array_t<wp::vec3> velocities, wp::array_t<int> tris, int num_points, int num_tris, int support_winding_number) { return 0; }
+WP_API uint64_t mesh_create_device(void* context, wp::array_t<wp::vec3> points, wp::array_t<wp::vec3> velocities, wp::array_t<int> tris, int num_points, int num_tris, int support_winding_number, int constructor_type) { return 0; }
 WP_API void mesh_destroy_device(uint64_t id) {}
 WP_API void mesh_refit_device(uint64_t id) {}
 
@@ -136,6 +136,133 @@ CUDA_CALLABLE inline float furthest_distance_to_aabb_sq(const vec3& p, const vec
 
 CUDA_CALLABLE inline float mesh_query_inside(uint64_t id, const vec3& p);
 
+#if !defined(__CUDA_ARCH__)
+
+// returns false for sliver triangles, which are skipped by the point queries
+inline bool mesh_face_vertices(const Mesh& mesh, int face, vec3& p, vec3& q, vec3& r)
+{
+    p = mesh.points[mesh.indices[face*3+0]];
+    q = mesh.points[mesh.indices[face*3+1]];
+    r = mesh.points[mesh.indices[face*3+2]];
+
+    vec3 e0 = q-p;
+    vec3 e1 = r-p;
+    vec3 e2 = r-q;
+    vec3 normal = cross(e0, e1);
+
+    return !(length(normal)/(dot(e0,e0) + dot(e1,e1) + dot(e2,e2)) < 1.e-6f);
+}
+
+// closest face strictly closer than sqrt(min_dist_sq) using the wide BVH of the mesh
+inline void mesh_closest_face_wide(const Mesh& mesh, const vec3& point, float& min_dist_sq, int& min_face, float& min_v, float& min_w)
+{
+    bvh_wide_traverse_ordered(mesh.bvh, min_dist_sq,
+        [&](const vec3& lower, const vec3& upper)
+        {
+            return distance_to_aabb_sq(point, lower, upper);
+        },
+        [&](int face)
+        {
+            vec3 p, q, r;
+            if (!mesh_face_vertices(mesh, face, p, q, r))
+                return;
+
+            vec2 barycentric = closest_point_to_triangle(p, q, r, point);
+            float u = barycentric[0];
+            float v = barycentric[1];
+            float w = 1.f - u - v;
+            vec3 c = u*p + v*q + w*r;
+
+            float dist_sq = length_sq(c-point);
+
+            if (dist_sq < min_dist_sq)
+            {
+                min_dist_sq = dist_sq;
+                min_v = v;
+                min_w = w;
+                min_face = face;
+            }
+        });
+}
+
+// furthest face strictly further than sqrt(max_dist_sq) using the wide BVH of the mesh
+inline void mesh_furthest_face_wide(const Mesh& mesh, const vec3& point, float& max_dist_sq, int& max_face, float& max_v, float& max_w)
+{
+    // nodes are visited in decreasing order of their furthest distance
+    float max_key = -max_dist_sq;
+
+    bvh_wide_traverse_ordered(mesh.bvh, max_key,
+        [&](const vec3& lower, const vec3& upper)
+        {
+            return -furthest_distance_to_aabb_sq(point, lower, upper);
+        },
+        [&](int face)
+        {
+            vec3 p, q, r;
+            if (!mesh_face_vertices(mesh, face, p, q, r))
+                return;
+
+            vec2 barycentric = furthest_point_to_triangle(p, q, r, point);
+            float u = barycentric[0];
+            float v = barycentric[1];
+            float w = 1.f - u - v;
+            vec3 c = u*p + v*q + w*r;
+
+            float dist_sq = length_sq(c-point);
+
+            if (dist_sq > max_dist_sq)
+            {
+                max_dist_sq = dist_sq;
+                max_key = -dist_sq;
+                max_v = v;
+                max_w = w;
+                max_face = face;
+            }
+        });
+}
+
+// nearest ray hit before min_t using the wide BVH of the mesh
+inline void mesh_ray_hit_wide(const Mesh& mesh, const vec3& start, const vec3& dir, float& min_t, int& min_face, float& min_u, float& min_v, float& min_sign, vec3& min_normal)
+{
+    const vec3 rcp_dir = vec3(1.0f/dir[0], 1.0f/dir[1], 1.0f/dir[2]);
+
+    bvh_wide_traverse_ordered(mesh.bvh, min_t,
+        [&](const vec3& lower, const vec3& upper)
+        {
+            // same expanded bounds as the binary traversal
+            const float eps = 1.e-3f;
+            float t = 0.0f;
+            if (intersect_ray_aabb(start, rcp_dir, lower - vec3(eps), upper + vec3(eps), t))
+                return t;
+            else
+                return FLT_MAX;
+        },
+        [&](int face)
+        {
+            vec3 p = mesh.points[mesh.indices[face*3+0]];
+            vec3 q = mesh.points[mesh.indices[face*3+1]];
+            vec3 r = mesh.points[mesh.indices[face*3+2]];
+
+            float t, u, v, sign;
+            vec3 n;
+
+            if (intersect_ray_tri_woop(start, dir, p, q, r, t, u, v, sign, &n))
+            {
+                if (t < min_t && t >= 0.0f)
+                {
+                    min_t = t;
+                    min_face = face;
+                    min_u = u;
+                    min_v = v;
+                    min_sign = sign;
+                    min_normal = n;
+                }
+            }
+        });
+}
+
+#endif // !__CUDA_ARCH__
+
 // returns true if there is a point (strictly) < distance max_dist
 CUDA_CALLABLE inline bool mesh_query_point(uint64_t id, const vec3& point, float max_dist, float& inside, int& face, float& u, float& v)
 {
@@ -151,6 +278,15 @@ CUDA_CALLABLE inline bool mesh_query_point(uint64_t id, const vec3& point, float
     float min_v;
     float min_w;
 
+#if !defined(__CUDA_ARCH__)
+    if (mesh.bvh.wide_nodes)
+    {
+        // skip the binary traversal below
+        mesh_closest_face_wide(mesh, point, min_dist_sq, min_face, min_v, min_w);
+        count = 0;
+    }
+#endif
+
 #if BVH_DEBUG
     int tests = 0;
     int secondary_culls = 0;
@@ -336,6 +472,15 @@ CUDA_CALLABLE inline bool mesh_query_point_no_sign(uint64_t id, const vec3& poin
     float min_v;
     float min_w;
 
+#if !defined(__CUDA_ARCH__)
+    if (mesh.bvh.wide_nodes)
+    {
+        // skip the binary traversal below
+        mesh_closest_face_wide(mesh, point, min_dist_sq, min_face, min_v, min_w);
+        count = 0;
+    }
+#endif
+
 #if BVH_DEBUG
     int tests = 0;
     int secondary_culls = 0;
@@ -518,6 +663,15 @@ CUDA_CALLABLE inline bool mesh_query_furthest_point_no_sign(uint64_t id, const v
     float min_v;
     float min_w;
 
+#if !defined(__CUDA_ARCH__)
+    if (mesh.bvh.wide_nodes)
+    {
+        // skip the binary traversal below
+        mesh_furthest_face_wide(mesh, point, max_dist_sq, min_face, min_v, min_w);
+        count = 0;
+    }
+#endif
+
 #if BVH_DEBUG
     int tests = 0;
     int secondary_culls = 0;
@@ -687,6 +841,96 @@ CUDA_CALLABLE inline bool mesh_query_furthest_point_no_sign(uint64_t id, const v
     }
 }
 
+// accumulates the angle weighted normals of the faces closest to the point, see mesh_query_point_sign_normal()
+CUDA_CALLABLE inline void mesh_query_point_sign_normal_face(const Mesh& mesh, int face, const vec3& point, float epsilon_min_dist, float epsilon_min_dist_sq,
+                                                            float& min_dist, int& min_face, float& min_v, float& min_w, vec3& accumulated_angle_weighted_normal)
+{
+    // compute closest point on tri
+    int i = mesh.indices[face*3+0];
+    int j = mesh.indices[face*3+1];
+    int k = mesh.indices[face*3+2];
+    vec3 p = mesh.points[i];
+    vec3 q = mesh.points[j];
+    vec3 r = mesh.points[k];
+    vec3 e0 = q-p;
+    vec3 e1 = r-p;
+    vec3 e2 = r-q;
+    vec3 normal = cross(e0, e1);
+    // sliver detection
+    float e0_norm_sq = dot(e0,e0);
+    float e1_norm_sq = dot(e1,e1);
+    float e2_norm_sq = dot(e2,e2);
+    if (length(normal)/(e0_norm_sq + e1_norm_sq + e2_norm_sq) < 1.e-6f)
+        return;
+    vec2 barycentric = closest_point_to_triangle(p, q, r, point);
+    float u = barycentric[0];
+    float v = barycentric[1];
+    float w = 1.f - u - v;
+    vec3 c = u*p + v*q + w*r;
+    float dist = sqrtf(length_sq(c-point));
+    if (dist < min_dist + epsilon_min_dist)
+    {
+        float weight = 0.0f;
+        vec3 cp = c-p;
+        vec3 cq = c-q;
+        vec3 cr = c-r;
+        float len_cp_sq = length_sq(cp);
+        float len_cq_sq = length_sq(cq);
+        float len_cr_sq = length_sq(cr);
+        
+        // Check if near vertex
+        if (len_cp_sq < epsilon_min_dist_sq)
+        {
+            // Vertex 0 is the closest feature
+            weight = acosf(dot(normalize(e0), normalize(e1)));
+        } else
+        if (len_cq_sq < epsilon_min_dist_sq)
+        {
+            // Vertex 1 is the closest feature
+            weight = acosf(dot(normalize(e2), normalize(-e0)));
+        } else
+        if (len_cr_sq < epsilon_min_dist_sq)
+        {
+            // Vertex 2 is the closest feature
+            weight = acosf(dot(normalize(-e1), normalize(-e2)));
+        } else
+        {
+            float e0cp = dot(e0, cp);
+            float e2cq = dot(e2, cq);
+            float e1cp = dot(e1, cp);
+
+            if ((len_cp_sq*e0_norm_sq-e0cp*e0cp < epsilon_min_dist_sq*e0_norm_sq) ||
+                (len_cq_sq*e2_norm_sq-e2cq*e2cq < epsilon_min_dist_sq*e2_norm_sq) ||
+                (len_cp_sq*e1_norm_sq-e1cp*e1cp < epsilon_min_dist_sq*e1_norm_sq)) {
+                // One of the edge
+                weight = 3.14159265359f;  // PI
+            } else {
+                weight = 2.0f*3.14159265359f; // 2*PI
+            }
+        }
+
+        if (dist > min_dist - epsilon_min_dist) 
+        {
+            // Treat as equal
+            accumulated_angle_weighted_normal += weight*normalize(normal);
+            if (dist < min_dist) 
+            {
+                min_dist = dist;
+                min_v = v;
+                min_w = w;
+                min_face = face;
+            }
+        } else {
+            // Less
+            min_dist = dist;
+            min_v = v;
+            min_w = w;
+            min_face = face;
+            accumulated_angle_weighted_normal = weight*normalize(normal);
+        }
+    }
+}
+
 // returns true if there is a point (strictly) < distance max_dist
 CUDA_CALLABLE inline bool mesh_query_point_sign_normal(uint64_t id, const vec3& point, float max_dist, float& inside, int& face, float& u, float& v, const float epsilon = 1e-3f)
 {
@@ -709,6 +953,24 @@ CUDA_CALLABLE inline bool mesh_query_point_sign_normal(uint64_t id, const vec3&
 #endif
     float epsilon_min_dist = mesh.average_edge_length * epsilon;
     float epsilon_min_dist_sq = epsilon_min_dist*epsilon_min_dist;
+#if !defined(__CUDA_ARCH__)
+    if (mesh.bvh.wide_nodes)
+    {
+        float cull_dist_sq = (min_dist + epsilon_min_dist)*(min_dist + epsilon_min_dist);
+        bvh_wide_traverse_ordered(mesh.bvh, cull_dist_sq,
+            [&](const vec3& lower, const vec3& upper)
+            {
+                return distance_to_aabb_sq(point, lower, upper);
+            },
+            [&](int face_index)
+            {
+                mesh_query_point_sign_normal_face(mesh, face_index, point, epsilon_min_dist, epsilon_min_dist_sq, min_dist, min_face, min_v, min_w, accumulated_angle_weighted_normal);
+                cull_dist_sq = (min_dist + epsilon_min_dist)*(min_dist + epsilon_min_dist);
+            });
+        // skip the binary traversal below
+        count = 0;
+    }
+#endif
     while (count)
     {
         const int nodeIndex = stack[--count];
@@ -727,91 +989,11 @@ CUDA_CALLABLE inline bool mesh_query_point_sign_normal(uint64_t id, const vec3&
         const int right_index = upper.i;
         if (lower.b)
         {
-            // compute closest point on tri
-            int i = mesh.indices[left_index*3+0];
-            int j = mesh.indices[left_index*3+1];
-            int k = mesh.indices[left_index*3+2];
-            vec3 p = mesh.points[i];
-            vec3 q = mesh.points[j];
-            vec3 r = mesh.points[k];
-            vec3 e0 = q-p;
-            vec3 e1 = r-p;
-            vec3 e2 = r-q;
-            vec3 normal = cross(e0, e1);
-            // sliver detection
-            float e0_norm_sq = dot(e0,e0);
-            float e1_norm_sq = dot(e1,e1);
-            float e2_norm_sq = dot(e2,e2);
-            if (length(normal)/(e0_norm_sq + e1_norm_sq + e2_norm_sq) < 1.e-6f)
-                continue;
-            vec2 barycentric = closest_point_to_triangle(p, q, r, point);
-            float u = barycentric[0];
-            float v = barycentric[1];
-            float w = 1.f - u - v;
-            vec3 c = u*p + v*q + w*r;
-            float dist = sqrtf(length_sq(c-point));
-            if (dist < min_dist + epsilon_min_dist)
-            {
-                float weight = 0.0f;
-                vec3 cp = c-p;
-                vec3 cq = c-q;
-                vec3 cr = c-r;
-                float len_cp_sq = length_sq(cp);
-                float len_cq_sq = length_sq(cq);
-                float len_cr_sq = length_sq(cr);
-                
-                // Check if near vertex
-                if (len_cp_sq < epsilon_min_dist_sq)
-                {
-                    // Vertex 0 is the closest feature
-                    weight = acosf(dot(normalize(e0), normalize(e1)));
-                } else
-                if (len_cq_sq < epsilon_min_dist_sq)
-                {
-                    // Vertex 1 is the closest feature
-                    weight = acosf(dot(normalize(e2), normalize(-e0)));
-                } else
-                if (len_cr_sq < epsilon_min_dist_sq)
-                {
-                    // Vertex 2 is the closest feature
-                    weight = acosf(dot(normalize(-e1), normalize(-e2)));
-                } else
-                {
-                    float e0cp = dot(e0, cp);
-                    float e2cq = dot(e2, cq);
-                    float e1cp = dot(e1, cp);
-
-                    if ((len_cp_sq*e0_norm_sq-e0cp*e0cp < epsilon_min_dist_sq*e0_norm_sq) ||
-                        (len_cq_sq*e2_norm_sq-e2cq*e2cq < epsilon_min_dist_sq*e2_norm_sq) ||
-                        (len_cp_sq*e1_norm_sq-e1cp*e1cp < epsilon_min_dist_sq*e1_norm_sq)) {
-                        // One of the edge
-                        weight = 3.14159265359f;  // PI
-                    } else {
-                        weight = 2.0f*3.14159265359f; // 2*PI
-                    }
-                }
-
-                if (dist > min_dist - epsilon_min_dist) 
-                {
-                    // Treat as equal
-                    accumulated_angle_weighted_normal += weight*normalize(normal);
-                    if (dist < min_dist) 
-                    {
-                        min_dist = dist;
-                        min_v = v;
-                        min_w = w;
-                        min_face = left_index;
-                    }
-                } else {
-                    // Less
-                    min_dist = dist;
-                    min_v = v;
-                    min_w = w;
-                    min_face = left_index;
-                    accumulated_angle_weighted_normal = weight*normalize(normal);
-                }
-            }
+            mesh_query_point_sign_normal_face(mesh, left_index, point, epsilon_min_dist, epsilon_min_dist_sq, min_dist, min_face, min_v, min_w, accumulated_angle_weighted_normal);
 #if BVH_DEBUG
+            vec3 p = mesh.points[mesh.indices[left_index*3+0]];
+            vec3 q = mesh.points[mesh.indices[left_index*3+1]];
+            vec3 r = mesh.points[mesh.indices[left_index*3+2]];
             tests++;
             bounds3 b;
             b = bounds_union(b, p);
@@ -1005,6 +1187,15 @@ CUDA_CALLABLE inline bool mesh_query_point_sign_winding_number(uint64_t id, cons
     float min_v;
     float min_w;
 
+#if !defined(__CUDA_ARCH__)
+    if (mesh.bvh.wide_nodes)
+    {
+        // skip the binary traversal below
+        mesh_closest_face_wide(mesh, point, min_dist_sq, min_face, min_v, min_w);
+        count = 0;
+    }
+#endif
+
 #if BVH_DEBUG
     int tests = 0;
     int secondary_culls = 0;
@@ -1258,6 +1449,15 @@ CUDA_CALLABLE inline bool mesh_query_ray(uint64_t id, const vec3& start, const v
     float min_sign = 1.0f;
     vec3 min_normal;
 
+#if !defined(__CUDA_ARCH__)
+    if (mesh.bvh.wide_nodes)
+    {
+        // skip the binary traversal below
+        mesh_ray_hit_wide(mesh, start, dir, min_t, min_face, min_u, min_v, min_sign, min_normal);
+        count = 0;
+    }
+#endif
+
     while (count)
     {
         const int nodeIndex = stack[--count];
@@ -1390,7 +1590,7 @@ struct mesh_query_aabb_t
     // Mesh Id
     Mesh mesh;
     // BVH traversal stack:
-    int stack[32];
+    int stack[BVH_QUERY_STACK_SIZE];
     int count;
 
     // inputs
@@ -1421,6 +1621,16 @@ CUDA_CALLABLE inline mesh_query_aabb_t mesh_query_aabb(
     query.input_lower = lower;
     query.input_upper = upper;
 
+#if !defined(__CUDA_ARCH__)
+    if (mesh.bvh.wide_nodes)
+    {
+        // the faces are found by mesh_query_aabb_next()
+        query.count = 0;
+        bvh_wide_push_root(mesh.bvh, false, lower, upper, query.stack, query.count);
+        return query;
+    }
+#endif
+
     wp::bounds3 input_bounds(query.input_lower, query.input_upper);
     
     // Navigate through the bvh, find the first overlapping leaf node.
@@ -1470,6 +1680,17 @@ CUDA_CALLABLE inline void adj_mesh_query_aabb(uint64_t id, const vec3& lower, co
 CUDA_CALLABLE inline bool mesh_query_aabb_next(mesh_query_aabb_t& query, int& index)
 {
     Mesh mesh = query.mesh;
+
+#if !defined(__CUDA_ARCH__)
+    if (mesh.bvh.wide_nodes)
+    {
+        if (!bvh_wide_query_next(mesh.bvh, false, query.input_lower, query.input_upper, query.stack, query.count, query.face))
+            return false;
+
+        index = query.face;
+        return true;
+    }
+#endif
     
     wp::bounds3 input_bounds(query.input_lower, query.input_upper);
     // Navigate through the bvh, find the first overlapping leaf node.
@@ -1,41 +1,103 @@
 #include "warp.h"
+#include "thread_pool.h"
+
+#include <algorithm>
+#include <vector>
 
 namespace
 {
 
-// Specialized accumulation functions for common type sizes
-template <int N, typename T> void fixed_len_sum(const T *val, T *sum, int value_size)
+// Specialized accumulation functions for common type sizes, the values are accumulated in registers
+template <int N, typename T> void fixed_len_sum(const T *val, int stride, int count, T *sum, int value_size)
 {
-    for (int i = 0; i < N; ++i, ++val, ++sum)
+    T acc[N];
+    for (int k = 0; k < N; ++k)
+        acc[k] = sum[k];
+
+    for (int i = 0; i < count; ++i, val += stride)
     {
-        *sum += *val;
+        for (int k = 0; k < N; ++k)
+            acc[k] += val[k];
     }
+
+    for (int k = 0; k < N; ++k)
+        sum[k] = acc[k];
 }
 
-template <typename T> void dyn_len_sum(const T *val, T *sum, int value_size)
+template <typename T> void dyn_len_sum(const T *val, int stride, int count, T *sum, int value_size)
 {
-    for (int i = 0; i < value_size; ++i, ++val, ++sum)
+    for (int i = 0; i < count; ++i, val += stride)
     {
-        *sum += *val;
+        for (int k = 0; k < value_size; ++k)
+            sum[k] += val[k];
     }
 }
 
-template <int N, typename T> void fixed_len_inner(const T *a, const T *b, T *dot, int value_size)
+template <int N, typename T>
+void fixed_len_inner(const T *a, int stride_a, const T *b, int stride_b, int count, T *dot, int value_size)
 {
-    for (int i = 0; i < N; ++i, ++a, ++b)
+    T acc = *dot;
+
+    for (int i = 0; i < count; ++i, a += stride_a, b += stride_b)
     {
-        *dot += *a * *b;
+        for (int k = 0; k < N; ++k)
+            acc += a[k] * b[k];
     }
+
+    *dot = acc;
 }
 
-template <typename T> void dyn_len_inner(const T *a, const T *b, T *dot, int value_size)
+template <typename T>
+void dyn_len_inner(const T *a, int stride_a, const T *b, int stride_b, int count, T *dot, int value_size)
 {
-    for (int i = 0; i < value_size; ++i, ++a, ++b)
+    for (int i = 0; i < count; ++i, a += stride_a, b += stride_b)
     {
-        *dot += *a * *b;
+        for (int k = 0; k < value_size; ++k)
+            *dot += a[k] * b[k];
     }
 }
 
+// number of elements accumulated serially by a task, the blocks do not depend on the
+// number of threads so that floating point results are reproducible
+const int REDUCE_BLOCK_SIZE = 4096;
+
+// reduces count elements into out_length scalars
+//  - accumulate_block(begin, end, sum) accumulates the elements [begin, end) into sum
+//  - block sums are combined pairwise in a fixed order
+template <typename T, typename Func>
+void blocked_reduce(int count, T *ptr_out, int out_length, const Func &accumulate_block)
+{
+    const int num_blocks = (count + REDUCE_BLOCK_SIZE - 1) / REDUCE_BLOCK_SIZE;
+
+    if (num_blocks <= 1)
+    {
+        memset(ptr_out, 0, sizeof(T) * out_length);
+        accumulate_block(0, count, ptr_out);
+        return;
+    }
+
+    std::vector<T> partial_sums(size_t(num_blocks) * out_length, T(0));
+
+    wp::parallel_for(num_blocks, [&](size_t begin, size_t end)
+    {
+        for (size_t block = begin; block < end; ++block)
+        {
+            const int block_end = std::min(count, int(block + 1) * REDUCE_BLOCK_SIZE);
+            accumulate_block(int(block) * REDUCE_BLOCK_SIZE, block_end, &partial_sums[block * out_length]);
+        }
+    }, 0, 1);
+
+    for (int width = 1; width < num_blocks; width *= 2)
+    {
+        for (int block = 0; block + width < num_blocks; block += 2 * width)
+        {
+            dyn_len_sum(&partial_sums[size_t(block + width) * out_length], 0, 1, &partial_sums[size_t(block) * out_length], out_length);
+        }
+    }
+
+    memcpy(ptr_out, partial_sums.data(), sizeof(T) * out_length);
+}
+
 } // namespace
 
 template <typename T>
@@ -47,7 +109,7 @@ void array_inner_host(const T *ptr_a, const T *ptr_b, T *ptr_out, int count, int
     const int stride_a = byte_stride_a / sizeof(T);
     const int stride_b = byte_stride_b / sizeof(T);
 
-    void (*inner_func)(const T *, const T *, T *, int);
+    void (*inner_func)(const T *, int, const T *, int, int, T *, int);
     switch (type_length)
     {
     case 1:
@@ -66,11 +128,10 @@ void array_inner_host(const T *ptr_a, const T *ptr_b, T *ptr_out, int count, int
         inner_func = dyn_len_inner<T>;
     }
 
-    *ptr_out = 0.0f;
-    for (int i = 0; i < count; ++i)
+    blocked_reduce(count, ptr_out, 1, [&](int begin, int end, T *dot)
     {
-        inner_func(ptr_a + i * stride_a, ptr_b + i * stride_b, ptr_out, type_length);
-    }
+        inner_func(ptr_a + size_t(begin) * stride_a, stride_a, ptr_b + size_t(begin) * stride_b, stride_b, end - begin, dot, type_length);
+    });
 }
 
 template <typename T> void array_sum_host(const T *ptr_a, T *ptr_out, int count, int byte_stride, int type_length)
@@ -78,7 +139,7 @@ template <typename T> void array_sum_host(const T *ptr_a, T *ptr_out, int count,
     assert((byte_stride % sizeof(T)) == 0);
     const int stride = byte_stride / sizeof(T);
 
-    void (*accumulate_func)(const T *, T *, int);
+    void (*accumulate_func)(const T *, int, int, T *, int);
     switch (type_length)
     {
     case 1:
@@ -97,61 +158,44 @@ template <typename T> void array_sum_host(const T *ptr_a, T *ptr_out, int count,
         accumulate_func = dyn_len_sum<T>;
     }
 
-    memset(ptr_out, 0, sizeof(T)*type_length);
-    for (int i = 0; i < count; ++i)
-        accumulate_func(ptr_a + i * stride, ptr_out, type_length);
-}
-
-void array_inner_float_host(uint64_t a, uint64_t b, uint64_t out, int count, int byte_stride_a, int byte_stride_b,
-                            int type_length)
-{
-    const float *ptr_a = (const float *)(a);
-    const float *ptr_b = (const float *)(b);
-    float *ptr_out = (float *)(out);
-
-    array_inner_host(ptr_a, ptr_b, ptr_out, count, byte_stride_a, byte_stride_b, type_length);
-}
-
-void array_inner_double_host(uint64_t a, uint64_t b, uint64_t out, int count, int byte_stride_a, int byte_stride_b,
-                             int type_length)
-{
-    const double *ptr_a = (const double *)(a);
-    const double *ptr_b = (const double *)(b);
-    double *ptr_out = (double *)(out);
-
-    array_inner_host(ptr_a, ptr_b, ptr_out, count, byte_stride_a, byte_stride_b, type_length);
+    blocked_reduce(count, ptr_out, type_length, [&](int begin, int end, T *sum)
+    {
+        accumulate_func(ptr_a + size_t(begin) * stride, stride, end - begin, sum, type_length);
+    });
 }
 
-void array_sum_float_host(uint64_t a, uint64_t out, int count, int byte_stride_a, int type_length)
-{
-    const float *ptr_a = (const float *)(a);
-    float *ptr_out = (float *)(out);
-    array_sum_host(ptr_a, ptr_out, count, byte_stride_a, type_length);
-}
+#define WP_DECLARE_REDUCE_HOST(Name, T) \
+    void array_inner_##Name##_host(uint64_t a, uint64_t b, uint64_t out, int count, int byte_stride_a, \
+                                   int byte_stride_b, int type_length) \
+    { \
+        array_inner_host((const T *)(a), (const T *)(b), (T *)(out), count, byte_stride_a, byte_stride_b, type_length); \
+    } \
+    void array_sum_##Name##_host(uint64_t a, uint64_t out, int count, int byte_stride_a, int type_length) \
+    { \
+        array_sum_host((const T *)(a), (T *)(out), count, byte_stride_a, type_length); \
+    }
 
-void array_sum_double_host(uint64_t a, uint64_t out, int count, int byte_stride_a, int type_length)
-{
-    const double *ptr_a = (const double *)(a);
-    double *ptr_out = (double *)(out);
-    array_sum_host(ptr_a, ptr_out, count, byte_stride_a, type_length);
-}
+WP_DECLARE_REDUCE_HOST(int, int)
+WP_DECLARE_REDUCE_HOST(uint, unsigned int)
+WP_DECLARE_REDUCE_HOST(int64, int64_t)
+WP_DECLARE_REDUCE_HOST(uint64, uint64_t)
+WP_DECLARE_REDUCE_HOST(float, float)
+WP_DECLARE_REDUCE_HOST(double, double)
 
 #if !WP_ENABLE_CUDA
-void array_inner_float_device(uint64_t a, uint64_t b, uint64_t out, int count, int byte_stride_a, int byte_stride_b,
-                              int type_length)
-{
-}
-
-void array_inner_double_device(uint64_t a, uint64_t b, uint64_t out, int count, int byte_stride_a, int byte_stride_b,
-                               int type_length)
-{
-}
-
-void array_sum_float_device(uint64_t a, uint64_t out, int count, int byte_stride_a, int type_length)
-{
-}
+#define WP_DECLARE_REDUCE_DEVICE(Name) \
+    void array_inner_##Name##_device(uint64_t a, uint64_t b, uint64_t out, int count, int byte_stride_a, \
+                                     int byte_stride_b, int type_length) \
+    { \
+    } \
+    void array_sum_##Name##_device(uint64_t a, uint64_t out, int count, int byte_stride_a, int type_length) \
+    { \
+    }
 
-void array_sum_double_device(uint64_t a, uint64_t out, int count, int byte_stride_a, int type_length)
-{
-}
-#endif
\ No newline at end of file
+WP_DECLARE_REDUCE_DEVICE(int)
+WP_DECLARE_REDUCE_DEVICE(uint)
+WP_DECLARE_REDUCE_DEVICE(int64)
+WP_DECLARE_REDUCE_DEVICE(uint64)
+WP_DECLARE_REDUCE_DEVICE(float)
+WP_DECLARE_REDUCE_DEVICE(double)
+#endif
@@ -311,38 +311,21 @@ void array_inner_device_dispatch(const T *ptr_a, const T *ptr_b, T *ptr_out, int
 
 } // anonymous namespace
 
-void array_inner_float_device(uint64_t a, uint64_t b, uint64_t out, int count, int byte_stride_a, int byte_stride_b,
-                              int type_len)
-{
-    void *context = cuda_context_get_current();
-
-    const float *ptr_a = (const float *)(a);
-    const float *ptr_b = (const float *)(b);
-    float *ptr_out = (float *)(out);
-
-    array_inner_device_dispatch(ptr_a, ptr_b, ptr_out, count, byte_stride_a, byte_stride_b, type_len);
-}
-
-void array_inner_double_device(uint64_t a, uint64_t b, uint64_t out, int count, int byte_stride_a, int byte_stride_b,
-                               int type_len)
-{
-    const double *ptr_a = (const double *)(a);
-    const double *ptr_b = (const double *)(b);
-    double *ptr_out = (double *)(out);
-
-    array_inner_device_dispatch(ptr_a, ptr_b, ptr_out, count, byte_stride_a, byte_stride_b, type_len);
-}
-
-void array_sum_float_device(uint64_t a, uint64_t out, int count, int byte_stride, int type_length)
-{
-    const float *ptr_a = (const float *)(a);
-    float *ptr_out = (float *)(out);
-    array_sum_device_dispatch(ptr_a, ptr_out, count, byte_stride, type_length);
-}
+#define WP_DECLARE_REDUCE_DEVICE(Name, T) \
+    void array_inner_##Name##_device(uint64_t a, uint64_t b, uint64_t out, int count, int byte_stride_a, \
+                                     int byte_stride_b, int type_len) \
+    { \
+        array_inner_device_dispatch((const T *)(a), (const T *)(b), (T *)(out), count, byte_stride_a, byte_stride_b, \
+                                    type_len); \
+    } \
+    void array_sum_##Name##_device(uint64_t a, uint64_t out, int count, int byte_stride, int type_length) \
+    { \
+        array_sum_device_dispatch((const T *)(a), (T *)(out), count, byte_stride, type_length); \
+    }
 
-void array_sum_double_device(uint64_t a, uint64_t out, int count, int byte_stride, int type_length)
-{
-    const double *ptr_a = (const double *)(a);
-    double *ptr_out = (double *)(out);
-    array_sum_device_dispatch(ptr_a, ptr_out, count, byte_stride, type_length);
-}
+WP_DECLARE_REDUCE_DEVICE(int, int)
+WP_DECLARE_REDUCE_DEVICE(uint, unsigned int)
+WP_DECLARE_REDUCE_DEVICE(int64, int64_t)
+WP_DECLARE_REDUCE_DEVICE(uint64, uint64_t)
+WP_DECLARE_REDUCE_DEVICE(float, float)
+WP_DECLARE_REDUCE_DEVICE(double, double)
@@ -1,62 +1,174 @@
 #include "warp.h"
+#include "thread_pool.h"
 
+#include <algorithm>
 #include <cstdint>
+#include <vector>
 
-template <typename T>
-void runlength_encode_host(int n,
-                           const T *values,
-                           T *run_values,
-                           int *run_lengths,
-                           int *run_count)
+namespace
 {
-    if (n == 0)
+
+// number of values processed serially by a task
+const int RLE_BLOCK_SIZE = 16384;
+
+// FixedLength > 0 lets the compiler unroll the comparison of scalar values
+template <int FixedLength, typename T>
+bool runlength_is_head(const T *values, int i, int type_length)
+{
+    const int length = FixedLength > 0 ? FixedLength : type_length;
+
+    if (i == 0)
+        return true;
+
+    for (int c = 0; c < length; ++c)
     {
-        *run_count = 0;
-        return;
+        if (!(values[size_t(i) * length + c] == values[size_t(i - 1) * length + c]))
+            return true;
     }
 
-    const T *end = values + n;
+    return false;
+}
 
-    *run_count = 1;
-    *run_lengths = 1;
-    *run_values = *values;
+template <int FixedLength, typename T>
+void runlength_encode_blocks(int n,
+                             const T *values,
+                             T *run_values,
+                             int *run_lengths,
+                             int *run_count,
+                             int type_length)
+{
+    const int num_blocks = (n + RLE_BLOCK_SIZE - 1) / RLE_BLOCK_SIZE;
+
+    // count the runs starting in each block
+    std::vector<int> block_offsets(num_blocks);
 
-    while (++values != end)
+    wp::parallel_for(num_blocks, [&](size_t begin, size_t end)
     {
-        if (*values == *run_values)
+        for (size_t block = begin; block < end; ++block)
         {
-            ++*run_lengths;
+            const int block_end = std::min(n, int(block + 1) * RLE_BLOCK_SIZE);
+
+            int count = 0;
+            for (int i = int(block) * RLE_BLOCK_SIZE; i < block_end; ++i)
+                count += runlength_is_head<FixedLength>(values, i, type_length);
+
+            block_offsets[block] = count;
         }
-        else
+    }, 0, 1);
+
+    // index of the first run of each block
+    int total = 0;
+    for (int block = 0; block < num_blocks; ++block)
+    {
+        const int count = block_offsets[block];
+        block_offsets[block] = total;
+        total += count;
+    }
+
+    // write the runs starting in each block, the last run of a block may extend past its end
+    // but only up to the next block with a run start so the total work stays linear
+    wp::parallel_for(num_blocks, [&](size_t begin, size_t end)
+    {
+        for (size_t block = begin; block < end; ++block)
         {
-            ++*run_count;
-            *(++run_lengths) = 1;
-            *(++run_values) = *values;
+            const int block_end = std::min(n, int(block + 1) * RLE_BLOCK_SIZE);
+
+            int run = block_offsets[block];
+            int run_start = -1;
+
+            for (int i = int(block) * RLE_BLOCK_SIZE; i < block_end; ++i)
+            {
+                if (!runlength_is_head<FixedLength>(values, i, type_length))
+                    continue;
+
+                if (run_start >= 0)
+                    run_lengths[run - 1] = i - run_start;
+
+                for (int c = 0; c < type_length; ++c)
+                    run_values[size_t(run) * type_length + c] = values[size_t(i) * type_length + c];
+
+                run_start = i;
+                ++run;
+            }
+
+            if (run_start >= 0)
+            {
+                int run_end = block_end;
+                while (run_end < n && !runlength_is_head<FixedLength>(values, run_end, type_length))
+                    ++run_end;
+
+                run_lengths[run - 1] = run_end - run_start;
+            }
         }
-    }
+    }, 0, 1);
+
+    *run_count = total;
 }
 
-void runlength_encode_int_host(
-    uint64_t values,
-    uint64_t run_values,
-    uint64_t run_lengths,
-    uint64_t run_count,
-    int n)
+} // anonymous namespace
+
+// values are made of type_length components, a run ends as soon as one component differs
+template <typename T>
+void runlength_encode_host(int n,
+                           const T *values,
+                           T *run_values,
+                           int *run_lengths,
+                           int *run_count,
+                           int type_length)
 {
-    runlength_encode_host<int>(n,
-                               reinterpret_cast<const int *>(values),
-                               reinterpret_cast<int *>(run_values),
-                               reinterpret_cast<int *>(run_lengths),
-                               reinterpret_cast<int *>(run_count));
+    if (n == 0)
+    {
+        *run_count = 0;
+        return;
+    }
+
+    if (type_length == 1)
+        runlength_encode_blocks<1>(n, values, run_values, run_lengths, run_count, type_length);
+    else
+        runlength_encode_blocks<0>(n, values, run_values, run_lengths, run_count, type_length);
 }
 
+#define WP_DECLARE_RUNLENGTH_ENCODE_HOST(Name, T) \
+    void runlength_encode_##Name##_host( \
+        uint64_t values, \
+        uint64_t run_values, \
+        uint64_t run_lengths, \
+        uint64_t run_count, \
+        int n, \
+        int type_length) \
+    { \
+        runlength_encode_host<T>(n, \
+                                 reinterpret_cast<const T *>(values), \
+                                 reinterpret_cast<T *>(run_values), \
+                                 reinterpret_cast<int *>(run_lengths), \
+                                 reinterpret_cast<int *>(run_count), \
+                                 type_length); \
+    }
+
+WP_DECLARE_RUNLENGTH_ENCODE_HOST(int, int)
+WP_DECLARE_RUNLENGTH_ENCODE_HOST(uint, unsigned int)
+WP_DECLARE_RUNLENGTH_ENCODE_HOST(int64, int64_t)
+WP_DECLARE_RUNLENGTH_ENCODE_HOST(uint64, uint64_t)
+WP_DECLARE_RUNLENGTH_ENCODE_HOST(float, float)
+WP_DECLARE_RUNLENGTH_ENCODE_HOST(double, double)
+
 #if !WP_ENABLE_CUDA
-void runlength_encode_int_device(
-    uint64_t values,
-    uint64_t run_values,
-    uint64_t run_lengths,
-    uint64_t run_count,
-    int n)
-{
-}
-#endif
\ No newline at end of file
+
+#define WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(Name, T) \
+    void runlength_encode_##Name##_device( \
+        uint64_t values, \
+        uint64_t run_values, \
+        uint64_t run_lengths, \
+        uint64_t run_count, \
+        int n) \
+    { \
+    }
+
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(int, int)
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(uint, unsigned int)
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(int64, int64_t)
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(uint64, uint64_t)
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(float, float)
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(double, double)
+
+#endif
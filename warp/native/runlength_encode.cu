@@ -30,17 +30,25 @@ void runlength_encode_device(int n,
     free_temp_device(WP_CURRENT_CONTEXT, temp_buffer);
 }
 
-void runlength_encode_int_device(
-    uint64_t values,
-    uint64_t run_values,
-    uint64_t run_lengths,
-    uint64_t run_count,
-    int n)
-{
-    return runlength_encode_device<int>(
-        n,
-        reinterpret_cast<const int *>(values),
-        reinterpret_cast<int *>(run_values),
-        reinterpret_cast<int *>(run_lengths),
-        reinterpret_cast<int *>(run_count));
-}
+#define WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(Name, T) \
+    void runlength_encode_##Name##_device( \
+        uint64_t values, \
+        uint64_t run_values, \
+        uint64_t run_lengths, \
+        uint64_t run_count, \
+        int n) \
+    { \
+        return runlength_encode_device<T>( \
+            n, \
+            reinterpret_cast<const T *>(values), \
+            reinterpret_cast<T *>(run_values), \
+            reinterpret_cast<int *>(run_lengths), \
+            reinterpret_cast<int *>(run_count)); \
+    }
+
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(int, int)
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(uint, unsigned int)
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(int64, int64_t)
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(uint64, uint64_t)
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(float, float)
+WP_DECLARE_RUNLENGTH_ENCODE_DEVICE(double, double)
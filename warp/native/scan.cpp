@@ -1,30 +1,129 @@
 #include "scan.h"
+#include "thread_pool.h"
 
-#include <numeric>
+#include <algorithm>
+#include <vector>
 
+namespace
+{
+
+// number of elements scanned serially by a task, the blocks do not depend on the
+// number of threads so that floating point results are reproducible
+const int SCAN_BLOCK_SIZE = 16384;
+
+// scans the elements [begin, end) starting from the running sums in offset
 template<typename T>
-void scan_host(const T* values_in, T* values_out, int n, bool inclusive)
+void scan_block(const T* values_in, T* values_out, int begin, int end, bool inclusive, int type_length, T* offset)
 {
-    static void* scan_temp_memory = NULL;
-    static size_t scan_temp_max_size = 0;
+    if (type_length == 1)
+    {
+        // keep the running sum in a register
+        T sum = *offset;
+
+        if (inclusive)
+        {
+            for (int i=begin; i < end; ++i)
+            {
+                sum += values_in[i];
+                values_out[i] = sum;
+            }
+        }
+        else
+        {
+            for (int i=begin; i < end; ++i)
+            {
+                const T value = values_in[i];
+                values_out[i] = sum;
+                sum += value;
+            }
+        }
+
+        *offset = sum;
+        return;
+    }
 
-    // compute temporary memory required
-    if (!inclusive && n > scan_temp_max_size)
+    for (int i=begin; i < end; ++i)
     {
-	    free_host(scan_temp_memory);
-        scan_temp_memory = alloc_host(sizeof(T) * n);
-        scan_temp_max_size = n;
+        for (int c=0; c < type_length; ++c)
+        {
+            // read the input first, the scan may be performed in place
+            const T value = values_in[i*type_length + c];
+
+            if (inclusive)
+            {
+                offset[c] += value;
+                values_out[i*type_length + c] = offset[c];
+            }
+            else
+            {
+                values_out[i*type_length + c] = offset[c];
+                offset[c] += value;
+            }
+        }
     }
+}
 
-    T* result = inclusive ? values_out : static_cast<T*>(scan_temp_memory);
+} // anonymous namespace
+
+template<typename T>
+void scan_host(const T* values_in, T* values_out, int n, bool inclusive, int type_length)
+{
+    if (n <= 0)
+        return;
 
-    // scan
-    std::partial_sum(values_in, values_in + n, result);
-    if (!inclusive) {
-        values_out[0] = (T)0;
-        memcpy_h2h(values_out + 1, result, sizeof(T) * (n - 1));
+    const int num_blocks = (n + SCAN_BLOCK_SIZE - 1) / SCAN_BLOCK_SIZE;
+
+    // block offsets, one per component
+    std::vector<T> offsets(size_t(num_blocks) * type_length, T(0));
+
+    if (num_blocks == 1)
+    {
+        scan_block(values_in, values_out, 0, n, inclusive, type_length, offsets.data());
+        return;
     }
+
+    // sum each block
+    wp::parallel_for(num_blocks, [&](size_t begin, size_t end)
+    {
+        for (size_t block=begin; block < end; ++block)
+        {
+            T* sum = &offsets[block * type_length];
+
+            const int block_end = std::min(n, int(block + 1) * SCAN_BLOCK_SIZE);
+            for (int i=int(block) * SCAN_BLOCK_SIZE; i < block_end; ++i)
+            {
+                for (int c=0; c < type_length; ++c)
+                    sum[c] += values_in[i*type_length + c];
+            }
+        }
+    }, 0, 1);
+
+    // exclusive scan of the block sums
+    std::vector<T> running(type_length, T(0));
+    for (int block=0; block < num_blocks; ++block)
+    {
+        for (int c=0; c < type_length; ++c)
+        {
+            const T sum = offsets[block * type_length + c];
+            offsets[block * type_length + c] = running[c];
+            running[c] += sum;
+        }
+    }
+
+    // scan each block from its offset
+    wp::parallel_for(num_blocks, [&](size_t begin, size_t end)
+    {
+        for (size_t block=begin; block < end; ++block)
+        {
+            const int block_end = std::min(n, int(block + 1) * SCAN_BLOCK_SIZE);
+            scan_block(values_in, values_out, int(block) * SCAN_BLOCK_SIZE, block_end, inclusive, type_length, &offsets[block * type_length]);
+        }
+    }, 0, 1);
 }
 
-template void scan_host(const int*, int*, int, bool);
-template void scan_host(const float*, float*, int, bool);
+template void scan_host(const int*, int*, int, bool, int);
+template void scan_host(const unsigned int*, unsigned int*, int, bool, int);
+template void scan_host(const int64_t*, int64_t*, int, bool, int);
+template void scan_host(const uint64_t*, uint64_t*, int, bool, int);
+template void scan_host(const float*, float*, int, bool, int);
+template void scan_host(const double*, double*, int, bool, int);
@@ -33,4 +33,8 @@ void scan_device(const T* values_in, T* values_out, int n, bool inclusive)
 }
 
 template void scan_device(const int*, int*, int, bool);
+template void scan_device(const unsigned int*, unsigned int*, int, bool);
+template void scan_device(const int64_t*, int64_t*, int, bool);
+template void scan_device(const uint64_t*, uint64_t*, int, bool);
 template void scan_device(const float*, float*, int, bool);
+template void scan_device(const double*, double*, int, bool);
@@ -1,7 +1,13 @@
 #pragma once
 
+#include <stdint.h>
+
+// the scans are instantiated for int, unsigned int, int64_t, uint64_t, float and double values
+//  - host scans operate on n elements of type_length components each, every component is scanned independently
+//  - host results only depend on n, not on the number of threads
+
 template<typename T>
-void scan_host(const T* values_in, T* values_out, int n, bool inclusive = true);
+void scan_host(const T* values_in, T* values_out, int n, bool inclusive = true, int type_length = 1);
 template<typename T>
 void scan_device(const T* values_in, T* values_out, int n, bool inclusive = true);
 
@@ -8,87 +8,274 @@
 
 #include "warp.h"
 #include "sort.h"
+#include "thread_pool.h"
 #include "string.h"
 
+#include <algorithm>
 #include <cstdint>
+#include <vector>
 
-void radix_sort_pairs_host(int* keys, int* values, int n)
+namespace
 {
-	static int tables[2][1 << 16];
-	memset(tables, 0, sizeof(tables));
-		
-	int* auxKeys = keys + n;
-	int* auxValues = values + n;
-
-	// build histograms
-	for (int i=0; i < n; ++i)
-	{
-		const unsigned short low = keys[i] & 0xffff;
-		const unsigned short high = keys[i] >> 16;
-		
-		++tables[0][low];
-		++tables[1][high];
-	}
-	
-	// convert histograms to offset tables in-place
-	int offlow = 0;
-	int offhigh = 0;
-	
-	for (int i=0; i < 65536; ++i)
-	{
-		const int newofflow = offlow + tables[0][i];
-		const int newoffhigh = offhigh + tables[1][i];
-		
-		tables[0][i] = offlow;
-		tables[1][i] = offhigh;
-		
-		offlow = newofflow;
-		offhigh = newoffhigh;
-	}
-		
-	// pass 1 - sort by low 16 bits
-	for (int i=0; i < n; ++i)
-	{
-		// lookup offset of input
-		const int k = keys[i];
-		const int v = values[i];
-		const int b = k & 0xffff;
-		
-		// find offset and increment
-		const int offset = tables[0][b]++;
-		
-		auxKeys[offset] = k;
-		auxValues[offset] = v;
-	}	
-		
-	// pass 2 - sort by high 16 bits
-	for (int i=0; i < n; ++i)
-	{
-		// lookup offset of input
-		const int k = auxKeys[i];
-		const int v = auxValues[i];
-
-		const int b = k >> 16;
-		
-		const int offset = tables[1][b]++;
-		
-		keys[offset] = k;
-		values[offset] = v;
-	}	
+
+// maps keys to unsigned integers with the same order
+template <typename KeyType> struct RadixKey;
+
+template <> struct RadixKey<int>
+{
+    typedef uint32_t Bits;
+    static Bits to_bits(int k) { return uint32_t(k) ^ 0x80000000u; }
+};
+
+template <> struct RadixKey<unsigned int>
+{
+    typedef uint32_t Bits;
+    static Bits to_bits(unsigned int k) { return k; }
+};
+
+template <> struct RadixKey<int64_t>
+{
+    typedef uint64_t Bits;
+    static Bits to_bits(int64_t k) { return uint64_t(k) ^ 0x8000000000000000ull; }
+};
+
+template <> struct RadixKey<uint64_t>
+{
+    typedef uint64_t Bits;
+    static Bits to_bits(uint64_t k) { return k; }
+};
+
+template <> struct RadixKey<float>
+{
+    typedef uint32_t Bits;
+    static Bits to_bits(float k)
+    {
+        // negative numbers are flipped entirely so that their order is reversed
+        uint32_t u;
+        memcpy(&u, &k, sizeof(u));
+        return (u & 0x80000000u) ? ~u : u ^ 0x80000000u;
+    }
+};
+
+// number of key bits sorted per pass
+const int RADIX_BITS = 8;
+const int RADIX_SIZE = 1 << RADIX_BITS;
+
+// minimum number of keys in a block, each block has its own histogram
+const int RADIX_MIN_BLOCK_SIZE = 16384;
+
+// segments up to this size are sorted by insertion
+const int INSERTION_SORT_MAX_SIZE = 32;
+
+template <typename KeyType>
+void insertion_sort_pairs(KeyType* keys, int* values, int n, int begin_bit, int end_bit)
+{
+    typedef typename RadixKey<KeyType>::Bits Bits;
+
+    const int key_bits = int(sizeof(KeyType) * 8);
+    const Bits mask = (end_bit - begin_bit == key_bits) ? ~Bits(0) : ((Bits(1) << (end_bit - begin_bit)) - 1) << begin_bit;
+
+    for (int i=1; i < n; ++i)
+    {
+        const KeyType k = keys[i];
+        const int v = values[i];
+        const Bits b = RadixKey<KeyType>::to_bits(k) & mask;
+
+        int j = i;
+        for (; j > 0 && (RadixKey<KeyType>::to_bits(keys[j-1]) & mask) > b; --j)
+        {
+            keys[j] = keys[j-1];
+            values[j] = values[j-1];
+        }
+
+        keys[j] = k;
+        values[j] = v;
+    }
 }
 
+// LSD radix sort of n pairs split into num_blocks blocks, the blocks are processed in parallel
+// and each pass scatters them in order so that the result does not depend on the number of blocks
+template <typename KeyType>
+void radix_sort_pairs_blocks(KeyType* keys, int* values, KeyType* aux_keys, int* aux_values, int n, int begin_bit, int end_bit, int num_blocks)
+{
+    typedef typename RadixKey<KeyType>::Bits Bits;
+
+    const int block_size = (n + num_blocks - 1) / num_blocks;
+
+    std::vector<int> histograms(size_t(num_blocks) * RADIX_SIZE);
+
+    KeyType* src_keys = keys;
+    int* src_values = values;
+    KeyType* dst_keys = aux_keys;
+    int* dst_values = aux_values;
+
+    for (int shift=begin_bit; shift < end_bit; shift += RADIX_BITS)
+    {
+        const Bits mask = (Bits(1) << std::min(RADIX_BITS, end_bit - shift)) - 1;
+
+        // count the digits of each block
+        wp::parallel_for(num_blocks, [&](size_t begin, size_t end)
+        {
+            for (size_t block=begin; block < end; ++block)
+            {
+                int* histogram = &histograms[block * RADIX_SIZE];
+                std::fill(histogram, histogram + RADIX_SIZE, 0);
+
+                const int block_end = std::min(n, int(block + 1) * block_size);
+                for (int i=int(block) * block_size; i < block_end; ++i)
+                    ++histogram[(RadixKey<KeyType>::to_bits(src_keys[i]) >> shift) & mask];
+            }
+        }, 0, 1);
+
+        // convert the histograms to offsets, digits are ordered first and blocks second
+        bool skip_pass = false;
+        int offset = 0;
+
+        for (int digit=0; digit < RADIX_SIZE; ++digit)
+        {
+            const int digit_start = offset;
+
+            for (int block=0; block < num_blocks; ++block)
+            {
+                int& count = histograms[block * RADIX_SIZE + digit];
+                const int next_offset = offset + count;
+                count = offset;
+                offset = next_offset;
+            }
+
+            // all keys have the same digit, the order is unchanged
+            if (offset - digit_start == n)
+                skip_pass = true;
+        }
+
+        if (skip_pass)
+            continue;
+
+        // scatter the pairs
+        wp::parallel_for(num_blocks, [&](size_t begin, size_t end)
+        {
+            for (size_t block=begin; block < end; ++block)
+            {
+                int* offsets = &histograms[block * RADIX_SIZE];
+
+                const int block_end = std::min(n, int(block + 1) * block_size);
+                for (int i=int(block) * block_size; i < block_end; ++i)
+                {
+                    const int o = offsets[(RadixKey<KeyType>::to_bits(src_keys[i]) >> shift) & mask]++;
+                    dst_keys[o] = src_keys[i];
+                    dst_values[o] = src_values[i];
+                }
+            }
+        }, 0, 1);
+
+        std::swap(src_keys, dst_keys);
+        std::swap(src_values, dst_values);
+    }
+
+    if (src_keys != keys)
+    {
+        memcpy(keys, src_keys, sizeof(KeyType) * n);
+        memcpy(values, src_values, sizeof(int) * n);
+    }
+}
+
+template <typename KeyType>
+bool clamp_bit_range(int& begin_bit, int& end_bit)
+{
+    begin_bit = std::max(begin_bit, 0);
+    end_bit = std::min(end_bit, int(sizeof(KeyType) * 8));
+
+    return begin_bit < end_bit;
+}
+
+} // anonymous namespace
+
+
+template <typename KeyType>
+void radix_sort_pairs_host(KeyType* keys, int* values, int n, int begin_bit, int end_bit)
+{
+    if (n <= 1 || !clamp_bit_range<KeyType>(begin_bit, end_bit))
+        return;
+
+    const int num_blocks = std::max(1, std::min(wp::cpu_default_thread_count(), n / RADIX_MIN_BLOCK_SIZE));
+
+    radix_sort_pairs_blocks(keys, values, keys + n, values + n, n, begin_bit, end_bit, num_blocks);
+}
+
+template <typename KeyType>
+void segmented_sort_pairs_host(KeyType* keys, int* values, int n, const int* segment_start_indices, const int* segment_end_indices, int num_segments, int begin_bit, int end_bit)
+{
+    if (n <= 1 || !clamp_bit_range<KeyType>(begin_bit, end_bit))
+        return;
+
+    // segments are sorted serially and in parallel with each other
+    wp::parallel_for(num_segments, [&](size_t begin, size_t end)
+    {
+        for (size_t segment=begin; segment < end; ++segment)
+        {
+            const int start = segment_start_indices[segment];
+            const int count = segment_end_indices[segment] - start;
+
+            if (count <= 1)
+                continue;
+
+            if (count <= INSERTION_SORT_MAX_SIZE)
+                insertion_sort_pairs(keys + start, values + start, count, begin_bit, end_bit);
+            else
+                radix_sort_pairs_blocks(keys + start, values + start, keys + n + start, values + n + start, count, begin_bit, end_bit, 1);
+        }
+    });
+}
+
+#define WP_DECLARE_SORT_HOST(KeyType) \
+    template void radix_sort_pairs_host<KeyType>(KeyType* keys, int* values, int n, int begin_bit, int end_bit); \
+    template void segmented_sort_pairs_host<KeyType>(KeyType* keys, int* values, int n, const int* segment_start_indices, const int* segment_end_indices, int num_segments, int begin_bit, int end_bit);
+
+WP_DECLARE_SORT_HOST(int)
+WP_DECLARE_SORT_HOST(unsigned int)
+WP_DECLARE_SORT_HOST(int64_t)
+WP_DECLARE_SORT_HOST(uint64_t)
+WP_DECLARE_SORT_HOST(float)
+
+
 #if !WP_ENABLE_CUDA
 
+template <typename KeyType>
 void radix_sort_reserve(void* context, int n, void** mem_out, size_t* size_out) {}
 
-void radix_sort_pairs_int_device(uint64_t keys, uint64_t values, int n) {}
+template void radix_sort_reserve<int>(void* context, int n, void** mem_out, size_t* size_out);
+
+#define WP_DECLARE_SORT_DEVICE(Name, KeyType) \
+    void radix_sort_pairs_##Name##_device(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit) {} \
+    void segmented_sort_pairs_##Name##_device(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit) {}
+
+WP_DECLARE_SORT_DEVICE(int, int)
+WP_DECLARE_SORT_DEVICE(uint, unsigned int)
+WP_DECLARE_SORT_DEVICE(int64, int64_t)
+WP_DECLARE_SORT_DEVICE(uint64, uint64_t)
+WP_DECLARE_SORT_DEVICE(float, float)
 
 #endif // !WP_ENABLE_CUDA
 
 
-void radix_sort_pairs_int_host(uint64_t keys, uint64_t values, int n)
-{
-    radix_sort_pairs_host(
-        reinterpret_cast<int *>(keys),
-        reinterpret_cast<int *>(values), n);
-}
+#define WP_DECLARE_SORT_API_HOST(Name, KeyType) \
+    void radix_sort_pairs_##Name##_host(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit) \
+    { \
+        radix_sort_pairs_host( \
+            reinterpret_cast<KeyType *>(keys), \
+            reinterpret_cast<int *>(values), n, begin_bit, end_bit); \
+    } \
+    void segmented_sort_pairs_##Name##_host(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit) \
+    { \
+        segmented_sort_pairs_host( \
+            reinterpret_cast<KeyType *>(keys), \
+            reinterpret_cast<int *>(values), n, \
+            reinterpret_cast<const int *>(segment_start_indices), \
+            reinterpret_cast<const int *>(segment_end_indices), num_segments, begin_bit, end_bit); \
+    }
+
+WP_DECLARE_SORT_API_HOST(int, int)
+WP_DECLARE_SORT_API_HOST(uint, unsigned int)
+WP_DECLARE_SORT_API_HOST(int64, int64_t)
+WP_DECLARE_SORT_API_HOST(uint64, uint64_t)
+WP_DECLARE_SORT_API_HOST(float, float)
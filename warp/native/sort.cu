@@ -27,11 +27,30 @@ struct RadixSortTemp
 static std::map<void*, RadixSortTemp> g_radix_sort_temp_map;
 
 
+// grows the temporary buffer of the current context to at least size bytes
+static RadixSortTemp& radix_sort_temp(void* context, size_t size)
+{
+    if (!context)
+        context = cuda_context_get_current();
+
+    RadixSortTemp& temp = g_radix_sort_temp_map[context];
+
+    if (size > temp.size)
+    {
+	    free_device(WP_CURRENT_CONTEXT, temp.mem);
+        temp.mem = alloc_device(WP_CURRENT_CONTEXT, size);
+        temp.size = size;
+    }
+
+    return temp;
+}
+
+template <typename KeyType>
 void radix_sort_reserve(void* context, int n, void** mem_out, size_t* size_out)
 {
     ContextGuard guard(context);
 
-    cub::DoubleBuffer<int> d_keys;
+    cub::DoubleBuffer<KeyType> d_keys;
 	cub::DoubleBuffer<int> d_values;
 
     // compute temporary memory required
@@ -41,57 +60,107 @@ void radix_sort_reserve(void* context, int n, void** mem_out, size_t* size_out)
         sort_temp_size,
         d_keys,
         d_values,
-        n, 0, 32,
+        n, 0, int(sizeof(KeyType)*8),
         (cudaStream_t)cuda_stream_get_current()));
 
-    if (!context)
-        context = cuda_context_get_current();
-
-    RadixSortTemp& temp = g_radix_sort_temp_map[context];
+    RadixSortTemp& temp = radix_sort_temp(context, sort_temp_size);
 
-    if (sort_temp_size > temp.size)
-    {
-	    free_device(WP_CURRENT_CONTEXT, temp.mem);
-        temp.mem = alloc_device(WP_CURRENT_CONTEXT, sort_temp_size);
-        temp.size = sort_temp_size;
-    }
-    
     if (mem_out)
         *mem_out = temp.mem;
     if (size_out)
         *size_out = temp.size;
 }
 
-void radix_sort_pairs_device(void* context, int* keys, int* values, int n)
+template <typename KeyType>
+void radix_sort_pairs_device(void* context, KeyType* keys, int* values, int n, int begin_bit, int end_bit)
 {
     ContextGuard guard(context);
 
-    cub::DoubleBuffer<int> d_keys(keys, keys + n);
+    cub::DoubleBuffer<KeyType> d_keys(keys, keys + n);
 	cub::DoubleBuffer<int> d_values(values, values + n);
 
     RadixSortTemp temp;
-    radix_sort_reserve(WP_CURRENT_CONTEXT, n, &temp.mem, &temp.size);
+    radix_sort_reserve<KeyType>(WP_CURRENT_CONTEXT, n, &temp.mem, &temp.size);
 
     // sort
     check_cuda(cub::DeviceRadixSort::SortPairs(
         temp.mem,
         temp.size,
-        d_keys, 
-        d_values, 
-        n, 0, 32, 
+        d_keys,
+        d_values,
+        n, begin_bit, end_bit,
         (cudaStream_t)cuda_stream_get_current()));
 
 	if (d_keys.Current() != keys)
-		memcpy_d2d(WP_CURRENT_CONTEXT, keys, d_keys.Current(), sizeof(int)*n);
+		memcpy_d2d(WP_CURRENT_CONTEXT, keys, d_keys.Current(), sizeof(KeyType)*n);
 
 	if (d_values.Current() != values)
 		memcpy_d2d(WP_CURRENT_CONTEXT, values, d_values.Current(), sizeof(int)*n);
 }
 
-void radix_sort_pairs_int_device(uint64_t keys, uint64_t values, int n)
+template <typename KeyType>
+void segmented_sort_pairs_device(void* context, KeyType* keys, int* values, int n, const int* segment_start_indices, const int* segment_end_indices, int num_segments, int begin_bit, int end_bit)
 {
-    radix_sort_pairs_device(
-        WP_CURRENT_CONTEXT,
-        reinterpret_cast<int *>(keys),
-        reinterpret_cast<int *>(values), n);
+    ContextGuard guard(context);
+
+    cub::DoubleBuffer<KeyType> d_keys(keys, keys + n);
+	cub::DoubleBuffer<int> d_values(values, values + n);
+
+    // compute temporary memory required
+	size_t sort_temp_size;
+    check_cuda(cub::DeviceSegmentedRadixSort::SortPairs(
+        NULL,
+        sort_temp_size,
+        d_keys,
+        d_values,
+        n, num_segments,
+        segment_start_indices, segment_end_indices,
+        begin_bit, end_bit,
+        (cudaStream_t)cuda_stream_get_current()));
+
+    RadixSortTemp& temp = radix_sort_temp(WP_CURRENT_CONTEXT, sort_temp_size);
+
+    // sort
+    check_cuda(cub::DeviceSegmentedRadixSort::SortPairs(
+        temp.mem,
+        sort_temp_size,
+        d_keys,
+        d_values,
+        n, num_segments,
+        segment_start_indices, segment_end_indices,
+        begin_bit, end_bit,
+        (cudaStream_t)cuda_stream_get_current()));
+
+	if (d_keys.Current() != keys)
+		memcpy_d2d(WP_CURRENT_CONTEXT, keys, d_keys.Current(), sizeof(KeyType)*n);
+
+	if (d_values.Current() != values)
+		memcpy_d2d(WP_CURRENT_CONTEXT, values, d_values.Current(), sizeof(int)*n);
 }
+
+#define WP_DECLARE_SORT_DEVICE(Name, KeyType) \
+    template void radix_sort_reserve<KeyType>(void* context, int n, void** mem_out, size_t* size_out); \
+    template void radix_sort_pairs_device<KeyType>(void* context, KeyType* keys, int* values, int n, int begin_bit, int end_bit); \
+    template void segmented_sort_pairs_device<KeyType>(void* context, KeyType* keys, int* values, int n, const int* segment_start_indices, const int* segment_end_indices, int num_segments, int begin_bit, int end_bit); \
+    void radix_sort_pairs_##Name##_device(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit) \
+    { \
+        radix_sort_pairs_device( \
+            WP_CURRENT_CONTEXT, \
+            reinterpret_cast<KeyType *>(keys), \
+            reinterpret_cast<int *>(values), n, begin_bit, end_bit); \
+    } \
+    void segmented_sort_pairs_##Name##_device(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit) \
+    { \
+        segmented_sort_pairs_device( \
+            WP_CURRENT_CONTEXT, \
+            reinterpret_cast<KeyType *>(keys), \
+            reinterpret_cast<int *>(values), n, \
+            reinterpret_cast<const int *>(segment_start_indices), \
+            reinterpret_cast<const int *>(segment_end_indices), num_segments, begin_bit, end_bit); \
+    }
+
+WP_DECLARE_SORT_DEVICE(int, int)
+WP_DECLARE_SORT_DEVICE(uint, unsigned int)
+WP_DECLARE_SORT_DEVICE(int64, int64_t)
+WP_DECLARE_SORT_DEVICE(uint64, uint64_t)
+WP_DECLARE_SORT_DEVICE(float, float)
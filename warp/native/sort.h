@@ -10,6 +10,33 @@
 
 #include <stddef.h>
 
+// the sorts below are instantiated for int, unsigned int, int64_t, uint64_t and float keys
+//  - keys and values must have storage for 2*n elements, the second half is used as temporary memory
+//  - only the key bits in [begin_bit, end_bit) are compared, the sort is stable so that fewer bits skip passes
+//  - the bits of signed and floating point keys are taken from their order-preserving unsigned representation
+
+template <typename KeyType=int>
 void radix_sort_reserve(void* context, int n, void** mem_out=NULL, size_t* size_out=NULL);
-void radix_sort_pairs_host(int* keys, int* values, int n);
-void radix_sort_pairs_device(void* context, int* keys, int* values, int n);
\ No newline at end of file
+
+template <typename KeyType>
+void radix_sort_pairs_host(KeyType* keys, int* values, int n, int begin_bit=0, int end_bit=sizeof(KeyType)*8);
+
+template <typename KeyType>
+void radix_sort_pairs_device(void* context, KeyType* keys, int* values, int n, int begin_bit=0, int end_bit=sizeof(KeyType)*8);
+
+// sorts each segment [segment_start_indices[i], segment_end_indices[i]) of the first n pairs independently
+template <typename KeyType>
+void segmented_sort_pairs_host(KeyType* keys, int* values, int n, const int* segment_start_indices, const int* segment_end_indices, int num_segments, int begin_bit=0, int end_bit=sizeof(KeyType)*8);
+
+template <typename KeyType>
+void segmented_sort_pairs_device(void* context, KeyType* keys, int* values, int n, const int* segment_start_indices, const int* segment_end_indices, int num_segments, int begin_bit=0, int end_bit=sizeof(KeyType)*8);
+
+// number of low bits needed to sort non-negative keys in [0, n)
+inline int radix_sort_bit_count(int n)
+{
+    int bits = 0;
+    while (bits < 31 && (1 << bits) < n)
+        ++bits;
+
+    return bits;
+}
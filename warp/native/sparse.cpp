@@ -1,9 +1,18 @@
 #include "warp.h"
+#include "scan.h"
+#include "sort.h"
+#include "thread_pool.h"
 
 #include <algorithm>
 #include <numeric>
 #include <vector>
 
+// the host BSR functions process blocks of consecutive entries in parallel
+//  - triplets and transposed entries are ordered with the stable radix sort, so blocks at the same
+//    location are accumulated in their input order and the results do not depend on the number of threads
+//  - row offsets are filled from the sorted row indices, each entry filling the offsets of the rows
+//    between its row and the row of the previous entry
+
 namespace
 {
 
@@ -59,6 +68,275 @@ template <typename T> void bsr_dyn_block_transpose(const T *src, T *dest, int ro
     }
 }
 
+// number of entries processed serially by a task
+const int BSR_BLOCK_SIZE = 16384;
+
+int bsr_num_blocks(int n)
+{
+    return (n + BSR_BLOCK_SIZE - 1) / BSR_BLOCK_SIZE;
+}
+
+// runs func(begin, end, block) over the blocks of [0, n) in parallel
+template <typename Func> void bsr_for_each_block(int n, const Func &func)
+{
+    wp::parallel_for(bsr_num_blocks(n), [&](size_t begin, size_t end) {
+        for (size_t block = begin; block < end; ++block)
+        {
+            func(int(block) * BSR_BLOCK_SIZE, std::min(n, int(block + 1) * BSR_BLOCK_SIZE), int(block));
+        }
+    }, 0, 1);
+}
+
+// exclusive scan of the per-block counts, returns the total
+int bsr_scan_block_counts(std::vector<int> &block_counts)
+{
+    int total = 0;
+    for (int &count : block_counts)
+    {
+        const int c = count;
+        count = total;
+        total += c;
+    }
+
+    return total;
+}
+
+// fills offsets[0..row_count] from the sorted rows of the n entries, row(i) returns the row of entry i
+template <typename RowFunc> void bsr_fill_offsets(int n, int row_count, const RowFunc &row, int *offsets)
+{
+    bsr_for_each_block(n, [&](int begin, int end, int block) {
+        for (int i = begin; i < end; ++i)
+        {
+            const int prev_row = i == 0 ? -1 : row(i - 1);
+            for (int r = prev_row + 1; r <= row(i); ++r)
+            {
+                offsets[r] = i;
+            }
+        }
+    });
+
+    for (int r = n == 0 ? 0 : row(n - 1) + 1; r <= row_count; ++r)
+    {
+        offsets[r] = n;
+    }
+}
+
+// symbolic product of the x and y patterns, united with the z pattern if provided
+//  - rows are distributed over tasks that each own a marker array with one entry per column
+//  - func(row, col) is called once for each distinct column of the row
+template <typename Func>
+void bsr_mm_for_each_row_column(int row_count, int col_count, const int *x_offsets, const int *x_columns,
+                                const int *y_offsets, const int *y_columns, const int *z_offsets,
+                                const int *z_columns, const Func &func)
+{
+    const int num_tasks = std::max(1, std::min(row_count, wp::cpu_default_thread_count() * 4));
+
+    wp::parallel_for(num_tasks, [&](size_t begin, size_t end) {
+        std::vector<int> marker(col_count, -1);
+
+        for (size_t task = begin; task < end; ++task)
+        {
+            const int row_begin = int(int64_t(row_count) * task / num_tasks);
+            const int row_end = int(int64_t(row_count) * (task + 1) / num_tasks);
+
+            for (int row = row_begin; row < row_end; ++row)
+            {
+                auto visit = [&](int col) {
+                    if (marker[col] != row)
+                    {
+                        marker[col] = row;
+                        func(row, col);
+                    }
+                };
+
+                if (z_offsets)
+                {
+                    for (int z_block = z_offsets[row]; z_block < z_offsets[row + 1]; ++z_block)
+                    {
+                        visit(z_columns[z_block]);
+                    }
+                }
+
+                for (int x_block = x_offsets[row]; x_block < x_offsets[row + 1]; ++x_block)
+                {
+                    const int x_col = x_columns[x_block];
+                    for (int y_block = y_offsets[x_col]; y_block < y_offsets[x_col + 1]; ++y_block)
+                    {
+                        visit(y_columns[y_block]);
+                    }
+                }
+            }
+        }
+    }, 0, 1);
+}
+
+// accumulates alpha * x * y into z for blocks of Rows x Inner and Inner x Cols, zero sizes are dynamic
+template <int Rows, int Inner, int Cols, typename T> struct bsr_block_mul_add
+{
+    int rows, inner, cols;
+
+    void operator()(T alpha, const T *x, const T *y, T *z) const
+    {
+        const int r_count = Rows > 0 ? Rows : rows;
+        const int k_count = Inner > 0 ? Inner : inner;
+        const int c_count = Cols > 0 ? Cols : cols;
+
+        for (int r = 0; r < r_count; ++r)
+        {
+            for (int k = 0; k < k_count; ++k)
+            {
+                const T ax = alpha * x[r * k_count + k];
+                for (int c = 0; c < c_count; ++c)
+                {
+                    z[r * c_count + c] += ax * y[k * c_count + c];
+                }
+            }
+        }
+    }
+};
+
+// numeric product, z must already hold the pattern of the product
+//  - rows are distributed over tasks that each own a map from columns to the blocks of the current z row
+template <typename T, typename BlockMulAdd>
+void bsr_mm_values(int row_count, int col_count, const BlockMulAdd &block_mul_add, T alpha, const int *x_offsets,
+                   const int *x_columns, const T *x_values, const int *y_offsets, const int *y_columns,
+                   const T *y_values, const int *z_offsets, const int *z_columns, T *z_values)
+{
+    const int x_block_size = block_mul_add.rows * block_mul_add.inner;
+    const int y_block_size = block_mul_add.inner * block_mul_add.cols;
+    const int z_block_size = block_mul_add.rows * block_mul_add.cols;
+
+    const int num_tasks = std::max(1, std::min(row_count, wp::cpu_default_thread_count() * 4));
+
+    wp::parallel_for(num_tasks, [&](size_t begin, size_t end) {
+        std::vector<int> z_blocks(col_count);
+
+        for (size_t task = begin; task < end; ++task)
+        {
+            const int row_begin = int(int64_t(row_count) * task / num_tasks);
+            const int row_end = int(int64_t(row_count) * (task + 1) / num_tasks);
+
+            for (int row = row_begin; row < row_end; ++row)
+            {
+                for (int z_block = z_offsets[row]; z_block < z_offsets[row + 1]; ++z_block)
+                {
+                    z_blocks[z_columns[z_block]] = z_block;
+                }
+
+                for (int x_block = x_offsets[row]; x_block < x_offsets[row + 1]; ++x_block)
+                {
+                    const int x_col = x_columns[x_block];
+                    const T *x_val = x_values + size_t(x_block) * x_block_size;
+
+                    for (int y_block = y_offsets[x_col]; y_block < y_offsets[x_col + 1]; ++y_block)
+                    {
+                        const int z_block = z_blocks[y_columns[y_block]];
+                        block_mul_add(alpha, x_val, y_values + size_t(y_block) * y_block_size,
+                                      z_values + size_t(z_block) * z_block_size);
+                    }
+                }
+            }
+        }
+    }, 0, 1);
+}
+
+template <typename T>
+void bsr_mm_values_host(int row_count, int col_count, int rows_per_block, int inner_block_size, int cols_per_block,
+                        T alpha, const int *x_offsets, const int *x_columns, const T *x_values, const int *y_offsets,
+                        const int *y_columns, const T *y_values, const int *z_offsets, const int *z_columns,
+                        T *z_values)
+{
+    // specialized block products for the common square block sizes
+    if (rows_per_block == inner_block_size && inner_block_size == cols_per_block && rows_per_block <= 3)
+    {
+        switch (rows_per_block)
+        {
+        case 1:
+            bsr_mm_values(row_count, col_count, bsr_block_mul_add<1, 1, 1, T>{1, 1, 1}, alpha, x_offsets, x_columns,
+                          x_values, y_offsets, y_columns, y_values, z_offsets, z_columns, z_values);
+            return;
+        case 2:
+            bsr_mm_values(row_count, col_count, bsr_block_mul_add<2, 2, 2, T>{2, 2, 2}, alpha, x_offsets, x_columns,
+                          x_values, y_offsets, y_columns, y_values, z_offsets, z_columns, z_values);
+            return;
+        case 3:
+            bsr_mm_values(row_count, col_count, bsr_block_mul_add<3, 3, 3, T>{3, 3, 3}, alpha, x_offsets, x_columns,
+                          x_values, y_offsets, y_columns, y_values, z_offsets, z_columns, z_values);
+            return;
+        }
+    }
+
+    bsr_mm_values(row_count, col_count,
+                  bsr_block_mul_add<0, 0, 0, T>{rows_per_block, inner_block_size, cols_per_block}, alpha, x_offsets,
+                  x_columns, x_values, y_offsets, y_columns, y_values, z_offsets, z_columns, z_values);
+}
+
+// y = alpha * A * x + beta * y for blocks of Rows x Cols, zero sizes are dynamic
+//  - x and A are not read when alpha is zero, y is not read when beta is zero
+template <int Rows, int Cols, typename T>
+void bsr_mv_rows(int row_count, int rows_per_block, int cols_per_block, T alpha, T beta, const int *offsets,
+                 const int *columns, const T *values, const T *x, T *y)
+{
+    const int r_count = Rows > 0 ? Rows : rows_per_block;
+    const int c_count = Cols > 0 ? Cols : cols_per_block;
+    const int block_size = r_count * c_count;
+
+    wp::parallel_for(row_count, [&](size_t begin, size_t end) {
+        std::vector<T> sum(r_count);
+
+        for (size_t row = begin; row < end; ++row)
+        {
+            std::fill(sum.begin(), sum.end(), T(0));
+
+            if (alpha != T(0))
+            {
+                for (int block = offsets[row]; block < offsets[row + 1]; ++block)
+                {
+                    const T *val = values + size_t(block) * block_size;
+                    const T *x_block = x + size_t(columns[block]) * c_count;
+
+                    for (int r = 0; r < r_count; ++r)
+                    {
+                        for (int c = 0; c < c_count; ++c)
+                        {
+                            sum[r] += val[r * c_count + c] * x_block[c];
+                        }
+                    }
+                }
+            }
+
+            T *y_block = y + row * r_count;
+            for (int r = 0; r < r_count; ++r)
+            {
+                y_block[r] = beta != T(0) ? alpha * sum[r] + beta * y_block[r] : alpha * sum[r];
+            }
+        }
+    });
+}
+
+template <typename T>
+void bsr_mv_host(int row_count, int rows_per_block, int cols_per_block, T alpha, T beta, const int *offsets,
+                 const int *columns, const T *values, const T *x, T *y)
+{
+    void (*mv_rows_func)(int, int, int, T, T, const int *, const int *, const T *, const T *, T *) =
+        bsr_mv_rows<0, 0, T>;
+
+    if (rows_per_block == 1 && cols_per_block == 1)
+    {
+        mv_rows_func = bsr_mv_rows<1, 1, T>;
+    }
+    else if (rows_per_block == 2 && cols_per_block == 2)
+    {
+        mv_rows_func = bsr_mv_rows<2, 2, T>;
+    }
+    else if (rows_per_block == 3 && cols_per_block == 3)
+    {
+        mv_rows_func = bsr_mv_rows<3, 3, T>;
+    }
+
+    mv_rows_func(row_count, rows_per_block, cols_per_block, alpha, beta, offsets, columns, values, x, y);
+}
+
 } // namespace
 
 template <typename T>
@@ -103,71 +381,103 @@ int bsr_matrix_from_triplets_host(const int rows_per_block, const int cols_per_b
         block_is_zero_func = bsr_dyn_block_is_zero<T>;
     }
 
-    std::vector<int> block_indices(nnz);
-    std::iota(block_indices.begin(), block_indices.end(), 0);
+    // keep the non-zero blocks and find the largest column index
+    std::vector<int> block_counts(bsr_num_blocks(nnz));
+    std::vector<int> block_max_cols(bsr_num_blocks(nnz));
 
-    // remove zero block indices
-    if (tpl_values)
-    {
-        block_indices.erase(std::remove_if(block_indices.begin(), block_indices.end(),
-                                           [block_is_zero_func, tpl_values, block_size](int i) {
-                                               return block_is_zero_func(tpl_values + i * block_size, block_size);
-                                           }),
-                            block_indices.end());
-    }
+    bsr_for_each_block(nnz, [&](int begin, int end, int block) {
+        int count = 0;
+        int max_col = 0;
+        for (int i = begin; i < end; ++i)
+        {
+            if (!tpl_values || !block_is_zero_func(tpl_values + size_t(i) * block_size, block_size))
+            {
+                ++count;
+                max_col = std::max(max_col, tpl_columns[i]);
+            }
+        }
 
-    // sort block indices according to lexico order
-    std::sort(block_indices.begin(), block_indices.end(), [tpl_rows, tpl_columns](int i, int j) -> bool {
-        return tpl_rows[i] < tpl_rows[j] || (tpl_rows[i] == tpl_rows[j] && tpl_columns[i] < tpl_columns[j]);
+        block_counts[block] = count;
+        block_max_cols[block] = max_col;
     });
 
-    // accumulate blocks at same locations, count blocks per row
-    std::fill_n(bsr_offsets, row_count + 1, 0);
+    const int kept_count = bsr_scan_block_counts(block_counts);
+    const int max_col = block_max_cols.empty() ? 0 : *std::max_element(block_max_cols.begin(), block_max_cols.end());
 
-    int current_row = -1;
-    int current_col = -1;
+    // combined row and column keys, only the bits needed by the indices are sorted
+    const int col_bits = radix_sort_bit_count(max_col + 1);
+    const int row_bits = radix_sort_bit_count(row_count);
 
-    // so that we get back to the start for the first block
-    if (bsr_values)
-    {
-        bsr_values -= block_size;
-    }
+    // the radix sort needs storage for twice the number of keys
+    std::vector<uint64_t> keys(2 * size_t(kept_count));
+    std::vector<int> block_indices(2 * size_t(kept_count));
 
-    for (int i = 0; i < block_indices.size(); ++i)
-    {
-        int idx = block_indices[i];
-        int row = tpl_rows[idx];
-        int col = tpl_columns[idx];
-        const T *val = tpl_values + idx * block_size;
-
-        if (row == current_row && col == current_col)
+    bsr_for_each_block(nnz, [&](int begin, int end, int block) {
+        int out = block_counts[block];
+        for (int i = begin; i < end; ++i)
         {
-            if (bsr_values)
+            if (!tpl_values || !block_is_zero_func(tpl_values + size_t(i) * block_size, block_size))
             {
-                block_accumulate_func(val, bsr_values, block_size);
+                keys[out] = (uint64_t(tpl_rows[i]) << col_bits) | uint64_t(tpl_columns[i]);
+                block_indices[out] = i;
+                ++out;
             }
         }
-        else
+    });
+
+    radix_sort_pairs_host(keys.data(), block_indices.data(), kept_count, 0, row_bits + col_bits);
+
+    // each distinct key starts a block of the matrix
+    auto is_head = [&](int i) { return i == 0 || keys[i] != keys[i - 1]; };
+
+    bsr_for_each_block(kept_count, [&](int begin, int end, int block) {
+        int count = 0;
+        for (int i = begin; i < end; ++i)
         {
-            *(bsr_columns++) = col;
+            count += is_head(i);
+        }
 
-            if (bsr_values)
+        block_counts[block] = count;
+    });
+
+    block_counts.resize(bsr_num_blocks(kept_count));
+    const int bsr_nnz = bsr_scan_block_counts(block_counts);
+
+    // rows of the matrix blocks, used to compute the offsets
+    std::vector<int> bsr_rows(bsr_nnz);
+
+    // write the blocks starting in each task block, the duplicates of the last one may extend past the end
+    bsr_for_each_block(kept_count, [&](int begin, int end, int block) {
+        int out = block_counts[block];
+        for (int i = begin; i < end; ++i)
+        {
+            if (!is_head(i))
             {
-                bsr_values += block_size;
-                std::copy_n(val, block_size, bsr_values);
+                continue;
             }
 
-            bsr_offsets[row + 1]++;
+            const int idx = block_indices[i];
+            bsr_rows[out] = tpl_rows[idx];
+            bsr_columns[out] = tpl_columns[idx];
+
+            if (bsr_values)
+            {
+                T *dst = bsr_values + size_t(out) * block_size;
+                std::copy_n(tpl_values + size_t(idx) * block_size, block_size, dst);
 
-            current_row = row;
-            current_col = col;
+                for (int j = i + 1; j < kept_count && !is_head(j); ++j)
+                {
+                    block_accumulate_func(tpl_values + size_t(block_indices[j]) * block_size, dst, block_size);
+                }
+            }
+
+            ++out;
         }
-    }
+    });
 
-    // build postfix sum of row counts
-    std::partial_sum(bsr_offsets, bsr_offsets + row_count + 1, bsr_offsets);
+    bsr_fill_offsets(bsr_nnz, row_count, [&](int i) { return bsr_rows[i]; }, bsr_offsets);
 
-    return bsr_offsets[row_count];
+    return bsr_nnz;
 }
 
 template <typename T>
@@ -225,39 +535,42 @@ void bsr_transpose_host(int rows_per_block, int cols_per_block, int row_count, i
         break;
     }
 
-    std::vector<int> block_indices(nnz), bsr_rows(nnz);
-    std::iota(block_indices.begin(), block_indices.end(), 0);
-
-    // Fill row indices from offsets
-    for (int row = 0; row < row_count; ++row)
-    {
-        std::fill(bsr_rows.begin() + bsr_offsets[row], bsr_rows.begin() + bsr_offsets[row + 1], row);
-    }
+    // row of each block
+    std::vector<int> bsr_rows(nnz);
 
-    // sort block indices according to (transposed) lexico order
-    std::sort(block_indices.begin(), block_indices.end(), [&bsr_rows, bsr_columns](int i, int j) -> bool {
-        return bsr_columns[i] < bsr_columns[j] || (bsr_columns[i] == bsr_columns[j] && bsr_rows[i] < bsr_rows[j]);
+    wp::parallel_for(row_count, [&](size_t begin, size_t end) {
+        for (size_t row = begin; row < end; ++row)
+        {
+            std::fill(bsr_rows.begin() + bsr_offsets[row], bsr_rows.begin() + bsr_offsets[row + 1], int(row));
+        }
     });
 
-    // Count blocks per column and transpose blocks
-    std::fill_n(transposed_bsr_offsets, col_count + 1, 0);
+    // the stable sort by column keeps the blocks of each column ordered by row, the radix sort needs
+    // storage for twice the number of keys
+    std::vector<int> keys(2 * size_t(nnz));
+    std::vector<int> block_indices(2 * size_t(nnz));
 
-    for (int i = 0; i < nnz; ++i)
-    {
-        int idx = block_indices[i];
-        int row = bsr_rows[idx];
-        int col = bsr_columns[idx];
+    bsr_for_each_block(nnz, [&](int begin, int end, int block) {
+        std::copy(bsr_columns + begin, bsr_columns + end, keys.begin() + begin);
+        std::iota(block_indices.begin() + begin, block_indices.begin() + end, begin);
+    });
 
-        ++transposed_bsr_offsets[col + 1];
-        transposed_bsr_columns[i] = row;
+    radix_sort_pairs_host(keys.data(), block_indices.data(), nnz, 0, radix_sort_bit_count(col_count));
 
-        const T *src_block = bsr_values + idx * block_size;
-        T *dst_block = transposed_bsr_values + i * block_size;
-        block_transpose_func(src_block, dst_block, rows_per_block, cols_per_block);
-    }
+    // transpose blocks
+    bsr_for_each_block(nnz, [&](int begin, int end, int block) {
+        for (int i = begin; i < end; ++i)
+        {
+            const int idx = block_indices[i];
+            transposed_bsr_columns[i] = bsr_rows[idx];
 
-    // build postfix sum of column counts
-    std::partial_sum(transposed_bsr_offsets, transposed_bsr_offsets + col_count + 1, transposed_bsr_offsets);
+            const T *src_block = bsr_values + size_t(idx) * block_size;
+            T *dst_block = transposed_bsr_values + size_t(i) * block_size;
+            block_transpose_func(src_block, dst_block, rows_per_block, cols_per_block);
+        }
+    });
+
+    bsr_fill_offsets(nnz, col_count, [&](int i) { return keys[i]; }, transposed_bsr_offsets);
 }
 
 WP_API int bsr_matrix_from_triplets_float_host(int rows_per_block, int cols_per_block, int row_count, int nnz,
@@ -306,6 +619,90 @@ WP_API void bsr_transpose_double_host(int rows_per_block, int cols_per_block, in
                        reinterpret_cast<double *>(transposed_bsr_values));
 }
 
+WP_API int bsr_mm_count_host(int row_count, int col_count, uint64_t x_offsets, uint64_t x_columns, uint64_t y_offsets,
+                             uint64_t y_columns, uint64_t z_offsets, uint64_t z_columns, uint64_t mm_offsets)
+{
+    int *offsets = reinterpret_cast<int *>(mm_offsets);
+
+    std::fill_n(offsets, row_count + 1, 0);
+
+    bsr_mm_for_each_row_column(row_count, col_count, reinterpret_cast<const int *>(x_offsets),
+                               reinterpret_cast<const int *>(x_columns), reinterpret_cast<const int *>(y_offsets),
+                               reinterpret_cast<const int *>(y_columns), reinterpret_cast<const int *>(z_offsets),
+                               reinterpret_cast<const int *>(z_columns),
+                               [offsets](int row, int col) { ++offsets[row + 1]; });
+
+    scan_host(offsets + 1, offsets + 1, row_count, true);
+
+    return offsets[row_count];
+}
+
+WP_API void bsr_mm_list_host(int row_count, int col_count, uint64_t x_offsets, uint64_t x_columns, uint64_t y_offsets,
+                             uint64_t y_columns, uint64_t z_offsets, uint64_t z_columns, uint64_t mm_offsets,
+                             uint64_t mm_columns)
+{
+    const int *offsets = reinterpret_cast<const int *>(mm_offsets);
+    int *columns = reinterpret_cast<int *>(mm_columns);
+
+    // the columns of each row are appended in visit order then sorted
+    std::vector<int> row_ends(offsets, offsets + row_count);
+
+    bsr_mm_for_each_row_column(row_count, col_count, reinterpret_cast<const int *>(x_offsets),
+                               reinterpret_cast<const int *>(x_columns), reinterpret_cast<const int *>(y_offsets),
+                               reinterpret_cast<const int *>(y_columns), reinterpret_cast<const int *>(z_offsets),
+                               reinterpret_cast<const int *>(z_columns),
+                               [&](int row, int col) { columns[row_ends[row]++] = col; });
+
+    wp::parallel_for(row_count, [&](size_t begin, size_t end) {
+        for (size_t row = begin; row < end; ++row)
+        {
+            std::sort(columns + offsets[row], columns + offsets[row + 1]);
+        }
+    });
+}
+
+WP_API void bsr_mm_values_float_host(int row_count, int col_count, int rows_per_block, int inner_block_size,
+                                     int cols_per_block, float alpha, uint64_t x_offsets, uint64_t x_columns,
+                                     uint64_t x_values, uint64_t y_offsets, uint64_t y_columns, uint64_t y_values,
+                                     uint64_t z_offsets, uint64_t z_columns, uint64_t z_values)
+{
+    bsr_mm_values_host(row_count, col_count, rows_per_block, inner_block_size, cols_per_block, alpha,
+                       reinterpret_cast<const int *>(x_offsets), reinterpret_cast<const int *>(x_columns),
+                       reinterpret_cast<const float *>(x_values), reinterpret_cast<const int *>(y_offsets),
+                       reinterpret_cast<const int *>(y_columns), reinterpret_cast<const float *>(y_values),
+                       reinterpret_cast<const int *>(z_offsets), reinterpret_cast<const int *>(z_columns),
+                       reinterpret_cast<float *>(z_values));
+}
+
+WP_API void bsr_mm_values_double_host(int row_count, int col_count, int rows_per_block, int inner_block_size,
+                                      int cols_per_block, double alpha, uint64_t x_offsets, uint64_t x_columns,
+                                      uint64_t x_values, uint64_t y_offsets, uint64_t y_columns, uint64_t y_values,
+                                      uint64_t z_offsets, uint64_t z_columns, uint64_t z_values)
+{
+    bsr_mm_values_host(row_count, col_count, rows_per_block, inner_block_size, cols_per_block, alpha,
+                       reinterpret_cast<const int *>(x_offsets), reinterpret_cast<const int *>(x_columns),
+                       reinterpret_cast<const double *>(x_values), reinterpret_cast<const int *>(y_offsets),
+                       reinterpret_cast<const int *>(y_columns), reinterpret_cast<const double *>(y_values),
+                       reinterpret_cast<const int *>(z_offsets), reinterpret_cast<const int *>(z_columns),
+                       reinterpret_cast<double *>(z_values));
+}
+
+WP_API void bsr_mv_float_host(int row_count, int rows_per_block, int cols_per_block, float alpha, float beta,
+                              uint64_t offsets, uint64_t columns, uint64_t values, uint64_t x, uint64_t y)
+{
+    bsr_mv_host(row_count, rows_per_block, cols_per_block, alpha, beta, reinterpret_cast<const int *>(offsets),
+                reinterpret_cast<const int *>(columns), reinterpret_cast<const float *>(values),
+                reinterpret_cast<const float *>(x), reinterpret_cast<float *>(y));
+}
+
+WP_API void bsr_mv_double_host(int row_count, int rows_per_block, int cols_per_block, double alpha, double beta,
+                               uint64_t offsets, uint64_t columns, uint64_t values, uint64_t x, uint64_t y)
+{
+    bsr_mv_host(row_count, rows_per_block, cols_per_block, alpha, beta, reinterpret_cast<const int *>(offsets),
+                reinterpret_cast<const int *>(columns), reinterpret_cast<const double *>(values),
+                reinterpret_cast<const double *>(x), reinterpret_cast<double *>(y));
+}
+
 #if !WP_ENABLE_CUDA
 WP_API int bsr_matrix_from_triplets_float_device(int rows_per_block, int cols_per_block, int row_count, int nnz,
                                                  uint64_t tpl_rows, uint64_t tpl_columns, uint64_t tpl_values,
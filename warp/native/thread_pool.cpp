@@ -0,0 +1,251 @@
+/** Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+ * NVIDIA CORPORATION and its licensors retain all intellectual property
+ * and proprietary rights in and to this software, related documentation
+ * and any modifications thereto.  Any use, reproduction, disclosure or
+ * distribution of this software and related documentation without an express
+ * license agreement from NVIDIA CORPORATION is strictly prohibited.
+ */
+
+#include "warp.h"
+#include "builtin.h"
+#include "thread_pool.h"
+
+#include <atomic>
+#include <climits>
+#include <cstdio>
+#include <condition_variable>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+namespace
+{
+
+// smallest number of items handed to a thread when the tile size is chosen automatically,
+// avoids waking up workers for launches that are cheaper to run on the calling thread
+const size_t MIN_AUTO_TILE_SIZE = 32;
+
+// number of tiles per participating thread when the tile size is chosen automatically,
+// oversubscribing a little helps balancing kernels whose threads have uneven cost
+const size_t AUTO_TILES_PER_THREAD = 4;
+
+struct Job
+{
+    wp::cpu_task_t task;
+    void* context;
+    size_t n;
+    size_t tile_size;
+    size_t num_tiles;
+
+    std::atomic<size_t> next_tile;
+    std::atomic<int> pending_workers;
+
+    void execute()
+    {
+        for (;;)
+        {
+            const size_t tile = next_tile.fetch_add(1, std::memory_order_relaxed);
+            if (tile >= num_tiles)
+                break;
+
+            const size_t begin = tile * tile_size;
+            const size_t end = (begin + tile_size < n) ? begin + tile_size : n;
+
+            task(context, begin, end);
+        }
+    }
+};
+
+// set on pool workers so that nested parallel loops run serially instead of deadlocking
+thread_local bool s_is_worker = false;
+
+class ThreadPool
+{
+public:
+
+    void run(Job& job, int num_workers)
+    {
+        // only one parallel loop can own the workers at a time, concurrent callers
+        // (e.g. launches from several Python threads) process their range on their own thread
+        std::unique_lock<std::mutex> run_lock(run_mutex, std::try_to_lock);
+        if (!run_lock.owns_lock())
+        {
+            job.task(job.context, 0, job.n);
+            return;
+        }
+
+        grow(num_workers);
+
+        job.pending_workers.store(num_workers, std::memory_order_relaxed);
+
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            current_job = &job;
+            active_workers = num_workers;
+            ++generation;
+        }
+        wake.notify_all();
+
+        // the calling thread participates in the work
+        job.execute();
+
+        // wait until all workers have released the job, it lives on the caller's stack
+        std::unique_lock<std::mutex> lock(mutex);
+        done.wait(lock, [&job] { return job.pending_workers.load(std::memory_order_acquire) == 0; });
+
+        current_job = nullptr;
+        active_workers = 0;
+    }
+
+private:
+
+    void grow(int num_workers)
+    {
+        while (int(workers.size()) < num_workers)
+        {
+            const int index = int(workers.size());
+            workers.emplace_back(&ThreadPool::worker_main, this, index);
+
+            // the pool lives for the duration of the process, workers block on the
+            // condition variable when idle and are torn down with the process
+            workers.back().detach();
+        }
+    }
+
+    void worker_main(int index)
+    {
+        s_is_worker = true;
+
+        unsigned long long seen_generation = 0;
+
+        for (;;)
+        {
+            Job* job;
+
+            {
+                std::unique_lock<std::mutex> lock(mutex);
+                wake.wait(lock, [&] { return generation != seen_generation && index < active_workers; });
+
+                seen_generation = generation;
+                job = current_job;
+            }
+
+            job->execute();
+
+            if (job->pending_workers.fetch_sub(1, std::memory_order_acq_rel) == 1)
+            {
+                // job must not be accessed after the last release, the caller may return immediately
+                std::lock_guard<std::mutex> lock(mutex);
+                done.notify_all();
+            }
+        }
+    }
+
+    std::vector<std::thread> workers;
+
+    std::mutex run_mutex;
+
+    std::mutex mutex;
+    std::condition_variable wake;
+    std::condition_variable done;
+
+    Job* current_job = nullptr;
+    int active_workers = 0;
+    unsigned long long generation = 0;
+};
+
+ThreadPool& get_thread_pool()
+{
+    // intentionally leaked, joining worker threads during library unload is not safe on all platforms
+    static ThreadPool* pool = new ThreadPool();
+    return *pool;
+}
+
+struct KernelLaunch
+{
+    void (*kernel)(void** args, size_t task_begin, size_t task_end);
+    void** args;
+};
+
+void kernel_task(void* context, size_t begin, size_t end)
+{
+    const KernelLaunch* launch = static_cast<const KernelLaunch*>(context);
+    launch->kernel(launch->args, begin, end);
+}
+
+} // anonymous namespace
+
+namespace wp
+{
+
+int cpu_default_thread_count()
+{
+    static const int count = int(std::thread::hardware_concurrency());
+    return count > 0 ? count : 1;
+}
+
+size_t cpu_auto_tile_size(size_t n, int max_threads)
+{
+    const size_t target_tiles = size_t(max_threads) * AUTO_TILES_PER_THREAD;
+    const size_t tile_size = (n + target_tiles - 1) / target_tiles;
+
+    return tile_size < MIN_AUTO_TILE_SIZE ? MIN_AUTO_TILE_SIZE : tile_size;
+}
+
+void cpu_parallel_for(size_t n, cpu_task_t task, void* context, int max_threads, size_t tile_size)
+{
+    if (n == 0)
+        return;
+
+    if (max_threads <= 0)
+        max_threads = cpu_default_thread_count();
+
+    if (tile_size == 0)
+        tile_size = cpu_auto_tile_size(n, max_threads);
+
+    const size_t num_tiles = (n + tile_size - 1) / tile_size;
+    const size_t num_threads = num_tiles < size_t(max_threads) ? num_tiles : size_t(max_threads);
+
+    if (num_threads <= 1 || s_is_worker)
+    {
+        task(context, 0, n);
+        return;
+    }
+
+    Job job;
+    job.task = task;
+    job.context = context;
+    job.n = n;
+    job.tile_size = tile_size;
+    job.num_tiles = num_tiles;
+    job.next_tile.store(0, std::memory_order_relaxed);
+    job.pending_workers.store(0, std::memory_order_relaxed);
+
+    get_thread_pool().run(job, int(num_threads) - 1);
+}
+
+} // namespace wp
+
+
+int cpu_get_default_thread_count()
+{
+    return wp::cpu_default_thread_count();
+}
+
+void cpu_launch_kernel(void* kernel, size_t dim, int max_threads, size_t tile_size, void** args)
+{
+    // the first kernel argument is the launch bounds, indirect launches are limited by their counter
+    const wp::launch_bounds_t* bounds = static_cast<const wp::launch_bounds_t*>(args[0]);
+    if (bounds->size_from)
+        dim = wp::launch_size(*bounds);
+
+    // the per-thread check in tid() is left out of CPU kernels so that their loops can be vectorized
+    if (dim > size_t(INT_MAX) + 1)
+        printf("Warp warning: launch of %zu threads, 1-D tid() is returning overflowed ints\n", dim);
+
+    KernelLaunch launch;
+    launch.kernel = reinterpret_cast<void (*)(void**, size_t, size_t)>(kernel);
+    launch.args = args;
+
+    wp::cpu_parallel_for(dim, kernel_task, &launch, max_threads, tile_size);
+}
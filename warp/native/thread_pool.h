@@ -0,0 +1,47 @@
+/** Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+ * NVIDIA CORPORATION and its licensors retain all intellectual property
+ * and proprietary rights in and to this software, related documentation
+ * and any modifications thereto.  Any use, reproduction, disclosure or
+ * distribution of this software and related documentation without an express
+ * license agreement from NVIDIA CORPORATION is strictly prohibited.
+ */
+
+#pragma once
+
+#include <stddef.h>
+
+namespace wp
+{
+
+// a task processes the items in the index range [begin, end)
+typedef void (*cpu_task_t)(void* context, size_t begin, size_t end);
+
+// number of threads used when max_threads is not specified, defaults to the hardware concurrency
+int cpu_default_thread_count();
+
+// tile size used by cpu_parallel_for() when none is specified for a range of n items processed by max_threads threads
+size_t cpu_auto_tile_size(size_t n, int max_threads);
+
+// runs task over [0, n) on the persistent CPU worker pool
+//  - the range is split into tiles of tile_size items that are claimed dynamically by the participating threads
+//  - max_threads <= 0 uses cpu_default_thread_count(), the calling thread counts as one of the threads
+//  - tile_size == 0 chooses a tile size automatically based on n and the number of threads
+// the call returns once the whole range has been processed, calls from inside a task run serially
+void cpu_parallel_for(size_t n, cpu_task_t task, void* context, int max_threads=0, size_t tile_size=0);
+
+// convenience wrapper for callables with the signature void(size_t begin, size_t end)
+template <typename Func>
+void parallel_for(size_t n, const Func& func, int max_threads=0, size_t tile_size=0)
+{
+    struct Closure
+    {
+        static void run(void* context, size_t begin, size_t end)
+        {
+            (*static_cast<const Func*>(context))(begin, end);
+        }
+    };
+
+    cpu_parallel_for(n, &Closure::run, const_cast<Func*>(&func), max_threads, tile_size);
+}
+
+} // namespace wp
@@ -65,12 +65,12 @@ void volume_rem_descriptor(uint64_t id)
 } // anonymous namespace
 
 
-// NB: buf must be a host pointer
-uint64_t volume_create_host(void* buf, uint64_t size)
+namespace
 {
-    if (size < sizeof(pnanovdb_grid_t) + sizeof(pnanovdb_tree_t))
-        return 0;  // This cannot be a valid NanoVDB grid with data
 
+// takes ownership of buf, which must have been allocated with alloc_host()
+uint64_t volume_create_host_from_buffer(void* buf, uint64_t size)
+{
     VolumeDesc volume;
 
     volume.context = NULL;
@@ -79,11 +79,13 @@ uint64_t volume_create_host(void* buf, uint64_t size)
     memcpy_h2h(&volume.tree_data, (pnanovdb_grid_t*)buf + 1, sizeof(pnanovdb_tree_t));
 
     if (volume.grid_data.magic != PNANOVDB_MAGIC_NUMBER)
+    {
+        free_host(buf);
         return 0;
+    }
 
     volume.size_in_bytes = size;
-    volume.buffer = alloc_host(size);
-    memcpy_h2h(volume.buffer, buf, size);
+    volume.buffer = buf;
 
     volume.first_voxel_data_offs =
         sizeof(pnanovdb_grid_t) + volume.tree_data.node_offset_leaf + PNANOVDB_GRID_TYPE_GET(PNANOVDB_GRID_TYPE_FLOAT, leaf_off_table);
@@ -95,6 +97,20 @@ uint64_t volume_create_host(void* buf, uint64_t size)
     return id;
 }
 
+} // anonymous namespace
+
+// NB: buf must be a host pointer
+uint64_t volume_create_host(void* buf, uint64_t size)
+{
+    if (size < sizeof(pnanovdb_grid_t) + sizeof(pnanovdb_tree_t))
+        return 0;  // This cannot be a valid NanoVDB grid with data
+
+    void* copy = alloc_host(size);
+    memcpy_h2h(copy, buf, size);
+
+    return volume_create_host_from_buffer(copy, size);
+}
+
 // NB: buf must be a pointer on the same device
 uint64_t volume_create_device(void* context, void* buf, uint64_t size)
 {
@@ -210,6 +226,49 @@ void volume_destroy_device(uint64_t id)
 }
 
 
+uint64_t volume_f_from_tiles_host(void* points, int num_points, float voxel_size, float bg_value, float tx, float ty, float tz, bool points_in_world_space)
+{
+    nanovdb::FloatGrid* grid;
+    size_t gridSize;
+    BuildGridParams<float> params;
+    params.voxel_size = voxel_size;
+    params.background_value = bg_value;
+    params.translation = nanovdb::Vec3f{tx, ty, tz};
+
+    build_grid_from_tiles_host(grid, gridSize, points, num_points, points_in_world_space, params);
+
+    return volume_create_host_from_buffer(grid, gridSize);
+}
+
+uint64_t volume_v_from_tiles_host(void* points, int num_points, float voxel_size, float bg_value_x, float bg_value_y, float bg_value_z, float tx, float ty, float tz, bool points_in_world_space)
+{
+    nanovdb::Vec3fGrid* grid;
+    size_t gridSize;
+    BuildGridParams<nanovdb::Vec3f> params;
+    params.voxel_size = voxel_size;
+    params.background_value = nanovdb::Vec3f{bg_value_x, bg_value_y, bg_value_z};
+    params.translation = nanovdb::Vec3f{tx, ty, tz};
+
+    build_grid_from_tiles_host(grid, gridSize, points, num_points, points_in_world_space, params);
+
+    return volume_create_host_from_buffer(grid, gridSize);
+}
+
+uint64_t volume_i_from_tiles_host(void* points, int num_points, float voxel_size, int bg_value, float tx, float ty, float tz, bool points_in_world_space)
+{
+    nanovdb::Int32Grid* grid;
+    size_t gridSize;
+    BuildGridParams<int32_t> params;
+    params.voxel_size = voxel_size;
+    params.background_value = (int32_t)(bg_value);
+    params.translation = nanovdb::Vec3f{tx, ty, tz};
+
+    build_grid_from_tiles_host(grid, gridSize, points, num_points, points_in_world_space, params);
+
+    return volume_create_host_from_buffer(grid, gridSize);
+}
+
+
 #if WP_ENABLE_CUDA
 uint64_t volume_f_from_tiles_device(void* context, void* points, int num_points, float voxel_size, float bg_value, float tx, float ty, float tz, bool points_in_world_space)
 {
@@ -0,0 +1,328 @@
+#include "volume_builder.h"
+#include "warp.h"
+#include "sort.h"
+#include "thread_pool.h"
+
+#include <algorithm>
+#include <cstring>
+#include <vector>
+
+// The host builder creates the same grid layout as the device builder in volume_builder.cu.
+// The nodes of each level are stored in the order of their sorted keys, so the children of a node
+// form a contiguous range of the next level, each node can then link its own children and compute
+// its bounding box without atomics.
+
+namespace
+{
+
+// number of keys processed serially by a task
+const int VOLUME_BUILD_BLOCK_SIZE = 16384;
+
+// writes the unique values of (keys[i] >> shift) for sorted keys, and the index of their first occurrence
+void unique_shifted_keys(const uint64_t* keys, int n, int shift, std::vector<uint64_t>& unique_keys, std::vector<int>& first_index)
+{
+    const int num_blocks = (n + VOLUME_BUILD_BLOCK_SIZE - 1) / VOLUME_BUILD_BLOCK_SIZE;
+
+    auto is_head = [&](int i)
+    {
+        return i == 0 || (keys[i] >> shift) != (keys[i-1] >> shift);
+    };
+
+    std::vector<int> block_offsets(num_blocks + 1, 0);
+
+    wp::parallel_for(num_blocks, [&](size_t begin, size_t end)
+    {
+        for (size_t block=begin; block < end; ++block)
+        {
+            const int block_end = std::min(n, int(block + 1) * VOLUME_BUILD_BLOCK_SIZE);
+
+            int count = 0;
+            for (int i=int(block) * VOLUME_BUILD_BLOCK_SIZE; i < block_end; ++i)
+                count += is_head(i);
+
+            block_offsets[block + 1] = count;
+        }
+    }, 0, 1);
+
+    for (int block=0; block < num_blocks; ++block)
+        block_offsets[block + 1] += block_offsets[block];
+
+    unique_keys.resize(block_offsets[num_blocks]);
+    first_index.resize(block_offsets[num_blocks] + 1);
+
+    wp::parallel_for(num_blocks, [&](size_t begin, size_t end)
+    {
+        for (size_t block=begin; block < end; ++block)
+        {
+            const int block_end = std::min(n, int(block + 1) * VOLUME_BUILD_BLOCK_SIZE);
+
+            int out = block_offsets[block];
+            for (int i=int(block) * VOLUME_BUILD_BLOCK_SIZE; i < block_end; ++i)
+            {
+                if (is_head(i))
+                {
+                    unique_keys[out] = keys[i] >> shift;
+                    first_index[out] = i;
+                    ++out;
+                }
+            }
+        }
+    }, 0, 1);
+
+    // sentinel so that the range of unique key j is [first_index[j], first_index[j+1])
+    first_index.back() = n;
+}
+
+template<typename Vec3T>
+void expand_cwise(nanovdb::BBox<Vec3T>& bbox, const Vec3T& v)
+{
+    bbox.mCoord[0].minComponent(v);
+    bbox.mCoord[1].maxComponent(v);
+}
+
+} // anonymous namespace
+
+template <typename BuildT>
+void build_grid_from_tiles_host(nanovdb::Grid<nanovdb::NanoTree<BuildT>> *&out_grid,
+                                size_t &out_grid_size,
+                                const void *points,
+                                size_t num_points,
+                                bool points_in_world_space,
+                                const BuildGridParams<BuildT> &params)
+{
+    using FloatT = typename nanovdb::FloatTraits<BuildT>::FloatType;
+    const BuildT ZERO_VAL{0};
+    const FloatT ZERO_SCALAR{0};
+
+    const double dx = params.voxel_size;
+    const double Tx = params.translation[0], Ty = params.translation[1], Tz = params.translation[2];
+    const BuildT background_value = params.background_value;
+
+    const int n = int(num_points);
+
+    // Phase 1: counting the nodes
+    std::vector<uint64_t> leaf_keys, lower_keys, upper_keys;
+    std::vector<int> first_leaf, first_lower, first_upper;
+    {
+        // keys and values need twice the storage for the radix sort
+        std::vector<uint64_t> all_leaf_keys(2*size_t(n));
+        std::vector<int> indices(2*size_t(n));
+
+        const float one_over_voxel_size = static_cast<float>(1.0 / dx);
+        const nanovdb::Vec3f translation(params.translation);
+
+        wp::parallel_for(n, [&](size_t begin, size_t end)
+        {
+            for (size_t i=begin; i < end; ++i)
+            {
+                nanovdb::Coord ijk;
+                if (points_in_world_space)
+                    ijk = ((static_cast<const nanovdb::Vec3f*>(points)[i] - translation) * one_over_voxel_size).round();
+                else
+                    ijk = static_cast<const nanovdb::Coord*>(points)[i];
+
+                all_leaf_keys[i] = coord_to_full_key(ijk);
+                indices[i] = int(i);
+            }
+        });
+
+        radix_sort_pairs_host(all_leaf_keys.data(), indices.data(), n, 0, 63);
+
+        unique_shifted_keys(all_leaf_keys.data(), n, 0, leaf_keys, first_leaf);
+        unique_shifted_keys(leaf_keys.data(), int(leaf_keys.size()), 12, lower_keys, first_lower);
+        unique_shifted_keys(lower_keys.data(), int(lower_keys.size()), 15, upper_keys, first_upper);
+    }
+
+    const uint32_t leaf_count = uint32_t(leaf_keys.size());
+    const uint32_t lower_node_count = uint32_t(lower_keys.size());
+    const uint32_t upper_node_count = uint32_t(upper_keys.size());
+
+    using Tree = nanovdb::NanoTree<BuildT>;
+    using Grid = nanovdb::Grid<Tree>;
+
+    const size_t total_bytes =
+        sizeof(Grid) +
+        sizeof(Tree) +
+        sizeof(typename Tree::RootType) +
+        sizeof(typename Tree::RootType::Tile) * upper_node_count +
+        sizeof(typename Tree::Node2) * upper_node_count +
+        sizeof(typename Tree::Node1) * lower_node_count +
+        sizeof(typename Tree::Node0) * leaf_count;
+
+    const int64_t upper_mem_offset =
+        sizeof(nanovdb::GridData) + sizeof(Tree) + sizeof(typename Tree::RootType) +
+        sizeof(typename Tree::RootType::Tile) * upper_node_count;
+    const int64_t lower_mem_offset = upper_mem_offset + sizeof(typename Tree::Node2) * upper_node_count;
+    const int64_t leaf_mem_offset = lower_mem_offset + sizeof(typename Tree::Node1) * lower_node_count;
+
+    typename Grid::DataType* grid = (typename Grid::DataType*)alloc_host(total_bytes);
+
+    typename Tree::DataType* const tree = reinterpret_cast<typename Tree::DataType*>(grid + 1); // The tree is immediately after the grid
+    typename Tree::RootType::DataType* const root = reinterpret_cast<typename Tree::RootType::DataType*>(tree + 1); // The root is immediately after the tree
+    typename Tree::RootType::Tile* const tiles = reinterpret_cast<typename Tree::RootType::Tile*>(root + 1);
+    typename Tree::Node2::DataType* const upper_nodes = nanovdb::PtrAdd<typename Tree::Node2::DataType>(grid, upper_mem_offset);
+    typename Tree::Node1::DataType* const lower_nodes = nanovdb::PtrAdd<typename Tree::Node1::DataType>(grid, lower_mem_offset);
+    typename Tree::Node0::DataType* const leaf_nodes  = nanovdb::PtrAdd<typename Tree::Node0::DataType>(grid, leaf_mem_offset);
+
+    constexpr uint32_t MASK_15BITS = (1u << 15) - 1u;
+    constexpr uint32_t MASK_12BITS = (1u << 12) - 1u;
+
+    // Phase 2: building the tree bottom-up, each level in parallel
+
+    // leaf nodes, the voxels are initialized to the background value
+    wp::parallel_for(leaf_count, [&](size_t begin, size_t end)
+    {
+        for (size_t i=begin; i < end; ++i)
+        {
+            const uint32_t lower_offset = leaf_keys[i] & MASK_12BITS;
+            const uint32_t upper_offset = (leaf_keys[i] >> 12) & MASK_15BITS;
+            const nanovdb::Coord ijk = tile_key36_to_coord(leaf_keys[i] >> 27);
+
+            const nanovdb::Coord localUpperIjk = Tree::Node2::OffsetToLocalCoord(upper_offset) << Tree::Node1::TOTAL;
+            const nanovdb::Coord localLowerIjk = Tree::Node1::OffsetToLocalCoord(lower_offset) << Tree::Node0::TOTAL;
+            const nanovdb::Coord leafOrigin = ijk + localUpperIjk + localLowerIjk;
+
+            auto& node = leaf_nodes[i];
+            node.mBBoxMin = leafOrigin;
+            node.mBBoxDif[0] = node.mBBoxDif[1] = node.mBBoxDif[2] = Tree::Node0::DIM;
+            node.mFlags = 0;
+            node.mValueMask.setOn();
+            node.mMinimum = ZERO_VAL;
+            node.mMaximum = ZERO_VAL;
+            node.mAverage = ZERO_SCALAR;
+            node.mStdDevi = ZERO_SCALAR;
+            std::fill(node.mValues, node.mValues + Tree::Node0::SIZE, background_value);
+        }
+    });
+
+    // lower nodes, linked to the leaves [first_lower[i], first_lower[i+1])
+    wp::parallel_for(lower_node_count, [&](size_t begin, size_t end)
+    {
+        for (size_t i=begin; i < end; ++i)
+        {
+            auto& node = lower_nodes[i];
+            node.mBBox = nanovdb::CoordBBox();
+            node.mFlags = 0;
+            node.mValueMask.setOff();
+            node.mChildMask.setOff();
+            node.mMinimum = ZERO_VAL;
+            node.mMaximum = ZERO_VAL;
+            node.mAverage = ZERO_SCALAR;
+            node.mStdDevi = ZERO_SCALAR;
+            for (size_t n = 0; n < Tree::Node1::SIZE; ++n) {
+                node.mTable[n].value = background_value;
+            }
+
+            for (int leaf=first_lower[i]; leaf < first_lower[i + 1]; ++leaf)
+            {
+                const uint32_t lower_offset = leaf_keys[leaf] & MASK_12BITS;
+                node.mChildMask.setOn(lower_offset);
+                node.setChild(lower_offset, leaf_nodes + leaf);
+
+                const nanovdb::Coord leafOrigin = leaf_nodes[leaf].mBBoxMin;
+                expand_cwise(node.mBBox, leafOrigin);
+                expand_cwise(node.mBBox, leafOrigin + nanovdb::Coord(Tree::Node0::DIM));
+            }
+        }
+    });
+
+    // root tiles and upper nodes, linked to the lower nodes [first_upper[i], first_upper[i+1])
+    wp::parallel_for(upper_node_count, [&](size_t begin, size_t end)
+    {
+        for (size_t i=begin; i < end; ++i)
+        {
+            tiles[i].key = root->CoordToKey(tile_key36_to_coord(upper_keys[i]));
+            tiles[i].child = sizeof(typename Tree::RootType) + sizeof(typename Tree::RootType::Tile) * upper_node_count + sizeof(typename Tree::Node2) * i;
+            tiles[i].state = 0;
+            tiles[i].value = background_value;
+
+            auto& node = upper_nodes[i];
+            node.mBBox = nanovdb::CoordBBox();
+            node.mFlags = 0;
+            node.mValueMask.setOff();
+            node.mChildMask.setOff();
+            node.mMinimum = ZERO_VAL;
+            node.mMaximum = ZERO_VAL;
+            node.mAverage = ZERO_SCALAR;
+            node.mStdDevi = ZERO_SCALAR;
+            for (size_t n = 0; n < Tree::Node2::SIZE; ++n) {
+                node.mTable[n].value = background_value;
+            }
+
+            for (int lower=first_upper[i]; lower < first_upper[i + 1]; ++lower)
+            {
+                const uint32_t upper_offset = lower_keys[lower] & MASK_15BITS;
+                node.mChildMask.setOn(upper_offset);
+                node.setChild(upper_offset, lower_nodes + lower);
+
+                expand_cwise(node.mBBox, lower_nodes[lower].mBBox.min());
+                expand_cwise(node.mBBox, lower_nodes[lower].mBBox.max());
+            }
+        }
+    });
+
+    // tree, root and grid
+    tree->mNodeOffset[3] = sizeof(Tree);
+    tree->mNodeOffset[2] = tree->mNodeOffset[3] + sizeof(typename Tree::RootType) + sizeof(typename Tree::RootType::Tile) * upper_node_count;
+    tree->mNodeOffset[1] = tree->mNodeOffset[2] + sizeof(typename Tree::Node2) * upper_node_count;
+    tree->mNodeOffset[0] = tree->mNodeOffset[1] + sizeof(typename Tree::Node1) * lower_node_count;
+    tree->mNodeCount[2] = tree->mTileCount[2] = upper_node_count;
+    tree->mNodeCount[1] = tree->mTileCount[1] = lower_node_count;
+    tree->mNodeCount[0] = tree->mTileCount[0] = leaf_count;
+    tree->mVoxelCount = Tree::Node0::SIZE * leaf_count; // assuming full leaves
+
+    root->mBBox = nanovdb::CoordBBox(); // init to empty
+    root->mTableSize = upper_node_count;
+    root->mBackground = background_value;
+    root->mMinimum = ZERO_VAL;
+    root->mMaximum = ZERO_VAL;
+    root->mAverage = ZERO_SCALAR;
+    root->mStdDevi = ZERO_SCALAR;
+
+    for (uint32_t i = 0; i < upper_node_count; ++i) {
+        root->mBBox.expand(upper_nodes[i].mBBox.min());
+        root->mBBox.expand(upper_nodes[i].mBBox.max());
+    }
+
+    nanovdb::Map map;
+    {
+        const double mat[4][4] = {
+            {dx, 0.0, 0.0, 0.0}, // row 0
+            {0.0, dx, 0.0, 0.0}, // row 1
+            {0.0, 0.0, dx, 0.0}, // row 2
+            {Tx, Ty, Tz, 1.0}, // row 3
+        };
+        const double invMat[4][4] = {
+            {1 / dx, 0.0, 0.0, 0.0}, // row 0
+            {0.0, 1 / dx, 0.0, 0.0}, // row 1
+            {0.0, 0.0, 1 / dx, 0.0}, // row 2
+            {0.0, 0.0, 0.0, 0.0}, // row 3, ignored by Map::set
+        };
+        map.set(mat, invMat, 1.0);
+    }
+
+    grid->mMagic = NANOVDB_MAGIC_NUMBER;
+    grid->mChecksum = 0xFFFFFFFFFFFFFFFFull;
+    grid->mVersion = nanovdb::Version();
+    grid->mFlags = static_cast<uint32_t>(nanovdb::GridFlags::HasBBox) |
+                   static_cast<uint32_t>(nanovdb::GridFlags::IsBreadthFirst);
+    grid->mGridIndex = 0;
+    grid->mGridCount = 1;
+    grid->mGridSize = total_bytes;
+    memcpy(grid->mGridName, params.name, 256);
+    grid->mWorldBBox.mCoord[0] = map.applyMap(nanovdb::Vec3R(root->mBBox.mCoord[0]));
+    grid->mWorldBBox.mCoord[1] = map.applyMap(nanovdb::Vec3R(root->mBBox.mCoord[1]));
+    grid->mVoxelSize = nanovdb::Vec3d(dx);
+    grid->mMap = map;
+    grid->mGridClass = nanovdb::GridClass::Unknown;
+    grid->mGridType = nanovdb::mapToGridType<BuildT>();
+    grid->mBlindMetadataOffset = total_bytes;
+    grid->mBlindMetadataCount = 0;
+
+    out_grid = reinterpret_cast<Grid*>(grid);
+    out_grid_size = total_bytes;
+}
+
+template void build_grid_from_tiles_host(nanovdb::Grid<nanovdb::NanoTree<float>>*&, size_t&, const void*, size_t, bool, const BuildGridParams<float>&);
+template void build_grid_from_tiles_host(nanovdb::Grid<nanovdb::NanoTree<nanovdb::Vec3f>>*&, size_t&, const void*, size_t, bool, const BuildGridParams<nanovdb::Vec3f>&);
+template void build_grid_from_tiles_host(nanovdb::Grid<nanovdb::NanoTree<int32_t>>*&, size_t&, const void*, size_t, bool, const BuildGridParams<int32_t>&);
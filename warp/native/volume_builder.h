@@ -2,6 +2,49 @@
 
 #include <nanovdb/NanoVDB.h>
 
+// Explanation of key types
+// ------------------------
+//
+// leaf_key:
+// .__.__. .... .__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.__.
+//  63 62  ....  27 26 25 24 23 22 21 20 19 18 17 16 15 14 13 12 11 10 09 08 07 06 05 04 03 02 01 00
+//  XX|< tile key >|<               upper offset               >|<           lower offset          >|
+//
+// tile key (36 bit):
+//   (uint32(ijk[2]) >> ChildT::TOTAL) |
+//   (uint64_t(uint32(ijk[1]) >> ChildT::TOTAL)) << 12 |
+//   (uint64_t(uint32(ijk[0]) >> ChildT::TOTAL)) << 24 
+//
+// lower_key (51 bits) == leaf_key >> 12
+//
+// upper_key (36 bits) == lower_key >> 15 == leaf_key >> 27 == tile key
+
+__hostdev__ inline uint64_t coord_to_full_key(const nanovdb::Coord& ijk) 
+{
+    using Tree = nanovdb::FloatTree; // any type is fine at this point
+    assert((abs(ijk[0]) >> 24) == 0);
+    assert((abs(ijk[1]) >> 24) == 0);
+    assert((abs(ijk[2]) >> 24) == 0);
+    constexpr uint32_t MASK_12BITS = (1u << 12) - 1u;
+    const uint64_t     tile_key36 =
+        ((uint32_t(ijk[2]) >> 12) & MASK_12BITS) | // z is the lower 12 bits
+        (uint64_t((uint32_t(ijk[1]) >> 12) & MASK_12BITS) << 12) | // y is the middle 12 bits
+        (uint64_t((uint32_t(ijk[0]) >> 12) & MASK_12BITS) << 24); // x is the upper 12 bits
+    const uint32_t upper_offset = Tree::Node2::CoordToOffset(ijk);
+    const uint32_t lower_offset = Tree::Node1::CoordToOffset(ijk);
+    return (tile_key36 << 27) | (upper_offset << 12) | lower_offset; 
+}
+
+// Convert a 36 bit tile key to the ijk origin of the addressed tile
+__hostdev__ inline nanovdb::Coord tile_key36_to_coord(uint64_t tile_key36) {
+    auto extend_sign = [](uint32_t i) -> int32_t { return i | ((i>>11 & 1) * 0xFFFFF800);};
+    constexpr uint32_t MASK_12BITS = (1u << 12) - 1u;
+    const int32_t i = extend_sign(uint32_t(tile_key36 >> 24) & MASK_12BITS);
+    const int32_t j = extend_sign(uint32_t(tile_key36 >> 12) & MASK_12BITS);
+    const int32_t k = extend_sign(uint32_t(tile_key36) & MASK_12BITS);
+    return nanovdb::Coord(i, j, k) << 12;
+}
+
 template<typename BuildT>
 struct BuildGridParams {
     double voxel_size = 1.0;
@@ -17,3 +60,12 @@ void build_grid_from_tiles(nanovdb::Grid<nanovdb::NanoTree<BuildT>> *&out_grid,
                            size_t num_points,
                            bool points_in_world_space,
                            const BuildGridParams<BuildT> &params);
+
+// host version of build_grid_from_tiles(), points and the grid are in host memory
+template <typename BuildT>
+void build_grid_from_tiles_host(nanovdb::Grid<nanovdb::NanoTree<BuildT>> *&out_grid,
+                                size_t &out_grid_size,
+                                const void *points,
+                                size_t num_points,
+                                bool points_in_world_space,
+                                const BuildGridParams<BuildT> &params);
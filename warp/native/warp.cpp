@@ -15,6 +15,10 @@
 #include "stdlib.h"
 #include "string.h"
 
+#if defined(_MSC_VER) && defined(_M_X64)
+#include <intrin.h>
+#endif
+
 int cuda_init();
 
 
@@ -139,6 +143,44 @@ int is_debug_enabled()
     return int(WP_ENABLE_DEBUG);
 }
 
+int cpu_get_simd_width()
+{
+#if defined(_MSC_VER) && defined(_M_X64)
+    int regs[4];
+    __cpuid(regs, 0);
+    const int max_leaf = regs[0];
+
+    __cpuid(regs, 1);
+    const bool osxsave = (regs[2] & (1 << 27)) != 0;
+    const bool fma = (regs[2] & (1 << 12)) != 0;
+
+    if (osxsave && max_leaf >= 7)
+    {
+        // check that the OS saves the vector registers on context switches
+        const unsigned long long xcr0 = _xgetbv(0);
+
+        __cpuidex(regs, 7, 0);
+        const bool avx2 = (regs[1] & (1 << 5)) != 0;
+        const bool avx512f = (regs[1] & (1 << 16)) != 0;
+
+        if (avx512f && (xcr0 & 0xe6) == 0xe6)
+            return 16;
+        if (avx2 && fma && (xcr0 & 0x6) == 0x6)
+            return 8;
+    }
+#elif defined(__x86_64__)
+    __builtin_cpu_init();
+
+    if (__builtin_cpu_supports("avx512f"))
+        return 16;
+    if (__builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma"))
+        return 8;
+#endif
+
+    // SSE2 and NEON baseline
+    return 4;
+}
+
 void* alloc_host(size_t s)
 {
     return malloc(s);
@@ -202,15 +244,18 @@ void memtile_host(void* dst, const void* src, size_t srcsize, size_t n)
     }
 }
 
-void array_scan_int_host(uint64_t in, uint64_t out, int len, bool inclusive)
-{
-    scan_host((const int*)in, (int*)out, len, inclusive);
-}
+#define WP_DECLARE_SCAN_HOST(Name, T) \
+    void array_scan_##Name##_host(uint64_t in, uint64_t out, int len, bool inclusive, int type_length) \
+    { \
+        scan_host((const T*)in, (T*)out, len, inclusive, type_length); \
+    }
 
-void array_scan_float_host(uint64_t in, uint64_t out, int len, bool inclusive)
-{
-    scan_host((const float*)in, (float*)out, len, inclusive);
-}
+WP_DECLARE_SCAN_HOST(int, int)
+WP_DECLARE_SCAN_HOST(uint, unsigned int)
+WP_DECLARE_SCAN_HOST(int64, int64_t)
+WP_DECLARE_SCAN_HOST(uint64, uint64_t)
+WP_DECLARE_SCAN_HOST(float, float)
+WP_DECLARE_SCAN_HOST(double, double)
 
 
 static void array_copy_nd(void* dst, const void* src,
@@ -955,6 +1000,7 @@ WP_API void* cuda_device_primary_context_retain(int ordinal) { return NULL; }
 WP_API void cuda_device_primary_context_release(int ordinal) {}
 WP_API const char* cuda_device_get_name(int ordinal) { return NULL; }
 WP_API int cuda_device_get_arch(int ordinal) { return 0; }
+WP_API int cuda_device_get_sm_count(int ordinal) { return 0; }
 WP_API int cuda_device_is_uva(int ordinal) { return 0; }
 WP_API int cuda_device_is_memory_pool_supported() { return 0; }
 
@@ -1001,7 +1047,11 @@ WP_API void cuda_set_context_restore_policy(bool always_restore) {}
 WP_API int cuda_get_context_restore_policy() { return false; }
 
 WP_API void array_scan_int_device(uint64_t in, uint64_t out, int len, bool inclusive) {}
+WP_API void array_scan_uint_device(uint64_t in, uint64_t out, int len, bool inclusive) {}
+WP_API void array_scan_int64_device(uint64_t in, uint64_t out, int len, bool inclusive) {}
+WP_API void array_scan_uint64_device(uint64_t in, uint64_t out, int len, bool inclusive) {}
 WP_API void array_scan_float_device(uint64_t in, uint64_t out, int len, bool inclusive) {}
+WP_API void array_scan_double_device(uint64_t in, uint64_t out, int len, bool inclusive) {}
 
 WP_API void cuda_graphics_map(void* context, void* resource) {}
 WP_API void cuda_graphics_unmap(void* context, void* resource) {}
@@ -76,6 +76,7 @@ struct DeviceInfo
     int ordinal = -1;
     char name[kNameLen] = "";
     int arch = 0;
+    int sm_count = 0;
     int is_uva = 0;
     int is_memory_pool_supported = 0;
 };
@@ -133,6 +134,7 @@ int cuda_init()
                 check_cu(cuDeviceGetAttribute_f(&major, CU_DEVICE_ATTRIBUTE_COMPUTE_CAPABILITY_MAJOR, device));
                 check_cu(cuDeviceGetAttribute_f(&minor, CU_DEVICE_ATTRIBUTE_COMPUTE_CAPABILITY_MINOR, device));
                 g_devices[i].arch = 10 * major + minor;
+                check_cu(cuDeviceGetAttribute_f(&g_devices[i].sm_count, CU_DEVICE_ATTRIBUTE_MULTIPROCESSOR_COUNT, device));
 
                 g_device_map[device] = &g_devices[i];
             }
@@ -1117,15 +1119,18 @@ WP_API void array_fill_device(void* context, void* arr_ptr, int arr_type, const
     }
 }
 
-void array_scan_int_device(uint64_t in, uint64_t out, int len, bool inclusive)
-{
-    scan_device((const int*)in, (int*)out, len, inclusive);
-}
+#define WP_DECLARE_SCAN_DEVICE(Name, T) \
+    void array_scan_##Name##_device(uint64_t in, uint64_t out, int len, bool inclusive) \
+    { \
+        scan_device((const T*)in, (T*)out, len, inclusive); \
+    }
 
-void array_scan_float_device(uint64_t in, uint64_t out, int len, bool inclusive)
-{
-    scan_device((const float*)in, (float*)out, len, inclusive);
-}
+WP_DECLARE_SCAN_DEVICE(int, int)
+WP_DECLARE_SCAN_DEVICE(uint, unsigned int)
+WP_DECLARE_SCAN_DEVICE(int64, int64_t)
+WP_DECLARE_SCAN_DEVICE(uint64, uint64_t)
+WP_DECLARE_SCAN_DEVICE(float, float)
+WP_DECLARE_SCAN_DEVICE(double, double)
 
 int cuda_driver_version()
 {
@@ -1205,6 +1210,13 @@ int cuda_device_get_arch(int ordinal)
     return 0;
 }
 
+int cuda_device_get_sm_count(int ordinal)
+{
+    if (ordinal >= 0 && ordinal < int(g_devices.size()))
+        return g_devices[ordinal].sm_count;
+    return 0;
+}
+
 int cuda_device_is_uva(int ordinal)
 {
     if (ordinal >= 0 && ordinal < int(g_devices.size()))
@@ -54,34 +54,63 @@ extern "C"
     WP_API void memtile_host(void* dest, const void* src, size_t srcsize, size_t n);
     WP_API void memtile_device(void* context, void* dest, const void* src, size_t srcsize, size_t n);
 
-	WP_API uint64_t bvh_create_host(wp::vec3* lowers, wp::vec3* uppers, int num_items);
+    // runs a generated CPU kernel entry point over dim threads on the CPU worker pool (see thread_pool.h)
+    WP_API void cpu_launch_kernel(void* kernel, size_t dim, int max_threads, size_t tile_size, void** args);
+    WP_API int cpu_get_default_thread_count();
+    // number of 32-bit lanes in the widest vector registers usable on the host CPU (4, 8 or 16)
+    WP_API int cpu_get_simd_width();
+
+    // CPU graphs record launches and memory operations for replay with a single call (see cpu_graph.cpp)
+    // nodes are added with the indices of the earlier nodes they depend on, nodes without
+    // mutual dependencies may run concurrently on the CPU worker pool
+    WP_API void* cpu_graph_create();
+    WP_API void cpu_graph_destroy(void* graph);
+    WP_API int cpu_graph_add_launch(void* graph, void* kernel, size_t dim, int max_threads, size_t tile_size, void** args, const int* deps, int num_deps);
+    WP_API int cpu_graph_add_memcpy(void* graph, void* dest, void* src, size_t n, const int* deps, int num_deps);
+    WP_API int cpu_graph_add_memset(void* graph, void* dest, int value, size_t n, const int* deps, int num_deps);
+    WP_API int cpu_graph_add_memtile(void* graph, void* dest, const void* src, size_t srcsize, size_t n, const int* deps, int num_deps);
+    WP_API int cpu_graph_add_array_copy(void* graph, void* dst, void* src, int dst_type, int src_type, int elem_size, const int* deps, int num_deps);
+    WP_API int cpu_graph_add_array_fill(void* graph, void* arr, int arr_type, const void* value, int value_size, const int* deps, int num_deps);
+    // number of sequential stages the graph is executed in
+    WP_API int cpu_graph_get_stage_count(void* graph);
+    WP_API void cpu_graph_launch(void* graph);
+
+	WP_API uint64_t bvh_create_host(wp::vec3* lowers, wp::vec3* uppers, int num_items, int constructor_type);
 	WP_API void bvh_destroy_host(uint64_t id);
-    WP_API void bvh_refit_host(uint64_t id);
+    // returns 0 if the wide BVH was released because the bounds are no longer finite
+    WP_API int bvh_refit_host(uint64_t id);
+    // builds the wide BVH used by CPU queries, returns 0 if the tree is too deep or its bounds are not finite
+    WP_API int bvh_create_wide_host(uint64_t id);
 
-	WP_API uint64_t bvh_create_device(void* context, wp::vec3* lowers, wp::vec3* uppers, int num_items);
+	WP_API uint64_t bvh_create_device(void* context, wp::vec3* lowers, wp::vec3* uppers, int num_items, int constructor_type);
 	WP_API void bvh_destroy_device(uint64_t id);
     WP_API void bvh_refit_device(uint64_t id);
 
     // create a user-accessible copy of the mesh, it is the 
     // users responsibility to keep-alive the points/tris data for the duration of the mesh lifetime
-	WP_API uint64_t mesh_create_host(wp::array_t<wp::vec3> points, wp::array_t<wp::vec3> velocities, wp::array_t<int> tris, int num_points, int num_tris, int support_winding_number);
+	WP_API uint64_t mesh_create_host(wp::array_t<wp::vec3> points, wp::array_t<wp::vec3> velocities, wp::array_t<int> tris, int num_points, int num_tris, int support_winding_number, int constructor_type);
 	WP_API void mesh_destroy_host(uint64_t id);
-    WP_API void mesh_refit_host(uint64_t id);
+    // returns 0 if the wide BVH was released because the bounds are no longer finite
+    WP_API int mesh_refit_host(uint64_t id);
+    WP_API int mesh_create_wide_bvh_host(uint64_t id);
 
-	WP_API uint64_t mesh_create_device(void* context, wp::array_t<wp::vec3> points, wp::array_t<wp::vec3> velocities, wp::array_t<int> tris, int num_points, int num_tris, int support_winding_number);
+	WP_API uint64_t mesh_create_device(void* context, wp::array_t<wp::vec3> points, wp::array_t<wp::vec3> velocities, wp::array_t<int> tris, int num_points, int num_tris, int support_winding_number, int constructor_type);
 	WP_API void mesh_destroy_device(uint64_t id);
     WP_API void mesh_refit_device(uint64_t id);
 
-    WP_API uint64_t hash_grid_create_host(int dim_x, int dim_y, int dim_z);
+    WP_API uint64_t hash_grid_create_host(int dim_x, int dim_y, int dim_z, int sparse);
     WP_API void hash_grid_reserve_host(uint64_t id, int num_points);
     WP_API void hash_grid_destroy_host(uint64_t id);
     WP_API void hash_grid_update_host(uint64_t id, float cell_width, const wp::vec3* positions, int num_points);
 
-    WP_API uint64_t hash_grid_create_device(void* context, int dim_x, int dim_y, int dim_z);
+    WP_API uint64_t hash_grid_create_device(void* context, int dim_x, int dim_y, int dim_z, int sparse);
     WP_API void hash_grid_reserve_device(uint64_t id, int num_points);
     WP_API void hash_grid_destroy_device(uint64_t id);
     WP_API void hash_grid_update_device(uint64_t id, float cell_width, const wp::vec3* positions, int num_points);
 
+    WP_API bool gemm_host(int m, int n, int k, const char* datatype,
+                          const void* a, const void* b, const void* c, void* d, double alpha, double beta,
+                          bool row_major_a, bool row_major_b, int batch_count);
     WP_API bool cutlass_gemm(int compute_capability, int m, int n, int k, const char* datatype,
                              const void* a, const void* b, const void* c, void* d, float alpha, float beta,
                              bool row_major_a, bool row_major_b, bool allow_tf32x3_arith, int batch_count);
@@ -90,6 +119,9 @@ extern "C"
     WP_API void volume_get_buffer_info_host(uint64_t id, void** buf, uint64_t* size);
     WP_API void volume_get_tiles_host(uint64_t id, void** buf, uint64_t* size);
     WP_API void volume_destroy_host(uint64_t id);
+    WP_API uint64_t volume_f_from_tiles_host(void* points, int num_points, float voxel_size, float bg_value, float tx, float ty, float tz, bool points_in_world_space);
+    WP_API uint64_t volume_v_from_tiles_host(void* points, int num_points, float voxel_size, float bg_value_x, float bg_value_y, float bg_value_z, float tx, float ty, float tz, bool points_in_world_space);
+    WP_API uint64_t volume_i_from_tiles_host(void* points, int num_points, float voxel_size, int bg_value, float tx, float ty, float tz, bool points_in_world_space);
 
     WP_API uint64_t volume_create_device(void* context, void* buf, uint64_t size);
     WP_API uint64_t volume_f_from_tiles_device(void* context, void* points, int num_points, float voxel_size, float bg_value, float tx, float ty, float tz, bool points_in_world_space);
@@ -101,6 +133,11 @@ extern "C"
 
     WP_API void volume_get_voxel_size(uint64_t id, float* dx, float* dy, float* dz);
     
+    WP_API uint64_t marching_cubes_create_host();
+    WP_API void marching_cubes_destroy_host(uint64_t id);
+    WP_API int marching_cubes_surface_host(uint64_t id, const float* field, int nx, int ny, int nz, float threshold, wp::vec3* verts, int* triangles, int max_verts, int max_tris, int* out_num_verts, int* out_num_tris);
+    WP_API int marching_cubes_surface_slab_host(uint64_t id, const float* field, int x_begin, int x_end, int nx, int ny, int nz, float threshold, wp::vec3* verts, int* triangles, int max_verts, int max_tris, int* out_num_verts, int* out_num_tris);
+
     WP_API uint64_t marching_cubes_create_device(void* context);
     WP_API void marching_cubes_destroy_device(uint64_t id);
     WP_API int marching_cubes_surface_device(uint64_t id, const float* field, int nx, int ny, int nz, float threshold, wp::vec3* verts, int* triangles, int max_verts, int max_tris, int* out_num_verts, int* out_num_tris);
@@ -113,27 +150,80 @@ extern "C"
     WP_API void array_fill_host(void* arr, int arr_type, const void* value, int value_size);
     WP_API void array_fill_device(void* context, void* arr, int arr_type, const void* value, int value_size);
 
+    WP_API void array_inner_int_host(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
+    WP_API void array_inner_uint_host(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
+    WP_API void array_inner_int64_host(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
+    WP_API void array_inner_uint64_host(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
     WP_API void array_inner_float_host(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
     WP_API void array_inner_double_host(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
+    WP_API void array_inner_int_device(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
+    WP_API void array_inner_uint_device(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
+    WP_API void array_inner_int64_device(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
+    WP_API void array_inner_uint64_device(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
     WP_API void array_inner_float_device(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
     WP_API void array_inner_double_device(uint64_t a, uint64_t b, uint64_t out, int count, int stride_a, int stride_b, int type_len);
 
-    WP_API void array_sum_float_device(uint64_t a, uint64_t out, int count, int stride, int type_len);
+    WP_API void array_sum_int_host(uint64_t a, uint64_t out, int count, int stride, int type_len);
+    WP_API void array_sum_uint_host(uint64_t a, uint64_t out, int count, int stride, int type_len);
+    WP_API void array_sum_int64_host(uint64_t a, uint64_t out, int count, int stride, int type_len);
+    WP_API void array_sum_uint64_host(uint64_t a, uint64_t out, int count, int stride, int type_len);
     WP_API void array_sum_float_host(uint64_t a, uint64_t out, int count, int stride, int type_len);
     WP_API void array_sum_double_host(uint64_t a, uint64_t out, int count, int stride, int type_len);
+    WP_API void array_sum_int_device(uint64_t a, uint64_t out, int count, int stride, int type_len);
+    WP_API void array_sum_uint_device(uint64_t a, uint64_t out, int count, int stride, int type_len);
+    WP_API void array_sum_int64_device(uint64_t a, uint64_t out, int count, int stride, int type_len);
+    WP_API void array_sum_uint64_device(uint64_t a, uint64_t out, int count, int stride, int type_len);
+    WP_API void array_sum_float_device(uint64_t a, uint64_t out, int count, int stride, int type_len);
     WP_API void array_sum_double_device(uint64_t a, uint64_t out, int count, int stride, int type_len);
 
-    WP_API void array_scan_int_host(uint64_t in, uint64_t out, int len, bool inclusive);
-    WP_API void array_scan_float_host(uint64_t in, uint64_t out, int len, bool inclusive);
+    WP_API void array_scan_int_host(uint64_t in, uint64_t out, int len, bool inclusive, int type_length);
+    WP_API void array_scan_uint_host(uint64_t in, uint64_t out, int len, bool inclusive, int type_length);
+    WP_API void array_scan_int64_host(uint64_t in, uint64_t out, int len, bool inclusive, int type_length);
+    WP_API void array_scan_uint64_host(uint64_t in, uint64_t out, int len, bool inclusive, int type_length);
+    WP_API void array_scan_float_host(uint64_t in, uint64_t out, int len, bool inclusive, int type_length);
+    WP_API void array_scan_double_host(uint64_t in, uint64_t out, int len, bool inclusive, int type_length);
 
     WP_API void array_scan_int_device(uint64_t in, uint64_t out, int len, bool inclusive);
+    WP_API void array_scan_uint_device(uint64_t in, uint64_t out, int len, bool inclusive);
+    WP_API void array_scan_int64_device(uint64_t in, uint64_t out, int len, bool inclusive);
+    WP_API void array_scan_uint64_device(uint64_t in, uint64_t out, int len, bool inclusive);
     WP_API void array_scan_float_device(uint64_t in, uint64_t out, int len, bool inclusive);
-
-    WP_API void radix_sort_pairs_int_host(uint64_t keys, uint64_t values, int n);
-    WP_API void radix_sort_pairs_int_device(uint64_t keys, uint64_t values, int n);
-
-    WP_API void runlength_encode_int_host(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n);
+    WP_API void array_scan_double_device(uint64_t in, uint64_t out, int len, bool inclusive);
+
+    WP_API void radix_sort_pairs_int_host(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit);
+    WP_API void radix_sort_pairs_int_device(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit);
+    WP_API void radix_sort_pairs_uint_host(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit);
+    WP_API void radix_sort_pairs_uint_device(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit);
+    WP_API void radix_sort_pairs_int64_host(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit);
+    WP_API void radix_sort_pairs_int64_device(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit);
+    WP_API void radix_sort_pairs_uint64_host(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit);
+    WP_API void radix_sort_pairs_uint64_device(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit);
+    WP_API void radix_sort_pairs_float_host(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit);
+    WP_API void radix_sort_pairs_float_device(uint64_t keys, uint64_t values, int n, int begin_bit, int end_bit);
+
+    WP_API void segmented_sort_pairs_int_host(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit);
+    WP_API void segmented_sort_pairs_int_device(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit);
+    WP_API void segmented_sort_pairs_uint_host(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit);
+    WP_API void segmented_sort_pairs_uint_device(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit);
+    WP_API void segmented_sort_pairs_int64_host(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit);
+    WP_API void segmented_sort_pairs_int64_device(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit);
+    WP_API void segmented_sort_pairs_uint64_host(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit);
+    WP_API void segmented_sort_pairs_uint64_device(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit);
+    WP_API void segmented_sort_pairs_float_host(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit);
+    WP_API void segmented_sort_pairs_float_device(uint64_t keys, uint64_t values, int n, uint64_t segment_start_indices, uint64_t segment_end_indices, int num_segments, int begin_bit, int end_bit);
+
+    WP_API void runlength_encode_int_host(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n, int type_length);
     WP_API void runlength_encode_int_device(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n);
+    WP_API void runlength_encode_uint_host(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n, int type_length);
+    WP_API void runlength_encode_uint_device(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n);
+    WP_API void runlength_encode_int64_host(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n, int type_length);
+    WP_API void runlength_encode_int64_device(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n);
+    WP_API void runlength_encode_uint64_host(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n, int type_length);
+    WP_API void runlength_encode_uint64_device(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n);
+    WP_API void runlength_encode_float_host(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n, int type_length);
+    WP_API void runlength_encode_float_device(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n);
+    WP_API void runlength_encode_double_host(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n, int type_length);
+    WP_API void runlength_encode_double_device(uint64_t values, uint64_t run_values, uint64_t run_lengths, uint64_t run_count, int n);
 
     WP_API int bsr_matrix_from_triplets_float_host(
         int rows_per_block,
@@ -196,6 +286,37 @@ extern "C"
         uint64_t transposed_bsr_columns,
         uint64_t transposed_bsr_values);
 
+    WP_API int bsr_mm_count_host(int row_count, int col_count,
+        uint64_t x_offsets, uint64_t x_columns,
+        uint64_t y_offsets, uint64_t y_columns,
+        uint64_t z_offsets, uint64_t z_columns,
+        uint64_t mm_offsets);
+    WP_API void bsr_mm_list_host(int row_count, int col_count,
+        uint64_t x_offsets, uint64_t x_columns,
+        uint64_t y_offsets, uint64_t y_columns,
+        uint64_t z_offsets, uint64_t z_columns,
+        uint64_t mm_offsets, uint64_t mm_columns);
+
+    WP_API void bsr_mm_values_float_host(int row_count, int col_count,
+        int rows_per_block, int inner_block_size, int cols_per_block, float alpha,
+        uint64_t x_offsets, uint64_t x_columns, uint64_t x_values,
+        uint64_t y_offsets, uint64_t y_columns, uint64_t y_values,
+        uint64_t z_offsets, uint64_t z_columns, uint64_t z_values);
+    WP_API void bsr_mm_values_double_host(int row_count, int col_count,
+        int rows_per_block, int inner_block_size, int cols_per_block, double alpha,
+        uint64_t x_offsets, uint64_t x_columns, uint64_t x_values,
+        uint64_t y_offsets, uint64_t y_columns, uint64_t y_values,
+        uint64_t z_offsets, uint64_t z_columns, uint64_t z_values);
+
+    WP_API void bsr_mv_float_host(int row_count, int rows_per_block, int cols_per_block,
+        float alpha, float beta,
+        uint64_t offsets, uint64_t columns, uint64_t values,
+        uint64_t x, uint64_t y);
+    WP_API void bsr_mv_double_host(int row_count, int rows_per_block, int cols_per_block,
+        double alpha, double beta,
+        uint64_t offsets, uint64_t columns, uint64_t values,
+        uint64_t x, uint64_t y);
+
     WP_API void bsr_transpose_float_device(int rows_per_block, int cols_per_block,
         int row_count, int col_count, int nnz,
         uint64_t bsr_offsets, uint64_t bsr_columns,
@@ -224,6 +345,7 @@ extern "C"
     WP_API void cuda_device_primary_context_release(int ordinal);
     WP_API const char* cuda_device_get_name(int ordinal);
     WP_API int cuda_device_get_arch(int ordinal);
+    WP_API int cuda_device_get_sm_count(int ordinal);
     WP_API int cuda_device_is_uva(int ordinal);
     WP_API int cuda_device_is_memory_pool_supported(int ordinal);
 
@@ -474,11 +474,12 @@ def volume_grad(volume: wp.uint64, p: wp.vec3):
     return wp.normalize(wp.vec3(dx, dy, dz))
 
 
-@wp.kernel
-def create_soft_contacts(
+@wp.func
+def create_soft_contact(
+    particle_index: int,
+    shape_index: int,
     particle_x: wp.array(dtype=wp.vec3),
     particle_radius: wp.array(dtype=float),
-    particle_flags: wp.array(dtype=wp.uint32),
     body_X_wb: wp.array(dtype=wp.transform),
     shape_X_bs: wp.array(dtype=wp.transform),
     shape_body: wp.array(dtype=int),
@@ -493,10 +494,6 @@ def create_soft_contacts(
     soft_contact_body_vel: wp.array(dtype=wp.vec3),
     soft_contact_normal: wp.array(dtype=wp.vec3),
 ):
-    particle_index, shape_index = wp.tid()
-    if (particle_flags[particle_index] & PARTICLE_FLAG_ACTIVE) == 0:
-        return
-
     rigid_index = shape_body[shape_index]
 
     px = particle_x[particle_index]
@@ -594,6 +591,175 @@ def create_soft_contacts(
             soft_contact_normal[index] = world_normal
 
 
+@wp.kernel
+def create_soft_contacts(
+    particle_x: wp.array(dtype=wp.vec3),
+    particle_radius: wp.array(dtype=float),
+    particle_flags: wp.array(dtype=wp.uint32),
+    body_X_wb: wp.array(dtype=wp.transform),
+    shape_X_bs: wp.array(dtype=wp.transform),
+    shape_body: wp.array(dtype=int),
+    geo: ModelShapeGeometry,
+    margin: float,
+    soft_contact_max: int,
+    # outputs
+    soft_contact_count: wp.array(dtype=int),
+    soft_contact_particle: wp.array(dtype=int),
+    soft_contact_shape: wp.array(dtype=int),
+    soft_contact_body_pos: wp.array(dtype=wp.vec3),
+    soft_contact_body_vel: wp.array(dtype=wp.vec3),
+    soft_contact_normal: wp.array(dtype=wp.vec3),
+):
+    particle_index, shape_index = wp.tid()
+    if (particle_flags[particle_index] & PARTICLE_FLAG_ACTIVE) == 0:
+        return
+
+    create_soft_contact(
+        particle_index,
+        shape_index,
+        particle_x,
+        particle_radius,
+        body_X_wb,
+        shape_X_bs,
+        shape_body,
+        geo,
+        margin,
+        soft_contact_max,
+        soft_contact_count,
+        soft_contact_particle,
+        soft_contact_shape,
+        soft_contact_body_pos,
+        soft_contact_body_vel,
+        soft_contact_normal,
+    )
+
+
+@wp.func
+def is_shape_bounded(geo_type: int, geo_scale: wp.vec3):
+    # SDFs and infinite planes generate soft contacts arbitrarily far from the shape origin
+    if geo_type == wp.sim.GEO_SDF:
+        return False
+    if geo_type == wp.sim.GEO_PLANE:
+        return geo_scale[0] > 0.0 and geo_scale[1] > 0.0
+    return True
+
+
+@wp.kernel
+def compute_shape_soft_contact_bounds(
+    body_X_wb: wp.array(dtype=wp.transform),
+    shape_X_bs: wp.array(dtype=wp.transform),
+    shape_body: wp.array(dtype=int),
+    geo: ModelShapeGeometry,
+    collision_radius: wp.array(dtype=float),
+    contact_distance: float,
+    # outputs
+    lowers: wp.array(dtype=wp.vec3),
+    uppers: wp.array(dtype=wp.vec3),
+):
+    shape_index = wp.tid()
+
+    rigid_index = shape_body[shape_index]
+    if rigid_index == -1:
+        X_ws = shape_X_bs[shape_index]
+    else:
+        X_ws = wp.transform_multiply(body_X_wb[rigid_index], shape_X_bs[shape_index])
+
+    # a particle can only be in contact with a bounded shape if it is within the contact distance (the margin plus
+    # the largest particle radius) of the bounds, unbounded shapes are reduced to their origin and tested against
+    # all particles instead
+    p = wp.transform_get_translation(X_ws)
+    geo_type = geo.type[shape_index]
+    geo_scale = geo.scale[shape_index]
+
+    extent = 0.0
+    if is_shape_bounded(geo_type, geo_scale):
+        # the bounding sphere contains the points within the contact distance of shapes with an exact distance
+        extent = collision_radius[shape_index]
+
+        # the distance to planes and cones is underestimated away from the shape
+        if geo_type == wp.sim.GEO_PLANE:
+            extent += (wp.sqrt(3.0) - 1.0) * contact_distance
+        if geo_type == wp.sim.GEO_CONE:
+            extent += (1.0 + geo_scale[0] / (2.0 * geo_scale[1])) * contact_distance
+
+    lowers[shape_index] = p - wp.vec3(extent)
+    uppers[shape_index] = p + wp.vec3(extent)
+
+
+@wp.kernel
+def create_soft_contacts_bvh(
+    shape_bvh: wp.uint64,
+    unbounded_shapes: wp.array(dtype=int),
+    particle_x: wp.array(dtype=wp.vec3),
+    particle_radius: wp.array(dtype=float),
+    particle_flags: wp.array(dtype=wp.uint32),
+    body_X_wb: wp.array(dtype=wp.transform),
+    shape_X_bs: wp.array(dtype=wp.transform),
+    shape_body: wp.array(dtype=int),
+    geo: ModelShapeGeometry,
+    margin: float,
+    soft_contact_max: int,
+    # outputs
+    soft_contact_count: wp.array(dtype=int),
+    soft_contact_particle: wp.array(dtype=int),
+    soft_contact_shape: wp.array(dtype=int),
+    soft_contact_body_pos: wp.array(dtype=wp.vec3),
+    soft_contact_body_vel: wp.array(dtype=wp.vec3),
+    soft_contact_normal: wp.array(dtype=wp.vec3),
+):
+    particle_index = wp.tid()
+    if (particle_flags[particle_index] & PARTICLE_FLAG_ACTIVE) == 0:
+        return
+
+    # only the shapes whose bounds are within the contact distance of the particle can generate a contact
+    px = particle_x[particle_index]
+    extent = wp.vec3(margin + particle_radius[particle_index])
+
+    query = wp.bvh_query_aabb(shape_bvh, px - extent, px + extent)
+    shape_index = int(0)
+
+    while wp.bvh_query_next(query, shape_index):
+        if is_shape_bounded(geo.type[shape_index], geo.scale[shape_index]):
+            create_soft_contact(
+                particle_index,
+                shape_index,
+                particle_x,
+                particle_radius,
+                body_X_wb,
+                shape_X_bs,
+                shape_body,
+                geo,
+                margin,
+                soft_contact_max,
+                soft_contact_count,
+                soft_contact_particle,
+                soft_contact_shape,
+                soft_contact_body_pos,
+                soft_contact_body_vel,
+                soft_contact_normal,
+            )
+
+    for i in range(unbounded_shapes.shape[0]):
+        create_soft_contact(
+            particle_index,
+            unbounded_shapes[i],
+            particle_x,
+            particle_radius,
+            body_X_wb,
+            shape_X_bs,
+            shape_body,
+            geo,
+            margin,
+            soft_contact_max,
+            soft_contact_count,
+            soft_contact_particle,
+            soft_contact_shape,
+            soft_contact_body_pos,
+            soft_contact_body_vel,
+            soft_contact_normal,
+        )
+
+
 @wp.kernel
 def count_contact_points(
     contact_pairs: wp.array(dtype=int, ndim=2),
@@ -675,6 +841,91 @@ def count_contact_points(
     wp.atomic_add(contact_count, 0, num_contacts)
 
 
+@wp.kernel
+def compute_shape_bounds(
+    body_q: wp.array(dtype=wp.transform),
+    shape_X_bs: wp.array(dtype=wp.transform),
+    shape_body: wp.array(dtype=int),
+    collision_radius: wp.array(dtype=float),
+    rigid_contact_margin: float,
+    # outputs
+    lowers: wp.array(dtype=wp.vec3),
+    uppers: wp.array(dtype=wp.vec3),
+):
+    tid = wp.tid()
+
+    rigid = shape_body[tid]
+    if rigid == -1:
+        X_ws = shape_X_bs[tid]
+    else:
+        X_ws = wp.transform_multiply(body_q[rigid], shape_X_bs[tid])
+
+    # the bounds of two shapes overlap whenever their pair passes the bounding sphere test of
+    # broadphase_collision_pairs, so that the broadphase does not drop any contact
+    p = wp.transform_get_translation(X_ws)
+    extent = 2.0 * collision_radius[tid] + rigid_contact_margin + 0.1
+    lowers[tid] = p - wp.vec3(extent)
+    uppers[tid] = p + wp.vec3(extent)
+
+
+@wp.func
+def is_shape_pair_filtered(
+    filter_offsets: wp.array(dtype=int), filter_shapes: wp.array(dtype=int), shape_a: int, shape_b: int
+):
+    # the shapes filtered from shape_a are sorted and only include shapes with larger indices
+    beg = filter_offsets[shape_a]
+    end = filter_offsets[shape_a + 1]
+    index = wp.lower_bound(filter_shapes, beg, end, shape_b)
+    return index < end and filter_shapes[index] == shape_b
+
+
+@wp.kernel
+def find_shape_contact_pairs(
+    bvh: wp.uint64,
+    lowers: wp.array(dtype=wp.vec3),
+    uppers: wp.array(dtype=wp.vec3),
+    shape_type: wp.array(dtype=int),
+    collision_radius: wp.array(dtype=float),
+    collision_group: wp.array(dtype=int),
+    filter_offsets: wp.array(dtype=int),
+    filter_shapes: wp.array(dtype=int),
+    rigid_contact_margin: float,
+    contact_pair_max: int,
+    # outputs
+    contact_pair_count: wp.array(dtype=int),
+    contact_pairs: wp.array(dtype=int, ndim=2),
+):
+    shape_a = wp.tid()
+    group_a = collision_group[shape_a]
+    p_a = 0.5 * (lowers[shape_a] + uppers[shape_a])
+
+    query = wp.bvh_query_aabb(bvh, lowers[shape_a], uppers[shape_a])
+    shape_b = int(0)
+
+    while wp.bvh_query_next(query, shape_b):
+        # each pair is reported once, by its first shape
+        if shape_b > shape_a:
+            group_b = collision_group[shape_b]
+            # shapes with collision group -1 collide with all other shapes
+            if group_a == group_b or group_a == -1 or group_b == -1:
+                # bounding sphere test of broadphase_collision_pairs, pairs with planes only test their bounds
+                p_b = 0.5 * (lowers[shape_b] + uppers[shape_b])
+                d = wp.length(p_a - p_b) * 0.5 - 0.1
+                overlap = d <= collision_radius[shape_a] + collision_radius[shape_b] + rigid_contact_margin
+                if shape_type[shape_a] == wp.sim.GEO_PLANE or shape_type[shape_b] == wp.sim.GEO_PLANE:
+                    overlap = True
+
+                if overlap and not is_shape_pair_filtered(filter_offsets, filter_shapes, shape_a, shape_b):
+                    index = wp.atomic_add(contact_pair_count, 0, 1)
+                    if index < contact_pair_max:
+                        contact_pairs[index, 0] = shape_a
+                        contact_pairs[index, 1] = shape_b
+                    elif index == contact_pair_max:
+                        print(
+                            "Number of shape contact pairs exceeded limit. Increase ModelBuilder.shape_contact_pair_max."
+                        )
+
+
 @wp.kernel
 def broadphase_collision_pairs(
     contact_pairs: wp.array(dtype=int, ndim=2),
@@ -1338,33 +1589,125 @@ def collide(model, state, edge_sdf_iter: int = 10):
     if model.particle_count and model.shape_count > 1:
         # clear old count
         model.soft_contact_count.zero_()
+        if model.soft_contact_shape_bvh is not None:
+            wp.launch(
+                kernel=compute_shape_soft_contact_bounds,
+                dim=model.shape_count - 1,
+                inputs=[
+                    state.body_q,
+                    model.shape_transform,
+                    model.shape_body,
+                    model.shape_geo,
+                    model.shape_collision_radius,
+                    model.soft_contact_margin + model.particle_max_radius,
+                ],
+                outputs=[
+                    model.soft_contact_shape_lowers,
+                    model.soft_contact_shape_uppers,
+                ],
+                device=model.device,
+                record_tape=False,
+            )
+            model.soft_contact_shape_bvh.refit()
+            wp.launch(
+                kernel=create_soft_contacts_bvh,
+                dim=model.particle_count,
+                inputs=[
+                    model.soft_contact_shape_bvh.id,
+                    model.soft_contact_unbounded_shapes,
+                    state.particle_q,
+                    model.particle_radius,
+                    model.particle_flags,
+                    state.body_q,
+                    model.shape_transform,
+                    model.shape_body,
+                    model.shape_geo,
+                    model.soft_contact_margin,
+                    model.soft_contact_max,
+                ],
+                outputs=[
+                    model.soft_contact_count,
+                    model.soft_contact_particle,
+                    model.soft_contact_shape,
+                    model.soft_contact_body_pos,
+                    model.soft_contact_body_vel,
+                    model.soft_contact_normal,
+                ],
+                device=model.device,
+                record_tape=False,
+            )
+        else:
+            wp.launch(
+                kernel=create_soft_contacts,
+                dim=(model.particle_count, model.shape_count - 1),
+                inputs=[
+                    state.particle_q,
+                    model.particle_radius,
+                    model.particle_flags,
+                    state.body_q,
+                    model.shape_transform,
+                    model.shape_body,
+                    model.shape_geo,
+                    model.soft_contact_margin,
+                    model.soft_contact_max,
+                ],
+                outputs=[
+                    model.soft_contact_count,
+                    model.soft_contact_particle,
+                    model.soft_contact_shape,
+                    model.soft_contact_body_pos,
+                    model.soft_contact_body_vel,
+                    model.soft_contact_normal,
+                ],
+                device=model.device,
+            )
+
+    # clear old count
+    model.rigid_contact_count.zero_()
+
+    if model.shape_contact_broadphase and model.shape_contact_pair_count:
+        # find the shape pairs whose world-space bounds overlap
+        model.shape_broadphase_pair_count.zero_()
         wp.launch(
-            kernel=create_soft_contacts,
-            dim=(model.particle_count, model.shape_count - 1),
+            kernel=compute_shape_bounds,
+            dim=len(model.shape_broadphase_lowers),
             inputs=[
-                state.particle_q,
-                model.particle_radius,
-                model.particle_flags,
                 state.body_q,
                 model.shape_transform,
                 model.shape_body,
-                model.shape_geo,
-                model.soft_contact_margin,
-                model.soft_contact_max,
+                model.shape_collision_radius,
+                model.rigid_contact_margin,
             ],
             outputs=[
-                model.soft_contact_count,
-                model.soft_contact_particle,
-                model.soft_contact_shape,
-                model.soft_contact_body_pos,
-                model.soft_contact_body_vel,
-                model.soft_contact_normal,
+                model.shape_broadphase_lowers,
+                model.shape_broadphase_uppers,
             ],
             device=model.device,
+            record_tape=False,
+        )
+        model.shape_broadphase_bvh.refit()
+        wp.launch(
+            kernel=find_shape_contact_pairs,
+            dim=len(model.shape_broadphase_lowers),
+            inputs=[
+                model.shape_broadphase_bvh.id,
+                model.shape_broadphase_lowers,
+                model.shape_broadphase_uppers,
+                model.shape_geo.type,
+                model.shape_collision_radius,
+                model.shape_broadphase_group,
+                model.shape_broadphase_filter_offsets,
+                model.shape_broadphase_filter_shapes,
+                model.rigid_contact_margin,
+                model.shape_contact_pair_max,
+            ],
+            outputs=[
+                model.shape_broadphase_pair_count,
+                model.shape_contact_pairs,
+            ],
+            device=model.device,
+            record_tape=False,
         )
-
-    # clear old count
-    model.rigid_contact_count.zero_()
 
     if model.shape_contact_pair_count:
         wp.launch(
@@ -1388,6 +1731,7 @@ def collide(model, state, edge_sdf_iter: int = 10):
             ],
             device=model.device,
             record_tape=False,
+            dim_from=model.shape_broadphase_pair_count if model.shape_contact_broadphase else None,
         )
 
     if model.ground and model.shape_ground_contact_pair_count:
@@ -1442,4 +1786,5 @@ def collide(model, state, edge_sdf_iter: int = 10):
                 model.rigid_contact_thickness,
             ],
             device=model.device,
+            dim_from=model.rigid_contact_count,
         )
@@ -356,28 +356,14 @@ def eval_triangles(
 #     return a + ab * v + ac * w
 
 
-@wp.kernel
-def eval_triangles_contact(
-    # idx : wp.array(dtype=int), # list of indices for colliding particles
-    num_particles: int,  # size of particles
+@wp.func
+def eval_triangle_contact(
+    face_no: int,
+    particle_no: int,
     x: wp.array(dtype=wp.vec3),
-    v: wp.array(dtype=wp.vec3),
     indices: wp.array2d(dtype=int),
-    pose: wp.array(dtype=wp.mat22),
-    activation: wp.array(dtype=float),
-    materials: wp.array2d(dtype=float),
     f: wp.array(dtype=wp.vec3),
 ):
-    tid = wp.tid()
-    face_no = tid // num_particles  # which face
-    particle_no = tid % num_particles  # which particle
-
-    k_mu = materials[face_no, 0]
-    k_lambda = materials[face_no, 1]
-    k_damp = materials[face_no, 2]
-    k_drag = materials[face_no, 3]
-    k_lift = materials[face_no, 4]
-
     # at the moment, just one particle
     pos = x[particle_no]
 
@@ -417,6 +403,61 @@ def eval_triangles_contact(
     wp.atomic_add(f, k, fn * bary[2])
 
 
+@wp.kernel
+def eval_triangles_contact(
+    # idx : wp.array(dtype=int), # list of indices for colliding particles
+    num_particles: int,  # size of particles
+    x: wp.array(dtype=wp.vec3),
+    v: wp.array(dtype=wp.vec3),
+    indices: wp.array2d(dtype=int),
+    pose: wp.array(dtype=wp.mat22),
+    activation: wp.array(dtype=float),
+    materials: wp.array2d(dtype=float),
+    f: wp.array(dtype=wp.vec3),
+):
+    tid = wp.tid()
+    face_no = tid // num_particles  # which face
+    particle_no = tid % num_particles  # which particle
+
+    eval_triangle_contact(face_no, particle_no, x, indices, f)
+
+
+@wp.kernel
+def compute_triangle_bounds(
+    x: wp.array(dtype=wp.vec3),
+    indices: wp.array2d(dtype=int),
+    lowers: wp.array(dtype=wp.vec3),
+    uppers: wp.array(dtype=wp.vec3),
+):
+    tid = wp.tid()
+
+    p = x[indices[tid, 0]]
+    q = x[indices[tid, 1]]
+    r = x[indices[tid, 2]]
+
+    lowers[tid] = wp.min(wp.min(p, q), r)
+    uppers[tid] = wp.max(wp.max(p, q), r)
+
+
+@wp.kernel
+def eval_triangles_contact_bvh(
+    tri_bvh: wp.uint64,
+    x: wp.array(dtype=wp.vec3),
+    indices: wp.array2d(dtype=int),
+    f: wp.array(dtype=wp.vec3),
+):
+    particle_no = wp.tid()
+
+    # contact forces are generated within a distance of 0.1 of the triangles
+    pos = x[particle_no]
+    extent = wp.vec3(0.1)
+
+    face_no = int(0)
+    query = wp.bvh_query_aabb(tri_bvh, pos - extent, pos + extent)
+    while wp.bvh_query_next(query, face_no):
+        eval_triangle_contact(face_no, particle_no, x, indices, f)
+
+
 @wp.kernel
 def eval_triangles_body_contacts(
     num_particles: int,  # number of particles (size of contact_point)
@@ -1530,8 +1571,27 @@ def compute_forces(model, state, particle_f, body_f, requires_grad):
             device=model.device,
         )
 
-    # triangle/triangle contacts
-    if model.enable_tri_collisions and model.tri_count:
+    # triangle/particle contacts, the candidate triangles of each particle are found from a BVH over the
+    # triangle bounds unless the model was finalized for differentiation
+    if model.enable_tri_collisions and model.tri_count and model.tri_collision_bvh is not None:
+        wp.launch(
+            kernel=compute_triangle_bounds,
+            dim=model.tri_count,
+            inputs=[state.particle_q, model.tri_indices],
+            outputs=[model.tri_collision_lowers, model.tri_collision_uppers],
+            device=model.device,
+            record_tape=False,
+        )
+        model.tri_collision_bvh.refit()
+
+        wp.launch(
+            kernel=eval_triangles_contact_bvh,
+            dim=model.particle_count,
+            inputs=[model.tri_collision_bvh.id, state.particle_q, model.tri_indices],
+            outputs=[particle_f],
+            device=model.device,
+        )
+    elif model.enable_tri_collisions and model.tri_count:
         wp.launch(
             kernel=eval_triangles_contact,
             dim=model.tri_count * model.particle_count,
@@ -1624,6 +1684,7 @@ def compute_forces(model, state, particle_f, body_f, requires_grad):
             ],
             outputs=[body_f],
             device=model.device,
+            dim_from=model.rigid_contact_count,
         )
 
     if model.joint_count:
@@ -1691,6 +1752,7 @@ def compute_forces(model, state, particle_f, body_f, requires_grad):
             # outputs
             outputs=[particle_f, body_f],
             device=model.device,
+            dim_from=model.soft_contact_count,
         )
 
     # evaluate muscle actuation
@@ -283,8 +283,27 @@ def solve_particle_particle_contacts(
     wp.atomic_add(deltas, i, delta * relaxation)
 
 
-@wp.kernel
-def solve_springs(
+@wp.func
+def apply_particle_delta(
+    index: int,
+    delta: wp.vec3,
+    x: wp.array(dtype=wp.vec3),
+    v: wp.array(dtype=wp.vec3),
+    particle_flags: wp.array(dtype=wp.uint32),
+    dt: float,
+):
+    # in-place position update of the Gauss-Seidel constraint projection, the velocity is kept equal to
+    # (x - x_orig) / dt as computed by apply_particle_deltas()
+    if (particle_flags[index] & PARTICLE_FLAG_ACTIVE) == 0:
+        return
+
+    x[index] = x[index] + delta
+    v[index] = v[index] + delta / dt
+
+
+@wp.func
+def solve_spring_constraint(
+    tid: int,
     x: wp.array(dtype=wp.vec3),
     v: wp.array(dtype=wp.vec3),
     invmass: wp.array(dtype=float),
@@ -294,10 +313,7 @@ def solve_springs(
     spring_damping: wp.array(dtype=float),
     dt: float,
     lambdas: wp.array(dtype=float),
-    delta: wp.array(dtype=wp.vec3),
 ):
-    tid = wp.tid()
-
     i = spring_indices[tid * 2 + 0]
     j = spring_indices[tid * 2 + 1]
 
@@ -317,7 +333,7 @@ def solve_springs(
     l = wp.length(xij)
 
     if l == 0.0:
-        return
+        return wp.vec3(0.0), wp.vec3(0.0)
 
     n = xij / l
 
@@ -332,7 +348,7 @@ def solve_springs(
 
     # Note strict inequality for damping -- 0 damping is ok
     if denom <= 0.0 or ke <= 0.0 or kd < 0.0:
-        return
+        return wp.vec3(0.0), wp.vec3(0.0)
 
     alpha= 1.0 / (ke * dt * dt)
     gamma = kd / (ke * dt)
@@ -345,12 +361,67 @@ def solve_springs(
 
     lambdas[tid] = lambdas[tid] + dlambda
 
+    return dxi, dxj
+
+
+@wp.kernel
+def solve_springs(
+    x: wp.array(dtype=wp.vec3),
+    v: wp.array(dtype=wp.vec3),
+    invmass: wp.array(dtype=float),
+    spring_indices: wp.array(dtype=int),
+    spring_rest_lengths: wp.array(dtype=float),
+    spring_stiffness: wp.array(dtype=float),
+    spring_damping: wp.array(dtype=float),
+    dt: float,
+    lambdas: wp.array(dtype=float),
+    delta: wp.array(dtype=wp.vec3),
+):
+    tid = wp.tid()
+
+    i = spring_indices[tid * 2 + 0]
+    j = spring_indices[tid * 2 + 1]
+
+    dxi, dxj = solve_spring_constraint(
+        tid, x, v, invmass, spring_indices, spring_rest_lengths, spring_stiffness, spring_damping, dt, lambdas
+    )
+
     wp.atomic_add(delta, i, dxi)
     wp.atomic_add(delta, j, dxj)
 
 
 @wp.kernel
-def bending_constraint(
+def solve_springs_colored(
+    x: wp.array(dtype=wp.vec3),
+    v: wp.array(dtype=wp.vec3),
+    invmass: wp.array(dtype=float),
+    particle_flags: wp.array(dtype=wp.uint32),
+    spring_indices: wp.array(dtype=int),
+    spring_rest_lengths: wp.array(dtype=float),
+    spring_stiffness: wp.array(dtype=float),
+    spring_damping: wp.array(dtype=float),
+    dt: float,
+    lambdas: wp.array(dtype=float),
+    color_constraints: wp.array(dtype=int),
+    color_offset: int,
+):
+    # the springs of a color do not share particles and are projected in place
+    tid = color_constraints[color_offset + wp.tid()]
+
+    i = spring_indices[tid * 2 + 0]
+    j = spring_indices[tid * 2 + 1]
+
+    dxi, dxj = solve_spring_constraint(
+        tid, x, v, invmass, spring_indices, spring_rest_lengths, spring_stiffness, spring_damping, dt, lambdas
+    )
+
+    apply_particle_delta(i, dxi, x, v, particle_flags, dt)
+    apply_particle_delta(j, dxj, x, v, particle_flags, dt)
+
+
+@wp.func
+def solve_bending_constraint(
+    tid: int,
     x: wp.array(dtype=wp.vec3),
     v: wp.array(dtype=wp.vec3),
     invmass: wp.array(dtype=float),
@@ -359,10 +430,7 @@ def bending_constraint(
     bending_properties: wp.array2d(dtype=float),
     dt: float,
     lambdas: wp.array(dtype=float),
-    delta: wp.array(dtype=wp.vec3),
 ):
-
-    tid = wp.tid()
     eps = 1.0e-6
 
     ke = bending_properties[tid, 0]
@@ -373,9 +441,6 @@ def bending_constraint(
     k = indices[tid, 2]
     l = indices[tid, 3]
 
-    if i == -1 or j == -1 or k == -1 or l == -1:
-        return
-
     rest_angle = rest[tid]
 
     x1 = x[i]
@@ -400,7 +465,7 @@ def bending_constraint(
     n2_length = wp.length(n2)
 
     if n1_length < eps or n2_length < eps:
-        return
+        return wp.vec3(0.0), wp.vec3(0.0), wp.vec3(0.0), wp.vec3(0.0)
 
     n1 /= n1_length
     n2 /= n2_length
@@ -424,7 +489,7 @@ def bending_constraint(
 
     # Note strict inequality for damping -- 0 damping is ok
     if denominator <= 0.0 or ke <= 0.0 or kd < 0.0:
-        return
+        return wp.vec3(0.0), wp.vec3(0.0), wp.vec3(0.0), wp.vec3(0.0)
 
     alpha = 1.0 / (ke * dt * dt)
     gamma = kd / (ke * dt)
@@ -440,6 +505,35 @@ def bending_constraint(
 
     lambdas[tid] = lambdas[tid] + dlambda
 
+    return delta0, delta1, delta2, delta3
+
+
+@wp.kernel
+def bending_constraint(
+    x: wp.array(dtype=wp.vec3),
+    v: wp.array(dtype=wp.vec3),
+    invmass: wp.array(dtype=float),
+    indices: wp.array2d(dtype=int),
+    rest: wp.array(dtype=float),
+    bending_properties: wp.array2d(dtype=float),
+    dt: float,
+    lambdas: wp.array(dtype=float),
+    delta: wp.array(dtype=wp.vec3),
+):
+    tid = wp.tid()
+
+    i = indices[tid, 0]
+    j = indices[tid, 1]
+    k = indices[tid, 2]
+    l = indices[tid, 3]
+
+    if i == -1 or j == -1 or k == -1 or l == -1:
+        return
+
+    delta0, delta1, delta2, delta3 = solve_bending_constraint(
+        tid, x, v, invmass, indices, rest, bending_properties, dt, lambdas
+    )
+
     wp.atomic_add(delta, i, delta0)
     wp.atomic_add(delta, j, delta1)
     wp.atomic_add(delta, k, delta2)
@@ -447,7 +541,43 @@ def bending_constraint(
 
 
 @wp.kernel
-def solve_tetrahedra(
+def bending_constraint_colored(
+    x: wp.array(dtype=wp.vec3),
+    v: wp.array(dtype=wp.vec3),
+    invmass: wp.array(dtype=float),
+    particle_flags: wp.array(dtype=wp.uint32),
+    indices: wp.array2d(dtype=int),
+    rest: wp.array(dtype=float),
+    bending_properties: wp.array2d(dtype=float),
+    dt: float,
+    lambdas: wp.array(dtype=float),
+    color_constraints: wp.array(dtype=int),
+    color_offset: int,
+):
+    # the edges of a color do not share particles and are projected in place
+    tid = color_constraints[color_offset + wp.tid()]
+
+    i = indices[tid, 0]
+    j = indices[tid, 1]
+    k = indices[tid, 2]
+    l = indices[tid, 3]
+
+    if i == -1 or j == -1 or k == -1 or l == -1:
+        return
+
+    delta0, delta1, delta2, delta3 = solve_bending_constraint(
+        tid, x, v, invmass, indices, rest, bending_properties, dt, lambdas
+    )
+
+    apply_particle_delta(i, delta0, x, v, particle_flags, dt)
+    apply_particle_delta(j, delta1, x, v, particle_flags, dt)
+    apply_particle_delta(k, delta2, x, v, particle_flags, dt)
+    apply_particle_delta(l, delta3, x, v, particle_flags, dt)
+
+
+@wp.func
+def solve_tetrahedron(
+    tid: int,
     x: wp.array(dtype=wp.vec3),
     v: wp.array(dtype=wp.vec3),
     inv_mass: wp.array(dtype=float),
@@ -457,10 +587,7 @@ def solve_tetrahedra(
     materials: wp.array(dtype=float, ndim=2),
     dt: float,
     relaxation: float,
-    delta: wp.array(dtype=wp.vec3),
 ):
-    tid = wp.tid()
-
     i = indices[tid, 0]
     j = indices[tid, 1]
     k = indices[tid, 2]
@@ -525,7 +652,7 @@ def solve_tetrahedra(
     # C_Neo
     r_s = wp.sqrt(wp.dot(f1, f1) + wp.dot(f2, f2) + wp.dot(f3, f3))
     if r_s == 0.0:
-        return
+        return wp.vec3(0.0), wp.vec3(0.0), wp.vec3(0.0), wp.vec3(0.0)
     # tr = wp.dot(f1, f1) + wp.dot(f2, f2) + wp.dot(f3, f3)
     # if (tr < 3.0):
     #     r_s = -r_s
@@ -590,10 +717,65 @@ def solve_tetrahedra(
     delta3 += grad3 * multiplier
 
     # apply forces
-    wp.atomic_sub(delta, i, delta0 * w0 * relaxation)
-    wp.atomic_sub(delta, j, delta1 * w1 * relaxation)
-    wp.atomic_sub(delta, k, delta2 * w2 * relaxation)
-    wp.atomic_sub(delta, l, delta3 * w3 * relaxation)
+    return (
+        -delta0 * w0 * relaxation,
+        -delta1 * w1 * relaxation,
+        -delta2 * w2 * relaxation,
+        -delta3 * w3 * relaxation,
+    )
+
+
+@wp.kernel
+def solve_tetrahedra(
+    x: wp.array(dtype=wp.vec3),
+    v: wp.array(dtype=wp.vec3),
+    inv_mass: wp.array(dtype=float),
+    indices: wp.array(dtype=int, ndim=2),
+    pose: wp.array(dtype=wp.mat33),
+    activation: wp.array(dtype=float),
+    materials: wp.array(dtype=float, ndim=2),
+    dt: float,
+    relaxation: float,
+    delta: wp.array(dtype=wp.vec3),
+):
+    tid = wp.tid()
+
+    delta0, delta1, delta2, delta3 = solve_tetrahedron(
+        tid, x, v, inv_mass, indices, pose, activation, materials, dt, relaxation
+    )
+
+    wp.atomic_add(delta, indices[tid, 0], delta0)
+    wp.atomic_add(delta, indices[tid, 1], delta1)
+    wp.atomic_add(delta, indices[tid, 2], delta2)
+    wp.atomic_add(delta, indices[tid, 3], delta3)
+
+
+@wp.kernel
+def solve_tetrahedra_colored(
+    x: wp.array(dtype=wp.vec3),
+    v: wp.array(dtype=wp.vec3),
+    inv_mass: wp.array(dtype=float),
+    particle_flags: wp.array(dtype=wp.uint32),
+    indices: wp.array(dtype=int, ndim=2),
+    pose: wp.array(dtype=wp.mat33),
+    activation: wp.array(dtype=float),
+    materials: wp.array(dtype=float, ndim=2),
+    dt: float,
+    relaxation: float,
+    color_constraints: wp.array(dtype=int),
+    color_offset: int,
+):
+    # the tetrahedra of a color do not share particles and are projected in place
+    tid = color_constraints[color_offset + wp.tid()]
+
+    delta0, delta1, delta2, delta3 = solve_tetrahedron(
+        tid, x, v, inv_mass, indices, pose, activation, materials, dt, relaxation
+    )
+
+    apply_particle_delta(indices[tid, 0], delta0, x, v, particle_flags, dt)
+    apply_particle_delta(indices[tid, 1], delta1, x, v, particle_flags, dt)
+    apply_particle_delta(indices[tid, 2], delta2, x, v, particle_flags, dt)
+    apply_particle_delta(indices[tid, 3], delta3, x, v, particle_flags, dt)
 
 
 @wp.kernel
@@ -2048,6 +2230,9 @@ class XPBDIntegrator:
             if model.edge_count:
                 model.edge_constraint_lambdas.zero_()
 
+            # colored constraints are projected in place, which is not differentiable
+            project_colors = model.particle_constraint_coloring and not requires_grad
+
             for i in range(self.iterations):
                 # print(f"### iteration {i} / {self.iterations-1}")
 
@@ -2129,6 +2314,7 @@ class XPBDIntegrator:
                             # outputs
                             outputs=[deltas, state_out.body_deltas],
                             device=model.device,
+                            dim_from=model.soft_contact_count,
                         )
 
                     if model.particle_max_radius > 0.0:
@@ -2153,7 +2339,7 @@ class XPBDIntegrator:
                         )
 
                     # distance constraints
-                    if model.spring_count:
+                    if model.spring_count and not project_colors:
                         wp.launch(
                             kernel=solve_springs,
                             dim=model.spring_count,
@@ -2173,7 +2359,7 @@ class XPBDIntegrator:
                         )
 
                     # bending constraints
-                    if model.edge_count:
+                    if model.edge_count and not project_colors:
                         wp.launch(
                             kernel=bending_constraint,
                             dim=model.edge_count,
@@ -2192,7 +2378,7 @@ class XPBDIntegrator:
                         )
 
                     # tetrahedral FEM
-                    if model.tet_count:
+                    if model.tet_count and not project_colors:
                         wp.launch(
                             kernel=solve_tetrahedra,
                             dim=model.tet_count,
@@ -2241,6 +2427,74 @@ class XPBDIntegrator:
                         particle_q = new_particle_q
                         particle_qd = new_particle_qd
 
+                    if project_colors:
+                        # the constraints of each color do not share particles and are applied in place,
+                        # later colors see the positions projected by the earlier ones
+                        offsets = model.spring_color_offsets
+                        for c in range(len(offsets) - 1):
+                            wp.launch(
+                                kernel=solve_springs_colored,
+                                dim=offsets[c + 1] - offsets[c],
+                                inputs=[
+                                    particle_q,
+                                    particle_qd,
+                                    model.particle_inv_mass,
+                                    model.particle_flags,
+                                    model.spring_indices,
+                                    model.spring_rest_length,
+                                    model.spring_stiffness,
+                                    model.spring_damping,
+                                    dt,
+                                    model.spring_constraint_lambdas,
+                                    model.spring_color_constraints,
+                                    offsets[c],
+                                ],
+                                device=model.device,
+                            )
+
+                        offsets = model.edge_color_offsets
+                        for c in range(len(offsets) - 1):
+                            wp.launch(
+                                kernel=bending_constraint_colored,
+                                dim=offsets[c + 1] - offsets[c],
+                                inputs=[
+                                    particle_q,
+                                    particle_qd,
+                                    model.particle_inv_mass,
+                                    model.particle_flags,
+                                    model.edge_indices,
+                                    model.edge_rest_angle,
+                                    model.edge_bending_properties,
+                                    dt,
+                                    model.edge_constraint_lambdas,
+                                    model.edge_color_constraints,
+                                    offsets[c],
+                                ],
+                                device=model.device,
+                            )
+
+                        offsets = model.tet_color_offsets
+                        for c in range(len(offsets) - 1):
+                            wp.launch(
+                                kernel=solve_tetrahedra_colored,
+                                dim=offsets[c + 1] - offsets[c],
+                                inputs=[
+                                    particle_q,
+                                    particle_qd,
+                                    model.particle_inv_mass,
+                                    model.particle_flags,
+                                    model.tet_indices,
+                                    model.tet_poses,
+                                    model.tet_activations,
+                                    model.tet_materials,
+                                    dt,
+                                    self.soft_body_relaxation,
+                                    model.tet_color_constraints,
+                                    offsets[c],
+                                ],
+                                device=model.device,
+                            )
+
                 # handle rigid bodies
                 # ----------------------------
 
@@ -2367,6 +2621,7 @@ class XPBDIntegrator:
                             rigid_contact_inv_weight,
                         ],
                         device=model.device,
+                        dim_from=model.rigid_contact_count,
                     )
 
                     if self.enable_restitution and i == 0:
@@ -2511,6 +2766,7 @@ class XPBDIntegrator:
                             state_out.body_deltas,
                         ],
                         device=model.device,
+                        dim_from=model.rigid_contact_count,
                     )
 
                     wp.launch(
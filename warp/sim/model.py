@@ -396,6 +396,41 @@ def compute_shape_mass(type, scale, src, density, is_solid, thickness):
     raise ValueError("Unsupported shape type: {}".format(type))
 
 
+def compute_constraint_coloring(indices, particle_count):
+    """Greedily assigns colors to constraints so that no two constraints of the same color share a particle
+
+    Args:
+        indices: Particle indices of each constraint, shape [constraint_count, n], entries of -1 are ignored
+        particle_count: Number of particles referenced by the indices
+
+    Returns:
+        A tuple of the constraint indices sorted by color, shape [constraint_count], and the list of
+        color_count + 1 offsets of each color's constraints in that order
+    """
+    # bitmask of the colors of the constraints already assigned to each particle
+    particle_colors = [0] * particle_count
+    colors = np.zeros(len(indices), dtype=np.int32)
+
+    for tid, constraint in enumerate(np.asarray(indices).tolist()):
+        particles = [p for p in constraint if p != -1]
+
+        used = 0
+        for p in particles:
+            used |= particle_colors[p]
+
+        # lowest color not used by any of the particles
+        color = (~used & (used + 1)).bit_length() - 1
+        for p in particles:
+            particle_colors[p] |= 1 << color
+
+        colors[tid] = color
+
+    order = np.argsort(colors, kind="stable").astype(np.int32)
+    offsets = np.searchsorted(colors[order], np.arange(colors.max(initial=-1) + 2)).tolist()
+
+    return order, offsets
+
+
 class Model:
     """Holds the definition of the simulation model
 
@@ -436,6 +471,9 @@ class Model:
         shape_ground_collision (list): Indicates whether each shape should collide with the ground, shape [shape_count], bool
         shape_contact_pairs (array): Pairs of shape indices that may collide, shape [contact_pair_count, 2], int
         shape_ground_contact_pairs (array): Pairs of shape, ground indices that may collide, shape [ground_contact_pair_count, 2], int
+        shape_contact_broadphase (bool): Whether the shape pairs that may collide are found at every collision step from a BVH over the world-space shape bounds
+        shape_contact_pair_max (int): Maximum number of shape pairs found by the broadphase, i.e. the capacity of `shape_contact_pairs` when `shape_contact_broadphase` is True
+        shape_broadphase_pair_count (array): Number of shape pairs found by the broadphase at the last collision step, shape [1], int
 
         spring_indices (array): Particle spring indices, shape [spring_count*2], int
         spring_rest_length (array): Particle spring rest length, shape [spring_count], float
@@ -447,6 +485,7 @@ class Model:
         tri_poses (array): Triangle element rest pose, shape [tri_count, 2, 2], float
         tri_activations (array): Triangle element activations, shape [tri_count], float
         tri_materials (array): Triangle element materials, shape [tri_count, 5], float
+        tri_collision_bvh (Bvh): BVH over the triangle bounds used to find the triangles near each particle for triangle-particle contacts, None if all triangle-particle pairs are tested
 
         edge_indices (array): Bending edge indices, shape [edge_count*4], int
         edge_rest_angle (array): Bending edge rest angle, shape [edge_count], float
@@ -457,6 +496,14 @@ class Model:
         tet_activations (array): Tetrahedral volumetric activations, shape [tet_count], float
         tet_materials (array): Tetrahedral elastic parameters in form :math:`k_{mu}, k_{lambda}, k_{damp}`, shape [tet_count, 3]
 
+        particle_constraint_coloring (bool): Whether the springs, bending edges and tetrahedra are grouped into colors that do not share particles, so that XPBD projects them in place color by color
+        spring_color_constraints (array): Spring indices sorted by color, shape [spring_count], int, None if the constraints are not colored
+        spring_color_offsets (list): Offsets of the springs of each color in `spring_color_constraints`, shape [spring_color_count + 1], int
+        edge_color_constraints (array): Bending edge indices sorted by color, shape [edge_count], int, None if the constraints are not colored
+        edge_color_offsets (list): Offsets of the bending edges of each color in `edge_color_constraints`, shape [edge_color_count + 1], int
+        tet_color_constraints (array): Tetrahedron indices sorted by color, shape [tet_count], int, None if the constraints are not colored
+        tet_color_offsets (list): Offsets of the tetrahedra of each color in `tet_color_constraints`, shape [tet_color_count + 1], int
+
         body_q (array): Poses of rigid bodies used for state initialization, shape [body_count, 7], float
         body_qd (array): Velocities of rigid bodies used for state initialization, shape [body_count, 6], float
         body_com (array): Rigid body center of mass (in local frame), shape [body_count, 7], float
@@ -499,6 +546,7 @@ class Model:
         joint_attach_kd (float): Joint attachment force damping (used by SemiImplicitIntegrator)
 
         soft_contact_margin (float): Contact margin for generation of soft contacts
+        soft_contact_shape_bvh (Bvh): BVH over the shape bounds used to find the shapes near each particle when generating soft contacts, None if all particle-shape pairs are tested
         soft_contact_ke (float): Stiffness of soft contacts (used by SemiImplicitIntegrator)
         soft_contact_kd (float): Damping of soft contacts (used by SemiImplicitIntegrator)
         soft_contact_kf (float): Stiffness of friction force in soft contacts (used by SemiImplicitIntegrator)
@@ -571,6 +619,9 @@ class Model:
         self.shape_ground_collision = None
         self.shape_contact_pairs = None
         self.shape_ground_contact_pairs = None
+        self.shape_contact_broadphase = False
+        self.shape_contact_pair_max = 0
+        self.shape_broadphase_pair_count = None
 
         self.spring_indices = None
         self.spring_rest_length = None
@@ -582,6 +633,7 @@ class Model:
         self.tri_poses = None
         self.tri_activations = None
         self.tri_materials = None
+        self.tri_collision_bvh = None
 
         self.edge_indices = None
         self.edge_rest_angle = None
@@ -592,6 +644,14 @@ class Model:
         self.tet_activations = None
         self.tet_materials = None
 
+        self.particle_constraint_coloring = False
+        self.spring_color_constraints = None
+        self.spring_color_offsets = None
+        self.edge_color_constraints = None
+        self.edge_color_offsets = None
+        self.tet_color_constraints = None
+        self.tet_color_offsets = None
+
         self.body_q = None
         self.body_qd = None
         self.body_com = None
@@ -636,6 +696,7 @@ class Model:
         self.joint_attach_kd = 1.0e2
 
         self.soft_contact_margin = 0.2
+        self.soft_contact_shape_bvh = None
         self.soft_contact_ke = 1.0e3
         self.soft_contact_kd = 10.0
         self.soft_contact_kf = 1.0e3
@@ -720,27 +781,78 @@ class Model:
         self.soft_contact_body_vel = wp.zeros(count, dtype=wp.vec3, device=self.device, requires_grad=requires_grad)
         self.soft_contact_normal = wp.zeros(count, dtype=wp.vec3, device=self.device, requires_grad=requires_grad)
 
+        # the shapes near each particle are found from a BVH over the shape bounds, the culled contact generation is
+        # not differentiable so that all particle-shape pairs are tested when gradients are required
+        self.soft_contact_shape_bvh = None
+        shape_count = self.shape_count - 1
+        if not requires_grad and shape_count > 0:
+            from .collide import compute_shape_soft_contact_bounds
+
+            # the ground plane is the last shape and does not generate soft contacts
+            shape_type = self.shape_geo.type.numpy()[:shape_count]
+            shape_scale = self.shape_geo.scale.numpy()[:shape_count]
+            unbounded = (shape_type == GEO_SDF) | (
+                (shape_type == GEO_PLANE) & ((shape_scale[:, 0] <= 0.0) | (shape_scale[:, 1] <= 0.0))
+            )
+            self.soft_contact_unbounded_shapes = wp.array(np.flatnonzero(unbounded), dtype=int, device=self.device)
+
+            self.soft_contact_shape_lowers = wp.empty(shape_count, dtype=wp.vec3, device=self.device)
+            self.soft_contact_shape_uppers = wp.empty(shape_count, dtype=wp.vec3, device=self.device)
+            wp.launch(
+                kernel=compute_shape_soft_contact_bounds,
+                dim=shape_count,
+                inputs=[
+                    self.body_q,
+                    self.shape_transform,
+                    self.shape_body,
+                    self.shape_geo,
+                    self.shape_collision_radius,
+                    self.soft_contact_margin + self.particle_max_radius,
+                ],
+                outputs=[
+                    self.soft_contact_shape_lowers,
+                    self.soft_contact_shape_uppers,
+                ],
+                device=self.device,
+                record_tape=False,
+            )
+            self.soft_contact_shape_bvh = wp.Bvh(self.soft_contact_shape_lowers, self.soft_contact_shape_uppers)
+
+    def allocate_tri_collisions(self, requires_grad=False):
+        # the triangles near each particle are found from a BVH over the triangle bounds that is refit from the
+        # particle positions at each step, all triangle-particle pairs are tested when gradients are required
+        self.tri_collision_bvh = None
+        if not requires_grad and self.tri_count > 0:
+            tri_points = self.particle_q.numpy()[self.tri_indices.numpy()]
+            self.tri_collision_lowers = wp.array(np.min(tri_points, axis=1), dtype=wp.vec3, device=self.device)
+            self.tri_collision_uppers = wp.array(np.max(tri_points, axis=1), dtype=wp.vec3, device=self.device)
+            self.tri_collision_bvh = wp.Bvh(self.tri_collision_lowers, self.tri_collision_uppers)
+
     def find_shape_contact_pairs(self):
         # find potential contact pairs based on collision groups and collision mask (pairwise filtering)
         import copy
         import itertools
 
-        filters = copy.copy(self.shape_collision_filter_pairs)
-        for a, b in self.shape_collision_filter_pairs:
-            filters.add((b, a))
-        contact_pairs = []
-        # iterate over collision groups (islands)
-        for group, shapes in self.shape_collision_group_map.items():
-            for shape_a, shape_b in itertools.product(shapes, shapes):
-                if shape_a < shape_b and (shape_a, shape_b) not in filters:
-                    contact_pairs.append((shape_a, shape_b))
-            if group != -1 and -1 in self.shape_collision_group_map:
-                # shapes with collision group -1 collide with all other shapes
-                for shape_a, shape_b in itertools.product(shapes, self.shape_collision_group_map[-1]):
+        if self.shape_contact_broadphase:
+            self.allocate_shape_broadphase()
+        else:
+            filters = copy.copy(self.shape_collision_filter_pairs)
+            for a, b in self.shape_collision_filter_pairs:
+                filters.add((b, a))
+            contact_pairs = []
+            # iterate over collision groups (islands)
+            for group, shapes in self.shape_collision_group_map.items():
+                for shape_a, shape_b in itertools.product(shapes, shapes):
                     if shape_a < shape_b and (shape_a, shape_b) not in filters:
                         contact_pairs.append((shape_a, shape_b))
-        self.shape_contact_pairs = wp.array(np.array(contact_pairs), dtype=wp.int32, device=self.device)
-        self.shape_contact_pair_count = len(contact_pairs)
+                if group != -1 and -1 in self.shape_collision_group_map:
+                    # shapes with collision group -1 collide with all other shapes
+                    for shape_a, shape_b in itertools.product(shapes, self.shape_collision_group_map[-1]):
+                        shape_a, shape_b = min(shape_a, shape_b), max(shape_a, shape_b)
+                        if (shape_a, shape_b) not in filters:
+                            contact_pairs.append((shape_a, shape_b))
+            self.shape_contact_pairs = wp.array(np.array(contact_pairs), dtype=wp.int32, device=self.device)
+            self.shape_contact_pair_count = len(contact_pairs)
         # find ground contact pairs
         ground_contact_pairs = []
         ground_id = self.shape_count - 1
@@ -750,25 +862,97 @@ class Model:
         self.shape_ground_contact_pairs = wp.array(np.array(ground_contact_pairs), dtype=wp.int32, device=self.device)
         self.shape_ground_contact_pair_count = len(ground_contact_pairs)
 
-    def count_contact_points(self):
+    def allocate_shape_broadphase(self):
         """
-        Counts the maximum number of contact points that need to be allocated.
+        Allocates the buffers of the broadphase that finds the shape pairs that may collide at every collision step.
         """
-        from .collide import count_contact_points
+        from .collide import compute_shape_bounds
 
-        # calculate the potential number of shape pair contact points
-        contact_count = wp.zeros(1, dtype=wp.int32, device=self.device)
+        # the ground plane is the last shape, its contacts are handled by the ground contact pairs
+        shape_count = self.shape_count - 1
+        if shape_count < 2:
+            self.shape_contact_pair_max = 0
+
+        self.shape_contact_pairs = wp.full(
+            (self.shape_contact_pair_max, 2), value=-1, dtype=wp.int32, device=self.device
+        )
+        self.shape_contact_pair_count = self.shape_contact_pair_max
+        self.shape_broadphase_pair_count = wp.zeros(1, dtype=wp.int32, device=self.device)
+        if not self.shape_contact_pair_max:
+            return
+
+        self.shape_broadphase_group = wp.array(
+            self.shape_collision_group[:shape_count], dtype=wp.int32, device=self.device
+        )
+
+        # filtered pairs (a, b) with a < b, stored as the sorted list of shapes b of each shape a
+        filters = np.array(
+            [(min(a, b), max(a, b)) for a, b in self.shape_collision_filter_pairs], dtype=np.int32
+        ).reshape(-1, 2)
+        filters = np.unique(filters, axis=0)
+        filter_offsets = np.searchsorted(filters[:, 0], np.arange(shape_count + 1))
+        self.shape_broadphase_filter_offsets = wp.array(filter_offsets, dtype=wp.int32, device=self.device)
+        self.shape_broadphase_filter_shapes = wp.array(filters[:, 1], dtype=wp.int32, device=self.device)
+
+        self.shape_broadphase_lowers = wp.empty(shape_count, dtype=wp.vec3, device=self.device)
+        self.shape_broadphase_uppers = wp.empty(shape_count, dtype=wp.vec3, device=self.device)
         wp.launch(
-            kernel=count_contact_points,
-            dim=self.shape_contact_pair_count,
+            kernel=compute_shape_bounds,
+            dim=shape_count,
             inputs=[
-                self.shape_contact_pairs,
-                self.shape_geo,
+                self.body_q,
+                self.shape_transform,
+                self.shape_body,
+                self.shape_collision_radius,
+                self.rigid_contact_margin,
+            ],
+            outputs=[
+                self.shape_broadphase_lowers,
+                self.shape_broadphase_uppers,
             ],
-            outputs=[contact_count],
             device=self.device,
             record_tape=False,
         )
+        self.shape_broadphase_bvh = wp.Bvh(self.shape_broadphase_lowers, self.shape_broadphase_uppers)
+
+    def count_contact_points(self):
+        """
+        Counts the maximum number of contact points that need to be allocated.
+        """
+        from .collide import count_contact_points
+
+        # calculate the potential number of shape pair contact points
+        contact_count = wp.zeros(1, dtype=wp.int32, device=self.device)
+        pair_contact_count = 0
+        if self.shape_contact_broadphase:
+            # the pairs are only known at collision time: a pair generates at most as many contact points as half
+            # the sum of the weights of its two shapes below, and a shape pairs at most once with each other shape
+            shape_count = self.shape_count - 1
+            shape_type = self.shape_geo.type.numpy()[:shape_count]
+            shape_weights = np.ones(shape_count, dtype=np.int64)
+            shape_weights[shape_type == GEO_CAPSULE] = 4
+            shape_weights[shape_type == GEO_BOX] = 24
+            shape_weights[shape_type == GEO_PLANE] = 8
+            for i in np.flatnonzero(shape_type == GEO_MESH):
+                shape_weights[i] = 2 * len(self.shape_geo_src[i].vertices)
+            # the shapes with the largest weights fill the 2 * shape_contact_pair_max shape slots of the pairs
+            shape_weights = np.sort(shape_weights)[::-1]
+            shape_slots = np.clip(
+                2 * self.shape_contact_pair_max - np.arange(shape_count) * (shape_count - 1), 0, shape_count - 1
+            )
+            pair_contact_count = int(np.sum(shape_weights * shape_slots) + 1) // 2
+        else:
+            wp.launch(
+                kernel=count_contact_points,
+                dim=self.shape_contact_pair_count,
+                inputs=[
+                    self.shape_contact_pairs,
+                    self.shape_geo,
+                ],
+                outputs=[contact_count],
+                device=self.device,
+                record_tape=False,
+            )
         # count ground contacts
         wp.launch(
             kernel=count_contact_points,
@@ -782,7 +966,7 @@ class Model:
             record_tape=False,
         )
         count = contact_count.numpy()[0]
-        return int(count)
+        return int(count) + pair_contact_count
 
     def allocate_rigid_contacts(self, count=None, requires_grad=False):
         if count is not None:
@@ -1163,6 +1347,17 @@ class ModelBuilder:
         # if setting is None, the number of worst-case number of contacts will be calculated in self.finalize()
         self.num_rigid_contacts_per_env = None
 
+        # find the shape pairs that may collide at every collision step from a BVH over the world-space shape bounds,
+        # instead of listing all shape pairs of each collision group in self.finalize()
+        self.shape_contact_broadphase = False
+        # maximum number of shape pairs found by the broadphase,
+        # if setting is None, 32 pairs per shape are allocated in self.finalize()
+        self.shape_contact_pair_max = None
+
+        # group the springs, bending edges and tetrahedra into colors that do not share particles in self.finalize(),
+        # XPBD then projects the constraints of each color in place (Gauss-Seidel) instead of averaging their deltas
+        self.particle_constraint_coloring = False
+
     @property
     def shape_count(self):
         return len(self.shape_geo_type)
@@ -3923,6 +4118,25 @@ class ModelBuilder:
             m.tet_activations = wp.array(self.tet_activations, dtype=wp.float32, requires_grad=requires_grad)
             m.tet_materials = wp.array(self.tet_materials, dtype=wp.float32, requires_grad=requires_grad)
 
+            # ---------------------
+            # constraint colors
+
+            # differentiable models average the constraint deltas
+            m.particle_constraint_coloring = self.particle_constraint_coloring and not requires_grad
+            if m.particle_constraint_coloring:
+                particle_count = len(self.particle_q)
+
+                order, m.spring_color_offsets = compute_constraint_coloring(
+                    np.array(self.spring_indices, dtype=np.int32).reshape(-1, 2), particle_count
+                )
+                m.spring_color_constraints = wp.array(order, dtype=wp.int32)
+
+                order, m.edge_color_offsets = compute_constraint_coloring(self.edge_indices, particle_count)
+                m.edge_color_constraints = wp.array(order, dtype=wp.int32)
+
+                order, m.tet_color_offsets = compute_constraint_coloring(self.tet_indices, particle_count)
+                m.tet_color_constraints = wp.array(order, dtype=wp.int32)
+
             # -----------------------
             # muscles
 
@@ -4010,6 +4224,13 @@ class ModelBuilder:
             # contacts
             if m.particle_count:
                 m.allocate_soft_contacts(self.soft_contact_max, requires_grad=requires_grad)
+            m.allocate_tri_collisions(requires_grad=requires_grad)
+            m.rigid_contact_margin = self.rigid_contact_margin
+            m.shape_contact_broadphase = self.shape_contact_broadphase
+            if self.shape_contact_pair_max is None:
+                m.shape_contact_pair_max = 32 * m.shape_count
+            else:
+                m.shape_contact_pair_max = self.shape_contact_pair_max
             m.find_shape_contact_pairs()
             if self.num_rigid_contacts_per_env is None:
                 contact_count = m.count_contact_points()
@@ -4018,7 +4239,6 @@ class ModelBuilder:
             if wp.config.verbose:
                 print(f"Allocating {contact_count} rigid contacts.")
             m.allocate_rigid_contacts(contact_count, requires_grad=requires_grad)
-            m.rigid_contact_margin = self.rigid_contact_margin
             m.rigid_contact_torsional_friction = self.rigid_contact_torsional_friction
             m.rigid_contact_rolling_friction = self.rigid_contact_rolling_friction
 
@@ -1,5 +1,7 @@
 from typing import Tuple, Any, Optional, Union, TypeVar, Generic
 
+import numpy as np
+
 import warp as wp
 import warp.types
 from warp.types import Matrix, Vector, Rows, Cols, Scalar, Array
@@ -596,6 +598,18 @@ def bsr_scale(x: BsrMatrix, alpha: Scalar) -> BsrMatrix:
     return x
 
 
+def _bsr_scale_values(x: BsrMatrix, alpha: Scalar):
+    """Performs the operation ``x := alpha * x`` on the values of `x`, preserving its topology"""
+
+    if not isinstance(alpha, x.scalar_type):
+        alpha = x.scalar_type(alpha)
+
+    if alpha.value == 0.0:
+        x.values.zero_()
+    elif alpha.value != 1.0 and x.nnz > 0:
+        wp.launch(kernel=_bsr_scale_kernel, dim=x.nnz, device=x.values.device, inputs=[alpha, x.values])
+
+
 @wp.kernel
 def _bsr_get_block_row(dest_offset: int, bsr_offsets: wp.array(dtype=int), rows: wp.array(dtype=int)):
     i = wp.tid()
@@ -626,6 +640,50 @@ def _bsr_axpy_add_block(
     dst_values[block] = dst_values[block] + scale * src_values[i]
 
 
+@wp.kernel
+def _bsr_list_block_indices(
+    rows: wp.array(dtype=int),
+    cols: wp.array(dtype=int),
+    dst_offsets: wp.array(dtype=int),
+    dst_columns: wp.array(dtype=int),
+    block_indices: wp.array(dtype=int),
+):
+    i = wp.tid()
+    row = rows[i]
+    beg = dst_offsets[row]
+    end = dst_offsets[row + 1]
+
+    block_indices[i] = wp.lower_bound(dst_columns, beg, end, cols[i])
+
+
+@wp.kernel
+def _bsr_axpy_add_indexed_block(
+    src_offset: int,
+    scale: Any,
+    block_indices: wp.array(dtype=int),
+    src_values: wp.array(dtype=Any),
+    dst_values: wp.array(dtype=Any),
+):
+    i = wp.tid()
+    block = block_indices[i + src_offset]
+
+    dst_values[block] = dst_values[block] + scale * src_values[i]
+
+
+def _bsr_host_topology(A: BsrMatrix):
+    """Copy of the block structure of a CPU matrix, recorded to check that a stored topology can be reused"""
+    return A.offsets.numpy()[: A.nrow + 1].copy(), A.columns.numpy()[: A.nnz].copy()
+
+
+def _bsr_has_topology(A: BsrMatrix, topology) -> bool:
+    offsets, columns = topology
+    return (
+        A.nnz == columns.shape[0]
+        and np.array_equal(A.offsets.numpy()[: A.nrow + 1], offsets)
+        and np.array_equal(A.columns.numpy()[: A.nnz], columns)
+    )
+
+
 class bsr_axpy_work_arrays:
     """Opaque structure for persisting :func:`bsr_axpy` temporary work buffers across calls"""
 
@@ -636,8 +694,14 @@ class bsr_axpy_work_arrays:
         self.device = device
         self._sum_rows = None
         self._sum_cols = None
+        self._sum_block_indices = None
         self._old_y_values = None
         self._old_x_values = None
+        self._x_nnz = None
+        self._y_nnz = None
+        self._x_topology = None
+        self._y_topology = None
+        self._x_block_offset = None
 
     def _allocate(self, device, y: BsrMatrix, sum_nnz: int):
         if self.device != device:
@@ -647,6 +711,8 @@ class bsr_axpy_work_arrays:
             self._sum_rows = wp.empty(shape=(sum_nnz), dtype=int, device=self.device)
         if self._sum_cols is None or self._sum_cols.size < sum_nnz:
             self._sum_cols = wp.empty(shape=(sum_nnz), dtype=int, device=self.device)
+        if self._sum_block_indices is None or self._sum_block_indices.size < sum_nnz:
+            self._sum_block_indices = wp.empty(shape=(sum_nnz), dtype=int, device=self.device)
 
         if self._old_y_values is None or self._old_y_values.size < y.nnz:
             self._old_y_values = wp.empty(shape=(y.nnz), dtype=y.values.dtype, device=self.device)
@@ -658,6 +724,7 @@ def bsr_axpy(
     alpha: Scalar = 1.0,
     beta: Scalar = 1.0,
     work_arrays: Optional[bsr_axpy_work_arrays] = None,
+    reuse_topology: bool = False,
 ) -> BsrMatrix[BlockType[Rows, Cols, Scalar]]:
     """
     Performs the sparse matrix addition ``y := alpha * X + beta * y`` on BSR matrices `x` and `y` and returns `y`.
@@ -670,6 +737,9 @@ def bsr_axpy(
         alpha: Uniform scaling factor for `x`
         beta: Uniform scaling factor for `y`
         work_arrays: In most cases this function will require the use of temporary storage; this storage can be reused across calls by passing an instance of :class:`bsr_axpy_work_arrays` in `work_arrays`.
+        reuse_topology: If ``True``, reuse the sum topology stored in `work_arrays` by a previous call rather than recompute it, and only update the values of `y`.
+            The matrix `x` must have the same structure as when `work_arrays` was populated, and the topology of `y` must not have been modified in-between.
+            On the CPU, the structures of `x` and `y` are compared with the stored ones. On CUDA devices, only their numbers of non-zero blocks are checked.
     """
 
     if y is None:
@@ -677,13 +747,14 @@ def bsr_axpy(
         y = bsr_zeros(x.nrow, x.ncol, block_type=x.values.dtype, device=x.values.device)
         beta = 0.0
 
-    # Handle easy cases first
-    if beta == 0.0 or y.nnz == 0:
-        bsr_assign(src=x, dest=y)
-        return bsr_scale(y, alpha=alpha)
+    # Handle easy cases first, unless the topology of y must be preserved
+    if not reuse_topology:
+        if beta == 0.0 or y.nnz == 0:
+            bsr_assign(src=x, dest=y)
+            return bsr_scale(y, alpha=alpha)
 
-    if alpha == 0.0 or x.nnz == 0:
-        return bsr_scale(y, alpha=beta)
+        if alpha == 0.0 or x.nnz == 0:
+            return bsr_scale(y, alpha=beta)
 
     if not isinstance(alpha, y.scalar_type):
         alpha = y.scalar_type(alpha)
@@ -692,6 +763,9 @@ def bsr_axpy(
 
     if x == y:
         # Aliasing case
+        if reuse_topology:
+            _bsr_scale_values(y, alpha=alpha.value + beta.value)
+            return y
         return bsr_scale(y, alpha=alpha.value + beta.value)
 
     # General case
@@ -705,80 +779,105 @@ def bsr_axpy(
     if x.nrow != y.nrow or x.ncol != y.ncol:
         raise ValueError("Matrices must have the same number of rows and columns")
 
-    if work_arrays is None:
+    if reuse_topology:
+        if (
+            work_arrays is None
+            or work_arrays.device != y.values.device
+            or work_arrays._x_nnz != x.nnz
+            or work_arrays._y_nnz != y.nnz
+            or (
+                work_arrays.device.is_cpu
+                and not (
+                    _bsr_has_topology(x, work_arrays._x_topology) and _bsr_has_topology(y, work_arrays._y_topology)
+                )
+            )
+        ):
+            raise ValueError(
+                "Reusing the sum topology requires the work arrays of a previous call with the same matrix structures"
+            )
+    elif work_arrays is None:
         work_arrays = bsr_axpy_work_arrays()
 
-    sum_nnz = x.nnz + y.nnz
     device = y.values.device
-    work_arrays._allocate(device, y, sum_nnz)
 
-    wp.copy(work_arrays._sum_cols, y.columns, 0, 0, y.nnz)
-    wp.launch(kernel=_bsr_get_block_row, device=device, dim=y.nnz, inputs=[0, y.offsets, work_arrays._sum_rows])
+    if reuse_topology:
+        # y already has the topology of the sum, only its values need to be updated
+        _bsr_scale_values(y, beta)
+    else:
+        sum_nnz = x.nnz + y.nnz
+        work_arrays._allocate(device, y, sum_nnz)
 
-    wp.copy(work_arrays._sum_cols, x.columns, y.nnz, 0, x.nnz)
-    wp.launch(kernel=_bsr_get_block_row, device=device, dim=x.nnz, inputs=[y.nnz, x.offsets, work_arrays._sum_rows])
+        wp.copy(work_arrays._sum_cols, y.columns, 0, 0, y.nnz)
+        wp.launch(kernel=_bsr_get_block_row, device=device, dim=y.nnz, inputs=[0, y.offsets, work_arrays._sum_rows])
 
-    # Save old y values before overwriting matrix
-    wp.copy(dest=work_arrays._old_y_values, src=y.values, count=y.nnz)
+        wp.copy(work_arrays._sum_cols, x.columns, y.nnz, 0, x.nnz)
+        wp.launch(kernel=_bsr_get_block_row, device=device, dim=x.nnz, inputs=[y.nnz, x.offsets, work_arrays._sum_rows])
 
-    # Increase dest array sizes if needed
-    if y.columns.shape[0] < sum_nnz:
-        y.columns = wp.empty(shape=(sum_nnz,), dtype=int, device=device)
+        # Save old y values before overwriting matrix
+        wp.copy(dest=work_arrays._old_y_values, src=y.values, count=y.nnz)
 
-    from warp.context import runtime
+        # Increase dest array sizes if needed
+        if y.columns.shape[0] < sum_nnz:
+            y.columns = wp.empty(shape=(sum_nnz,), dtype=int, device=device)
 
-    if device.is_cpu:
-        native_func = runtime.core.bsr_matrix_from_triplets_float_host
-    else:
-        native_func = runtime.core.bsr_matrix_from_triplets_float_device
-
-    old_y_nnz = y.nnz
-    y.nnz = native_func(
-        y.block_shape[0],
-        y.block_shape[1],
-        y.nrow,
-        sum_nnz,
-        work_arrays._sum_rows.ptr,
-        work_arrays._sum_cols.ptr,
-        0,
-        y.offsets.ptr,
-        y.columns.ptr,
-        0,
-    )
+        from warp.context import runtime
 
-    _bsr_ensure_fits(y)
-    y.values.zero_()
+        if device.is_cpu:
+            native_func = runtime.core.bsr_matrix_from_triplets_float_host
+        else:
+            native_func = runtime.core.bsr_matrix_from_triplets_float_device
 
-    wp.launch(
-        kernel=_bsr_axpy_add_block,
-        device=device,
-        dim=old_y_nnz,
-        inputs=[
+        old_y_nnz = y.nnz
+        y.nnz = native_func(
+            y.block_shape[0],
+            y.block_shape[1],
+            y.nrow,
+            sum_nnz,
+            work_arrays._sum_rows.ptr,
+            work_arrays._sum_cols.ptr,
             0,
-            beta,
-            work_arrays._sum_rows,
-            work_arrays._sum_cols,
-            y.offsets,
-            y.columns,
-            work_arrays._old_y_values,
-            y.values,
-        ],
-    )
+            y.offsets.ptr,
+            y.columns.ptr,
+            0,
+        )
+
+        _bsr_ensure_fits(y)
+        y.values.zero_()
+
+        # Locate the destination block of each summed block once, x blocks are listed after the old y blocks
+        wp.launch(
+            kernel=_bsr_list_block_indices,
+            device=device,
+            dim=sum_nnz,
+            inputs=[
+                work_arrays._sum_rows,
+                work_arrays._sum_cols,
+                y.offsets,
+                y.columns,
+                work_arrays._sum_block_indices,
+            ],
+        )
+
+        wp.launch(
+            kernel=_bsr_axpy_add_indexed_block,
+            device=device,
+            dim=old_y_nnz,
+            inputs=[0, beta, work_arrays._sum_block_indices, work_arrays._old_y_values, y.values],
+        )
+
+        work_arrays._x_nnz = x.nnz
+        work_arrays._y_nnz = y.nnz
+        work_arrays._x_block_offset = old_y_nnz
+
+        if device.is_cpu:
+            work_arrays._x_topology = _bsr_host_topology(x)
+            work_arrays._y_topology = _bsr_host_topology(y)
 
     wp.launch(
-        kernel=_bsr_axpy_add_block,
+        kernel=_bsr_axpy_add_indexed_block,
         device=device,
         dim=x.nnz,
-        inputs=[
-            old_y_nnz,
-            alpha,
-            work_arrays._sum_rows,
-            work_arrays._sum_cols,
-            y.offsets,
-            y.columns,
-            x.values,
-            y.values,
-        ],
+        inputs=[work_arrays._x_block_offset, alpha, work_arrays._sum_block_indices, x.values, y.values],
     )
 
     return y
@@ -866,6 +965,66 @@ def _bsr_mm_compute_values(
             mm_values[mm_block] = mm_values[mm_block] + ax_val * y_values[y_block]
 
 
+@wp.kernel
+def _bsr_mm_list_block_indices(
+    x_offsets: wp.array(dtype=int),
+    x_columns: wp.array(dtype=int),
+    y_offsets: wp.array(dtype=int),
+    y_columns: wp.array(dtype=int),
+    mm_offsets: wp.array(dtype=int),
+    z_offsets: wp.array(dtype=int),
+    z_columns: wp.array(dtype=int),
+    mm_block_indices: wp.array(dtype=int),
+):
+    row = wp.tid()
+    mm_block = mm_offsets[row]
+
+    z_beg = z_offsets[row]
+    z_end = z_offsets[row + 1]
+
+    x_beg = x_offsets[row]
+    x_end = x_offsets[row + 1]
+
+    for x_block in range(x_beg, x_end):
+        x_col = x_columns[x_block]
+
+        y_beg = y_offsets[x_col]
+        y_end = y_offsets[x_col + 1]
+        for y_block in range(y_beg, y_end):
+            mm_block_indices[mm_block] = wp.lower_bound(z_columns, z_beg, z_end, y_columns[y_block])
+            mm_block += 1
+
+
+@wp.kernel
+def _bsr_mm_compute_values_from_block_indices(
+    alpha: Any,
+    x_offsets: wp.array(dtype=int),
+    x_columns: wp.array(dtype=int),
+    x_values: wp.array(dtype=Any),
+    y_offsets: wp.array(dtype=int),
+    y_values: wp.array(dtype=Any),
+    mm_offsets: wp.array(dtype=int),
+    mm_block_indices: wp.array(dtype=int),
+    mm_values: wp.array(dtype=Any),
+):
+    row = wp.tid()
+    mm_block = mm_offsets[row]
+
+    x_beg = x_offsets[row]
+    x_end = x_offsets[row + 1]
+    for x_block in range(x_beg, x_end):
+        x_col = x_columns[x_block]
+        ax_val = alpha * x_values[x_block]
+
+        y_beg = y_offsets[x_col]
+        y_end = y_offsets[x_col + 1]
+
+        for y_block in range(y_beg, y_end):
+            z_block = mm_block_indices[mm_block]
+            mm_values[z_block] = mm_values[z_block] + ax_val * y_values[y_block]
+            mm_block += 1
+
+
 class bsr_mm_work_arrays:
     """Opaque structure for persisting :func:`bsr_mm` temporary work buffers across calls"""
 
@@ -881,8 +1040,11 @@ class bsr_mm_work_arrays:
         self._old_z_values = None
         self._old_z_offsets = None
         self._old_z_columns = None
+        self._mm_block_indices = None
+        self._z_nnz = None
+        self._topologies = None
 
-    def _allocate_stage_1(self, device, z: BsrMatrix, copied_z_nnz: int, z_aliasing: bool):
+    def _allocate_stage_1(self, device, z: BsrMatrix, copied_z_nnz: int, save_z_topology: bool):
         if self.device != device:
             self._reset(device)
 
@@ -898,7 +1060,7 @@ class bsr_mm_work_arrays:
             if self._old_z_values is None or self._old_z_values.size < copied_z_nnz:
                 self._old_z_values = wp.empty(shape=(copied_z_nnz,), dtype=z.values.dtype, device=self.device)
 
-        if z_aliasing:
+        if save_z_topology:
             if self._old_z_columns is None or self._old_z_columns.size < z.nnz:
                 self._old_z_columns = wp.empty(shape=(z.nnz,), dtype=z.columns.dtype, device=self.device)
             if self._old_z_offsets is None or self._old_z_offsets.size < z.nrow + 1:
@@ -911,6 +1073,10 @@ class bsr_mm_work_arrays:
         if self._mm_cols is None or self._mm_cols.size < mm_nnz:
             self._mm_cols = wp.empty(shape=(mm_nnz,), dtype=int, device=self.device)
 
+        if self.device.is_cuda:
+            if self._mm_block_indices is None or self._mm_block_indices.size < mm_nnz:
+                self._mm_block_indices = wp.empty(shape=(mm_nnz,), dtype=int, device=self.device)
+
 
 def bsr_mm(
     x: BsrMatrix[BlockType[Rows, Any, Scalar]],
@@ -919,6 +1085,7 @@ def bsr_mm(
     alpha: Scalar = 1.0,
     beta: Scalar = 0.0,
     work_arrays: Optional[bsr_mm_work_arrays] = None,
+    reuse_topology: bool = False,
 ) -> BsrMatrix[BlockType[Rows, Cols, Scalar]]:
     """
     Performs the sparse matrix-matrix multiplication ``z := alpha * x * y + beta * z`` on BSR matrices `x`, `y` and `z`, and returns `z`.
@@ -933,6 +1100,10 @@ def bsr_mm(
         alpha: Uniform scaling factor for the ``x * y`` product
         beta: Uniform scaling factor for `z`
         work_arrays: In most cases this function will require the use of temporary storage; this storage can be reused across calls by passing an instance of :class:`bsr_mm_work_arrays` in `work_arrays`.
+        reuse_topology: If ``True``, reuse the product topology stored in `work_arrays` by a previous call rather than recompute it, and only update the values of `z`.
+            The matrices `x`, `y` and `z` must have the same structure as when `work_arrays` was populated, and the topology of `z` must not have been modified in-between.
+            On the CPU, the structures of the matrices are compared with the stored ones. On CUDA devices, only the number of non-zero blocks of `z` is checked,
+            which avoids any synchronization with the host, so the product may be captured in a CUDA graph.
     """
 
     if z is None:
@@ -963,7 +1134,24 @@ def bsr_mm(
 
     device = z.values.device
 
-    if alpha == 0.0 or x.nnz == 0 or y.nnz == 0:
+    if reuse_topology:
+        if (
+            work_arrays is None
+            or work_arrays.device != device
+            or work_arrays._z_nnz != z.nnz
+            or (
+                device.is_cpu
+                and not all(
+                    _bsr_has_topology(A, topology)
+                    for A, topology in zip((x, y, z), work_arrays._topologies)
+                    if topology
+                )
+            )
+        ):
+            raise ValueError(
+                "Reusing the product topology requires the work arrays of a previous call with the same matrix structures"
+            )
+    elif alpha == 0.0 or x.nnz == 0 or y.nnz == 0:
         # Easy case
         return bsr_scale(z, beta)
 
@@ -975,105 +1163,192 @@ def bsr_mm(
     if work_arrays is None:
         work_arrays = bsr_mm_work_arrays()
 
-    z_aliasing = z == x or z == y
-    copied_z_nnz = z.nnz if beta != 0.0 or z_aliasing else 0
+    from warp.context import runtime
 
-    work_arrays._allocate_stage_1(device, z, copied_z_nnz, z_aliasing)
+    z_aliasing = z == x or z == y
 
-    # Prefix sum of number of (unmerged) mm blocks per row
-    wp.launch(
-        kernel=_bsr_mm_count_coeffs,
-        device=device,
-        dim=z.nrow,
-        inputs=[copied_z_nnz, x.offsets, x.columns, y.offsets, work_arrays._mm_row_counts],
-    )
-    warp.utils.array_scan(work_arrays._mm_row_counts, work_arrays._mm_row_counts)
+    if reuse_topology:
+        # z already has the topology of the product, only its values need to be updated
+        if z_aliasing:
+            work_arrays._allocate_stage_1(device, z, z.nnz, True)
+            wp.copy(src=z.values, dest=work_arrays._old_z_values, count=z.nnz)
+            wp.copy(src=z.columns, dest=work_arrays._old_z_columns, count=z.nnz)
+            wp.copy(src=z.offsets, dest=work_arrays._old_z_offsets, count=z.nrow + 1)
 
-    # Get back total counts on host
-    if device.is_cuda:
-        wp.copy(dest=work_arrays._pinned_count_buffer, src=work_arrays._mm_row_counts, src_offset=z.nrow, count=1)
-        wp.synchronize_stream(wp.get_stream())
-        mm_nnz = int(work_arrays._pinned_count_buffer.numpy()[0])
+        _bsr_scale_values(z, beta)
     else:
-        mm_nnz = int(work_arrays._mm_row_counts.numpy()[z.nrow])
-
-    work_arrays._allocate_stage_2(mm_nnz)
+        copied_z_nnz = z.nnz if beta.value != 0.0 or z_aliasing else 0
 
-    # If z has a non-zero scale, save current data before overwriting it
-    if copied_z_nnz > 0:
-        # Copy z row and column indices
-        wp.copy(dest=work_arrays._mm_cols, src=z.columns, count=copied_z_nnz)
-        wp.launch(
-            kernel=_bsr_get_block_row, device=device, dim=copied_z_nnz, inputs=[0, z.offsets, work_arrays._mm_rows]
-        )
-        # Save current z values in temporary buffer
-        wp.copy(src=z.values, dest=work_arrays._old_z_values, count=copied_z_nnz)
-        if z_aliasing:
-            # If z is aliasing with x or y, need to save topology as well
-            wp.copy(src=z.columns, dest=work_arrays._old_z_columns, count=copied_z_nnz)
-            wp.copy(src=z.offsets, dest=work_arrays._old_z_offsets, count=z.nrow + 1)
+        # On CPU, the symbolic product also merges the topology of the original z blocks
+        save_z_topology = z_aliasing or (device.is_cpu and copied_z_nnz > 0)
 
-    # Fill unmerged mm blocks rows and columns
-    wp.launch(
-        kernel=_bsr_mm_list_coeffs,
-        device=device,
-        dim=z.nrow,
-        inputs=[
-            x.offsets,
-            x.columns,
-            y.offsets,
-            y.columns,
-            work_arrays._mm_row_counts,
-            work_arrays._mm_rows,
-            work_arrays._mm_cols,
-        ],
-    )
+        work_arrays._allocate_stage_1(device, z, copied_z_nnz, save_z_topology)
 
-    # Increase dest array size if needed
-    if z.columns.shape[0] < mm_nnz:
-        z.columns = wp.empty(shape=(mm_nnz,), dtype=int, device=device)
+        if device.is_cpu:
+            # Only the original z blocks are listed
+            mm_nnz = copied_z_nnz
+        else:
+            # Prefix sum of number of (unmerged) mm blocks per row
+            wp.launch(
+                kernel=_bsr_mm_count_coeffs,
+                device=device,
+                dim=z.nrow,
+                inputs=[copied_z_nnz, x.offsets, x.columns, y.offsets, work_arrays._mm_row_counts],
+            )
+            warp.utils.array_scan(work_arrays._mm_row_counts, work_arrays._mm_row_counts)
 
-    from warp.context import runtime
+            # Get back total counts on host
+            wp.copy(dest=work_arrays._pinned_count_buffer, src=work_arrays._mm_row_counts, src_offset=z.nrow, count=1)
+            wp.synchronize_stream(wp.get_stream())
+            mm_nnz = int(work_arrays._pinned_count_buffer.numpy()[0])
 
-    if device.is_cpu:
-        native_func = runtime.core.bsr_matrix_from_triplets_float_host
-    else:
-        native_func = runtime.core.bsr_matrix_from_triplets_float_device
-
-    z.nnz = native_func(
-        z.block_shape[0],
-        z.block_shape[1],
-        z.nrow,
-        mm_nnz,
-        work_arrays._mm_rows.ptr,
-        work_arrays._mm_cols.ptr,
-        0,
-        z.offsets.ptr,
-        z.columns.ptr,
-        0,
-    )
+        work_arrays._allocate_stage_2(mm_nnz)
 
-    _bsr_ensure_fits(z)
-    z.values.zero_()
+        # If z has a non-zero scale, save current data before overwriting it
+        if copied_z_nnz > 0:
+            # Copy z row and column indices
+            wp.copy(dest=work_arrays._mm_cols, src=z.columns, count=copied_z_nnz)
+            wp.launch(
+                kernel=_bsr_get_block_row, device=device, dim=copied_z_nnz, inputs=[0, z.offsets, work_arrays._mm_rows]
+            )
+            # Save current z values in temporary buffer
+            wp.copy(src=z.values, dest=work_arrays._old_z_values, count=copied_z_nnz)
+            if save_z_topology:
+                # If z is aliasing with x or y, need to save topology as well
+                wp.copy(src=z.columns, dest=work_arrays._old_z_columns, count=copied_z_nnz)
+                wp.copy(src=z.offsets, dest=work_arrays._old_z_offsets, count=z.nrow + 1)
+
+        if device.is_cpu:
+            # Two-pass symbolic product computing the merged z topology directly
+            symbolic_inputs = [
+                z.nrow,
+                z.ncol,
+                work_arrays._old_z_offsets.ptr if x == z else x.offsets.ptr,
+                work_arrays._old_z_columns.ptr if x == z else x.columns.ptr,
+                work_arrays._old_z_offsets.ptr if y == z else y.offsets.ptr,
+                work_arrays._old_z_columns.ptr if y == z else y.columns.ptr,
+                work_arrays._old_z_offsets.ptr if copied_z_nnz > 0 else 0,
+                work_arrays._old_z_columns.ptr if copied_z_nnz > 0 else 0,
+                z.offsets.ptr,
+            ]
+
+            z.nnz = runtime.core.bsr_mm_count_host(*symbolic_inputs)
+
+            if z.columns.shape[0] < z.nnz:
+                z.columns = wp.empty(shape=(z.nnz,), dtype=int, device=device)
+
+            runtime.core.bsr_mm_list_host(*symbolic_inputs, z.columns.ptr)
+        else:
+            # Fill unmerged mm blocks rows and columns
+            wp.launch(
+                kernel=_bsr_mm_list_coeffs,
+                device=device,
+                dim=z.nrow,
+                inputs=[
+                    x.offsets,
+                    x.columns,
+                    y.offsets,
+                    y.columns,
+                    work_arrays._mm_row_counts,
+                    work_arrays._mm_rows,
+                    work_arrays._mm_cols,
+                ],
+            )
 
-    if copied_z_nnz > 0:
-        # Add back original z values
-        wp.launch(
-            kernel=_bsr_axpy_add_block,
-            device=device,
-            dim=copied_z_nnz,
-            inputs=[
+            # Increase dest array size if needed
+            if z.columns.shape[0] < mm_nnz:
+                z.columns = wp.empty(shape=(mm_nnz,), dtype=int, device=device)
+
+            z.nnz = runtime.core.bsr_matrix_from_triplets_float_device(
+                z.block_shape[0],
+                z.block_shape[1],
+                z.nrow,
+                mm_nnz,
+                work_arrays._mm_rows.ptr,
+                work_arrays._mm_cols.ptr,
                 0,
-                beta,
-                work_arrays._mm_rows,
-                work_arrays._mm_cols,
-                z.offsets,
-                z.columns,
-                work_arrays._old_z_values,
-                z.values,
-            ],
+                z.offsets.ptr,
+                z.columns.ptr,
+                0,
+            )
+
+            # Locate the z block of each mm block once, so that values can be computed without searching
+            wp.launch(
+                kernel=_bsr_mm_list_block_indices,
+                device=device,
+                dim=z.nrow,
+                inputs=[
+                    work_arrays._old_z_offsets if x == z else x.offsets,
+                    work_arrays._old_z_columns if x == z else x.columns,
+                    work_arrays._old_z_offsets if y == z else y.offsets,
+                    work_arrays._old_z_columns if y == z else y.columns,
+                    work_arrays._mm_row_counts,
+                    z.offsets,
+                    z.columns,
+                    work_arrays._mm_block_indices,
+                ],
+            )
+
+        _bsr_ensure_fits(z)
+        z.values.zero_()
+
+        if copied_z_nnz > 0:
+            # Add back original z values
+            wp.launch(
+                kernel=_bsr_axpy_add_block,
+                device=device,
+                dim=copied_z_nnz,
+                inputs=[
+                    0,
+                    beta,
+                    work_arrays._mm_rows,
+                    work_arrays._mm_cols,
+                    z.offsets,
+                    z.columns,
+                    work_arrays._old_z_values,
+                    z.values,
+                ],
+            )
+
+        work_arrays._z_nnz = z.nnz
+
+        if device.is_cpu:
+            # the factors aliasing z are checked through z
+            work_arrays._topologies = (
+                None if x == z else _bsr_host_topology(x),
+                None if y == z else _bsr_host_topology(y),
+                _bsr_host_topology(z),
+            )
+
+    # Add mm blocks to z values
+    native_func = None
+    if device.is_cpu:
+        if z.scalar_type == wp.float32:
+            native_func = runtime.core.bsr_mm_values_float_host
+        elif z.scalar_type == wp.float64:
+            native_func = runtime.core.bsr_mm_values_double_host
+
+    if native_func:
+        native_func(
+            z.nrow,
+            z.ncol,
+            x.block_shape[0],
+            x.block_shape[1],
+            y.block_shape[1],
+            alpha.value,
+            work_arrays._old_z_offsets.ptr if x == z else x.offsets.ptr,
+            work_arrays._old_z_columns.ptr if x == z else x.columns.ptr,
+            work_arrays._old_z_values.ptr if x == z else x.values.ptr,
+            work_arrays._old_z_offsets.ptr if y == z else y.offsets.ptr,
+            work_arrays._old_z_columns.ptr if y == z else y.columns.ptr,
+            work_arrays._old_z_values.ptr if y == z else y.values.ptr,
+            z.offsets.ptr,
+            z.columns.ptr,
+            z.values.ptr,
         )
 
+        return z
+
     # Add mm blocks to z values
     if (warp.types.type_is_matrix(x.values.dtype) or warp.types.type_is_matrix(y.values.dtype)) and not (
         warp.types.type_is_matrix(z.values.dtype)
@@ -1084,23 +1359,41 @@ def bsr_mm(
     else:
         mm_values = z.values
 
-    wp.launch(
-        kernel=_bsr_mm_compute_values,
-        device=device,
-        dim=z.nrow,
-        inputs=[
-            alpha,
-            work_arrays._old_z_offsets if x == z else x.offsets,
-            work_arrays._old_z_columns if x == z else x.columns,
-            work_arrays._old_z_values if x == z else x.values,
-            work_arrays._old_z_offsets if y == z else y.offsets,
-            work_arrays._old_z_columns if y == z else y.columns,
-            work_arrays._old_z_values if y == z else y.values,
-            z.offsets,
-            z.columns,
-            mm_values,
-        ],
-    )
+    if device.is_cpu:
+        wp.launch(
+            kernel=_bsr_mm_compute_values,
+            device=device,
+            dim=z.nrow,
+            inputs=[
+                alpha,
+                work_arrays._old_z_offsets if x == z else x.offsets,
+                work_arrays._old_z_columns if x == z else x.columns,
+                work_arrays._old_z_values if x == z else x.values,
+                work_arrays._old_z_offsets if y == z else y.offsets,
+                work_arrays._old_z_columns if y == z else y.columns,
+                work_arrays._old_z_values if y == z else y.values,
+                z.offsets,
+                z.columns,
+                mm_values,
+            ],
+        )
+    else:
+        wp.launch(
+            kernel=_bsr_mm_compute_values_from_block_indices,
+            device=device,
+            dim=z.nrow,
+            inputs=[
+                alpha,
+                work_arrays._old_z_offsets if x == z else x.offsets,
+                work_arrays._old_z_columns if x == z else x.columns,
+                work_arrays._old_z_values if x == z else x.values,
+                work_arrays._old_z_offsets if y == z else y.offsets,
+                work_arrays._old_z_values if y == z else y.values,
+                work_arrays._mm_row_counts,
+                work_arrays._mm_block_indices,
+                mm_values,
+            ],
+        )
 
     return z
 
@@ -1207,11 +1500,35 @@ def bsr_mv(
             if x.dtype != A.scalar_type:
                 x = x.view(dtype=A.scalar_type)
 
-    wp.launch(
-        kernel=_bsr_mv_kernel,
-        device=A.values.device,
-        dim=A.nrow,
-        inputs=[alpha, A.offsets, A.columns, A.values, x, beta, y],
-    )
+    native_func = None
+    if A.values.device.is_cpu and x.is_contiguous and y.is_contiguous:
+        from warp.context import runtime
+
+        if A.scalar_type == wp.float32:
+            native_func = runtime.core.bsr_mv_float_host
+        elif A.scalar_type == wp.float64:
+            native_func = runtime.core.bsr_mv_double_host
+
+    if native_func:
+        # Rows are processed in parallel by the host
+        native_func(
+            A.nrow,
+            A.block_shape[0],
+            A.block_shape[1],
+            alpha.value,
+            beta.value,
+            A.offsets.ptr,
+            A.columns.ptr,
+            A.values.ptr,
+            x.ptr,
+            y.ptr,
+        )
+    else:
+        wp.launch(
+            kernel=_bsr_mv_kernel,
+            device=A.values.device,
+            dim=A.nrow,
+            inputs=[alpha, A.offsets, A.columns, A.values, x, beta, y],
+        )
 
     return y
@@ -110,6 +110,8 @@ class Tape:
                 inputs = launch[3]
                 outputs = launch[4]
                 device = launch[5]
+                max_cpu_threads = launch[6]
+                dim_from = launch[7]
 
                 adj_inputs = []
                 adj_outputs = []
@@ -132,11 +134,13 @@ class Tape:
                     device=device,
                     adjoint=True,
                     max_blocks=max_blocks,
+                    max_cpu_threads=max_cpu_threads,
+                    dim_from=dim_from,
                 )
 
     # record a kernel launch on the tape
-    def record_launch(self, kernel, dim, max_blocks, inputs, outputs, device):
-        self.launches.append([kernel, dim, max_blocks, inputs, outputs, device])
+    def record_launch(self, kernel, dim, max_blocks, inputs, outputs, device, max_cpu_threads=0, dim_from=None):
+        self.launches.append([kernel, dim, max_blocks, inputs, outputs, device, max_cpu_threads, dim_from])
 
     def record_func(self, backward, arrays):
         """
@@ -10,6 +10,8 @@ import unittest
 
 import warp as wp
 import warp.tests.test_adam
+import warp.tests.test_allocator
+import warp.tests.test_aot
 import warp.tests.test_arithmetic
 import warp.tests.test_array
 import warp.tests.test_atomic
@@ -20,6 +22,8 @@ import warp.tests.test_codegen
 import warp.tests.test_compile_consts
 import warp.tests.test_conditional
 import warp.tests.test_copy
+import warp.tests.test_cpu_graph
+import warp.tests.test_cpu_simd
 import warp.tests.test_ctypes
 import warp.tests.test_devices
 import warp.tests.test_dlpack
@@ -36,6 +40,8 @@ import warp.tests.test_hash_grid
 import warp.tests.test_import
 import warp.tests.test_indexedarray
 import warp.tests.test_intersect
+import warp.tests.test_kernel_cache
+import warp.tests.test_kernel_units
 import warp.tests.test_large
 import warp.tests.test_launch
 import warp.tests.test_lerp
@@ -118,9 +124,12 @@ def register_tests(parent):
     tests.append(warp.tests.test_smoothstep.register(parent))
     tests.append(warp.tests.test_model.register(parent))
     tests.append(warp.tests.test_fast_math.register(parent))
+    tests.append(warp.tests.test_cpu_simd.register(parent))
+    tests.append(warp.tests.test_cpu_graph.register(parent))
     tests.append(warp.tests.test_streams.register(parent))
     tests.append(warp.tests.test_torch.register(parent))
     tests.append(warp.tests.test_pinned.register(parent))
+    tests.append(warp.tests.test_allocator.register(parent))
     tests.append(warp.tests.test_print.register(parent))
     tests.append(warp.tests.test_matmul.register(parent))
     tests.append(warp.tests.test_options.register(parent))
@@ -142,6 +151,9 @@ def register_tests(parent):
     tests.append(warp.tests.test_lvalue.register(parent))
     tests.append(warp.tests.test_devices.register(parent))
     tests.append(warp.tests.test_modules_lite.register(parent))
+    tests.append(warp.tests.test_kernel_cache.register(parent))
+    tests.append(warp.tests.test_kernel_units.register(parent))
+    tests.append(warp.tests.test_aot.register(parent))
     tests.append(warp.tests.test_snippet.register(parent))
 
     return tests
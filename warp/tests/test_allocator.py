@@ -0,0 +1,174 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+import unittest
+
+import numpy as np
+
+import warp as wp
+from warp.tests.test_base import *
+
+wp.init()
+
+
+def test_allocator_size_classes(test, device):
+    test.assertEqual(wp.context.get_alloc_size_class(1), 256)
+    test.assertEqual(wp.context.get_alloc_size_class(256), 256)
+    test.assertEqual(wp.context.get_alloc_size_class(4096), 4096)
+    test.assertEqual(wp.context.get_alloc_size_class(4097), 5120)
+    test.assertEqual(wp.context.get_alloc_size_class(5120), 5120)
+    test.assertEqual(wp.context.get_alloc_size_class(1000000), 1048576)
+
+
+def test_allocator_reuse(test, device):
+    saved_pool = wp.config.alloc_pool
+
+    try:
+        wp.config.alloc_pool = True
+        run_allocator_reuse(test, device)
+
+    finally:
+        wp.config.alloc_pool = saved_pool
+        wp.empty_cache(device)
+
+
+def run_allocator_reuse(test, device):
+    wp.empty_cache(device)
+    wp.reset_allocator_stats(device)
+
+    base = wp.get_allocator_stats(device)["bytes_in_use"]
+
+    a = wp.zeros(1000, dtype=float, device=device)
+    ptr = a.ptr
+
+    stats = wp.get_allocator_stats(device)
+    test.assertEqual(stats["bytes_in_use"], base + 4096)
+    test.assertEqual(stats["system_alloc_count"], 1)
+
+    del a
+
+    stats = wp.get_allocator_stats(device)
+    test.assertEqual(stats["bytes_in_use"], base)
+    test.assertEqual(stats["bytes_cached"], 4096)
+    test.assertEqual(stats["system_free_count"], 0)
+
+    # an allocation of the same size class reuses the block
+    b = wp.full(1020, value=2.0, dtype=float, device=device)
+    test.assertEqual(b.ptr, ptr)
+    assert_np_equal(b.numpy(), np.full(1020, 2.0))
+
+    stats = wp.get_allocator_stats(device)
+    test.assertEqual(stats["alloc_count"], 2)
+    test.assertEqual(stats["cache_hit_count"], 1)
+    test.assertEqual(stats["system_alloc_count"], 1)
+    test.assertEqual(stats["bytes_cached"], 0)
+    test.assertEqual(stats["peak_bytes_in_use"], base + 4096)
+
+    del b
+
+    wp.empty_cache(device)
+
+    stats = wp.get_allocator_stats(device)
+    test.assertEqual(stats["bytes_cached"], 0)
+    test.assertEqual(stats["system_free_count"], 1)
+
+
+def test_allocator_limit(test, device):
+    saved_pool = wp.config.alloc_pool
+    saved_limit = wp.config.alloc_pool_limit
+
+    try:
+        wp.empty_cache(device)
+        wp.config.alloc_pool = True
+        wp.config.alloc_pool_limit = 8192
+
+        arrays = [wp.empty(1024, dtype=float, device=device) for _ in range(3)]
+        arrays.clear()
+
+        # only the blocks that fit within the limit are kept
+        test.assertEqual(wp.get_allocator_stats(device)["bytes_cached"], 8192)
+
+    finally:
+        wp.config.alloc_pool = saved_pool
+        wp.config.alloc_pool_limit = saved_limit
+        wp.empty_cache(device)
+
+
+def test_allocator_disabled(test, device):
+    saved_pool = wp.config.alloc_pool
+
+    try:
+        wp.empty_cache(device)
+        wp.config.alloc_pool = False
+
+        a = wp.empty(1000, dtype=float, device=device)
+        del a
+
+        test.assertEqual(wp.get_allocator_stats(device)["bytes_cached"], 0)
+
+        # arrays without elements have no memory to free
+        b = wp.empty(0, dtype=float, device=device)
+        test.assertIsNone(b.ptr)
+        del b
+
+    finally:
+        wp.config.alloc_pool = saved_pool
+
+
+def test_allocator_streams(test, device):
+    saved_pool = wp.config.alloc_pool
+
+    try:
+        wp.config.alloc_pool = True
+        run_allocator_streams(test, device)
+
+    finally:
+        wp.config.alloc_pool = saved_pool
+        wp.empty_cache(device)
+
+
+def run_allocator_streams(test, device):
+    wp.empty_cache(device)
+
+    stream = wp.Stream(device)
+    x = wp.full(1024, value=1.0, dtype=float, device=device)
+
+    with wp.ScopedStream(stream):
+        a = wp.zeros(1024, dtype=float, device=device)
+        wp.copy(a, x)
+        ptr = a.ptr
+        del a
+
+    # the block freed on the other stream is reused after waiting for its work
+    b = wp.empty(1024, dtype=float, device=device)
+    test.assertEqual(b.ptr, ptr)
+
+    wp.synchronize_device(device)
+
+
+def register(parent):
+    devices = get_test_devices()
+    cuda_devices = wp.get_cuda_devices()
+
+    class TestAllocator(parent):
+        pass
+
+    add_function_test(TestAllocator, "test_allocator_size_classes", test_allocator_size_classes, devices=["cpu"])
+    add_function_test(TestAllocator, "test_allocator_reuse", test_allocator_reuse, devices=devices)
+    add_function_test(TestAllocator, "test_allocator_limit", test_allocator_limit, devices=devices)
+    add_function_test(TestAllocator, "test_allocator_disabled", test_allocator_disabled, devices=devices)
+
+    if cuda_devices:
+        add_function_test(TestAllocator, "test_allocator_streams", test_allocator_streams, devices=cuda_devices)
+
+    return TestAllocator
+
+
+if __name__ == "__main__":
+    wp.build.clear_kernel_cache()
+    _ = register(unittest.TestCase)
+    unittest.main(verbosity=2)
@@ -0,0 +1,118 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from typing import Any
+
+import numpy as np
+
+import warp as wp
+import warp.aot
+from warp.tests.test_base import *
+
+wp.init()
+
+
+@wp.kernel
+def aot_scale(x: wp.array(dtype=Any), s: Any):
+    i = wp.tid()
+    x[i] = x[i] * s
+
+
+wp.overload(aot_scale, {"x": wp.array(dtype=float), "s": float})
+wp.overload(aot_scale, {"x": wp.array(dtype=wp.float64), "s": wp.float64})
+
+
+def test_aot_bundle(test, device):
+    module = wp.get_module(__name__)
+
+    test.assertIn((f"{__name__}.aot_scale", 2), warp.aot.enumerate_kernels([module]))
+
+    bundle_dir = tempfile.mkdtemp()
+    bundle_path = os.path.join(bundle_dir, "kernels.wpbundle")
+    saved_bundles = wp.config.kernel_bundles
+
+    try:
+        manifest = warp.aot.build_bundle(bundle_path, [module])
+
+        cache_key = wp.build.kernel_cache_key(module.hash_module(), wp.build.cpu_target)
+        test.assertEqual(manifest["modules"][cache_key]["kernels"], ["aot_scale"])
+
+        # remove the module from the kernel cache, it is restored from the bundle
+        module.unload()
+        _, obj_path, _ = module.get_cpu_build_paths(module.hash_module())
+        os.remove(obj_path)
+
+        wp.config.kernel_bundles = bundle_path
+
+        x = wp.array(np.arange(4), dtype=wp.float64, device=device)
+        wp.launch(aot_scale, dim=4, inputs=[x, wp.float64(2.0)], device=device)
+        assert_np_equal(x.numpy(), 2.0 * np.arange(4))
+
+        test.assertTrue(os.path.isfile(obj_path))
+
+    finally:
+        wp.config.kernel_bundles = saved_bundles
+        shutil.rmtree(bundle_dir, ignore_errors=True)
+
+
+def test_aot_bundle_version(test, device):
+    bundle_dir = tempfile.mkdtemp()
+    bundle_path = os.path.join(bundle_dir, "kernels.wpbundle")
+    saved_bundles = wp.config.kernel_bundles
+
+    try:
+        manifest = {"format": warp.aot.BUNDLE_FORMAT, "warp_version": "0.0.0", "target": "none", "modules": {}}
+        with zipfile.ZipFile(bundle_path, "w") as archive:
+            archive.writestr(warp.aot.MANIFEST_NAME, json.dumps(manifest))
+
+        # bundles written by other versions of Warp are ignored
+        wp.config.kernel_bundles = [bundle_path]
+
+        capture = StdOutCapture()
+        capture.begin()
+        bundles = warp.aot.get_kernel_bundles()
+        output = capture.end()
+
+        test.assertEqual(bundles, [])
+        test.assertIn("Ignoring kernel bundle", output)
+
+        # newer formats cannot be read
+        manifest["format"] = warp.aot.BUNDLE_FORMAT + 1
+        with zipfile.ZipFile(bundle_path, "w") as archive:
+            archive.writestr(warp.aot.MANIFEST_NAME, json.dumps(manifest))
+
+        with test.assertRaisesRegex(RuntimeError, "has format"):
+            warp.aot.KernelBundle(bundle_path)
+
+    finally:
+        wp.config.kernel_bundles = saved_bundles
+        warp.aot.opened_bundles.clear()
+        shutil.rmtree(bundle_dir, ignore_errors=True)
+
+
+def register(parent):
+    class TestAot(parent):
+        pass
+
+    devices = ["cpu"]
+
+    add_function_test(TestAot, "test_aot_bundle", test_aot_bundle, devices=devices)
+    add_function_test(TestAot, "test_aot_bundle_version", test_aot_bundle_version, devices=devices)
+
+    return TestAot
+
+
+if __name__ == "__main__":
+    wp.build.clear_kernel_cache()
+    _ = register(unittest.TestCase)
+    unittest.main(verbosity=2)
@@ -8,6 +8,12 @@ from warp.tests.test_base import *
 wp.init()
 
 
+def random_values(rng, dtype, size):
+    if wp.types.type_scalar_type(dtype) in wp.types.int_types:
+        return rng.integers(0, 100, size=size)
+    return rng.random(size=size)
+
+
 def make_test_array_sum(dtype):
     N = 1000
 
@@ -16,7 +22,7 @@ def make_test_array_sum(dtype):
 
         cols = wp.types.type_length(dtype)
 
-        values_np = rng.random(size=(N, cols))
+        values_np = random_values(rng, dtype, (N, cols))
         values = wp.array(values_np, device=device, dtype=dtype)
 
         vsum = array_sum(values)
@@ -37,7 +43,7 @@ def make_test_array_sum_axis(dtype):
     def test_array_sum(test, device):
         rng = np.random.default_rng(123)
 
-        values_np = rng.random(size=(I, J, K))
+        values_np = random_values(rng, dtype, (I, J, K))
         values = wp.array(values_np, shape=(I, J, K), device=device, dtype=dtype)
 
         for axis in range(3):
@@ -65,8 +71,8 @@ def make_test_array_inner(dtype):
 
         cols = wp.types.type_length(dtype)
 
-        a_np = rng.random(size=(N, cols))
-        b_np = rng.random(size=(N, cols))
+        a_np = random_values(rng, dtype, (N, cols))
+        b_np = random_values(rng, dtype, (N, cols))
 
         a = wp.array(a_np, device=device, dtype=dtype)
         b = wp.array(b_np, device=device, dtype=dtype)
@@ -89,8 +95,8 @@ def make_test_array_inner_axis(dtype):
     def test_array_inner(test, device):
         rng = np.random.default_rng(123)
 
-        a_np = rng.random(size=(I, J, K))
-        b_np = rng.random(size=(I, J, K))
+        a_np = random_values(rng, dtype, (I, J, K))
+        b_np = random_values(rng, dtype, (I, J, K))
 
         a = wp.array(a_np, shape=(I, J, K), device=device, dtype=dtype)
         b = wp.array(b_np, shape=(I, J, K), device=device, dtype=dtype)
@@ -114,6 +120,9 @@ def test_array_inner_empty(test, device):
     values = wp.array([], device=device, dtype=wp.vec2)
     test.assertEqual(array_inner(values, values), 0.0)
 
+    values = wp.array([], device=device, dtype=wp.int32)
+    test.assertEqual(array_inner(values, values), 0)
+
     values = wp.array([], shape=(0, 3), device=device, dtype=float)
     assert_np_equal(array_inner(values, values, axis=0).numpy(), np.zeros(3))
 
@@ -127,12 +136,18 @@ def register(parent):
     add_function_test(TestArraySym, "test_array_sum_double", make_test_array_sum(wp.float64), devices=devices)
     add_function_test(TestArraySym, "test_array_sum_vec3", make_test_array_sum(wp.vec3), devices=devices)
     add_function_test(TestArraySym, "test_array_sum_axis_float", make_test_array_sum_axis(wp.float32), devices=devices)
+    add_function_test(TestArraySym, "test_array_sum_int", make_test_array_sum(wp.int32), devices=devices)
+    add_function_test(TestArraySym, "test_array_sum_vec3i", make_test_array_sum(wp.vec3i), devices=devices)
+    add_function_test(TestArraySym, "test_array_sum_axis_uint64", make_test_array_sum_axis(wp.uint64), devices=devices)
     add_function_test(TestArraySym, "test_array_sum_empty", test_array_sum_empty, devices=devices)
     add_function_test(TestArraySym, "test_array_inner_double", make_test_array_inner(wp.float64), devices=devices)
     add_function_test(TestArraySym, "test_array_inner_vec3", make_test_array_inner(wp.vec3), devices=devices)
     add_function_test(
         TestArraySym, "test_array_inner_axis_float", make_test_array_inner_axis(wp.float32), devices=devices
     )
+    add_function_test(TestArraySym, "test_array_inner_int64", make_test_array_inner(wp.int64), devices=devices)
+    add_function_test(TestArraySym, "test_array_inner_vec2ui", make_test_array_inner(wp.vec2ui), devices=devices)
+    add_function_test(TestArraySym, "test_array_inner_axis_int", make_test_array_inner_axis(wp.int32), devices=devices)
     add_function_test(TestArraySym, "test_array_inner_empty", test_array_inner_empty, devices=devices)
 
     return TestArraySym
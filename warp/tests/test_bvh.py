@@ -70,7 +70,7 @@ def intersect_ray_aabb(start, dir, lower, upper):
         return 0
 
 
-def test_bvh(test, type, device):
+def test_bvh(test, type, device, constructor=None, wide_bvh=False):
     rng = np.random.default_rng(123)
 
     num_bounds = 100
@@ -80,7 +80,7 @@ def test_bvh(test, type, device):
     device_lowers = wp.array(lowers, dtype=wp.vec3, device=device)
     device_uppers = wp.array(uppers, dtype=wp.vec3, device=device)
 
-    bvh = wp.Bvh(device_lowers, device_uppers)
+    bvh = wp.Bvh(device_lowers, device_uppers, constructor=constructor, wide_bvh=wide_bvh)
 
     bounds_intersected = wp.zeros(shape=(num_bounds), dtype=int, device=device)
 
@@ -132,6 +132,61 @@ def test_bvh_query_ray(test, device):
     test_bvh(test, "ray", device)
 
 
+def test_bvh_constructors(test, device):
+    for constructor in ("sah", "median", "lbvh"):
+        test_bvh(test, "AABB", device, constructor)
+        test_bvh(test, "ray", device, constructor)
+
+
+def test_bvh_wide(test, device):
+    for constructor in ("sah", "median", "lbvh"):
+        test_bvh(test, "AABB", device, constructor, wide_bvh=True)
+        test_bvh(test, "ray", device, constructor, wide_bvh=True)
+
+
+def test_bvh_constructors_large(test, device, wide_bvh=False):
+    rng = np.random.default_rng(123)
+
+    # large enough to build the subtrees in parallel on the CPU, with duplicate
+    # bounds that can't be split by their centroids
+    num_bounds = 100000
+    lowers = rng.random(size=(num_bounds, 3)) * 100.0
+    lowers[: num_bounds // 4] = 50.0
+    uppers = lowers + rng.random(size=(num_bounds, 3))
+
+    query_lower = np.array((40.0, 40.0, 40.0))
+    query_upper = np.array((60.0, 60.0, 60.0))
+    expected = np.all((lowers <= query_upper) & (uppers >= query_lower), axis=1).astype(int)
+
+    device_lowers = wp.array(lowers, dtype=wp.vec3, device=device)
+    device_uppers = wp.array(uppers, dtype=wp.vec3, device=device)
+
+    for constructor in ("sah", "median", "lbvh"):
+        bvh = wp.Bvh(device_lowers, device_uppers, constructor=constructor, wide_bvh=wide_bvh)
+
+        bounds_intersected = wp.zeros(shape=(num_bounds), dtype=int, device=device)
+        wp.launch(
+            kernel=bvh_query_aabb,
+            dim=1,
+            inputs=[bvh.id, wp.vec3(query_lower), wp.vec3(query_upper), bounds_intersected],
+            device=device,
+        )
+
+        assert_np_equal(bounds_intersected.numpy(), expected)
+
+
+def test_bvh_wide_large(test, device):
+    test_bvh_constructors_large(test, device, wide_bvh=True)
+
+
+def test_bvh_invalid_constructor(test, device):
+    lowers = wp.zeros(4, dtype=wp.vec3, device=device)
+    uppers = wp.zeros(4, dtype=wp.vec3, device=device)
+
+    with test.assertRaisesRegex(RuntimeError, r"Unknown BVH constructor 'octree'"):
+        wp.Bvh(lowers, uppers, constructor="octree")
+
+
 def register(parent):
     devices = get_test_devices()
 
@@ -140,6 +195,11 @@ def register(parent):
 
     add_function_test(TestBvh, "test_bvh_aabb", test_bvh_query_aabb, devices=devices)
     add_function_test(TestBvh, "test_bvh_ray", test_bvh_query_ray, devices=devices)
+    add_function_test(TestBvh, "test_bvh_constructors", test_bvh_constructors, devices=devices)
+    add_function_test(TestBvh, "test_bvh_constructors_large", test_bvh_constructors_large, devices=devices)
+    add_function_test(TestBvh, "test_bvh_wide", test_bvh_wide, devices=["cpu"])
+    add_function_test(TestBvh, "test_bvh_wide_large", test_bvh_wide_large, devices=["cpu"])
+    add_function_test(TestBvh, "test_bvh_invalid_constructor", test_bvh_invalid_constructor, devices=devices)
 
     return TestBvh
 
@@ -0,0 +1,321 @@
+import gc
+import unittest
+import weakref
+
+import numpy as np
+
+import warp as wp
+from warp.tests.test_base import *
+
+wp.init()
+
+
+@wp.kernel
+def scale(x: wp.array(dtype=float), s: float, y: wp.array(dtype=float)):
+    i = wp.tid()
+    y[i] = x[i] * s
+
+
+@wp.kernel
+def accumulate(a: wp.array(dtype=float), b: wp.array(dtype=float)):
+    i = wp.tid()
+    wp.atomic_add(a, i, b[i])
+
+
+@wp.struct
+class Buffers:
+    src: wp.array(dtype=wp.vec3)
+    dst: wp.array(dtype=wp.vec3)
+
+
+@wp.kernel
+def struct_copy(buffers: Buffers):
+    i = wp.tid()
+    v = buffers.src[i]
+    buffers.dst[i] = v
+
+
+@wp.kernel
+def view_write(x: wp.array2d(dtype=float), y: wp.array2d(dtype=float)):
+    i = wp.tid()
+    row = y[i]
+    row[0] = x[i, 0] + x[i, 1]
+
+
+@wp.kernel
+def translate(points: wp.array(dtype=wp.vec3), offset: wp.vec3):
+    i = wp.tid()
+    points[i] = points[i] + offset
+
+
+@wp.kernel
+def mesh_points(mesh: wp.uint64, out: wp.array(dtype=wp.vec3)):
+    i = wp.tid()
+    out[i] = wp.mesh_get(mesh).points[i]
+
+
+def test_cpu_graph_written_args(test, device):
+    # the write analysis runs when the kernels are built
+    module = wp.get_module(__name__)
+    wp.context.ModuleBuilder(module, module.options)
+
+    test.assertEqual(scale.adj.written_args, {"y"})
+    test.assertEqual(accumulate.adj.written_args, {"a"})
+    test.assertEqual(view_write.adj.written_args, {"y"})
+
+    # struct args may hold arrays that are written through attributes
+    test.assertEqual(struct_copy.adj.written_args, {"buffers"})
+
+
+def test_cpu_graph_capture(test, device):
+    n = 1000
+
+    x_np = np.arange(n, dtype=np.float32)
+
+    x = wp.array(x_np, dtype=float, device=device)
+    y = wp.zeros(n, dtype=float, device=device)
+    z = wp.zeros(n, dtype=float, device=device)
+    out = wp.zeros(n, dtype=float, device=device)
+
+    wp.capture_begin(device, force_module_load=False)
+
+    try:
+        y.fill_(1.0)
+        wp.launch(accumulate, dim=n, inputs=[y, x], device=device)
+        wp.launch(scale, dim=n, inputs=[x, 3.0, z], device=device)
+        wp.launch(accumulate, dim=n, inputs=[y, z], device=device)
+        wp.copy(out, y)
+    finally:
+        graph = wp.capture_end(device)
+
+    # nothing runs until the graph is launched
+    assert_np_equal(y.numpy(), np.zeros(n))
+    assert_np_equal(out.numpy(), np.zeros(n))
+
+    # the fill is reset on every replay
+    for _ in range(2):
+        wp.capture_launch(graph)
+        assert_np_equal(out.numpy(), 1.0 + 4.0 * x_np)
+
+    # the fill and the first scale are independent, the accumulations are ordered after both
+    test.assertEqual(wp.context.runtime.core.cpu_graph_get_stage_count(graph.exec), 4)
+
+
+def test_cpu_graph_independent_launches(test, device):
+    n = 257
+
+    x_np = np.arange(n, dtype=np.float32)
+    x = wp.array(x_np, dtype=float, device=device)
+    outputs = [wp.zeros(n, dtype=float, device=device) for _ in range(4)]
+
+    wp.capture_begin(device, force_module_load=False)
+
+    try:
+        # launches that only share a read-only input have no dependencies
+        for i, y in enumerate(outputs):
+            wp.launch(scale, dim=n, inputs=[x, float(i), y], device=device, max_cpu_threads=2)
+    finally:
+        graph = wp.capture_end(device)
+
+    test.assertEqual(wp.context.runtime.core.cpu_graph_get_stage_count(graph.exec), 1)
+
+    wp.capture_launch(graph)
+
+    for i, y in enumerate(outputs):
+        assert_np_equal(y.numpy(), x_np * float(i))
+
+
+def test_cpu_graph_struct_and_views(test, device):
+    n = 64
+
+    rng = np.random.default_rng(42)
+    src_np = rng.random((n, 3), dtype=np.float32)
+    x_np = rng.random((n, 2), dtype=np.float32)
+
+    buffers = Buffers()
+    buffers.src = wp.array(src_np, dtype=wp.vec3, device=device)
+    buffers.dst = wp.zeros(n, dtype=wp.vec3, device=device)
+
+    x = wp.array(x_np, dtype=float, device=device)
+    y = wp.zeros((n, 2), dtype=float, device=device)
+
+    # strided destination, copied with a non-contiguous copy command
+    column = wp.zeros(n, dtype=float, device=device)
+
+    wp.capture_begin(device, force_module_load=False)
+
+    try:
+        wp.launch(struct_copy, dim=n, inputs=[buffers], device=device)
+        wp.launch(view_write, dim=n, inputs=[x, y], device=device)
+        y[:, 1].fill_(2.0)
+        wp.copy(column, y[:, 0])
+    finally:
+        graph = wp.capture_end(device)
+
+    wp.capture_launch(graph)
+
+    assert_np_equal(buffers.dst.numpy(), src_np)
+    assert_np_equal(y.numpy()[:, 1], np.full(n, 2.0))
+    assert_np_equal(column.numpy(), x_np[:, 0] + x_np[:, 1], tol=1.0e-6)
+
+
+def test_cpu_graph_handles(test, device):
+    points_np = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32)
+
+    points = wp.array(points_np, dtype=wp.vec3, device=device)
+    indices = wp.array([0, 1, 2], dtype=int, device=device)
+    mesh = wp.Mesh(points=points, indices=indices)
+
+    out = wp.zeros(3, dtype=wp.vec3, device=device)
+
+    wp.capture_begin(device, force_module_load=False)
+
+    try:
+        wp.launch(translate, dim=3, inputs=[points, wp.vec3(1.0, 1.0, 1.0)], device=device)
+        wp.launch(mesh_points, dim=3, inputs=[mesh.id, out], device=device)
+    finally:
+        graph = wp.capture_end(device)
+
+    # the mesh memory is not visible through the handle, the launch is ordered after the first one
+    test.assertEqual(wp.context.runtime.core.cpu_graph_get_stage_count(graph.exec), 2)
+
+    wp.capture_launch(graph)
+    assert_np_equal(out.numpy(), points_np + 1.0)
+
+
+def test_cpu_graph_cmd(test, device):
+    n = 32
+
+    x_np = np.arange(n, dtype=np.float32)
+    x = wp.array(x_np, dtype=float, device=device)
+    y = wp.zeros(n, dtype=float, device=device)
+
+    cmd = wp.launch(scale, dim=n, inputs=[x, 2.0, y], device=device, record_cmd=True)
+
+    wp.capture_begin(device, force_module_load=False)
+
+    try:
+        cmd.launch()
+    finally:
+        graph = wp.capture_end(device)
+
+    # updates of the command after capture do not affect the graph
+    cmd.set_param_by_name("s", 5.0)
+
+    wp.capture_launch(graph)
+    assert_np_equal(y.numpy(), 2.0 * x_np)
+
+    cmd.launch()
+    assert_np_equal(y.numpy(), 5.0 * x_np)
+
+
+def test_cpu_graph_cmd_retain(test, device):
+    n = 32
+
+    x_np = np.arange(n, dtype=np.float32)
+    x = wp.array(x_np, dtype=float, device=device)
+    y = wp.zeros(n, dtype=float, device=device)
+    count = wp.array([n // 2], dtype=wp.int32, device=device)
+
+    cmd = wp.launch(scale, dim=n, inputs=[x, 2.0, y], device=device, dim_from=count, record_cmd=True)
+
+    wp.capture_begin(device, force_module_load=False)
+
+    try:
+        cmd.launch()
+    finally:
+        graph = wp.capture_end(device)
+
+    # the graph keeps the arrays of the command alive after they are replaced in the command
+    refs = [weakref.ref(a) for a in (x, y, count)]
+    cmd.set_param_by_name("x", wp.zeros(n, dtype=float, device=device))
+    cmd.set_param_by_name("y", wp.zeros(n, dtype=float, device=device))
+    del x, y, count
+    gc.collect()
+
+    for ref in refs:
+        test.assertIsNotNone(ref())
+
+    wp.capture_launch(graph)
+
+    expected = np.zeros(n, dtype=np.float32)
+    expected[: n // 2] = 2.0 * x_np[: n // 2]
+    assert_np_equal(refs[1]().numpy(), expected)
+
+
+@wp.kernel
+def count_positive(x: wp.array(dtype=float), count: wp.array(dtype=wp.int32), out: wp.array(dtype=float)):
+    i = wp.tid()
+    if x[i] > 0.0:
+        out[wp.atomic_add(count, 0, 1)] = x[i]
+
+
+def test_cpu_graph_dim_from(test, device):
+    n = 300
+
+    x = wp.zeros(n, dtype=float, device=device)
+    count = wp.zeros(1, dtype=wp.int32, device=device)
+    compacted = wp.zeros(n, dtype=float, device=device)
+    y = wp.zeros(n, dtype=float, device=device)
+
+    wp.capture_begin(device, force_module_load=False)
+
+    try:
+        count.zero_()
+        y.zero_()
+        wp.launch(count_positive, dim=n, inputs=[x, count, compacted], device=device)
+        wp.launch(scale, dim=n, inputs=[compacted, 2.0, y], device=device, dim_from=count)
+    finally:
+        graph = wp.capture_end(device)
+
+    # the indirect launch reads the counter written by the previous launch at each replay
+    for positive in (0, 17, n):
+        x.assign(np.concatenate((np.ones(positive), -np.ones(n - positive))).astype(np.float32))
+        wp.capture_launch(graph)
+
+        expected = np.zeros(n, dtype=np.float32)
+        expected[:positive] = 2.0
+        assert_np_equal(y.numpy(), expected)
+
+
+def test_cpu_graph_errors(test, device):
+    wp.capture_begin(device, force_module_load=False)
+
+    try:
+        with test.assertRaisesRegex(RuntimeError, "already active"):
+            wp.capture_begin(device, force_module_load=False)
+    finally:
+        graph = wp.capture_end(device)
+
+    with test.assertRaisesRegex(RuntimeError, "not active"):
+        wp.capture_end(device)
+
+    # empty graphs can be launched
+    wp.capture_launch(graph)
+
+
+def register(parent):
+    class TestCpuGraph(parent):
+        pass
+
+    devices = ["cpu"]
+
+    add_function_test(TestCpuGraph, "test_cpu_graph_written_args", test_cpu_graph_written_args, devices=devices)
+    add_function_test(TestCpuGraph, "test_cpu_graph_capture", test_cpu_graph_capture, devices=devices)
+    add_function_test(
+        TestCpuGraph, "test_cpu_graph_independent_launches", test_cpu_graph_independent_launches, devices=devices
+    )
+    add_function_test(TestCpuGraph, "test_cpu_graph_struct_and_views", test_cpu_graph_struct_and_views, devices=devices)
+    add_function_test(TestCpuGraph, "test_cpu_graph_handles", test_cpu_graph_handles, devices=devices)
+    add_function_test(TestCpuGraph, "test_cpu_graph_cmd", test_cpu_graph_cmd, devices=devices)
+    add_function_test(TestCpuGraph, "test_cpu_graph_cmd_retain", test_cpu_graph_cmd_retain, devices=devices)
+    add_function_test(TestCpuGraph, "test_cpu_graph_dim_from", test_cpu_graph_dim_from, devices=devices)
+    add_function_test(TestCpuGraph, "test_cpu_graph_errors", test_cpu_graph_errors, devices=devices)
+
+    return TestCpuGraph
+
+
+if __name__ == "__main__":
+    wp.build.clear_kernel_cache()
+    _ = register(unittest.TestCase)
+    unittest.main(verbosity=2)
@@ -0,0 +1,153 @@
+import unittest
+
+import numpy as np
+
+import warp as wp
+from warp.tests.test_base import *
+
+wp.init()
+
+
+@wp.kernel
+def saxpy(a: float, x: wp.array(dtype=float), y: wp.array(dtype=float), out: wp.array(dtype=float)):
+    i = wp.tid()
+    out[i] = a * x[i] + wp.sqrt(y[i])
+
+
+@wp.kernel
+def scale_2d(x: wp.array2d(dtype=float), out: wp.array2d(dtype=float)):
+    i, j = wp.tid()
+    out[i, j] = x[i, j] * float(i + 1)
+
+
+@wp.kernel
+def vec_length(x: wp.array(dtype=wp.vec3), out: wp.array(dtype=float)):
+    i = wp.tid()
+    out[i] = wp.length(x[i])
+
+
+@wp.kernel
+def clamp_branch(x: wp.array(dtype=float), out: wp.array(dtype=float)):
+    i = wp.tid()
+    if x[i] > 0.5:
+        out[i] = 0.5
+    else:
+        out[i] = x[i]
+
+
+@wp.kernel
+def sum_atomic(x: wp.array(dtype=float), out: wp.array(dtype=float)):
+    i = wp.tid()
+    wp.atomic_add(out, 0, x[i])
+
+
+@wp.func
+def sum_loop(n: int):
+    s = int(0)
+    for k in range(n):
+        s += k
+    return s
+
+
+@wp.kernel
+def sum_func(n: wp.array(dtype=int), out: wp.array(dtype=int)):
+    i = wp.tid()
+    out[i] = sum_loop(n[i])
+
+
+def test_cpu_simd_eligibility(test, device):
+    wp.set_module_options({"cpu_simd_width": 8})
+    wp.load_module(device=device)
+
+    test.assertTrue(saxpy.adj.simd_compatible)
+    test.assertTrue(scale_2d.adj.simd_compatible)
+    test.assertTrue(vec_length.adj.simd_compatible)
+
+    # kernels with control flow or atomics fall back to the scalar loop
+    test.assertFalse(clamp_branch.adj.simd_compatible)
+    test.assertFalse(sum_atomic.adj.simd_compatible)
+    test.assertFalse(sum_func.adj.simd_compatible)
+
+    wp.set_module_options({"cpu_simd_width": 0})
+
+
+def test_cpu_simd_kernels(test, device):
+    rng = np.random.default_rng(123)
+
+    # not a multiple of any lane count
+    n = 1003
+
+    x_np = rng.random(n, dtype=np.float32)
+    y_np = rng.random(n, dtype=np.float32)
+    v_np = rng.random((n, 3), dtype=np.float32)
+    x2d_np = rng.random((17, 29), dtype=np.float32)
+    counts_np = rng.integers(0, 20, size=n, dtype=np.int32)
+
+    for width in (0, 4, 8, 16):
+        wp.set_module_options({"cpu_simd_width": width})
+
+        x = wp.array(x_np, dtype=float, device=device)
+        y = wp.array(y_np, dtype=float, device=device)
+        out = wp.zeros(n, dtype=float, device=device)
+
+        wp.launch(saxpy, dim=n, inputs=[2.0, x, y, out], device=device)
+        assert_np_equal(out.numpy(), 2.0 * x_np + np.sqrt(y_np), tol=1.0e-6)
+
+        # non-contiguous arrays take the strided loop
+        out.zero_()
+        wp.launch(saxpy, dim=n // 2, inputs=[2.0, x[::2], y[::2], out[::2]], device=device)
+        expect = np.zeros(n, dtype=np.float32)
+        expect[::2][: n // 2] = 2.0 * x_np[::2][: n // 2] + np.sqrt(y_np[::2][: n // 2])
+        assert_np_equal(out.numpy(), expect, tol=1.0e-6)
+
+        # several threads, each processing a range that is not aligned to the lane count
+        out.zero_()
+        wp.launch(saxpy, dim=n, inputs=[2.0, x, y, out], device=device, max_cpu_threads=3)
+        assert_np_equal(out.numpy(), 2.0 * x_np + np.sqrt(y_np), tol=1.0e-6)
+
+        x2d = wp.array(x2d_np, dtype=float, device=device)
+        out2d = wp.zeros_like(x2d)
+        wp.launch(scale_2d, dim=x2d.shape, inputs=[x2d, out2d], device=device)
+        assert_np_equal(out2d.numpy(), x2d_np * np.arange(1, 18, dtype=np.float32)[:, None], tol=1.0e-6)
+
+        v = wp.array(v_np, dtype=wp.vec3, device=device)
+        wp.launch(vec_length, dim=n, inputs=[v, out], device=device)
+        assert_np_equal(out.numpy(), np.linalg.norm(v_np, axis=1), tol=1.0e-6)
+
+        wp.launch(clamp_branch, dim=n, inputs=[x, out], device=device)
+        assert_np_equal(out.numpy(), np.minimum(x_np, 0.5))
+
+        total = wp.zeros(1, dtype=float, device=device)
+        wp.launch(sum_atomic, dim=n, inputs=[x, total], device=device)
+        assert_np_equal(total.numpy(), np.array([x_np.sum()]), tol=1.0e-3)
+
+        counts = wp.array(counts_np, dtype=int, device=device)
+        sums = wp.zeros(n, dtype=int, device=device)
+        wp.launch(sum_func, dim=n, inputs=[counts, sums], device=device)
+        assert_np_equal(sums.numpy(), counts_np * (counts_np - 1) // 2)
+
+    wp.set_module_options({"cpu_simd_width": 0})
+
+
+def test_cpu_simd_invalid_width(test, device):
+    with test.assertRaisesRegex(ValueError, "cpu_simd_width"):
+        wp.codegen.get_cpu_simd_width(saxpy, {"cpu_simd_width": 3})
+
+
+def register(parent):
+    class TestCpuSimd(parent):
+        pass
+
+    devices = ["cpu"]
+
+    add_function_test(TestCpuSimd, "test_cpu_simd_eligibility", test_cpu_simd_eligibility, devices=devices)
+    add_function_test(TestCpuSimd, "test_cpu_simd_kernels", test_cpu_simd_kernels, devices=devices)
+    add_function_test(TestCpuSimd, "test_cpu_simd_invalid_width", test_cpu_simd_invalid_width, devices=devices)
+
+    return TestCpuSimd
+
+
+if __name__ == "__main__":
+    wp.build.clear_kernel_cache()
+    _ = register(unittest.TestCase)
+    unittest.main(verbosity=2)
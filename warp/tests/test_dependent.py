@@ -18,5 +18,16 @@ def kern(expect: float):
     wp.expect_eq(ref.magic(), expect)
 
 
+@wp.kernel
+def kern_value(out: wp.array(dtype=float)):
+    out[0] = ref.magic()
+
+
 def run(expect, device):
     wp.launch(kern, dim=1, inputs=[expect], device=device)
+
+
+def value(device):
+    out = wp.zeros(1, dtype=float, device=device)
+    wp.launch(kern_value, dim=1, inputs=[out], device=device)
+    return out.numpy()[0]
@@ -134,6 +134,54 @@ def test_hashgrid_query(test, device):
         test.assertTrue(np.array_equal(counts, counts_ref))
 
 
+def test_hashgrid_sparse(test, device):
+    rng = np.random.default_rng(123)
+
+    # fine grid, dense cell storage would need 2 * 1024^3 ints
+    sparse_grid = wp.HashGrid(1024, 1024, 1024, device, sparse=True)
+    dense_grid = wp.HashGrid(dim_x, dim_y, dim_z, device)
+
+    # a growing then shrinking number of clusters exercises the table reallocation and reuse
+    for num_clusters in (4, 64, 8):
+        centers = rng.random(size=(num_clusters, 3)) * scale * 20.0
+        points = (centers[:, None, :] + rng.random(size=(num_clusters, 256, 3)) * scale * 0.2).reshape((-1, 3))
+
+        points_arr = wp.array(points, dtype=wp.vec3, device=device)
+        counts_sparse = wp.zeros(len(points), dtype=int, device=device)
+        counts_dense = wp.zeros(len(points), dtype=int, device=device)
+        counts_ref = wp.zeros(len(points), dtype=int, device=device)
+
+        sparse_grid.build(points_arr, cell_radius)
+        dense_grid.build(points_arr, cell_radius)
+
+        wp.launch(
+            count_neighbors,
+            dim=len(points),
+            inputs=[sparse_grid.id, query_radius, points_arr, counts_sparse],
+            device=device,
+        )
+        wp.launch(
+            count_neighbors,
+            dim=len(points),
+            inputs=[dense_grid.id, query_radius, points_arr, counts_dense],
+            device=device,
+        )
+        wp.launch(
+            count_neighbors_reference,
+            dim=len(points) * len(points),
+            inputs=[query_radius, points_arr, counts_ref, len(points)],
+            device=device,
+        )
+
+        assert_np_equal(counts_sparse.numpy(), counts_ref.numpy())
+        assert_np_equal(counts_dense.numpy(), counts_ref.numpy())
+
+
+def test_hashgrid_invalid_dims(test, device):
+    with test.assertRaises(RuntimeError):
+        wp.HashGrid(4096, 4096, 4096, device)
+
+
 def register(parent):
     devices = get_test_devices()
 
@@ -141,6 +189,8 @@ def register(parent):
         pass
 
     add_function_test(TestHashGrid, "test_hashgrid_query", test_hashgrid_query, devices=devices)
+    add_function_test(TestHashGrid, "test_hashgrid_sparse", test_hashgrid_sparse, devices=["cpu"])
+    add_function_test(TestHashGrid, "test_hashgrid_invalid_dims", test_hashgrid_invalid_dims, devices=devices)
 
     return TestHashGrid
 
@@ -0,0 +1,208 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import warp as wp
+import warp.sim
+from warp.tests.test_base import *
+
+wp.init()
+
+
+@wp.kernel
+def kernel_cache_fill(x: wp.array(dtype=float), value: float):
+    i = wp.tid()
+    x[i] = value
+
+
+def run_fill(device):
+    x = wp.zeros(4, dtype=float, device=device)
+    wp.launch(kernel_cache_fill, dim=4, inputs=[x, 2.0], device=device)
+    assert_np_equal(x.numpy(), np.full(4, 2.0))
+
+
+def test_kernel_cache_key(test, device):
+    module = wp.get_module(__name__)
+    module_hash = module.hash_module()
+
+    key = wp.build.kernel_cache_key(module_hash, wp.build.cpu_target)
+    test.assertEqual(len(key), 32)
+    test.assertEqual(key, wp.build.kernel_cache_key(module_hash, wp.build.cpu_target))
+
+    # builds for other targets do not collide
+    test.assertNotEqual(key, wp.build.kernel_cache_key(module_hash, "cuda.sm70.ptx"))
+
+    wp.load_module(device=device)
+
+    _, obj_path, cpp_path = module.get_cpu_build_paths(module_hash)
+    test.assertTrue(os.path.basename(obj_path).endswith(f"_{key}.o"))
+    test.assertTrue(os.path.isfile(obj_path))
+    test.assertTrue(os.path.isfile(cpp_path))
+
+    # no temporary files are left behind by the build
+    for name in os.listdir(wp.build.kernel_bin_dir) + os.listdir(wp.build.kernel_gen_dir):
+        test.assertNotIn(".tmp-", name)
+
+
+def test_kernel_cache_shared_dir(test, device):
+    module = wp.get_module(__name__)
+    module.unload()
+
+    _, obj_path, _ = module.get_cpu_build_paths(module.hash_module())
+
+    shared_dir = tempfile.mkdtemp()
+    saved_shared_dir = wp.config.cache_shared_dir
+
+    try:
+        # make the object code only available in the shared cache
+        os.makedirs(os.path.join(shared_dir, "bin"))
+        wp.load_module(device=device)
+        module.unload()
+        shutil.move(obj_path, os.path.join(shared_dir, "bin", os.path.basename(obj_path)))
+
+        wp.config.cache_shared_dir = shared_dir
+        run_fill(device)
+
+        # the module was loaded from the shared cache without being built
+        test.assertFalse(os.path.isfile(obj_path))
+
+    finally:
+        wp.config.cache_shared_dir = saved_shared_dir
+        module.unload()
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+def test_kernel_cache_evict(test, device):
+    cache_dir = tempfile.mkdtemp()
+    saved_dirs = (wp.build.kernel_bin_dir, wp.build.kernel_gen_dir)
+
+    try:
+        wp.build.kernel_bin_dir = os.path.join(cache_dir, "bin")
+        wp.build.kernel_gen_dir = os.path.join(cache_dir, "gen")
+        os.makedirs(wp.build.kernel_bin_dir)
+        os.makedirs(wp.build.kernel_gen_dir)
+
+        # three entries of 200 bytes, from the least to the most recently used
+        stems = [f"wp_test_{i:032x}" for i in range(3)]
+        for i, stem in enumerate(stems):
+            for path in (
+                os.path.join(wp.build.kernel_bin_dir, stem + ".o"),
+                os.path.join(wp.build.kernel_gen_dir, stem + ".cpp"),
+            ):
+                with open(path, "wb") as f:
+                    f.write(bytes(100))
+                os.utime(path, (1000.0 + i, 1000.0 + i))
+
+        def exists(stem):
+            return os.path.isfile(os.path.join(wp.build.kernel_bin_dir, stem + ".o"))
+
+        # no limit
+        wp.build.evict_kernel_cache(0)
+        test.assertTrue(all(exists(stem) for stem in stems))
+
+        wp.build.evict_kernel_cache(400)
+        test.assertEqual([exists(stem) for stem in stems], [False, True, True])
+        test.assertFalse(os.path.isfile(os.path.join(wp.build.kernel_gen_dir, stems[0] + ".cpp")))
+
+        # the lock file of an evicted entry is kept so that processes waiting on it stay mutually exclusive
+        test.assertTrue(os.path.isfile(os.path.join(wp.build.kernel_bin_dir, stems[0] + ".lock")))
+
+        # entries that are in use are skipped
+        with wp.build.cache_entry_lock(stems[1] + ".o"):
+            wp.build.evict_kernel_cache(1)
+
+        test.assertEqual([exists(stem) for stem in stems], [False, True, False])
+
+    finally:
+        wp.build.kernel_bin_dir, wp.build.kernel_gen_dir = saved_dirs
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_kernel_cache_source_info(test, device):
+    # kernels created in new modules, their sources are parsed on demand
+    module_a = wp.context.Module("kernel_cache_source_a", None)
+    kernel_a = wp.Kernel(kernel_cache_fill.func, key="fill", module=module_a)
+    test.assertNotIn("tree", kernel_a.adj.__dict__)
+
+    module_a.hash_module()
+
+    info = wp.build.get_source_info(kernel_cache_fill.func)
+    test.assertEqual(info["hash"], hashlib.sha256(bytes(kernel_a.adj.source, "utf-8")).hexdigest())
+    test.assertEqual(info["refs"], [])
+
+    # the persisted information is used instead of the source
+    module_b = wp.context.Module("kernel_cache_source_b", None)
+    kernel_b = wp.Kernel(kernel_cache_fill.func, key="fill", module=module_b)
+
+    module_b.hash_module()
+    test.assertNotIn("tree", kernel_b.adj.__dict__)
+    test.assertNotIn("source", kernel_b.adj.__dict__)
+
+
+@wp.func
+def kernel_cache_add(a: wp.vec3, b: wp.vec3):
+    return a + b
+
+
+def create_kernel_cache_combine(func):
+    def combine(out: wp.array(dtype=wp.vec3)):
+        out[0] = func(wp.vec3(1.0, 2.0, 3.0), wp.vec3(3.0, 2.0, 1.0))
+
+    return combine
+
+
+def test_kernel_cache_source_info_closure(test, device):
+    # the kernels of a factory share their source but reference different modules
+    module_a = wp.context.Module("kernel_cache_closure_a", None)
+    kernel_a = wp.Kernel(create_kernel_cache_combine(kernel_cache_add), key="combine", module=module_a)
+    module_a.hash_module()
+
+    module_b = wp.context.Module("kernel_cache_closure_b", None)
+    kernel_b = wp.Kernel(create_kernel_cache_combine(wp.sim.utils.vec_min), key="combine", module=module_b)
+    module_b.hash_module()
+
+    test.assertIsNone(wp.build.get_source_info(kernel_a.func))
+    test.assertIsNone(wp.build.get_source_info(kernel_b.func))
+
+    test.assertIn(wp.get_module(__name__), module_a.references)
+    test.assertNotIn(wp.get_module("warp.sim.utils"), module_a.references)
+    test.assertIn(wp.get_module("warp.sim.utils"), module_b.references)
+    test.assertNotIn(wp.get_module(__name__), module_b.references)
+
+    out = wp.zeros(1, dtype=wp.vec3, device=device)
+    wp.launch(kernel_b, dim=1, inputs=[out], device=device)
+    assert_np_equal(out.numpy(), np.array([[1.0, 2.0, 1.0]]))
+
+
+def register(parent):
+    class TestKernelCache(parent):
+        pass
+
+    devices = ["cpu"]
+
+    add_function_test(TestKernelCache, "test_kernel_cache_key", test_kernel_cache_key, devices=devices)
+    add_function_test(TestKernelCache, "test_kernel_cache_shared_dir", test_kernel_cache_shared_dir, devices=devices)
+    add_function_test(TestKernelCache, "test_kernel_cache_evict", test_kernel_cache_evict, devices=devices)
+    add_function_test(TestKernelCache, "test_kernel_cache_source_info", test_kernel_cache_source_info, devices=devices)
+    add_function_test(
+        TestKernelCache, "test_kernel_cache_source_info_closure", test_kernel_cache_source_info_closure, devices=devices
+    )
+
+    return TestKernelCache
+
+
+if __name__ == "__main__":
+    wp.build.clear_kernel_cache()
+    _ = register(unittest.TestCase)
+    unittest.main(verbosity=2)
@@ -0,0 +1,148 @@
+# Copyright (c) 2023 NVIDIA CORPORATION.  All rights reserved.
+# NVIDIA CORPORATION and its licensors retain all intellectual property
+# and proprietary rights in and to this software, related documentation
+# and any modifications thereto.  Any use, reproduction, disclosure or
+# distribution of this software and related documentation without an express
+# license agreement from NVIDIA CORPORATION is strictly prohibited.
+
+import os
+import unittest
+from typing import Any
+
+import numpy as np
+
+import warp as wp
+from warp.tests.test_base import *
+
+wp.init()
+
+wp.set_module_options({"cpu_kernel_units": True})
+
+
+@wp.func
+def unit_square(x: Any):
+    return x * x
+
+
+@wp.kernel
+def unit_square_kernel(x: wp.array(dtype=Any)):
+    i = wp.tid()
+    x[i] = unit_square(x[i])
+
+
+wp.overload(unit_square_kernel, {"x": wp.array(dtype=float)})
+
+
+@wp.kernel
+def unit_offset_kernel(x: wp.array(dtype=float), offset: float):
+    i = wp.tid()
+    x[i] = x[i] + offset
+
+
+UNIT_SCALE = wp.constant(2.0)
+
+
+@wp.kernel
+def unit_scale_kernel(x: wp.array(dtype=float)):
+    i = wp.tid()
+    x[i] = x[i] * UNIT_SCALE
+
+
+def get_unit_paths(module):
+    paths = {}
+    for name, unit_hash, kernel in module.get_cpu_units():
+        paths[kernel.get_mangled_name()] = module.get_cpu_build_paths(unit_hash, name)[1]
+    return paths
+
+
+def test_kernel_units_load(test, device):
+    module = wp.get_module(__name__)
+
+    x = wp.array(np.arange(4), dtype=float, device=device)
+    wp.launch(unit_square_kernel, dim=4, inputs=[x], device=device)
+    wp.launch(unit_offset_kernel, dim=4, inputs=[x, 1.0], device=device)
+    assert_np_equal(x.numpy(), np.arange(4) ** 2 + 1.0)
+
+    # one unit per concrete kernel
+    paths = get_unit_paths(module)
+    test.assertEqual(len(paths), len(unit_square_kernel.overloads) + 2)
+    test.assertEqual(set(module.cpu_units.keys()), set(paths.keys()))
+
+    for path in paths.values():
+        test.assertTrue(os.path.isfile(path))
+
+
+def test_kernel_units_incremental(test, device):
+    module = wp.get_module(__name__)
+    wp.load_module(device=device)
+
+    paths = get_unit_paths(module)
+
+    # adding an overload only adds a unit, the existing units keep their hashes
+    overload = wp.overload(unit_square_kernel, {"x": wp.array(dtype=wp.float64)})
+
+    new_paths = get_unit_paths(module)
+    test.assertEqual(len(new_paths), 4)
+    for name, path in paths.items():
+        test.assertEqual(new_paths[name], path)
+
+    new_path = new_paths[overload.get_mangled_name()]
+    if os.path.isfile(new_path):
+        os.remove(new_path)
+
+    # only the new overload needs to be built
+    missing = module.load_cpu_cache(module.get_cpu_units())
+    module.unload()
+    test.assertEqual([kernel for _, _, kernel in missing], [overload])
+
+    x = wp.array(np.arange(4), dtype=wp.float64, device=device)
+    wp.launch(unit_square_kernel, dim=4, inputs=[x], device=device)
+    assert_np_equal(x.numpy(), np.arange(4) ** 2)
+
+    test.assertTrue(os.path.isfile(new_path))
+
+
+def test_kernel_units_constants(test, device):
+    global UNIT_SCALE
+
+    module = wp.get_module(__name__)
+    paths = get_unit_paths(module)
+
+    try:
+        # changing a constant only changes the hash of the kernels referencing it
+        UNIT_SCALE = wp.constant(3.0)
+        module.unload()
+
+        new_paths = get_unit_paths(module)
+        for name, path in paths.items():
+            if name == unit_scale_kernel.get_mangled_name():
+                test.assertNotEqual(new_paths[name], path)
+            else:
+                test.assertEqual(new_paths[name], path)
+
+        x = wp.full(4, value=1.0, dtype=float, device=device)
+        wp.launch(unit_scale_kernel, dim=4, inputs=[x], device=device)
+        assert_np_equal(x.numpy(), np.full(4, 3.0))
+
+    finally:
+        UNIT_SCALE = wp.constant(2.0)
+        module.unload()
+
+
+def register(parent):
+    class TestKernelUnits(parent):
+        pass
+
+    devices = ["cpu"]
+
+    add_function_test(TestKernelUnits, "test_kernel_units_load", test_kernel_units_load, devices=devices)
+    add_function_test(TestKernelUnits, "test_kernel_units_incremental", test_kernel_units_incremental, devices=devices)
+    add_function_test(TestKernelUnits, "test_kernel_units_constants", test_kernel_units_constants, devices=devices)
+
+    return TestKernelUnits
+
+
+if __name__ == "__main__":
+    wp.build.clear_kernel_cache()
+    _ = register(unittest.TestCase)
+    unittest.main(verbosity=2)
@@ -306,6 +306,161 @@ def test_launch_tuple_args(test, device):
     assert_np_equal(out.numpy(), np.array((0, 3, 6, 9)))
 
 
+@wp.kernel
+def kernel_scale(
+    values: wp.array(dtype=float),
+    scale: float,
+    offset: int,
+    out: wp.array(dtype=float),
+):
+    tid = wp.tid()
+    out[tid] = values[tid] * scale + float(offset)
+
+
+def test_launch_cmd_update(test, device):
+    values = wp.array(np.arange(0, 4), dtype=float, device=device)
+    out_a = wp.zeros_like(values)
+    out_b = wp.zeros_like(values)
+
+    cmd = wp.launch(kernel_scale, dim=len(values), inputs=[values, 1.0, 0, out_a], device=device, record_cmd=True)
+
+    index_scale = cmd.get_param_index("scale")
+    index_out = cmd.get_param_index("out")
+
+    # scalars are updated in place, arrays are swapped between launches
+    for i in range(4):
+        out = out_b if i & 1 else out_a
+
+        cmd.set_param_at_index(index_scale, float(i))
+        cmd.set_param_by_name("offset", i)
+        cmd.set_param_at_index(index_out, out)
+        cmd.launch()
+
+        assert_np_equal(out.numpy(), np.arange(0, 4) * i + i)
+
+    # ints are accepted by float params
+    cmd.set_param_at_index(index_scale, 2)
+    cmd.launch()
+    assert_np_equal(out_b.numpy(), np.arange(0, 4) * 2 + 3)
+
+    # values that can't be written in place go through the regular argument packing
+    cmd.set_param_at_index(index_scale, wp.float32(4.0))
+    cmd.launch()
+    assert_np_equal(out_b.numpy(), np.arange(0, 4) * 4 + 3)
+
+    with test.assertRaisesRegex(RuntimeError, "no argument named"):
+        cmd.set_param_by_name("bogus", 1.0)
+
+    with test.assertRaises(RuntimeError):
+        cmd.set_param_at_index(index_out, wp.zeros(4, dtype=int, device=device))
+
+
+@wp.kernel
+def count_threads(counts: wp.array(dtype=int), sum_f: wp.array(dtype=float), ids: wp.array(dtype=int)):
+    tid = wp.tid()
+
+    wp.atomic_add(counts, 0, 1)
+    wp.atomic_max(counts, 1, tid)
+    wp.atomic_min(counts, 2, -tid)
+    wp.atomic_add(sum_f, 0, 1.0)
+
+    ids[tid] = tid
+
+
+def test_launch_cpu_threads(test, device):
+    n = 10007
+
+    saved_tile_size = wp.config.cpu_tile_size
+
+    try:
+        for tile_size in (0, 1, 64):
+            wp.config.cpu_tile_size = tile_size
+
+            for max_cpu_threads in (1, 2, 8):
+                counts = wp.zeros(3, dtype=int, device=device)
+                sum_f = wp.zeros(1, dtype=float, device=device)
+                ids = wp.zeros(n, dtype=int, device=device)
+
+                wp.launch(
+                    count_threads, dim=n, inputs=[counts, sum_f, ids], device=device, max_cpu_threads=max_cpu_threads
+                )
+
+                # every thread runs exactly once and atomics are not lost between workers
+                assert_np_equal(counts.numpy(), np.array([n, n - 1, -(n - 1)]))
+                assert_np_equal(sum_f.numpy(), np.array([float(n)]))
+                assert_np_equal(ids.numpy(), np.arange(n))
+
+    finally:
+        wp.config.cpu_tile_size = saved_tile_size
+
+
+@wp.kernel
+def kernel2d_fill(a: wp.array(dtype=int, ndim=2)):
+    i, j = wp.tid()
+
+    a[i, j] = i * 1000 + j
+
+
+def test_launch_cpu_threads_2d(test, device):
+    a = wp.zeros((37, 53), dtype=int, device=device)
+
+    cmd = wp.launch(kernel2d_fill, dim=a.shape, inputs=[a], device=device, record_cmd=True, max_cpu_threads=4)
+    cmd.launch()
+
+    assert_np_equal(a.numpy(), np.arange(37)[:, None] * 1000 + np.arange(53)[None, :])
+
+
+@wp.kernel
+def mark_threads(out: wp.array(dtype=int)):
+    tid = wp.tid()
+    out[tid] = out[tid] + 1
+
+
+def test_launch_dim_from(test, device):
+    n = 1000
+
+    out = wp.zeros(n, dtype=int, device=device)
+    count = wp.zeros(1, dtype=wp.int32, device=device)
+
+    # the launch runs min(dim, count) threads
+    for value in (0, -5, 1, 317, n, n + 10):
+        out.zero_()
+        count.fill_(value)
+        wp.launch(mark_threads, dim=n, inputs=[out], device=device, dim_from=count)
+
+        expected = np.zeros(n, dtype=int)
+        expected[: max(0, min(n, value))] = 1
+        assert_np_equal(out.numpy(), expected)
+
+    # the counter is read when the command is launched
+    out.zero_()
+    cmd = wp.launch(mark_threads, dim=n, inputs=[out], device=device, dim_from=count, record_cmd=True)
+    count.fill_(42)
+    cmd.launch()
+    test.assertEqual(out.numpy().sum(), 42)
+
+    cmd.set_dim(10)
+    cmd.launch()
+    assert_np_equal(out.numpy()[:10], np.full(10, 2))
+    test.assertEqual(out.numpy().sum(), 52)
+
+    # 1-tuples are 1-D launches
+    out.zero_()
+    count.fill_(7)
+    wp.launch(mark_threads, dim=(n,), inputs=[out], device=device, dim_from=count)
+    test.assertEqual(out.numpy().sum(), 7)
+
+    cmd.set_dim([n])
+    with test.assertRaises(RuntimeError):
+        cmd.set_dim((n, 1))
+
+    with test.assertRaises(RuntimeError):
+        wp.launch(mark_threads, dim=(n, 1), inputs=[out], device=device, dim_from=count)
+
+    with test.assertRaises(RuntimeError):
+        wp.launch(mark_threads, dim=n, inputs=[out], device=device, dim_from=wp.zeros(1, dtype=float, device=device))
+
+
 def register(parent):
     devices = get_test_devices()
 
@@ -322,6 +477,11 @@ def register(parent):
     add_function_test(TestLaunch, "test_launch_cmd_set_ctype", test_launch_cmd_set_ctype, devices=devices)
     add_function_test(TestLaunch, "test_launch_cmd_set_dim", test_launch_cmd_set_dim, devices=devices)
     add_function_test(TestLaunch, "test_launch_cmd_empty", test_launch_cmd_empty, devices=devices)
+    add_function_test(TestLaunch, "test_launch_cmd_update", test_launch_cmd_update, devices=devices)
+    add_function_test(TestLaunch, "test_launch_dim_from", test_launch_dim_from, devices=devices)
+
+    add_function_test(TestLaunch, "test_launch_cpu_threads", test_launch_cpu_threads, devices=["cpu"])
+    add_function_test(TestLaunch, "test_launch_cpu_threads_2d", test_launch_cpu_threads_2d, devices=["cpu"])
 
     return TestLaunch
 
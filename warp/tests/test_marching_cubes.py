@@ -39,7 +39,7 @@ def test_marching_cubes(test, device):
 
     radius = dim / 4.0
 
-    wp.launch(make_field, dim=field.shape, inputs=[field, wp.vec3(dim / 2, dim / 2, dim / 2), radius], device="cuda")
+    wp.launch(make_field, dim=field.shape, inputs=[field, wp.vec3(dim / 2, dim / 2, dim / 2), radius], device=device)
 
     iso.surface(field=field, threshold=0.0)
 
@@ -52,13 +52,112 @@ def test_marching_cubes(test, device):
     iso.resize(nx=dim * 2, ny=dim * 2, nz=dim * 2, max_verts=max_verts, max_tris=max_tris)
 
 
+def make_sphere_field(dim, device):
+    field = wp.zeros(shape=(dim, dim, dim), dtype=float, device=device)
+    wp.launch(make_field, dim=field.shape, inputs=[field, wp.vec3(dim / 2, dim / 2, dim / 2), dim / 4.0], device=device)
+
+    return field
+
+
+def test_marching_cubes_welding(test, device):
+    dim = 32
+
+    field = make_sphere_field(dim, device)
+
+    iso = wp.MarchingCubes(nx=dim, ny=dim, nz=dim, max_verts=10**5, max_tris=10**5, device=device)
+
+    # samples exactly on the surface create vertices that no triangle uses, avoid them
+    iso.surface(field=field, threshold=0.25)
+
+    verts = iso.verts.numpy()
+    tris = iso.indices.numpy().reshape(-1, 3)
+
+    test.assertGreater(len(tris), 0)
+
+    # every vertex is shared by the triangles around it
+    assert_np_equal(np.unique(tris), np.arange(len(verts)))
+
+    # the sphere is closed, so every edge is shared by exactly two triangles
+    edges = np.sort(np.concatenate((tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]])), axis=1)
+    _, counts = np.unique(edges, axis=0, return_counts=True)
+    test.assertTrue(np.all(counts == 2))
+
+
+def test_marching_cubes_slabs(test, device):
+    dim = 24
+
+    field = make_sphere_field(dim, device)
+    field_np = field.numpy()
+
+    iso = wp.MarchingCubes(nx=dim, ny=dim, nz=dim, max_verts=10**5, max_tris=10**5, device=device)
+    iso.surface(field=field, threshold=0.0)
+
+    verts = iso.verts.numpy()
+    indices = iso.indices.numpy()
+
+    for slab_size in (1, 2, 5, dim):
+        slabs = (field_np[x : x + slab_size] for x in range(0, dim, slab_size))
+        iso.surface_slabs(slabs, threshold=0.0)
+
+        assert_np_equal(iso.verts.numpy(), verts)
+        assert_np_equal(iso.indices.numpy(), indices)
+
+    # slabs must cover the grid
+    with test.assertRaises(RuntimeError):
+        iso.surface_slabs([field_np[: dim // 2]], threshold=0.0)
+
+
+def test_marching_cubes_max_verts(test, device):
+    dim = 32
+
+    field = make_sphere_field(dim, device)
+
+    iso = wp.MarchingCubes(nx=dim, ny=dim, nz=dim, max_verts=16, max_tris=10**5, device=device)
+    with test.assertRaises(RuntimeError):
+        iso.surface(field=field, threshold=0.0)
+
+    iso.resize(nx=dim, ny=dim, nz=dim, max_verts=10**5, max_tris=16)
+    with test.assertRaises(RuntimeError):
+        iso.surface(field=field, threshold=0.0)
+
+    iso.resize(nx=dim, ny=dim, nz=dim, max_verts=10**5, max_tris=10**5)
+    iso.surface(field=field, threshold=0.0)
+    test.assertGreater(len(iso.indices), 0)
+
+
+def test_marching_cubes_invalid_field(test, device):
+    dim = 16
+
+    field = make_sphere_field(dim, device)
+
+    iso = wp.MarchingCubes(nx=dim, ny=dim, nz=dim + 1, max_verts=10**5, max_tris=10**5, device=device)
+    with test.assertRaisesRegex(RuntimeError, "does not match"):
+        iso.surface(field=field, threshold=0.0)
+
+    iso.resize(nx=dim, ny=dim, nz=dim, max_verts=10**5, max_tris=10**5)
+    with test.assertRaisesRegex(RuntimeError, "float32 array"):
+        iso.surface(field=wp.zeros(dim**3, dtype=wp.float64, device=device), threshold=0.0)
+
+    field_2x = wp.zeros((dim, dim, 2 * dim), dtype=float, device=device)
+    with test.assertRaisesRegex(RuntimeError, "contiguous"):
+        iso.surface(field=field_2x[:, :, ::2], threshold=0.0)
+
+
 def register(parent):
-    devices = ["cuda"]
+    devices = get_test_devices()
 
     class TestMarchingCubes(parent):
         pass
 
     add_function_test(TestMarchingCubes, "test_marching_cubes", test_marching_cubes, devices=devices)
+    add_function_test(TestMarchingCubes, "test_marching_cubes_welding", test_marching_cubes_welding, devices=devices)
+    add_function_test(TestMarchingCubes, "test_marching_cubes_slabs", test_marching_cubes_slabs, devices=["cpu"])
+    add_function_test(
+        TestMarchingCubes, "test_marching_cubes_max_verts", test_marching_cubes_max_verts, devices=devices
+    )
+    add_function_test(
+        TestMarchingCubes, "test_marching_cubes_invalid_field", test_marching_cubes_invalid_field, devices=devices
+    )
 
     return TestMarchingCubes
 
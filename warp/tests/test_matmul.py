@@ -420,25 +420,91 @@ def test_large_batch_count(test, device):
     assert np.array_equal(adj_C_np, C.grad.numpy())
 
 
+def test_cpu_inplace(test, device):
+    rng = np.random.default_rng(42)
+    m = 37
+    n = 70
+    batch_count = 3
+
+    # the larger depth is computed with NumPy's BLAS for float32 and float64
+    for k in (300, 1000):
+        A_np = np.ceil(rng.uniform(low=-4.5, high=3.5, size=(batch_count, m, k)))
+        B_np = np.ceil(rng.uniform(low=-4.5, high=3.5, size=(batch_count, k, n)))
+        C_np = np.ceil(rng.uniform(low=-4.5, high=3.5, size=(batch_count, m, n)))
+        D_np = np.ceil(rng.uniform(low=-4.5, high=3.5, size=(batch_count, m, n)))
+
+        for dtype in (wp.float16, wp.float32, wp.float64):
+            tol = 0.1 if dtype == wp.float16 else 1.0e-5
+
+            A = wp.array3d(A_np, dtype=dtype, device=device)
+            B = wp.array3d(B_np, dtype=dtype, device=device)
+            C = wp.array3d(C_np, dtype=dtype, device=device)
+            D = wp.array3d(D_np, dtype=dtype, device=device)
+
+            # separate C and D
+            wp.batched_matmul(A, B, C, D, alpha=0.5, beta=2.0, device=device)
+            expected = 0.5 * np.matmul(A_np, B_np) + 2.0 * C_np
+            assert_np_equal(D.numpy().astype(np.float64), expected, tol=tol)
+
+            # D is both the C input and the output
+            D = wp.array3d(D_np, dtype=dtype, device=device)
+            wp.batched_matmul(A, B, D, D, alpha=0.5, beta=2.0, device=device)
+            expected = 0.5 * np.matmul(A_np, B_np) + 2.0 * D_np
+            assert_np_equal(D.numpy().astype(np.float64), expected, tol=tol)
+
+            # transposed A with the device given as a string
+            A_t = wp.array2d(A_np[0].T, dtype=dtype, device=device).transpose()
+            D = wp.array2d(D_np[0], dtype=dtype, device=device)
+            wp.matmul(A_t, B[0], D, D, device=str(device))
+            expected = np.matmul(A_np[0], B_np[0])
+            assert_np_equal(D.numpy().astype(np.float64), expected, tol=tol)
+
+
+def test_cpu_f64_precision(test, device):
+    rng = np.random.default_rng(42)
+    A_np = rng.uniform(low=-1.0, high=1.0, size=(2, 23, 41))
+    B_np = rng.uniform(low=-1.0, high=1.0, size=(2, 41, 19))
+    C_np = rng.uniform(low=-1.0, high=1.0, size=(2, 23, 19))
+
+    A = wp.array3d(A_np, dtype=wp.float64, device=device)
+    B = wp.array3d(B_np, dtype=wp.float64, device=device)
+    C = wp.array3d(C_np, dtype=wp.float64, device=device)
+    D = wp.zeros_like(C)
+
+    # scale factors that are not representable in float32
+    wp.batched_matmul(A, B, C, D, alpha=1.7, beta=0.1, device=device)
+    expected = 1.7 * np.matmul(A_np, B_np) + 0.1 * C_np
+    assert_np_equal(D.numpy(), expected, tol=1.0e-12)
+
+    A_t = wp.array2d(A_np[0].T, dtype=wp.float64, device=device).transpose()
+    D = wp.zeros_like(C[0])
+    wp.matmul(A_t, B[0], C[0], D, alpha=0.3, beta=-2.1, device=device)
+    expected = 0.3 * np.matmul(A_np[0], B_np[0]) - 2.1 * C_np[0]
+    assert_np_equal(D.numpy(), expected, tol=1.0e-12)
+
+
 def register(parent):
     devices = [d for d in get_test_devices()]
 
     class TestMatmul(parent):
         pass
 
+    # CUDA devices need CUTLASS, the CPU uses the native host GEMM
+    from warp.context import runtime
+
+    if not runtime.core.is_cutlass_enabled():
+        print("Skipping CUDA matmul tests because CUTLASS is not supported in this build")
+        devices = [d for d in devices if d.is_cpu]
+
     if devices:
-        # check if CUTLASS is available
-        from warp.context import runtime
-
-        if runtime.core.is_cutlass_enabled():
-            # add_function_test(TestMatmul, "test_f16", test_f16, devices=devices)
-            add_function_test(TestMatmul, "test_f32", test_f32, devices=devices)
-            add_function_test(TestMatmul, "test_f64", test_f64, devices=devices)
-            add_function_test(TestMatmul, "test_tape", test_tape, devices=devices)
-            add_function_test(TestMatmul, "test_operator", test_operator, devices=devices)
-            add_function_test(TestMatmul, "test_large_batch_count", test_large_batch_count, devices=devices)
-        else:
-            print("Skipping matmul tests because CUTLASS is not supported in this build")
+        # add_function_test(TestMatmul, "test_f16", test_f16, devices=devices)
+        add_function_test(TestMatmul, "test_f32", test_f32, devices=devices)
+        add_function_test(TestMatmul, "test_f64", test_f64, devices=devices)
+        add_function_test(TestMatmul, "test_tape", test_tape, devices=devices)
+        add_function_test(TestMatmul, "test_operator", test_operator, devices=devices)
+        add_function_test(TestMatmul, "test_large_batch_count", test_large_batch_count, devices=devices)
+        add_function_test(TestMatmul, "test_cpu_inplace", test_cpu_inplace, devices=["cpu"])
+        add_function_test(TestMatmul, "test_cpu_f64_precision", test_cpu_f64_precision, devices=["cpu"])
 
     return TestMatmul
 
@@ -415,17 +415,18 @@ def register(parent):
     class TestMatmul(parent):
         pass
 
+    # CUDA devices need CUTLASS, the CPU uses the native host GEMM
+    from warp.context import runtime
+
+    if not runtime.core.is_cutlass_enabled():
+        print("Skipping CUDA matmul tests because CUTLASS is not supported in this build")
+        devices = [d for d in devices if d.is_cpu]
+
     if devices:
-        # check if CUTLASS is available
-        from warp.context import runtime
-
-        if runtime.core.is_cutlass_enabled():
-            add_function_test(TestMatmul, "test_f32", test_f32, devices=devices)
-            add_function_test(TestMatmul, "test_tape", test_tape, devices=devices)
-            add_function_test(TestMatmul, "test_operator", test_operator, devices=devices)
-            add_function_test(TestMatmul, "test_large_batch_count", test_large_batch_count, devices=devices)
-        else:
-            print("Skipping matmul tests because CUTLASS is not supported in this build")
+        add_function_test(TestMatmul, "test_f32", test_f32, devices=devices)
+        add_function_test(TestMatmul, "test_tape", test_tape, devices=devices)
+        add_function_test(TestMatmul, "test_operator", test_operator, devices=devices)
+        add_function_test(TestMatmul, "test_large_batch_count", test_large_batch_count, devices=devices)
 
     return TestMatmul
 
@@ -5,6 +5,8 @@
 # distribution of this software and related documentation without an express
 # license agreement from NVIDIA CORPORATION is strictly prohibited.
 
+import contextlib
+import io
 import unittest
 
 import numpy as np
@@ -301,6 +303,116 @@ def test_mesh_exceptions(test, device):
         wp.Mesh(points=points, indices=indices)
 
 
+@wp.kernel(enable_backward=False)
+def query_all_kernel(
+    mesh_id: wp.uint64,
+    points: wp.array(dtype=wp.vec3),
+    dirs: wp.array(dtype=wp.vec3),
+    closest_dists: wp.array(dtype=float),
+    furthest_dists: wp.array(dtype=float),
+    signs: wp.array(dtype=float),
+    normal_signs: wp.array(dtype=float),
+    ray_ts: wp.array(dtype=float),
+    aabb_counts: wp.array(dtype=int),
+):
+    tid = wp.tid()
+    p = points[tid]
+
+    sign = float(0.0)
+    face = int(0)
+    u = float(0.0)
+    v = float(0.0)
+
+    if wp.mesh_query_point(mesh_id, p, 1e6, sign, face, u, v):
+        closest_dists[tid] = wp.length(wp.mesh_eval_position(mesh_id, face, u, v) - p)
+        signs[tid] = sign
+
+    if wp.mesh_query_furthest_point_no_sign(mesh_id, p, 0.0, face, u, v):
+        furthest_dists[tid] = wp.length(wp.mesh_eval_position(mesh_id, face, u, v) - p)
+
+    if wp.mesh_query_point_sign_normal(mesh_id, p, 1e6, sign, face, u, v):
+        normal_signs[tid] = sign
+
+    t = float(0.0)
+    normal = wp.vec3()
+    if wp.mesh_query_ray(mesh_id, p, dirs[tid], 1e6, t, u, v, sign, normal, face):
+        ray_ts[tid] = t
+
+    count = int(0)
+    query = wp.mesh_query_aabb(mesh_id, p - wp.vec3(0.2), p + wp.vec3(0.2))
+    for index in query:
+        count += 1
+    aabb_counts[tid] = count
+
+
+def test_mesh_wide_bvh(test, device):
+    rng = np.random.default_rng(123)
+
+    # bumpy closed sphere
+    resolution = 48
+    theta, phi = np.meshgrid(
+        np.linspace(0.0, np.pi, resolution), np.linspace(0.0, 2.0 * np.pi, resolution, endpoint=False)
+    )
+    radius = 1.0 + 0.1 * np.sin(5.0 * theta) * np.cos(3.0 * phi)
+    sphere_points = np.stack(
+        (radius * np.sin(theta) * np.cos(phi), radius * np.sin(theta) * np.sin(phi), radius * np.cos(theta)), axis=-1
+    ).reshape(-1, 3)
+
+    cells = np.arange(resolution * resolution).reshape(resolution, resolution)
+    a = cells[:, :-1]
+    b = cells[:, 1:]
+    c = np.roll(cells, -1, axis=0)[:, 1:]
+    d = np.roll(cells, -1, axis=0)[:, :-1]
+    sphere_indices = np.stack((a, b, c, a, c, d), axis=-1).reshape(-1)
+
+    num_queries = 1000
+    query_points = wp.array(rng.uniform(-1.5, 1.5, size=(num_queries, 3)), dtype=wp.vec3, device=device)
+    query_dirs = wp.array(rng.normal(size=(num_queries, 3)), dtype=wp.vec3, device=device)
+
+    def run_queries(mesh):
+        results = [wp.zeros(num_queries, dtype=float, device=device) for _ in range(5)]
+        results.append(wp.zeros(num_queries, dtype=int, device=device))
+        wp.launch(
+            query_all_kernel, dim=num_queries, inputs=[mesh.id, query_points, query_dirs, *results], device=device
+        )
+        return [r.numpy() for r in results]
+
+    for constructor in ("sah", "median", "lbvh"):
+        points = wp.array(sphere_points, dtype=wp.vec3, device=device)
+        indices = wp.array(sphere_indices, dtype=int, device=device)
+
+        binary_mesh = wp.Mesh(points=points, indices=indices, constructor=constructor)
+        wide_mesh = wp.Mesh(points=points, indices=indices, constructor=constructor, wide_bvh=True)
+
+        for _ in range(2):
+            expected = run_queries(binary_mesh)
+            results = run_queries(wide_mesh)
+
+            for result, expect in zip(results, expected):
+                assert_np_equal(result, expect, tol=1.0e-6)
+
+            # the wide nodes are requantized in place by the refit
+            points.assign(sphere_points * rng.uniform(0.5, 1.5, size=(len(sphere_points), 1)))
+            binary_mesh.refit()
+            wide_mesh.refit()
+
+        # non-finite points release the wide nodes and the queries fall back to the binary nodes
+        nan_points = sphere_points.copy()
+        nan_points[0] = np.nan
+        points.assign(nan_points)
+        with contextlib.redirect_stdout(io.StringIO()) as f:
+            wide_mesh.refit()
+
+        test.assertIn("the wide BVH was released", f.getvalue())
+
+        points.assign(sphere_points)
+        binary_mesh.refit()
+        wide_mesh.refit()
+
+        for result, expect in zip(run_queries(wide_mesh), run_queries(binary_mesh)):
+            assert_np_equal(result, expect, tol=1.0e-6)
+
+
 def register(parent):
     devices = get_test_devices()
 
@@ -310,6 +422,7 @@ def register(parent):
     add_function_test(TestMesh, "test_mesh_read_properties", test_mesh_read_properties, devices=devices)
     add_function_test(TestMesh, "test_mesh_query_point", test_mesh_query_point, devices=devices)
     add_function_test(TestMesh, "test_mesh_query_ray", test_mesh_query_ray, devices=devices)
+    add_function_test(TestMesh, "test_mesh_wide_bvh", test_mesh_wide_bvh, devices=["cpu"])
     add_function_test(TestMesh, "test_mesh_refit_graph", test_mesh_refit_graph, devices=wp.get_cuda_devices())
     add_function_test(TestMesh, "test_mesh_exceptions", test_mesh_exceptions, devices=wp.get_cuda_devices())
     return TestMesh
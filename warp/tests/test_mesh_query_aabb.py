@@ -199,6 +199,45 @@ def test_mesh_query_aabb_count_nonoverlap(test, device):
         test.assertTrue(c == 1)
 
 
+def test_mesh_query_aabb_constructors(test, device):
+    rng = np.random.default_rng(123)
+
+    # random triangle soup, each triangle queries the triangles its bounds overlap
+    num_tris = 1000
+    points = rng.random(size=(num_tris * 3, 3)).astype(np.float32) * 10.0
+    points = np.repeat(points[::3], 3, axis=0) + rng.random(size=(num_tris * 3, 3)).astype(np.float32) * 0.5
+    indices = np.arange(num_tris * 3, dtype=np.int32)
+
+    tri_points = points.reshape(num_tris, 3, 3)
+    tri_lowers = tri_points.min(axis=1)
+    tri_uppers = tri_points.max(axis=1)
+    overlaps = np.all(
+        (tri_lowers[:, None, :] <= tri_uppers[None, :, :]) & (tri_uppers[:, None, :] >= tri_lowers[None, :, :]), axis=2
+    )
+    expected = np.count_nonzero(overlaps, axis=1)
+
+    for constructor in ("sah", "median", "lbvh"):
+        m = wp.Mesh(
+            points=wp.array(points, dtype=wp.vec3, device=device),
+            indices=wp.array(indices, dtype=int, device=device),
+            constructor=constructor,
+        )
+
+        lowers = wp.array(tri_lowers, dtype=wp.vec3, device=device)
+        uppers = wp.array(tri_uppers, dtype=wp.vec3, device=device)
+        counts = wp.empty(n=num_tris, dtype=int, device=device)
+
+        wp.launch(
+            kernel=compute_num_contacts,
+            dim=num_tris,
+            inputs=[lowers, uppers, m.id],
+            outputs=[counts],
+            device=device,
+        )
+
+        assert_np_equal(counts.numpy(), expected)
+
+
 def register(parent):
     devices = get_test_devices()
 
@@ -218,6 +257,12 @@ def register(parent):
         test_mesh_query_aabb_count_nonoverlap,
         devices=devices,
     )
+    add_function_test(
+        TestMeshQueryAABBMethods,
+        "test_mesh_query_aabb_constructors",
+        test_mesh_query_aabb_constructors,
+        devices=devices,
+    )
 
     return TestMeshQueryAABBMethods
 
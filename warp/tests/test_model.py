@@ -105,6 +105,222 @@ def register(parent):
             assert_np_equal(np.array(builder1.edge_rest_angle), np.array(builder2.edge_rest_angle), tol=1.0e-4)
             assert_np_equal(np.array(builder1.edge_bending_properties), np.array(builder2.edge_bending_properties))
 
+        def test_shape_contact_broadphase(self):
+            def finalize(shape_contact_broadphase):
+                rng = np.random.default_rng(123)
+
+                builder = ModelBuilder()
+                builder.shape_contact_broadphase = shape_contact_broadphase
+                for i in range(200):
+                    body = builder.add_body(origin=wp.transform(rng.random(3) * 4.0, wp.quat_identity()))
+                    if i % 3 == 0:
+                        shape = builder.add_shape_sphere(body, radius=0.1)
+                    elif i % 3 == 1:
+                        shape = builder.add_shape_box(body, hx=0.1, hy=0.1, hz=0.1)
+                    else:
+                        shape = builder.add_shape_capsule(body, radius=0.05, half_height=0.1)
+
+                    # move the shape to a random collision group
+                    group = int(rng.integers(-1, 3))
+                    builder.shape_collision_group_map[-1].remove(shape)
+                    builder.shape_collision_group_map.setdefault(group, []).append(shape)
+                    builder.shape_collision_group[shape] = group
+
+                for i in range(0, 199, 7):
+                    builder.shape_collision_filter_pairs.add((i + 1, i))
+
+                return builder.finalize(device="cpu")
+
+            def contacts(model):
+                wp.sim.collide(model, model.state())
+                count = model.rigid_contact_count.numpy()[0]
+                shape0 = model.rigid_contact_shape0.numpy()[:count]
+                shape1 = model.rigid_contact_shape1.numpy()[:count]
+                point_id = model.rigid_contact_point_id.numpy()[:count]
+                return count, set(zip(shape0, shape1, point_id))
+
+            model = finalize(False)
+            broadphase_model = finalize(True)
+
+            count, points = contacts(model)
+            broadphase_count, broadphase_points = contacts(broadphase_model)
+
+            self.assertGreater(broadphase_model.shape_broadphase_pair_count.numpy()[0], 0)
+            self.assertLess(broadphase_model.shape_contact_pair_count, model.shape_contact_pair_count)
+            self.assertEqual(count, broadphase_count)
+            self.assertEqual(points, broadphase_points)
+
+        def test_soft_contact_culling(self):
+            rng = np.random.default_rng(123)
+
+            builder = ModelBuilder()
+            for i in range(30):
+                for j in range(30):
+                    pos = (i * 0.1, 1.0 + 0.3 * np.sin(i * 0.3), j * 0.1)
+                    builder.add_particle(pos, (0.0, 0.0, 0.0), 1.0, radius=0.02 + 0.01 * ((i + j) % 3))
+
+            for i in range(40):
+                origin = wp.transform(rng.random(3) * (3.0, 2.0, 3.0), wp.quat_rpy(*rng.random(3)))
+                body = builder.add_body(origin=origin)
+                if i % 5 == 0:
+                    builder.add_shape_sphere(body, radius=0.2)
+                elif i % 5 == 1:
+                    builder.add_shape_box(body, hx=0.3, hy=0.1, hz=0.2)
+                elif i % 5 == 2:
+                    builder.add_shape_capsule(body, radius=0.1, half_height=0.3)
+                elif i % 5 == 3:
+                    builder.add_shape_cone(body, radius=0.3, half_height=0.05)
+                else:
+                    builder.add_shape_plane(body=body, width=0.3, length=0.2)
+
+            # infinite planes are tested against all particles
+            builder.add_shape_plane(plane=(0.0, 1.0, 0.0, -0.5), width=0.0, length=0.0)
+
+            # only soft contacts are generated
+            for shape_a in range(builder.shape_count):
+                builder.shape_ground_collision[shape_a] = False
+                for shape_b in range(shape_a):
+                    builder.shape_collision_filter_pairs.add((shape_b, shape_a))
+
+            def contacts(model):
+                wp.sim.collide(model, model.state())
+                count = model.soft_contact_count.numpy()[0]
+                pairs = zip(model.soft_contact_particle.numpy()[:count], model.soft_contact_shape.numpy()[:count])
+                values = np.concatenate(
+                    (
+                        model.soft_contact_body_pos.numpy()[:count],
+                        model.soft_contact_body_vel.numpy()[:count],
+                        model.soft_contact_normal.numpy()[:count],
+                    ),
+                    axis=1,
+                )
+                return dict(zip(pairs, values))
+
+            # differentiable models test all particle-shape pairs
+            model = builder.finalize(device="cpu", requires_grad=True)
+            culled_model = builder.finalize(device="cpu")
+            self.assertIsNone(model.soft_contact_shape_bvh)
+            self.assertIsNotNone(culled_model.soft_contact_shape_bvh)
+
+            points = contacts(model)
+            culled_points = contacts(culled_model)
+
+            self.assertGreater(len(points), 0)
+            self.assertEqual(points.keys(), culled_points.keys())
+            for pair, values in points.items():
+                assert_np_equal(culled_points[pair], values)
+
+        def test_tri_collisions(self):
+            builder = ModelBuilder()
+
+            # two sheets of cloth that are closer than the triangle contact distance
+            for layer in range(2):
+                builder.add_cloth_grid(
+                    pos=(0.0, 1.0 + 0.05 * layer, 0.013 * layer),
+                    rot=wp.quat_from_axis_angle((1.0, 0.0, 0.0), -0.5 * np.pi + 0.1 * layer),
+                    vel=(0.0, 0.0, 0.0),
+                    dim_x=16,
+                    dim_y=16,
+                    cell_x=0.07,
+                    cell_y=0.07,
+                    mass=0.1,
+                )
+
+            def forces(model, enable_tri_collisions=True):
+                model.enable_tri_collisions = enable_tri_collisions
+                state = model.state()
+                state.particle_f.zero_()
+                wp.sim.integrator_euler.compute_forces(model, state, state.particle_f, None, requires_grad=False)
+                return state.particle_f.numpy()
+
+            # differentiable models test all triangle-particle pairs
+            model = builder.finalize(device="cpu", requires_grad=True)
+            bvh_model = builder.finalize(device="cpu")
+            self.assertIsNone(model.tri_collision_bvh)
+            self.assertIsNotNone(bvh_model.tri_collision_bvh)
+
+            f_elastic = forces(model, enable_tri_collisions=False)
+            f = forces(model)
+            f_bvh = forces(bvh_model)
+
+            self.assertGreater(np.abs(f - f_elastic).max(), 1.0)
+            assert_np_equal(f_bvh, f, tol=1.0e-2)
+
+        def test_particle_constraint_coloring(self):
+            builder = ModelBuilder()
+            builder.particle_constraint_coloring = True
+            builder.add_cloth_grid(
+                pos=(0.0, 2.0, 0.0),
+                rot=wp.quat_identity(),
+                vel=(0.0, 0.0, 0.0),
+                dim_x=12,
+                dim_y=12,
+                cell_x=0.1,
+                cell_y=0.1,
+                mass=0.1,
+                fix_left=True,
+                add_springs=True,
+                spring_ke=1.0e3,
+                spring_kd=0.0,
+            )
+            builder.add_soft_grid(
+                pos=(0.0, 0.5, 2.0),
+                rot=wp.quat_identity(),
+                vel=(0.0, 0.0, 0.0),
+                dim_x=4,
+                dim_y=3,
+                dim_z=3,
+                cell_x=0.1,
+                cell_y=0.1,
+                cell_z=0.1,
+                density=100.0,
+                k_mu=1.0e4,
+                k_lambda=1.0e4,
+                k_damp=0.0,
+                fix_left=True,
+            )
+
+            model = builder.finalize(device="cpu")
+
+            springs = model.spring_indices.numpy().reshape(-1, 2)
+            colored = (
+                (springs, model.spring_color_constraints, model.spring_color_offsets),
+                (model.edge_indices.numpy(), model.edge_color_constraints, model.edge_color_offsets),
+                (model.tet_indices.numpy(), model.tet_color_constraints, model.tet_color_offsets),
+            )
+            for indices, constraints, offsets in colored:
+                constraints = constraints.numpy()
+                self.assertGreater(len(offsets), 2)
+                self.assertEqual(offsets[-1], len(indices))
+                self.assertEqual(sorted(constraints), list(range(len(indices))))
+
+                # the constraints of a color do not share particles
+                for c in range(len(offsets) - 1):
+                    particles = indices[constraints[offsets[c] : offsets[c + 1]]].flatten()
+                    particles = particles[particles != -1]
+                    self.assertEqual(len(particles), len(np.unique(particles)))
+
+            def simulate(model):
+                integrator = wp.sim.XPBDIntegrator(iterations=4)
+                state_in = model.state()
+                state_out = model.state()
+                integrator.simulate(model, state_in, state_out, 1.0 / 60.0)
+
+                q = state_out.particle_q.numpy()
+                lengths = np.linalg.norm(q[springs[:, 0]] - q[springs[:, 1]], axis=1)
+                return q, np.abs(lengths / model.spring_rest_length.numpy() - 1.0).max()
+
+            # differentiable models are not colored
+            jacobi_model = builder.finalize(device="cpu", requires_grad=True)
+            self.assertIsNone(jacobi_model.spring_color_constraints)
+
+            q, stretch = simulate(model)
+            jacobi_q, jacobi_stretch = simulate(jacobi_model)
+
+            self.assertTrue(np.isfinite(q).all())
+            self.assertTrue(np.isfinite(jacobi_q).all())
+            self.assertLess(stretch, jacobi_stretch)
+
     return TestModel
 
 
@@ -5,14 +5,23 @@
 # distribution of this software and related documentation without an express
 # license agreement from NVIDIA CORPORATION is strictly prohibited.
 
+import os
 import unittest
 
+import numpy as np
+
 import warp as wp
 from warp.tests.test_base import *
 
 wp.init()
 
 
+@wp.kernel
+def module_lite_arange(x: wp.array(dtype=int)):
+    i = wp.tid()
+    x[i] = i
+
+
 def test_module_lite_load(test, device):
     # Load current module
     wp.load_module()
@@ -24,6 +33,30 @@ def test_module_lite_load(test, device):
     wp.load_module(wp.config, recursive=True)
 
 
+def test_module_lite_load_async(test, device):
+    module = wp.get_module(__name__)
+    module.unload()
+
+    # remove cached object code so that the module is rebuilt
+    _, obj_path, _ = module.get_cpu_build_paths(module.hash_module())
+    if os.path.isfile(obj_path):
+        os.remove(obj_path)
+
+    wp.load_module(device=device, block=False)
+    test.assertIsNotNone(module.cpu_build)
+
+    # the launch waits for the pending build
+    x = wp.zeros(8, dtype=int, device=device)
+    wp.launch(module_lite_arange, dim=8, inputs=[x], device=device)
+    assert_np_equal(x.numpy(), np.arange(8))
+
+    test.assertIsNone(module.cpu_build)
+    test.assertTrue(os.path.isfile(obj_path))
+
+    # already loaded
+    wp.force_load(device=device, modules=[module])
+
+
 def test_module_lite_options(test, device):
     wp.set_module_options({"max_unroll": 8})
     module_options = wp.get_module_options()
@@ -38,6 +71,7 @@ def register(parent):
         pass
 
     add_function_test(TestModuleLite, "test_module_lite_load", test_module_lite_load, devices=devices)
+    add_function_test(TestModuleLite, "test_module_lite_load_async", test_module_lite_load_async, devices=["cpu"])
     add_function_test(TestModuleLite, "test_module_lite_get_options", test_module_lite_options, devices=devices)
 
     return TestModuleLite
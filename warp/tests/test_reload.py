@@ -128,6 +128,43 @@ def test_reload(test, device):
     test_square.run(expect=16.0, device=device)  # 4*4 = 16
 
 
+square_value = """import warp as wp
+
+wp.init()
+
+
+@wp.func
+def power(x: float):
+    return {}
+
+
+@wp.kernel
+def kern(out: wp.array(dtype=float)):
+    out[0] = power(2.0)
+
+
+def value(device):
+    out = wp.zeros(1, dtype=float, device=device)
+    wp.launch(kern, dim=1, inputs=[out], device=device)
+    return out.numpy()[0]
+"""
+
+
+def test_reload_func_body(test, device):
+    path = os.path.abspath(os.path.join(os.path.dirname(__file__), "test_square.py"))
+
+    with open(path, "w") as f:
+        f.writelines(square_value.format("x * x"))
+    importlib.reload(test_square)
+    test.assertEqual(test_square.value(device), 4.0)
+
+    # only the body of the function changes, the kernel cache must not return the previous binary
+    with open(path, "w") as f:
+        f.writelines(square_value.format("x * x * x"))
+    importlib.reload(test_square)
+    test.assertEqual(test_square.value(device), 8.0)
+
+
 def test_reload_class(test, device):
     def test_func():
         import warp.tests.test_class_kernel
@@ -186,6 +223,7 @@ def test_reload_references(test, device):
     importlib.reload(test_reference_reference)
 
     test_dependent.run(expect=1.0, device=device)  # 1 * 1 = 1
+    test.assertEqual(test_dependent.value(device), 1.0)
 
     # rewrite and reload the first dependency module
     with open(path_ref, "w") as f:
@@ -193,6 +231,7 @@ def test_reload_references(test, device):
     importlib.reload(test_reference)
 
     test_dependent.run(expect=2.0, device=device)  # 2 * 1 = 1
+    test.assertEqual(test_dependent.value(device), 2.0)
 
     # rewrite and reload the second dependency module
     with open(path_refref, "w") as f:
@@ -200,6 +239,7 @@ def test_reload_references(test, device):
     importlib.reload(test_reference_reference)
 
     test_dependent.run(expect=4.0, device=device)  # 2 * 2 = 4
+    test.assertEqual(test_dependent.value(device), 4.0)
 
 
 def register(parent):
@@ -210,6 +250,7 @@ def register(parent):
 
     add_function_test(TestReload, "test_redefine", test_redefine, devices=devices)
     add_function_test(TestReload, "test_reload", test_reload, devices=devices)
+    add_function_test(TestReload, "test_reload_func_body", test_reload_func_body, devices=devices)
     add_function_test(TestReload, "test_reload_class", test_reload_class, devices=devices)
     add_function_test(TestReload, "test_reload_references", test_reload_references, devices=devices)
 
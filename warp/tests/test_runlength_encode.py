@@ -29,6 +29,50 @@ def test_runlength_encode_int(test, device, n):
     assert_np_equal(unique_counts.numpy()[:run_count], unique_counts_np[:run_count])
 
 
+def test_runlength_encode_types(test, device):
+    rng = np.random.default_rng(123)
+
+    # long runs that span several blocks on the CPU
+    n = 100000
+    run_starts = np.sort(rng.choice(np.arange(1, n), size=20, replace=False))
+
+    for dtype in (wp.int32, wp.uint32, wp.int64, wp.uint64, wp.float32, wp.float64):
+        np_type = wp.types.warp_type_to_np_dtype[dtype]
+
+        values_np = np.zeros(n, dtype=np_type)
+        for i, start in enumerate(run_starts):
+            values_np[start:] = (i + 1) % 3
+
+        expected_lengths = np.diff(np.concatenate(([0], run_starts, [n])))
+
+        values = wp.array(values_np, dtype=dtype, device=device)
+        run_values = wp.empty_like(values)
+        run_lengths = wp.empty(n, dtype=int, device=device)
+
+        run_count = runlength_encode(values, run_values, run_lengths)
+
+        test.assertEqual(run_count, len(run_starts) + 1)
+        assert_np_equal(run_lengths.numpy()[:run_count], expected_lengths)
+        assert_np_equal(run_values.numpy()[:run_count], values_np[np.concatenate(([0], run_starts))])
+
+
+def test_runlength_encode_vector(test, device):
+    values_np = np.zeros((50000, 2), dtype=np.float32)
+    values_np[10000:, 0] = 1.0
+    values_np[20000:, 1] = 1.0
+    values_np[20001:, 0] = 2.0
+
+    values = wp.array(values_np, dtype=wp.vec2, device=device)
+    run_values = wp.empty_like(values)
+    run_lengths = wp.empty(values.size, dtype=int, device=device)
+
+    run_count = runlength_encode(values, run_values, run_lengths)
+
+    test.assertEqual(run_count, 4)
+    assert_np_equal(run_lengths.numpy()[:run_count], np.array((10000, 10000, 1, 29999)))
+    assert_np_equal(run_values.numpy()[:run_count], np.array(((0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (2.0, 1.0))))
+
+
 def test_runlength_encode_error_devices_mismatch(test, device):
     values = wp.zeros(123, dtype=int, device="cpu")
     run_values = wp.empty_like(values, device="cuda:0")
@@ -125,8 +169,8 @@ def test_runlength_encode_error_run_count_unsupported_dtype(test, device):
 
 
 def test_runlength_encode_error_unsupported_dtype(test, device):
-    values = wp.zeros(123, dtype=float, device=device)
-    run_values = wp.empty(123, dtype=float, device=device)
+    values = wp.zeros(123, dtype=wp.float16, device=device)
+    run_values = wp.empty(123, dtype=wp.float16, device=device)
     run_lengths = wp.empty(123, dtype=int, device=device)
     with test.assertRaisesRegex(
         RuntimeError,
@@ -147,6 +191,10 @@ def register(parent):
     add_function_test(
         TestRunlengthEncode, "test_runlength_encode_empty", partial(test_runlength_encode_int, n=0), devices=devices
     )
+    add_function_test(TestRunlengthEncode, "test_runlength_encode_types", test_runlength_encode_types, devices=devices)
+    add_function_test(
+        TestRunlengthEncode, "test_runlength_encode_vector", test_runlength_encode_vector, devices=["cpu"]
+    )
     add_function_test(
         TestRunlengthEncode,
         "test_runlength_encode_error_devices_mismatch",
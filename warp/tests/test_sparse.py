@@ -256,6 +256,28 @@ def make_test_bsr_axpy(block_shape, scalar_type):
             res = _bsr_to_dense(y)
             assert_np_equal(res, ref, 0.0001)
 
+        # test reusing the sum topology with new values
+        with test.assertRaisesRegex(ValueError, "Reusing the sum topology"):
+            bsr_axpy(x, y, work_arrays=bsr_axpy_work_arrays(), reuse_topology=True)
+
+        bsr_axpy(x, y, alpha=1.0, beta=1.0, work_arrays=work_arrays)
+        for alpha, beta in zip(alphas, betas):
+            bsr_scale(x, 0.5)
+            ref = alpha * _bsr_to_dense(x) + beta * _bsr_to_dense(y)
+            nnz = y.nnz
+            bsr_axpy(x, y, alpha, beta, work_arrays=work_arrays, reuse_topology=True)
+
+            test.assertEqual(y.nnz, nnz)
+            res = _bsr_to_dense(y)
+            assert_np_equal(res, ref, 0.0001)
+
+        if device.is_cpu:
+            # the structures are compared on the CPU, not only the numbers of blocks
+            x_moved = bsr_copy(x)
+            x_moved.columns.numpy()[0] = (x_moved.columns.numpy()[0] + 1) % ncol
+            with test.assertRaisesRegex(ValueError, "Reusing the sum topology"):
+                bsr_axpy(x_moved, y, work_arrays=work_arrays, reuse_topology=True)
+
         # test aliasing
         ref = 3.0 * _bsr_to_dense(y)
         bsr_axpy(y, y, alpha=1.0, beta=2.0)
@@ -324,6 +346,27 @@ def make_test_bsr_mm(block_shape, scalar_type):
             res = _bsr_to_dense(z)
             assert_np_equal(res, ref, 0.0001)
 
+        # test reusing the product topology with new values
+        with test.assertRaisesRegex(ValueError, "Reusing the product topology"):
+            bsr_mm(x, y, z, work_arrays=bsr_mm_work_arrays(), reuse_topology=True)
+
+        for alpha, beta in zip(alphas, betas):
+            bsr_scale(x, 0.5)
+            ref = alpha * (_bsr_to_dense(x) @ _bsr_to_dense(y)) + beta * _bsr_to_dense(z)
+            nnz = z.nnz
+            bsr_mm(x, y, z, alpha, beta, work_arrays=work_arrays, reuse_topology=True)
+
+            test.assertEqual(z.nnz, nnz)
+            res = _bsr_to_dense(z)
+            assert_np_equal(res, ref, 0.0001)
+
+        if device.is_cpu:
+            # the structures are compared on the CPU, not only the numbers of blocks
+            y_moved = bsr_copy(y)
+            y_moved.columns.numpy()[0] = (y_moved.columns.numpy()[0] + 1) % y_ncol
+            with test.assertRaisesRegex(ValueError, "Reusing the product topology"):
+                bsr_mm(x, y_moved, z, work_arrays=work_arrays, reuse_topology=True)
+
         # test aliasing of matrix arguments
         # x = alpha * z * x + beta * x
         alpha, beta = alphas[0], betas[0]
@@ -419,6 +462,45 @@ def make_test_bsr_mv(block_shape, scalar_type):
     return test_bsr_mv
 
 
+def test_bsr_large_cpu(test, device):
+    # Enough blocks for the host triplet, transpose and product functions to split the work over several tasks
+    rng = np.random.default_rng(123)
+
+    shape = (600, 600)
+    n = 60000
+
+    rows_np = rng.integers(0, high=shape[0], size=n, dtype=int)
+    cols_np = rng.integers(0, high=shape[1], size=n, dtype=int)
+    vals_np = rng.random(size=n)
+    vals_np[::7] = 0.0
+
+    ref = np.zeros(shape)
+    np.add.at(ref, (rows_np, cols_np), vals_np)
+
+    rows = wp.array(rows_np, dtype=int, device=device)
+    cols = wp.array(cols_np, dtype=int, device=device)
+    vals = wp.array(vals_np, dtype=wp.float64, device=device)
+
+    csr = bsr_zeros(shape[0], shape[1], wp.float64, device=device)
+    bsr_set_from_triplets(csr, rows, cols, vals)
+
+    kept = vals_np != 0.0
+    test.assertEqual(csr.nnz, len(np.unique(rows_np[kept] * shape[1] + cols_np[kept])))
+    assert_np_equal(_bsr_to_dense(csr), ref, 0.0001)
+
+    csr_t = bsr_transposed(csr)
+    assert_np_equal(_bsr_to_dense(csr_t), ref.T, 0.0001)
+
+    csr_t_offsets = csr_t.offsets.numpy()
+    csr_t_columns = csr_t.columns.numpy()
+    for row in range(csr_t.nrow):
+        test.assertTrue(np.all(np.diff(csr_t_columns[csr_t_offsets[row] : csr_t_offsets[row + 1]]) > 0))
+
+    prod = bsr_copy(csr)
+    bsr_mm(csr, csr_t, prod, alpha=2.0, beta=0.5)
+    assert_np_equal(_bsr_to_dense(prod), 2.0 * ref @ ref.T + 0.5 * ref, 0.0001)
+
+
 def register(parent):
     devices = get_test_devices()
 
@@ -450,6 +532,8 @@ def register(parent):
     add_function_test(TestSparse, "test_bsr_mv_1_3", make_test_bsr_mv((1, 3), wp.float32), devices=devices)
     add_function_test(TestSparse, "test_bsr_mv_3_3", make_test_bsr_mv((3, 3), wp.float64), devices=devices)
 
+    add_function_test(TestSparse, "test_bsr_large_cpu", test_bsr_large_cpu, devices=["cpu"])
+
     return TestSparse
 
 
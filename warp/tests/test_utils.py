@@ -101,9 +101,66 @@ def test_array_scan_error_dtypes_mismatch(test, device):
         wp.utils.array_scan(values, result, True)
 
 
+def test_array_scan_types(test, device):
+    rng = np.random.default_rng(123)
+
+    # large enough to be split into several blocks on the CPU
+    n = 100000
+
+    for dtype in (wp.int32, wp.uint32, wp.int64, wp.uint64, wp.float32, wp.float64):
+        np_type = wp.types.warp_type_to_np_dtype[dtype]
+
+        if dtype in (wp.float32, wp.float64):
+            values_np = rng.uniform(low=0.0, high=1.0, size=n).astype(np_type)
+        else:
+            values_np = rng.integers(0, high=100, size=n).astype(np_type)
+
+        expected = np.cumsum(values_np, dtype=np.float64 if dtype in (wp.float32, wp.float64) else np_type)
+
+        values = wp.array(values_np, dtype=dtype, device=device)
+        result_inc = wp.zeros_like(values)
+        result_exc = wp.zeros_like(values)
+
+        wp.utils.array_scan(values, result_inc, True)
+        wp.utils.array_scan(values, result_exc, False)
+
+        if dtype in (wp.float32, wp.float64):
+            assert_np_equal(result_inc.numpy(), expected, tol=1.0e-4 * expected[-1])
+            assert_np_equal(result_exc.numpy()[1:], expected[:-1], tol=1.0e-4 * expected[-1])
+        else:
+            assert_np_equal(result_inc.numpy(), expected)
+            assert_np_equal(result_exc.numpy()[1:], expected[:-1])
+
+        test.assertEqual(result_exc.numpy()[0], 0)
+
+        # in place
+        wp.utils.array_scan(result_inc, result_inc, False)
+        wp.utils.array_scan(values, result_exc, True)
+        wp.utils.array_scan(values, values, True)
+        assert_np_equal(values.numpy(), result_exc.numpy())
+
+
+def test_array_scan_vector(test, device):
+    rng = np.random.default_rng(123)
+
+    values_np = rng.integers(-100, high=100, size=(100000, 3)).astype(np.float64)
+    expected = np.cumsum(values_np, axis=0)
+
+    values = wp.array(values_np, dtype=wp.vec3d, device=device)
+    result_inc = wp.zeros_like(values)
+    result_exc = wp.zeros_like(values)
+
+    wp.utils.array_scan(values, result_inc, True)
+    wp.utils.array_scan(values, result_exc, False)
+
+    assert_np_equal(result_inc.numpy(), expected)
+    assert_np_equal(result_exc.numpy()[1:], expected[:-1])
+    assert_np_equal(result_exc.numpy()[0], np.zeros(3))
+
+
 def test_array_scan_error_unsupported_dtype(test, device):
-    values = wp.zeros(123, dtype=wp.vec3, device=device)
-    result = wp.zeros(123, dtype=wp.vec3, device=device)
+    values = wp.zeros(123, dtype=wp.float16, device=device)
+    result = wp.zeros(123, dtype=wp.float16, device=device)
     with test.assertRaisesRegex(
         RuntimeError,
         r"Unsupported data type$",
@@ -155,6 +212,103 @@ def test_radix_sort_pairs_error_unsupported_dtype(test, device):
         wp.utils.radix_sort_pairs(keys, values, 1)
 
 
+def test_radix_sort_pairs_key_types(test, device):
+    rng = np.random.default_rng(123)
+
+    # large enough to be sorted in several blocks on the CPU
+    n = 100000
+
+    key_values = {
+        wp.int32: rng.integers(-(2**31), 2**31 - 1, size=n, dtype=np.int32),
+        wp.uint32: rng.integers(0, 2**32 - 1, size=n, dtype=np.uint32),
+        wp.int64: rng.integers(-(2**63), 2**63 - 1, size=n, dtype=np.int64),
+        wp.uint64: rng.integers(0, 2**64 - 1, size=n, dtype=np.uint64),
+        wp.float32: rng.normal(scale=1.0e3, size=n).astype(np.float32),
+    }
+
+    for dtype, keys_np in key_values.items():
+        # repeat keys to check that the sort is stable
+        keys_np[n // 2 :] = keys_np[: n // 2]
+
+        keys = wp.array(np.concatenate((keys_np, keys_np)), dtype=dtype, device=device)
+        values = wp.array(np.arange(2 * n, dtype=np.int32), dtype=int, device=device)
+
+        wp.utils.radix_sort_pairs(keys, values, n)
+
+        order = np.argsort(keys_np, kind="stable")
+        assert_np_equal(keys.numpy()[:n], keys_np[order])
+        assert_np_equal(values.numpy()[:n], order.astype(np.int32))
+
+
+def test_radix_sort_pairs_bit_range(test, device):
+    rng = np.random.default_rng(123)
+
+    n = 50000
+    keys_np = rng.integers(0, 1 << 20, size=n, dtype=np.int32)
+
+    keys = wp.array(np.concatenate((keys_np, keys_np)), dtype=int, device=device)
+    values = wp.array(np.arange(2 * n, dtype=np.int32), dtype=int, device=device)
+
+    # only the low 12 bits are sorted
+    wp.utils.radix_sort_pairs(keys, values, n, end_bit=12)
+
+    order = np.argsort(keys_np & 0xFFF, kind="stable")
+    assert_np_equal(keys.numpy()[:n], keys_np[order])
+    assert_np_equal(values.numpy()[:n], order.astype(np.int32))
+
+    with test.assertRaisesRegex(RuntimeError, r"Invalid bit range \[0, 40\) for keys of 32 bits$"):
+        wp.utils.radix_sort_pairs(keys, values, n, end_bit=40)
+
+
+def test_segmented_sort_pairs(test, device):
+    rng = np.random.default_rng(123)
+
+    # segments of various sizes, including empty segments and segments sorted by insertion
+    segment_sizes = np.array((0, 1, 7, 33, 1000, 0, 5000, 2), dtype=np.int32)
+    segment_starts = np.concatenate(((0,), np.cumsum(segment_sizes))).astype(np.int32)
+    n = int(segment_starts[-1])
+
+    keys_np = rng.integers(0, 100, size=n).astype(np.float32)
+
+    for use_end_indices in (False, True):
+        keys = wp.array(np.concatenate((keys_np, keys_np)), dtype=float, device=device)
+        values = wp.array(np.arange(2 * n, dtype=np.int32), dtype=int, device=device)
+
+        if use_end_indices:
+            start_indices = wp.array(segment_starts[:-1], dtype=int, device=device)
+            end_indices = wp.array(segment_starts[1:], dtype=int, device=device)
+        else:
+            start_indices = wp.array(segment_starts, dtype=int, device=device)
+            end_indices = None
+
+        wp.utils.segmented_sort_pairs(keys, values, n, start_indices, end_indices)
+
+        keys_result = keys.numpy()[:n]
+        values_result = values.numpy()[:n]
+
+        for start, end in zip(segment_starts[:-1], segment_starts[1:]):
+            order = start + np.argsort(keys_np[start:end], kind="stable")
+            assert_np_equal(keys_result[start:end], keys_np[order])
+            assert_np_equal(values_result[start:end], order.astype(np.int32))
+
+    # the segments of CPU arrays are checked before sorting
+    if device.is_cpu:
+        invalid_segments = (
+            ((-1, 5), (5, 10), r"0 <= start <= end <= count"),
+            ((0, 5), (5, n + 1), r"0 <= start <= end <= count"),
+            ((0, 6), (5, 5), r"0 <= start <= end <= count"),
+            ((0, 4), (5, 10), r"Segments must not overlap"),
+            ((4, 0), (10, 5), r"Segments must not overlap"),
+        )
+
+        for starts, ends, message in invalid_segments:
+            start_indices = wp.array(starts, dtype=int, device=device)
+            end_indices = wp.array(ends, dtype=int, device=device)
+
+            with test.assertRaisesRegex(RuntimeError, message):
+                wp.utils.segmented_sort_pairs(keys, values, n, start_indices, end_indices)
+
+
 def test_array_sum(test, device):
     for dtype in (wp.float32, wp.float64):
         values = wp.array((1.0, 2.0, 3.0), dtype=dtype, device=device)
@@ -166,6 +320,25 @@ def test_array_sum(test, device):
         test.assertEqual(result.numpy()[0], 6.0)
 
 
+def test_array_sum_large(test, device):
+    rng = np.random.default_rng(123)
+
+    # large enough to be split into several blocks on the CPU
+    values_np = rng.uniform(low=-1.0, high=1.0, size=(100003, 3))
+
+    for dtype, vec_type in ((wp.float32, wp.vec3f), (wp.float64, wp.vec3d)):
+        values = wp.array(values_np[:, 0], dtype=dtype, device=device)
+        test.assertAlmostEqual(wp.utils.array_sum(values), np.sum(values_np[:, 0]), places=2)
+
+        values = wp.array(values_np, dtype=vec_type, device=device)
+        assert_np_equal(np.array(wp.utils.array_sum(values)), np.sum(values_np, axis=0), tol=1.0e-2)
+
+        test.assertAlmostEqual(wp.utils.array_inner(values, values), np.sum(values_np * values_np), places=0)
+
+        # results are reproducible
+        test.assertEqual(wp.utils.array_inner(values, values), wp.utils.array_inner(values, values))
+
+
 def test_array_sum_error_out_device_mismatch(test, device):
     values = wp.array((1.0, 2.0, 3.0), dtype=wp.float32, device="cpu")
     result = wp.empty(shape=(1,), dtype=wp.float32, device="cuda:0")
@@ -197,7 +370,7 @@ def test_array_sum_error_out_shape_mismatch(test, device):
 
 
 def test_array_sum_error_unsupported_dtype(test, device):
-    values = wp.array((1, 2, 3), dtype=int, device=device)
+    values = wp.zeros(123, dtype=wp.float16, device=device)
     with test.assertRaisesRegex(
         RuntimeError,
         r"Unsupported data type$",
@@ -282,8 +455,8 @@ def test_array_inner_error_out_shape_mismatch(test, device):
 
 
 def test_array_inner_error_unsupported_dtype(test, device):
-    a = wp.array((1, 2, 3), dtype=int, device=device)
-    b = wp.array((1, 2, 3), dtype=int, device=device)
+    a = wp.zeros(123, dtype=wp.float16, device=device)
+    b = wp.zeros(123, dtype=wp.float16, device=device)
     with test.assertRaisesRegex(
         RuntimeError,
         r"Unsupported data type$",
@@ -399,6 +572,8 @@ def register(parent):
     add_function_test(TestUtils, "test_array_scan_error_devices_mismatch", test_array_scan_error_devices_mismatch)
     add_function_test(TestUtils, "test_array_scan_error_sizes_mismatch", test_array_scan_error_sizes_mismatch)
     add_function_test(TestUtils, "test_array_scan_error_dtypes_mismatch", test_array_scan_error_dtypes_mismatch)
+    add_function_test(TestUtils, "test_array_scan_types", test_array_scan_types, devices=devices)
+    add_function_test(TestUtils, "test_array_scan_vector", test_array_scan_vector, devices=["cpu"])
     add_function_test(
         TestUtils, "test_array_scan_error_unsupported_dtype", test_array_scan_error_unsupported_dtype, devices=devices
     )
@@ -416,7 +591,11 @@ def register(parent):
         test_radix_sort_pairs_error_unsupported_dtype,
         devices=devices,
     )
+    add_function_test(TestUtils, "test_radix_sort_pairs_key_types", test_radix_sort_pairs_key_types, devices=devices)
+    add_function_test(TestUtils, "test_radix_sort_pairs_bit_range", test_radix_sort_pairs_bit_range, devices=devices)
+    add_function_test(TestUtils, "test_segmented_sort_pairs", test_segmented_sort_pairs, devices=devices)
     add_function_test(TestUtils, "test_array_sum", test_array_sum, devices=devices)
+    add_function_test(TestUtils, "test_array_sum_large", test_array_sum_large, devices=devices)
     add_function_test(TestUtils, "test_array_sum_error_out_device_mismatch", test_array_sum_error_out_device_mismatch)
     add_function_test(TestUtils, "test_array_sum_error_out_dtype_mismatch", test_array_sum_error_out_dtype_mismatch)
     add_function_test(TestUtils, "test_array_sum_error_out_shape_mismatch", test_array_sum_error_out_shape_mismatch)
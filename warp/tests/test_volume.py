@@ -16,6 +16,14 @@ wp.init()
 
 
 # float volume tests
+@wp.kernel
+def test_volume_lookup_voxels_f(volume: wp.uint64, voxels: wp.array(dtype=wp.vec3i), values: wp.array(dtype=float)):
+    tid = wp.tid()
+
+    v = voxels[tid]
+    values[tid] = wp.volume_lookup_f(volume, v[0], v[1], v[2])
+
+
 @wp.kernel
 def test_volume_lookup_f(volume: wp.uint64, points: wp.array(dtype=wp.vec3)):
     tid = wp.tid()
@@ -560,9 +568,6 @@ def register(parent):
             points_np = np.append(point_grid, [[8096, 8096, 8096]], axis=0)
             values_ref = np.append(np.array([x + 100 * y + 10000 * z for x, y, z in point_grid]), bg_value)
             for device in devices:
-                if device.is_cpu:
-                    continue
-
                 volume = wp.Volume.allocate(
                     min=[-11, -11, -11], max=[11, 11, 11], voxel_size=0.1, bg_value=bg_value, device=device
                 )
@@ -578,9 +583,6 @@ def register(parent):
             points_np = np.append(point_grid, [[8096, 8096, 8096]], axis=0)
             values_ref = np.append(point_grid, [bg_value], axis=0)
             for device in devices:
-                if device.is_cpu:
-                    continue
-
                 volume = wp.Volume.allocate(
                     min=[-11, -11, -11], max=[11, 11, 11], voxel_size=0.1, bg_value=bg_value, device=device
                 )
@@ -598,9 +600,6 @@ def register(parent):
                 np.array([x + 100 * y + 10000 * z for x, y, z in point_grid], dtype=np.int32), bg_value
             )
             for device in devices:
-                if device.is_cpu:
-                    continue
-
                 volume = wp.Volume.allocate(
                     min=[-11, -11, -11], max=[11, 11, 11], voxel_size=0.1, bg_value=bg_value, device=device
                 )
@@ -623,22 +622,27 @@ def register(parent):
                     np.testing.assert_equal([0.25] * 3, voxel_size)
 
         def test_volume_from_numpy(self):
-            # Volume.allocate_from_tiles() is only available with CUDA
-            if wp.is_cuda_available():
-                mins = np.array([-3.0, -3.0, -3.0])
-                voxel_size = 0.2
-                maxs = np.array([3.0, 3.0, 3.0])
-                nums = np.ceil((maxs - mins) / (voxel_size)).astype(dtype=int)
-                center = np.array([0.0, 0.0, 0.0])
-                rad = 2.5
-                sphere_sdf_np = np.zeros(tuple(nums))
-                for x in range(nums[0]):
-                    for y in range(nums[1]):
-                        for z in range(nums[2]):
-                            pos = mins + voxel_size * np.array([x, y, z])
-                            dis = np.linalg.norm(pos - center)
-                            sphere_sdf_np[x, y, z] = dis - rad
-                sphere_vdb = wp.Volume.load_from_numpy(sphere_sdf_np, mins, voxel_size, rad + 3.0 * voxel_size)
+            mins = np.array([-3.0, -3.0, -3.0])
+            voxel_size = 0.2
+            maxs = np.array([3.0, 3.0, 3.0])
+            nums = np.ceil((maxs - mins) / (voxel_size)).astype(dtype=int)
+            center = np.array([0.0, 0.0, 0.0])
+            rad = 2.5
+            sphere_sdf_np = np.zeros(tuple(nums))
+            for x in range(nums[0]):
+                for y in range(nums[1]):
+                    for z in range(nums[2]):
+                        pos = mins + voxel_size * np.array([x, y, z])
+                        dis = np.linalg.norm(pos - center)
+                        sphere_sdf_np[x, y, z] = dis - rad
+
+            voxels_np = np.array([[0, 0, 0], [15, 15, 15], [29, 3, 17], [40, 40, 40]], dtype=np.int32)
+            expected = np.append(sphere_sdf_np[tuple(voxels_np[:3].T)], rad + 3.0 * voxel_size).astype(np.float32)
+
+            for device in devices:
+                sphere_vdb = wp.Volume.load_from_numpy(
+                    sphere_sdf_np, mins, voxel_size, rad + 3.0 * voxel_size, device=device
+                )
 
                 self.assertNotEqual(sphere_vdb.id, 0)
 
@@ -646,6 +650,17 @@ def register(parent):
                 self.assertEqual(sphere_vdb_array.dtype, wp.uint8)
                 self.assertFalse(sphere_vdb_array.owner)
 
+                voxels = wp.array(voxels_np, dtype=wp.vec3i, device=device)
+                values = wp.zeros(len(voxels_np), dtype=float, device=device)
+                wp.launch(
+                    test_volume_lookup_voxels_f,
+                    dim=len(voxels_np),
+                    inputs=[sphere_vdb.id, voxels, values],
+                    device=device,
+                )
+
+                assert_np_equal(values.numpy(), expected, tol=1.0e-6)
+
     for device in devices:
         points_jittered_np = point_grid + rng.uniform(-0.5, 0.5, size=point_grid.shape)
         points[device.alias] = wp.array(point_grid, dtype=wp.vec3, device=device)
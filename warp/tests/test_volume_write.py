@@ -157,9 +157,6 @@ def register(parent):
             num_points = len(points_ref)
             bb_max = np.array([11, 11, 11])
             for device in devices:
-                if device.is_cpu:
-                    continue
-
                 volume_a = wp.Volume.allocate(
                     -bb_max,
                     bb_max,
@@ -207,9 +204,6 @@ def register(parent):
                             values_ref[t * 512 + i * 64 + j * 8 + k] = float(100 * (ti + i) + 10 * (tj + j) + (tk + k))
 
             for device in devices:
-                if device.is_cpu:
-                    continue
-
                 points_is_d = wp.array(points_is, dtype=wp.int32, device=device)
                 points_ws_d = wp.array(points_ws, dtype=wp.vec3, device=device)
                 volume_a = wp.Volume.allocate_by_tiles(
@@ -253,9 +247,6 @@ def register(parent):
                             values_ref[t * 512 + i * 64 + j * 8 + k] = [ti + i, tj + j, tk + k]
 
             for device in devices:
-                if device.is_cpu:
-                    continue
-
                 points_d = wp.array(points_is, dtype=wp.int32, device=device)
                 volume = wp.Volume.allocate_by_tiles(points_d, 0.1, wp.vec3(1, 2, 3), device=device)
                 values = wp.empty(len(points_d) * 512, dtype=wp.vec3, device=device)
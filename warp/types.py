@@ -9,7 +9,6 @@ from __future__ import annotations
 
 import builtins
 import ctypes
-import hashlib
 import inspect
 import struct
 import zlib
@@ -38,10 +37,6 @@ Array = Generic[DType]
 
 T = TypeVar("T")
 
-# shared hash for all constants
-_constant_hash = hashlib.sha256()
-
-
 def constant(x):
     """Function to declare compile-time constants accessible from Warp kernels
 
@@ -49,31 +44,33 @@ def constant(x):
         x: Compile-time constant value, can be any of the built-in math types.
     """
 
-    global _constant_hash
+    # validate the constant type
+    get_constant_bytes(x)
+
+    return x
+
+
+def get_constant_bytes(x):
+    """Returns the binary representation of a compile-time constant value, used to hash the kernels referencing it."""
 
-    # hash the constant value
     if isinstance(x, builtins.bool):
         # This needs to come before the check for `int` since all boolean
         # values are also instances of `int`.
-        _constant_hash.update(struct.pack("?", x))
+        return struct.pack("?", x)
     elif isinstance(x, int):
-        _constant_hash.update(struct.pack("<q", x))
+        return struct.pack("<q", x)
     elif isinstance(x, float):
-        _constant_hash.update(struct.pack("<d", x))
+        return struct.pack("<d", x)
     elif isinstance(x, float16):
         # float16 is a special case
-        p = ctypes.pointer(ctypes.c_float(x.value))
-        _constant_hash.update(p.contents)
+        return bytes(ctypes.c_float(x.value))
     elif isinstance(x, tuple(scalar_types)):
-        p = ctypes.pointer(x._type_(x.value))
-        _constant_hash.update(p.contents)
+        return bytes(x._type_(x.value))
     elif isinstance(x, ctypes.Array):
-        _constant_hash.update(bytes(x))
+        return bytes(x)
     else:
         raise RuntimeError(f"Invalid constant type: {type(x)}")
 
-    return x
-
 
 def float_to_half_bits(value):
     return warp.context.runtime.core.float_to_half_bits(value)
@@ -939,7 +936,12 @@ ARRAY_TYPE_FABRIC_INDEXED = 3
 
 # represents bounds for kernel launch (number of threads across multiple dimensions)
 class launch_bounds_t(ctypes.Structure):
-    _fields_ = [("shape", ctypes.c_int32 * LAUNCH_MAX_DIMS), ("ndim", ctypes.c_int32), ("size", ctypes.c_size_t)]
+    _fields_ = [
+        ("shape", ctypes.c_int32 * LAUNCH_MAX_DIMS),
+        ("ndim", ctypes.c_int32),
+        ("size", ctypes.c_size_t),
+        ("size_from", ctypes.c_void_p),
+    ]
 
     def __init__(self, shape):
         if isinstance(shape, int):
@@ -1945,6 +1947,8 @@ class array(Array):
                 warp.context.runtime.core.array_fill_device(
                     self.device.context, carr_ptr, ARRAY_TYPE_REGULAR, cvalue_ptr, cvalue_size
                 )
+            elif self.device.is_capturing:
+                self.device.cpu_capture.record_array_fill(carr, ARRAY_TYPE_REGULAR, cvalue_ptr, cvalue_size, self)
             else:
                 warp.context.runtime.core.array_fill_host(carr_ptr, ARRAY_TYPE_REGULAR, cvalue_ptr, cvalue_size)
 
@@ -2320,6 +2324,8 @@ class noncontiguous_array_base(Generic[T]):
             warp.context.runtime.core.array_fill_device(
                 self.device.context, ctype_ptr, self.type_id, cvalue_ptr, cvalue_size
             )
+        elif self.device.is_capturing:
+            self.device.cpu_capture.record_array_fill(ctype, self.type_id, cvalue_ptr, cvalue_size, self)
         else:
             warp.context.runtime.core.array_fill_host(ctype_ptr, self.type_id, cvalue_ptr, cvalue_size)
 
@@ -2474,8 +2480,25 @@ def array_type_id(a):
         raise ValueError("Invalid array type")
 
 
+# BVH construction algorithms, the values match BVHConstructorType in native/bvh.h
+bvh_constructor_values = {"sah": 0, "median": 1, "lbvh": 2}
+
+
+def get_bvh_constructor_value(constructor, device):
+    # keep the builders used before the constructor argument existed by default
+    if constructor is None:
+        constructor = "median" if device.is_cpu else "lbvh"
+
+    if constructor not in bvh_constructor_values:
+        raise RuntimeError(
+            f"Unknown BVH constructor '{constructor}', valid values are {', '.join(bvh_constructor_values.keys())}"
+        )
+
+    return bvh_constructor_values[constructor]
+
+
 class Bvh:
-    def __init__(self, lowers, uppers):
+    def __init__(self, lowers, uppers, constructor=None, wide_bvh=False):
         """Class representing a bounding volume hierarchy.
 
         Attributes:
@@ -2485,6 +2508,15 @@ class Bvh:
         Args:
             lowers (:class:`warp.array`): Array of lower bounds :class:`warp.vec3`
             uppers (:class:`warp.array`): Array of upper bounds :class:`warp.vec3`
+            constructor (str): Algorithm used to build the hierarchy, ``"sah"`` for a binned surface area heuristic
+                build, ``"median"`` for object median splits or ``"lbvh"`` for a linear BVH built from Morton codes.
+                Defaults to ``"median"`` on the CPU and ``"lbvh"`` on CUDA devices, where ``"sah"`` and ``"median"``
+                trees are built on the host and copied to the device.
+            wide_bvh (bool): If true and the bounds live on the CPU, the tree is also collapsed into a 4-wide BVH
+                with quantized child bounds that is used by the queries and kept up to date by :meth:`refit`.
+                The wide nodes are stored in addition to the binary nodes, so this trades extra memory for faster
+                queries. A warning is issued and the queries use the binary nodes if the tree is too deep for the
+                query stacks or its bounds are not finite. Ignored on CUDA devices.
         """
 
         if len(lowers) != len(uppers):
@@ -2503,6 +2535,8 @@ class Bvh:
         self.lowers = lowers
         self.uppers = uppers
 
+        constructor_value = get_bvh_constructor_value(constructor, self.device)
+
         def get_data(array):
             if array:
                 return ctypes.c_void_p(array.ptr)
@@ -2512,10 +2546,15 @@ class Bvh:
         from warp.context import runtime
 
         if self.device.is_cpu:
-            self.id = runtime.core.bvh_create_host(get_data(lowers), get_data(uppers), int(len(lowers)))
+            self.id = runtime.core.bvh_create_host(
+                get_data(lowers), get_data(uppers), int(len(lowers)), constructor_value
+            )
+
+            if wide_bvh and not runtime.core.bvh_create_wide_host(self.id):
+                warp.utils.warn("Bvh could not build the wide BVH, the queries use the binary BVH instead")
         else:
             self.id = runtime.core.bvh_create_device(
-                self.device.context, get_data(lowers), get_data(uppers), int(len(lowers))
+                self.device.context, get_data(lowers), get_data(uppers), int(len(lowers)), constructor_value
             )
 
     def __del__(self):
@@ -2538,7 +2577,10 @@ class Bvh:
         from warp.context import runtime
 
         if self.device.is_cpu:
-            runtime.core.bvh_refit_host(self.id)
+            if not runtime.core.bvh_refit_host(self.id):
+                warp.utils.warn(
+                    "Bvh bounds are not finite, the wide BVH was released and the queries use the binary BVH"
+                )
         else:
             runtime.core.bvh_refit_device(self.id)
             runtime.verify_cuda_device(self.device)
@@ -2553,7 +2595,15 @@ class Mesh:
         "indices": Var("indices", array(dtype=int32)),
     }
 
-    def __init__(self, points=None, indices=None, velocities=None, support_winding_number=False):
+    def __init__(
+        self,
+        points=None,
+        indices=None,
+        velocities=None,
+        support_winding_number=False,
+        constructor=None,
+        wide_bvh=False,
+    ):
         """Class representing a triangle mesh.
 
         Attributes:
@@ -2565,6 +2615,10 @@ class Mesh:
             indices (:class:`warp.array`): Array of triangle indices of type :class:`warp.int32`, should be a 1d array with shape (num_tris, 3)
             velocities (:class:`warp.array`): Array of vertex velocities of type :class:`warp.vec3` (optional)
             support_winding_number (bool): If true the mesh will build additional datastructures to support `wp.mesh_query_point_sign_winding_number()` queries
+            constructor (str): Algorithm used to build the BVH of the triangles, see :class:`warp.Bvh`
+            wide_bvh (bool): If true and the mesh lives on the CPU, the queries use a 4-wide BVH with quantized child
+                bounds, see :class:`warp.Bvh`. Winding number queries always use the binary BVH. The wide nodes
+                are stored in addition to the binary nodes and increase the memory used by the mesh.
         """
 
         if points.device != indices.device:
@@ -2587,6 +2641,8 @@ class Mesh:
         self.velocities = velocities
         self.indices = indices
 
+        constructor_value = get_bvh_constructor_value(constructor, self.device)
+
         from warp.context import runtime
 
         if self.device.is_cpu:
@@ -2597,7 +2653,11 @@ class Mesh:
                 int(len(points)),
                 int(indices.size / 3),
                 int(support_winding_number),
+                constructor_value,
             )
+
+            if wide_bvh and not runtime.core.mesh_create_wide_bvh_host(self.id):
+                warp.utils.warn("Mesh could not build the wide BVH, the queries use the binary BVH instead")
         else:
             self.id = runtime.core.mesh_create_device(
                 self.device.context,
@@ -2607,6 +2667,7 @@ class Mesh:
                 int(len(points)),
                 int(indices.size / 3),
                 int(support_winding_number),
+                constructor_value,
             )
 
     def __del__(self):
@@ -2628,7 +2689,10 @@ class Mesh:
         from warp.context import runtime
 
         if self.device.is_cpu:
-            runtime.core.mesh_refit_host(self.id)
+            if not runtime.core.mesh_refit_host(self.id):
+                warp.utils.warn(
+                    "Mesh points are not finite, the wide BVH was released and the queries use the binary BVH"
+                )
         else:
             runtime.core.mesh_refit_device(self.id)
             runtime.verify_cuda_device(self.device)
@@ -2760,13 +2824,11 @@ class Volume:
     ) -> Volume:
         """Creates a Volume object from a dense 3D NumPy array.
 
-        This function is only supported for CUDA devices.
-
         Args:
             min_world: The 3D coordinate of the lower corner of the volume.
             voxel_size: The size of each voxel in spatial coordinates.
             bg_value: Background value
-            device: The CUDA device to create the volume on, e.g.: "cuda" or "cuda:0".
+            device: The device to create the volume on, e.g.: "cpu", "cuda" or "cuda:0".
 
         Returns:
 
@@ -2851,8 +2913,6 @@ class Volume:
     ) -> Volume:
         """Allocate a new Volume based on the bounding box defined by min and max.
 
-        This function is only supported for CUDA devices.
-
         Allocate a volume that is large enough to contain voxels [min[0], min[1], min[2]] - [max[0], max[1], max[2]], inclusive.
         If points_in_world_space is true, then min and max are first converted to index space with the given voxel size and
         translation, and the volume is allocated with those.
@@ -2866,7 +2926,7 @@ class Volume:
             voxel_size (float): Voxel size of the new volume.
             bg_value (float or array-like): Value of unallocated voxels of the volume, also defines the volume's type, a :class:`warp.vec3` volume is created if this is `array-like`, otherwise a float volume is created
             translation (array-like): translation between the index and world spaces.
-            device (Devicelike): The CUDA device to create the volume on, e.g.: "cuda" or "cuda:0".
+            device (Devicelike): The device to create the volume on, e.g.: "cpu", "cuda" or "cuda:0".
 
         """
         if points_in_world_space:
@@ -2894,10 +2954,10 @@ class Volume:
     ) -> Volume:
         """Allocate a new Volume with active tiles for each point tile_points.
 
-        This function is only supported for CUDA devices.
-
         The smallest unit of allocation is a dense tile of 8x8x8 voxels.
         This is the primary method for allocating sparse volumes. It uses an array of points indicating the tiles that must be allocated.
+        On the CPU the volume is built by a multithreaded host builder, which is fast enough to rebuild a volume every frame.
+        The voxels of the new volume are initialized to `bg_value` on the CPU, and are undefined on CUDA devices.
 
         Example use cases:
             * `tile_points` can mark tiles directly in index space as in the case this method is called by `allocate`.
@@ -2911,7 +2971,7 @@ class Volume:
             voxel_size (float): Voxel size of the new volume.
             bg_value (float or array-like): Value of unallocated voxels of the volume, also defines the volume's type, a :class:`warp.vec3` volume is created if this is `array-like`, otherwise a float volume is created
             translation (array-like): Translation between the index and world spaces.
-            device (Devicelike): The CUDA device to create the volume on, e.g.: "cuda" or "cuda:0".
+            device (Devicelike): The device to create the volume on, e.g.: "cpu", "cuda" or "cuda:0".
 
         """
         from warp.context import runtime
@@ -2920,21 +2980,55 @@ class Volume:
 
         if voxel_size <= 0.0:
             raise RuntimeError(f"Voxel size must be positive! Got {voxel_size}")
-        if not device.is_cuda:
-            raise RuntimeError("Only CUDA devices are supported for allocate_by_tiles")
         if not (
             isinstance(tile_points, array)
             and (tile_points.dtype == int32 and tile_points.ndim == 2)
             or (tile_points.dtype == vec3 and tile_points.ndim == 1)
         ):
             raise RuntimeError("Expected an warp array of vec3s or of n-by-3 int32s as tile_points!")
-        if not tile_points.device.is_cuda:
+        if tile_points.device != device or not tile_points.is_contiguous:
             tile_points = array(tile_points, dtype=tile_points.dtype, device=device)
 
         volume = cls(data=None)
         volume.device = device
         in_world_space = tile_points.dtype == vec3
-        if hasattr(bg_value, "__len__"):
+        if device.is_cpu:
+            if hasattr(bg_value, "__len__"):
+                volume.id = volume.context.core.volume_v_from_tiles_host(
+                    ctypes.c_void_p(tile_points.ptr),
+                    tile_points.shape[0],
+                    voxel_size,
+                    bg_value[0],
+                    bg_value[1],
+                    bg_value[2],
+                    translation[0],
+                    translation[1],
+                    translation[2],
+                    in_world_space,
+                )
+            elif isinstance(bg_value, int):
+                volume.id = volume.context.core.volume_i_from_tiles_host(
+                    ctypes.c_void_p(tile_points.ptr),
+                    tile_points.shape[0],
+                    voxel_size,
+                    bg_value,
+                    translation[0],
+                    translation[1],
+                    translation[2],
+                    in_world_space,
+                )
+            else:
+                volume.id = volume.context.core.volume_f_from_tiles_host(
+                    ctypes.c_void_p(tile_points.ptr),
+                    tile_points.shape[0],
+                    voxel_size,
+                    float(bg_value),
+                    translation[0],
+                    translation[1],
+                    translation[2],
+                    in_world_space,
+                )
+        elif hasattr(bg_value, "__len__"):
             volume.id = volume.context.core.volume_v_from_tiles_device(
                 volume.device.context,
                 ctypes.c_void_p(tile_points.ptr),
@@ -2979,6 +3073,89 @@ class Volume:
         return volume
 
 
+# number of multiply-adds per matrix from which float32 and float64 host GEMMs use NumPy's BLAS, the native
+# implementation is faster for the small matrices of MLP layers but can't match the AVX kernels of BLAS on large ones
+_gemm_host_blas_min_size = 128 * 128 * 128
+
+
+def _gemm_host_blas(m, n, k, datatype, a, b, c, d, alpha, beta, row_major_a, row_major_b, batch_count):
+    """Computes a (batched) GEMM with the memory layouts of gemm_host() through NumPy views of the operands."""
+    dtype = np.dtype(datatype.decode())
+
+    def view(ptr, rows, cols, row_major):
+        buffer = (ctypes.c_byte * (batch_count * rows * cols * dtype.itemsize)).from_address(ptr.value)
+        if row_major:
+            return np.frombuffer(buffer, dtype=dtype).reshape(batch_count, rows, cols)
+        else:
+            return np.frombuffer(buffer, dtype=dtype).reshape(batch_count, cols, rows).transpose(0, 2, 1)
+
+    a_np = view(a, m, k, row_major_a)
+    b_np = view(b, k, n, row_major_b)
+    d_np = view(d, m, n, True)
+
+    if beta != 0.0 and c.value == d.value:
+        # accumulate into D after computing the product, D aliases C
+        product = np.matmul(a_np, b_np)
+        d_np *= beta
+        d_np += alpha * product
+        return True
+
+    np.matmul(a_np, b_np, out=d_np)
+
+    if alpha != 1.0:
+        d_np *= alpha
+
+    if beta != 0.0:
+        d_np += beta * view(c, m, n, True)
+
+    return True
+
+
+def _gemm(
+    device,
+    m: int,
+    n: int,
+    k: int,
+    datatype: bytes,
+    a,
+    b,
+    c,
+    d,
+    alpha: float,
+    beta: float,
+    row_major_a: builtins.bool,
+    row_major_b: builtins.bool,
+    allow_tf32x3_arith: builtins.bool,
+    batch_count: int,
+) -> builtins.bool:
+    """Dispatches a (batched) GEMM to the host implementations or to CUTLASS, returns True on success."""
+    from warp.context import runtime
+
+    if device.is_cpu:
+        if datatype in (b"<f4", b"<f8") and m * n * k >= _gemm_host_blas_min_size:
+            return _gemm_host_blas(m, n, k, datatype, a, b, c, d, alpha, beta, row_major_a, row_major_b, batch_count)
+
+        return runtime.core.gemm_host(m, n, k, datatype, a, b, c, d, alpha, beta, row_major_a, row_major_b, batch_count)
+    else:
+        return runtime.core.cutlass_gemm(
+            device.arch,
+            m,
+            n,
+            k,
+            datatype,
+            a,
+            b,
+            c,
+            d,
+            alpha,
+            beta,
+            row_major_a,
+            row_major_b,
+            allow_tf32x3_arith,
+            batch_count,
+        )
+
+
 def matmul(
     a: array2d,
     b: array2d,
@@ -3000,12 +3177,11 @@ def matmul(
         beta (float): parameter beta of GEMM
         allow_tf32x3_arith (bool): whether to use CUTLASS's 3xTF32 GEMMs, which enable accuracy similar to FP32
                                    while using Tensor Cores
-        device: device we want to use to multiply matrices. Defaults to active runtime device. If "cpu", resorts to using numpy multiplication.
+        device: device we want to use to multiply matrices. Defaults to active runtime device. On the CPU, small matrices use a blocked multithreaded implementation and large float32 and float64 matrices use NumPy's BLAS, both write directly to the outputs.
     """
     from warp.context import runtime
 
-    if device is None:
-        device = runtime.get_device(device)
+    device = runtime.get_device(device)
 
     if a.device != device or b.device != device or c.device != device or d.device != device:
         raise RuntimeError("Matrices A, B, C, and D must all be on the same device as the runtime device.")
@@ -3036,14 +3212,8 @@ def matmul(
             arrays=[a, b, c, d],
         )
 
-    # cpu fallback if no cuda devices found
-    if device == "cpu":
-        d.assign(alpha * (a.numpy() @ b.numpy()) + beta * c.numpy())
-        return
-
-    cc = device.arch
-    ret = runtime.core.cutlass_gemm(
-        cc,
+    ret = _gemm(
+        device,
         m,
         n,
         k,
@@ -3092,12 +3262,11 @@ def adj_matmul(
         beta (float): parameter beta of GEMM
         allow_tf32x3_arith (bool): whether to use CUTLASS's 3xTF32 GEMMs, which enable accuracy similar to FP32
                                    while using Tensor Cores
-        device: device we want to use to multiply matrices. Defaults to active runtime device. If "cpu", resorts to using numpy multiplication.
+        device: device we want to use to multiply matrices. Defaults to active runtime device. On the CPU, small matrices use a blocked multithreaded implementation and large float32 and float64 matrices use NumPy's BLAS, both write directly to the outputs.
     """
     from warp.context import runtime
 
-    if device is None:
-        device = runtime.get_device(device)
+    device = runtime.get_device(device)
 
     if (
         a.device != device
@@ -3155,19 +3324,11 @@ def adj_matmul(
             )
         )
 
-    # cpu fallback if no cuda devices found
-    if device == "cpu":
-        adj_a.assign(alpha * np.matmul(adj_d.numpy(), b.numpy().transpose()))
-        adj_b.assign(alpha * (a.numpy().transpose() @ adj_d.numpy()))
-        adj_c.assign(beta * adj_d.numpy())
-        return
-
-    cc = device.arch
 
     # adj_a
     if not a.is_transposed:
-        ret = runtime.core.cutlass_gemm(
-            cc,
+        ret = _gemm(
+            device,
             m,
             k,
             n,
@@ -3186,8 +3347,8 @@ def adj_matmul(
         if not ret:
             raise RuntimeError("adj_matmul failed.")
     else:
-        ret = runtime.core.cutlass_gemm(
-            cc,
+        ret = _gemm(
+            device,
             k,
             m,
             n,
@@ -3208,8 +3369,8 @@ def adj_matmul(
 
     # adj_b
     if not b.is_transposed:
-        ret = runtime.core.cutlass_gemm(
-            cc,
+        ret = _gemm(
+            device,
             k,
             n,
             m,
@@ -3228,8 +3389,8 @@ def adj_matmul(
         if not ret:
             raise RuntimeError("adj_matmul failed.")
     else:
-        ret = runtime.core.cutlass_gemm(
-            cc,
+        ret = _gemm(
+            device,
             n,
             k,
             m,
@@ -3249,8 +3410,8 @@ def adj_matmul(
             raise RuntimeError("adj_matmul failed.")        
 
     # adj_c
-    ret = runtime.core.cutlass_gemm(
-        cc,
+    ret = _gemm(
+        device,
         m,
         n,
         k,
@@ -3291,12 +3452,11 @@ def batched_matmul(
         beta (float): parameter beta of GEMM
         allow_tf32x3_arith (bool): whether to use CUTLASS's 3xTF32 GEMMs, which enable accuracy similar to FP32
                                    while using Tensor Cores
-        device: device we want to use to multiply matrices. Defaults to active runtime device. If "cpu", resorts to using numpy multiplication.
+        device: device we want to use to multiply matrices. Defaults to active runtime device. On the CPU, small matrices use a blocked multithreaded implementation and large float32 and float64 matrices use NumPy's BLAS, both write directly to the outputs.
     """
     from warp.context import runtime
 
-    if device is None:
-        device = runtime.get_device(device)
+    device = runtime.get_device(device)
 
     if a.device != device or b.device != device or c.device != device or d.device != device:
         raise RuntimeError("Matrices A, B, C, and D must all be on the same device as the runtime device.")
@@ -3328,22 +3488,16 @@ def batched_matmul(
             arrays=[a, b, c, d],
         )
 
-    # cpu fallback if no cuda devices found
-    if device == "cpu":
-        d.assign(alpha * np.matmul(a.numpy(), b.numpy()) + beta * c.numpy())
-        return
-
     # handle case in which batch_count exceeds max_batch_count, which is a CUDA array size maximum
     max_batch_count = 65535
     iters = int(batch_count / max_batch_count)
     remainder = batch_count % max_batch_count
 
-    cc = device.arch
     for i in range(iters):
         idx_start = i * max_batch_count
         idx_end = (i + 1) * max_batch_count if i < iters - 1 else batch_count
-        ret = runtime.core.cutlass_gemm(
-            cc,
+        ret = _gemm(
+            device,
             m,
             n,
             k,
@@ -3363,8 +3517,8 @@ def batched_matmul(
             raise RuntimeError("Batched matmul failed.")
     
     idx_start = iters * max_batch_count
-    ret = runtime.core.cutlass_gemm(
-        cc,
+    ret = _gemm(
+        device,
         m,
         n,
         k,
@@ -3411,12 +3565,11 @@ def adj_batched_matmul(
         beta (float): parameter beta of GEMM
         allow_tf32x3_arith (bool): whether to use CUTLASS's 3xTF32 GEMMs, which enable accuracy similar to FP32
                                    while using Tensor Cores
-        device: device we want to use to multiply matrices. Defaults to active runtime device. If "cpu", resorts to using numpy multiplication.
+        device: device we want to use to multiply matrices. Defaults to active runtime device. On the CPU, small matrices use a blocked multithreaded implementation and large float32 and float64 matrices use NumPy's BLAS, both write directly to the outputs.
     """
     from warp.context import runtime
 
-    if device is None:
-        device = runtime.get_device(device)
+    device = runtime.get_device(device)
 
     if (
         a.device != device
@@ -3474,19 +3627,11 @@ def adj_batched_matmul(
             "wp.matmul is only valid for contiguous arrays, with the exception that A and/or B and their associated adjoints may be transposed."
         )
 
-    # cpu fallback if no cuda devices found
-    if device == "cpu":
-        adj_a.assign(alpha * np.matmul(adj_d.numpy(), b.numpy().transpose((0, 2, 1))))
-        adj_b.assign(alpha * np.matmul(a.numpy().transpose((0, 2, 1)), adj_d.numpy()))
-        adj_c.assign(beta * adj_d.numpy())
-        return
-
     # handle case in which batch_count exceeds max_batch_count, which is a CUDA array size maximum
     max_batch_count = 65535
     iters = int(batch_count / max_batch_count)
     remainder = batch_count % max_batch_count
 
-    cc = device.arch
 
     for i in range(iters):
         idx_start = i * max_batch_count
@@ -3494,8 +3639,8 @@ def adj_batched_matmul(
 
         # adj_a
         if not a.is_transposed:
-            ret = runtime.core.cutlass_gemm(
-                cc,
+            ret = _gemm(
+                device,
                 m,
                 k,
                 n,
@@ -3514,8 +3659,8 @@ def adj_batched_matmul(
             if not ret:
                 raise RuntimeError("adj_matmul failed.")
         else:
-            ret = runtime.core.cutlass_gemm(
-                cc,
+            ret = _gemm(
+                device,
                 k,
                 m,
                 n,
@@ -3536,8 +3681,8 @@ def adj_batched_matmul(
 
         # adj_b
         if not b.is_transposed:
-            ret = runtime.core.cutlass_gemm(
-                cc,
+            ret = _gemm(
+                device,
                 k,
                 n,
                 m,
@@ -3556,8 +3701,8 @@ def adj_batched_matmul(
             if not ret:
                 raise RuntimeError("adj_matmul failed.")
         else:
-            ret = runtime.core.cutlass_gemm(
-                cc,
+            ret = _gemm(
+                device,
                 n,
                 k,
                 m,
@@ -3577,8 +3722,8 @@ def adj_batched_matmul(
                 raise RuntimeError("adj_matmul failed.")   
 
         # adj_c
-        ret = runtime.core.cutlass_gemm(
-            cc,
+        ret = _gemm(
+            device,
             m,
             n,
             k,
@@ -3601,8 +3746,8 @@ def adj_batched_matmul(
     
     # adj_a
     if not a.is_transposed:
-        ret = runtime.core.cutlass_gemm(
-            cc,
+        ret = _gemm(
+            device,
             m,
             k,
             n,
@@ -3621,8 +3766,8 @@ def adj_batched_matmul(
         if not ret:
             raise RuntimeError("adj_matmul failed.")
     else:
-        ret = runtime.core.cutlass_gemm(
-            cc,
+        ret = _gemm(
+            device,
             k,
             m,
             n,
@@ -3643,8 +3788,8 @@ def adj_batched_matmul(
 
     # adj_b
     if not b.is_transposed:
-        ret = runtime.core.cutlass_gemm(
-            cc,
+        ret = _gemm(
+            device,
             k,
             n,
             m,
@@ -3663,8 +3808,8 @@ def adj_batched_matmul(
         if not ret:
             raise RuntimeError("adj_matmul failed.")
     else:
-        ret = runtime.core.cutlass_gemm(
-            cc,
+        ret = _gemm(
+            device,
             n,
             k,
             m,
@@ -3684,8 +3829,8 @@ def adj_batched_matmul(
             raise RuntimeError("adj_matmul failed.")   
 
     # adj_c
-    ret = runtime.core.cutlass_gemm(
-        cc,
+    ret = _gemm(
+        device,
         m,
         n,
         k,
@@ -3705,7 +3850,7 @@ def adj_batched_matmul(
         raise RuntimeError("adj_batched_matmul failed.")
 
 class HashGrid:
-    def __init__(self, dim_x, dim_y, dim_z, device=None):
+    def __init__(self, dim_x, dim_y, dim_z, device=None, sparse=False):
         """Class representing a hash grid object for accelerated point queries.
 
         Attributes:
@@ -3716,16 +3861,22 @@ class HashGrid:
             dim_x (int): Number of cells in x-axis
             dim_y (int): Number of cells in y-axis
             dim_z (int): Number of cells in z-axis
+            sparse (bool): If true and the grid lives on the CPU, only the occupied cells are stored in an
+                open-addressing hash table instead of dense arrays of ``dim_x*dim_y*dim_z`` cells, so that fine
+                grids over sparse point sets stay small. Ignored on CUDA devices.
         """
 
         from warp.context import runtime
 
+        if dim_x * dim_y * dim_z >= 2**31:
+            raise RuntimeError(f"HashGrid dimensions {dim_x}x{dim_y}x{dim_z} exceed the maximum of 2^31 cells")
+
         self.device = runtime.get_device(device)
 
         if self.device.is_cpu:
-            self.id = runtime.core.hash_grid_create_host(dim_x, dim_y, dim_z)
+            self.id = runtime.core.hash_grid_create_host(dim_x, dim_y, dim_z, int(sparse))
         else:
-            self.id = runtime.core.hash_grid_create_device(self.device.context, dim_x, dim_y, dim_z)
+            self.id = runtime.core.hash_grid_create_device(self.device.context, dim_x, dim_y, dim_z, int(sparse))
 
         # indicates whether the grid data has been reserved for use by a kernel
         self.reserved = False
@@ -3777,13 +3928,27 @@ class HashGrid:
 
 class MarchingCubes:
     def __init__(self, nx: int, ny: int, nz: int, max_verts: int, max_tris: int, device=None):
+        """Class representing a marching cubes surfacer that extracts the iso-surface of a dense scalar field.
+
+        The vertices are created once per crossed grid edge and shared by the adjacent triangles. On the CPU the
+        surface can also be extracted slab by slab with :meth:`surface_slabs`.
+
+        Attributes:
+            verts (:class:`warp.array`): Vertices of the last extracted surface, in grid coordinates
+            indices (:class:`warp.array`): Vertex indices of the last extracted surface, 3 per triangle
+
+        Args:
+            nx (int): Number of field samples along the x-axis
+            ny (int): Number of field samples along the y-axis
+            nz (int): Number of field samples along the z-axis
+            max_verts (int): Maximum number of vertices of the extracted surface
+            max_tris (int): Maximum number of triangles of the extracted surface
+        """
+
         from warp.context import runtime
 
         self.device = runtime.get_device(device)
 
-        if not self.device.is_cuda:
-            raise RuntimeError("Only CUDA devices are supported for marching cubes")
-
         self.nx = nx
         self.ny = ny
         self.nz = nz
@@ -3791,44 +3956,95 @@ class MarchingCubes:
         self.max_verts = max_verts
         self.max_tris = max_tris
 
-        # bindings to warp.so
-        self.alloc = runtime.core.marching_cubes_create_device
-        self.alloc.argtypes = [ctypes.c_void_p]
-        self.alloc.restype = ctypes.c_uint64
-        self.free = runtime.core.marching_cubes_destroy_device
+        if self.device.is_cpu:
+            self.id = ctypes.c_uint64(runtime.core.marching_cubes_create_host())
+        else:
+            # bindings to warp.so
+            self.alloc = runtime.core.marching_cubes_create_device
+            self.alloc.argtypes = [ctypes.c_void_p]
+            self.alloc.restype = ctypes.c_uint64
+            self.free = runtime.core.marching_cubes_destroy_device
+
+            # alloc surfacer
+            self.id = ctypes.c_uint64(self.alloc(self.device.context))
 
+        self._alloc_geometry()
+
+    def __del__(self):
+        try:
+            from warp.context import runtime
+
+            if self.device.is_cpu:
+                runtime.core.marching_cubes_destroy_host(self.id)
+            else:
+                # use CUDA context guard to avoid side effects during garbage collection
+                with self.device.context_guard:
+                    # destroy surfacer
+                    self.free(self.id)
+
+        except Exception:
+            pass
+
+    def _alloc_geometry(self):
         from warp.context import zeros
 
-        self.verts = zeros(max_verts, dtype=vec3, device=self.device)
-        self.indices = zeros(max_tris * 3, dtype=int, device=self.device)
+        self.verts = zeros(self.max_verts, dtype=vec3, device=self.device)
+        self.indices = zeros(self.max_tris * 3, dtype=int, device=self.device)
 
-        # alloc surfacer
-        self.id = ctypes.c_uint64(self.alloc(self.device.context))
+    def _set_geometry_size(self, num_verts, num_tris):
+        # resize the geometry arrays
+        self.verts.shape = (num_verts,)
+        self.indices.shape = (num_tris * 3,)
 
-    def __del__(self):
-        # use CUDA context guard to avoid side effects during garbage collection
-        with self.device.context_guard:
-            # destroy surfacer
-            self.free(self.id)
+        self.verts.size = num_verts
+        self.indices.size = num_tris * 3
 
     def resize(self, nx: int, ny: int, nz: int, max_verts: int, max_tris: int):
         # actual allocations will be resized on next call to surface()
         self.nx = nx
         self.ny = ny
         self.nz = nz
-        self.max_verts = max_verts
-        self.max_tris = max_tris
+
+        if max_verts != self.max_verts or max_tris != self.max_tris:
+            self.max_verts = max_verts
+            self.max_tris = max_tris
+
+            self._alloc_geometry()
 
     def surface(self, field: array(dtype=float), threshold: float):
+        """Extracts the iso-surface of a field into :attr:`verts` and :attr:`indices`.
+
+        Args:
+            field (:class:`warp.array`): Contiguous array of ``nx*ny*nz`` samples, indexed by ``(x*ny + y)*nz + z``
+            threshold (float): Iso-value of the extracted surface
+        """
+
         from warp.context import runtime
 
+        # the field is read by a native loop, which does not check its bounds
+        if not isinstance(field, array) or field.device != self.device or field.dtype != float32:
+            raise RuntimeError(f"Marching cubes field must be a float32 array on device {self.device}")
+
+        if not field.is_contiguous:
+            raise RuntimeError("Marching cubes field must be a contiguous array")
+
+        field_size = self.nx * self.ny * self.nz
+        if field.size != field_size:
+            raise RuntimeError(
+                f"Marching cubes field of {field.size} samples does not match the {field_size} samples of the grid"
+            )
+
         # WP_API int marching_cubes_surface_host(const float* field, int nx, int ny, int nz, float threshold, wp::vec3* verts, int* triangles, int max_verts, int max_tris, int* out_num_verts, int* out_num_tris);
         num_verts = ctypes.c_int(0)
         num_tris = ctypes.c_int(0)
 
-        runtime.core.marching_cubes_surface_device.restype = ctypes.c_int
+        if self.device.is_cpu:
+            surface_func = runtime.core.marching_cubes_surface_host
+        else:
+            surface_func = runtime.core.marching_cubes_surface_device
+            surface_func.restype = ctypes.c_int
 
-        error = runtime.core.marching_cubes_surface_device(
+        error = surface_func(
             self.id,
             ctypes.cast(field.ptr, ctypes.c_void_p),
             self.nx,
@@ -3845,15 +4061,82 @@ class MarchingCubes:
 
         if error:
             raise RuntimeError(
-                "Buffers may not be large enough, marching cubes required at least {num_verts} vertices, and {num_tris} triangles."
+                f"Buffers may not be large enough, marching cubes required at least {num_verts.value} vertices, and {num_tris.value} triangles."
             )
 
-        # resize the geometry arrays
-        self.verts.shape = (num_verts.value,)
-        self.indices.shape = (num_tris.value * 3,)
+        self._set_geometry_size(num_verts.value, num_tris.value)
+
+    def surface_slabs(self, slabs, threshold: float):
+        """Extracts the iso-surface of a field provided as consecutive slabs of x-planes, CPU only.
+
+        Only the current slab and two planes of the previous one are accessed at a time, so that surfaces can be
+        extracted from fields that do not fit in memory, e.g. by loading the slabs from disk in a generator.
+        The resulting :attr:`verts` and :attr:`indices` are the same as the ones computed by :meth:`surface`
+        for the whole field.
+
+        Args:
+            slabs: Iterable of contiguous CPU arrays of ``k*ny*nz`` samples, e.g. of shape ``(k, ny, nz)``, holding
+                the field at ``k`` consecutive planes along the x-axis. The slabs must cover the ``nx`` planes in
+                order. NumPy arrays are also accepted.
+            threshold (float): Iso-value of the extracted surface
+        """
+
+        from warp.context import runtime
+
+        if not self.device.is_cpu:
+            raise RuntimeError("Marching cubes slabs are only supported on the CPU")
+
+        num_verts = ctypes.c_int(0)
+        num_tris = ctypes.c_int(0)
+
+        plane_size = self.ny * self.nz
+        x_begin = 0
+        error = 0
+
+        for slab in slabs:
+            if not isinstance(slab, array):
+                slab = array(slab, dtype=float32, device=self.device)
+
+            if slab.device != self.device or slab.dtype != float32 or not slab.is_contiguous:
+                raise RuntimeError("Marching cubes slabs must be contiguous float32 arrays on the CPU")
+
+            if slab.size == 0 or slab.size % plane_size != 0:
+                raise RuntimeError(
+                    f"Marching cubes slab of {slab.size} samples is not made of planes of {plane_size} samples"
+                )
+
+            x_end = x_begin + slab.size // plane_size
+            if x_end > self.nx:
+                raise RuntimeError(f"Marching cubes slabs cover more than the {self.nx} planes of the grid")
+
+            error |= runtime.core.marching_cubes_surface_slab_host(
+                self.id,
+                ctypes.cast(slab.ptr, ctypes.c_void_p),
+                x_begin,
+                x_end,
+                self.nx,
+                self.ny,
+                self.nz,
+                ctypes.c_float(threshold),
+                ctypes.cast(self.verts.ptr, ctypes.c_void_p),
+                ctypes.cast(self.indices.ptr, ctypes.c_void_p),
+                self.max_verts,
+                self.max_tris,
+                ctypes.c_void_p(ctypes.addressof(num_verts)),
+                ctypes.c_void_p(ctypes.addressof(num_tris)),
+            )
+
+            x_begin = x_end
+
+        if x_begin != self.nx:
+            raise RuntimeError(f"Marching cubes slabs cover {x_begin} of the {self.nx} planes of the grid")
+
+        if error:
+            raise RuntimeError(
+                f"Buffers may not be large enough, marching cubes required at least {num_verts.value} vertices, and {num_tris.value} triangles."
+            )
 
-        self.verts.size = num_verts.value
-        self.indices.size = num_tris.value * 3
+        self._set_geometry_size(num_verts.value, num_tris.value)
 
 
 def type_is_generic(t):
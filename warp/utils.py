@@ -48,6 +48,17 @@ def quat_between_vectors(a: wp.vec3, b: wp.vec3) -> wp.quat:
     return wp.normalize(q)
 
 
+# scalar types supported by the scans, reductions and run-length encoding, mapped to their native suffix
+scan_value_types = {
+    wp.int32: "int",
+    wp.uint32: "uint",
+    wp.int64: "int64",
+    wp.uint64: "uint64",
+    wp.float32: "float",
+    wp.float64: "double",
+}
+
+
 def array_scan(in_array, out_array, inclusive=True):
     if in_array.device != out_array.device:
         raise RuntimeError("Array storage devices do not match")
@@ -61,25 +72,70 @@ def array_scan(in_array, out_array, inclusive=True):
     if in_array.size == 0:
         return
 
+    scalar_type = wp.types.type_scalar_type(in_array.dtype)
+    type_length = wp.types.type_length(in_array.dtype)
+
+    if scalar_type not in scan_value_types:
+        raise RuntimeError("Unsupported data type")
+
+    value_type = scan_value_types[scalar_type]
+
     from warp.context import runtime
 
     if in_array.device.is_cpu:
-        if in_array.dtype == wp.int32:
-            runtime.core.array_scan_int_host(in_array.ptr, out_array.ptr, in_array.size, inclusive)
-        elif in_array.dtype == wp.float32:
-            runtime.core.array_scan_float_host(in_array.ptr, out_array.ptr, in_array.size, inclusive)
-        else:
-            raise RuntimeError("Unsupported data type")
+        array_scan_func = getattr(runtime.core, f"array_scan_{value_type}_host")
+        array_scan_func(in_array.ptr, out_array.ptr, in_array.size, inclusive, type_length)
     elif in_array.device.is_cuda:
-        if in_array.dtype == wp.int32:
-            runtime.core.array_scan_int_device(in_array.ptr, out_array.ptr, in_array.size, inclusive)
-        elif in_array.dtype == wp.float32:
-            runtime.core.array_scan_float_device(in_array.ptr, out_array.ptr, in_array.size, inclusive)
-        else:
+        # vector types are only supported on the CPU
+        if type_length != 1:
             raise RuntimeError("Unsupported data type")
 
+        array_scan_func = getattr(runtime.core, f"array_scan_{value_type}_device")
+        array_scan_func(in_array.ptr, out_array.ptr, in_array.size, inclusive)
+
+
+# key types supported by the radix sorts, mapped to the suffix of their native functions
+radix_sort_key_types = {
+    wp.int32: "int",
+    wp.uint32: "uint",
+    wp.int64: "int64",
+    wp.uint64: "uint64",
+    wp.float32: "float",
+}
+
+
+def get_radix_sort_bit_range(keys, values, begin_bit, end_bit):
+    if values.dtype != wp.int32 or keys.dtype not in radix_sort_key_types:
+        raise RuntimeError("Unsupported data type")
+
+    key_bits = wp.types.type_size_in_bytes(keys.dtype) * 8
+
+    if end_bit is None:
+        end_bit = key_bits
+
+    if begin_bit < 0 or end_bit > key_bits or begin_bit > end_bit:
+        raise RuntimeError(f"Invalid bit range [{begin_bit}, {end_bit}) for keys of {key_bits} bits")
+
+    return begin_bit, end_bit
+
+
+def radix_sort_pairs(keys, values, count: int, begin_bit: int = 0, end_bit: int = None):
+    """Sorts the first ``count`` key-value pairs by key, the sort is stable.
+
+    Keys can be of type ``int32``, ``uint32``, ``int64``, ``uint64`` or ``float32``, values must be ``int32``.
+    Both arrays must have storage for ``2*count`` elements, the second half is used as temporary memory.
+
+    Args:
+        keys: Array of keys
+        values: Array of values
+        count: Number of pairs to sort
+        begin_bit: First bit of the keys compared by the sort
+        end_bit: Bit after the last bit of the keys compared by the sort, defaults to the size of the keys.
+            Limiting the bit range skips the sorting passes of the other bits, e.g. for keys that are
+            known to be smaller than ``2**end_bit``. The bits of signed and floating-point keys are taken
+            from an unsigned representation that preserves their order.
+    """
 
-def radix_sort_pairs(keys, values, count: int):
     if keys.device != values.device:
         raise RuntimeError("Array storage devices do not match")
 
@@ -89,18 +145,110 @@ def radix_sort_pairs(keys, values, count: int):
     if keys.size < 2 * count or values.size < 2 * count:
         raise RuntimeError("Array storage must be large enough to contain 2*count elements")
 
+    begin_bit, end_bit = get_radix_sort_bit_range(keys, values, begin_bit, end_bit)
+
     from warp.context import runtime
 
+    key_type = radix_sort_key_types[keys.dtype]
+
     if keys.device.is_cpu:
-        if keys.dtype == wp.int32 and values.dtype == wp.int32:
-            runtime.core.radix_sort_pairs_int_host(keys.ptr, values.ptr, count)
-        else:
-            raise RuntimeError("Unsupported data type")
+        radix_sort_pairs_func = getattr(runtime.core, f"radix_sort_pairs_{key_type}_host")
     elif keys.device.is_cuda:
-        if keys.dtype == wp.int32 and values.dtype == wp.int32:
-            runtime.core.radix_sort_pairs_int_device(keys.ptr, values.ptr, count)
+        radix_sort_pairs_func = getattr(runtime.core, f"radix_sort_pairs_{key_type}_device")
+
+    radix_sort_pairs_func(keys.ptr, values.ptr, count, begin_bit, end_bit)
+
+
+def segmented_sort_pairs(
+    keys,
+    values,
+    count: int,
+    segment_start_indices,
+    segment_end_indices=None,
+    begin_bit: int = 0,
+    end_bit: int = None,
+):
+    """Sorts the key-value pairs of each segment by key independently, the sort is stable.
+
+    The segments are given by ranges of indices into the first ``count`` pairs. Pairs that are not
+    in a segment are left unchanged. The key types, storage requirements and bit range are the same
+    as for :func:`radix_sort_pairs`.
+
+    Each segment must satisfy ``0 <= start <= end <= count`` and the segments must not overlap.
+    This is checked for CPU arrays, the segments of CUDA arrays are not checked.
+
+    Args:
+        keys: Array of keys
+        values: Array of values
+        count: Number of pairs covered by the segments
+        segment_start_indices: ``int32`` array of the start index of each segment. If ``segment_end_indices``
+            is None, segment ``i`` ends at the start of segment ``i+1`` and the last entry only marks the end
+            of the last segment.
+        segment_end_indices: Optional ``int32`` array of the end index (exclusive) of each segment
+        begin_bit: First bit of the keys compared by the sort
+        end_bit: Bit after the last bit of the keys compared by the sort, defaults to the size of the keys
+    """
+
+    if keys.device != values.device or segment_start_indices.device != keys.device:
+        raise RuntimeError("Array storage devices do not match")
+
+    if segment_end_indices is not None and segment_end_indices.device != keys.device:
+        raise RuntimeError("Array storage devices do not match")
+
+    if keys.size < 2 * count or values.size < 2 * count:
+        raise RuntimeError("Array storage must be large enough to contain 2*count elements")
+
+    if segment_start_indices.dtype != wp.int32 or (
+        segment_end_indices is not None and segment_end_indices.dtype != wp.int32
+    ):
+        raise RuntimeError("Segment indices must be of type int32")
+
+    if segment_end_indices is None:
+        num_segments = segment_start_indices.size - 1
+    elif segment_end_indices.size != segment_start_indices.size:
+        raise RuntimeError("Segment start and end index arrays must have the same size")
+    else:
+        num_segments = segment_start_indices.size
+
+    begin_bit, end_bit = get_radix_sort_bit_range(keys, values, begin_bit, end_bit)
+
+    if count == 0 or num_segments <= 0:
+        return
+
+    if keys.device.is_cpu:
+        # the host sort indexes the keys with the segment bounds and sorts segments concurrently
+        starts = segment_start_indices.numpy()
+        if segment_end_indices is None:
+            starts, ends = starts[:-1], starts[1:]
         else:
-            raise RuntimeError("Unsupported data type")
+            ends = segment_end_indices.numpy()
+
+        if np.any(starts < 0) or np.any(ends > count) or np.any(starts > ends):
+            raise RuntimeError("Segment indices must satisfy 0 <= start <= end <= count")
+
+        non_empty = starts < ends
+        order = np.argsort(starts[non_empty], kind="stable")
+        if np.any(starts[non_empty][order][1:] < ends[non_empty][order][:-1]):
+            raise RuntimeError("Segments must not overlap")
+
+    if segment_end_indices is None:
+        # the end of each segment is the start of the next one
+        segment_end_ptr = segment_start_indices.ptr + wp.types.type_size_in_bytes(wp.int32)
+    else:
+        segment_end_ptr = segment_end_indices.ptr
+
+    from warp.context import runtime
+
+    key_type = radix_sort_key_types[keys.dtype]
+
+    if keys.device.is_cpu:
+        segmented_sort_pairs_func = getattr(runtime.core, f"segmented_sort_pairs_{key_type}_host")
+    elif keys.device.is_cuda:
+        segmented_sort_pairs_func = getattr(runtime.core, f"segmented_sort_pairs_{key_type}_device")
+
+    segmented_sort_pairs_func(
+        keys.ptr, values.ptr, count, segment_start_indices.ptr, segment_end_ptr, num_segments, begin_bit, end_bit
+    )
 
 
 def runlength_encode(values, run_values, run_lengths, run_count=None, value_count=None):
@@ -136,23 +284,27 @@ def runlength_encode(values, run_values, run_lengths, run_count=None, value_coun
             return 0
         host_return = False
 
+    scalar_type = wp.types.type_scalar_type(values.dtype)
+    type_length = wp.types.type_length(values.dtype)
+
+    if scalar_type not in scan_value_types:
+        raise RuntimeError("Unsupported data type")
+
+    value_type = scan_value_types[scalar_type]
+
     from warp.context import runtime
 
     if values.device.is_cpu:
-        if values.dtype == wp.int32:
-            runtime.core.runlength_encode_int_host(
-                values.ptr, run_values.ptr, run_lengths.ptr, run_count.ptr, value_count
-            )
-        else:
-            raise RuntimeError("Unsupported data type")
+        runlength_encode_func = getattr(runtime.core, f"runlength_encode_{value_type}_host")
+        runlength_encode_func(values.ptr, run_values.ptr, run_lengths.ptr, run_count.ptr, value_count, type_length)
     elif values.device.is_cuda:
-        if values.dtype == wp.int32:
-            runtime.core.runlength_encode_int_device(
-                values.ptr, run_values.ptr, run_lengths.ptr, run_count.ptr, value_count
-            )
-        else:
+        # vector types are only supported on the CPU
+        if type_length != 1:
             raise RuntimeError("Unsupported data type")
 
+        runlength_encode_func = getattr(runtime.core, f"runlength_encode_{value_type}_device")
+        runlength_encode_func(values.ptr, run_values.ptr, run_lengths.ptr, run_count.ptr, value_count)
+
     if host_return:
         return int(run_count.numpy()[0])
 
@@ -198,20 +350,13 @@ def array_sum(values, out=None, value_count=None, axis=None):
 
     from warp.context import runtime
 
+    if scalar_type not in scan_value_types:
+        raise RuntimeError("Unsupported data type")
+
     if values.device.is_cpu:
-        if scalar_type == wp.float32:
-            native_func = runtime.core.array_sum_float_host
-        elif scalar_type == wp.float64:
-            native_func = runtime.core.array_sum_double_host
-        else:
-            raise RuntimeError("Unsupported data type")
+        native_func = getattr(runtime.core, f"array_sum_{scan_value_types[scalar_type]}_host")
     elif values.device.is_cuda:
-        if scalar_type == wp.float32:
-            native_func = runtime.core.array_sum_float_device
-        elif scalar_type == wp.float64:
-            native_func = runtime.core.array_sum_double_device
-        else:
-            raise RuntimeError("Unsupported data type")
+        native_func = getattr(runtime.core, f"array_sum_{scan_value_types[scalar_type]}_device")
 
     if axis is None:
         stride = wp.types.type_size_in_bytes(values.dtype)
@@ -280,27 +425,20 @@ def array_inner(a, b, out=None, count=None, axis=None):
             raise RuntimeError(f"out array should have shape {output_shape}")
 
     if count == 0:
-        if axis is None and host_return:
-            return 0.0
         out.zero_()
+        if axis is None and host_return:
+            return out.numpy()[0]
         return out
 
     from warp.context import runtime
 
+    if scalar_type not in scan_value_types:
+        raise RuntimeError("Unsupported data type")
+
     if a.device.is_cpu:
-        if scalar_type == wp.float32:
-            native_func = runtime.core.array_inner_float_host
-        elif scalar_type == wp.float64:
-            native_func = runtime.core.array_inner_double_host
-        else:
-            raise RuntimeError("Unsupported data type")
+        native_func = getattr(runtime.core, f"array_inner_{scan_value_types[scalar_type]}_host")
     elif a.device.is_cuda:
-        if scalar_type == wp.float32:
-            native_func = runtime.core.array_inner_float_device
-        elif scalar_type == wp.float64:
-            native_func = runtime.core.array_inner_double_device
-        else:
-            raise RuntimeError("Unsupported data type")
+        native_func = getattr(runtime.core, f"array_inner_{scan_value_types[scalar_type]}_device")
 
     if axis is None:
         stride_a = wp.types.type_size_in_bytes(a.dtype)